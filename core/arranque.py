@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Arranque rápido y perfil de arranque.
+
+Este módulo reúne las dos herramientas que mantienen corto el tiempo hasta
+el primer frame:
+1. importar_diferido: registra un módulo en sys.modules sin ejecutarlo; el
+   código del módulo corre recién cuando se usa uno de sus atributos. Así la
+   simulación sin ventana nunca paga la importación de pygame.
+2. PerfilArranque: con --profile-startup instala un buscador al frente de
+   sys.meta_path que cronometra la carga de cada módulo (tiempo propio y con
+   sus dependencias) y permite medir las etapas de inicialización.
+"""
+
+import importlib.util
+import sys
+import time
+from contextlib import contextmanager
+
+def importar_diferido(nombre):
+    """
+    Importa un módulo de forma diferida con importlib.util.LazyLoader.
+
+    Parámetros:
+        nombre (str): Nombre completo del módulo, p. ej. "pygame"
+
+    Retorna:
+        module: El módulo; se ejecuta al acceder a su primer atributo
+
+    Si el módulo ya estaba importado se devuelve tal cual. Si no se puede
+    diferir (módulos integrados o sin exec_module) se importa normalmente.
+    """
+    modulo = sys.modules.get(nombre)
+    if modulo is not None:
+        return modulo
+
+    spec = importlib.util.find_spec(nombre)
+    if spec is None:
+        raise ModuleNotFoundError(f"No se encontró el módulo {nombre!r}", name=nombre)
+    if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+        return importlib.import_module(nombre)
+
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+class _CargadorCronometrado:
+    """
+    Envoltorio de un cargador que mide cuánto tarda en crear y ejecutar el módulo.
+
+    Al terminar restituye el cargador original en el módulo, así el resto del
+    programa (recursos de paquetes, recargas) no ve el envoltorio.
+    """
+
+    def __init__(self, cargador, perfil):
+        self.cargador = cargador
+        self.perfil = perfil
+
+    def create_module(self, spec):
+        creador = getattr(self.cargador, "create_module", None)
+        if creador is None:
+            return None
+        with self.perfil._cronometrar(spec.name):
+            return creador(spec)
+
+    def exec_module(self, modulo):
+        try:
+            with self.perfil._cronometrar(modulo.__name__):
+                self.cargador.exec_module(modulo)
+        finally:
+            modulo.__loader__ = self.cargador
+            if modulo.__spec__ is not None and modulo.__spec__.loader is self:
+                modulo.__spec__.loader = self.cargador
+
+    def __getattr__(self, nombre):
+        return getattr(self.cargador, nombre)
+
+class _BuscadorCronometrado:
+    """Buscador de sys.meta_path que delega en los demás y envuelve el cargador encontrado"""
+
+    def __init__(self, perfil):
+        self.perfil = perfil
+
+    def find_spec(self, nombre, ruta=None, objetivo=None):
+        for buscador in sys.meta_path:
+            if buscador is self:
+                continue
+            buscar = getattr(buscador, "find_spec", None)
+            spec = buscar(nombre, ruta, objetivo) if buscar is not None else None
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _CargadorCronometrado(spec.loader, self.perfil)
+        return spec
+
+class PerfilArranque:
+    """
+    Tiempos de importación por módulo y de las etapas de inicialización.
+
+    Atributos:
+        activo (bool): Si el buscador cronometrado está instalado
+        importaciones (dict): nombre -> [segundos con dependencias, segundos propios]
+        etapas (list): Pares (etapa, segundos) en el orden en que se midieron
+    """
+
+    def __init__(self):
+        self.activo = False
+        self.importaciones = {}
+        self.etapas = []
+        self._buscador = _BuscadorCronometrado(self)
+        self._pila = []
+        self._inicio = None
+
+    def activar(self):
+        """Instala el buscador cronometrado al frente de sys.meta_path"""
+        if not self.activo:
+            sys.meta_path.insert(0, self._buscador)
+            self._inicio = time.perf_counter()
+            self.activo = True
+
+    def desactivar(self):
+        """Quita el buscador; los tiempos medidos se conservan"""
+        if self.activo:
+            sys.meta_path.remove(self._buscador)
+            self.activo = False
+
+    @contextmanager
+    def medir(self, etapa):
+        """Mide una etapa de inicialización (sin costo si el perfil no está activo)"""
+        if not self.activo:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.append((etapa, time.perf_counter() - inicio))
+
+    @contextmanager
+    def _cronometrar(self, nombre):
+        """Acumula el tiempo de carga de un módulo descontando el de los módulos anidados"""
+        marco = [nombre, 0.0]
+        self._pila.append(marco)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            transcurrido = time.perf_counter() - inicio
+            self._pila.pop()
+            if self._pila:
+                self._pila[-1][1] += transcurrido
+            tiempos = self.importaciones.setdefault(nombre, [0.0, 0.0])
+            tiempos[0] += transcurrido
+            tiempos[1] += transcurrido - marco[1]
+
+    def reporte(self, limite=20):
+        """
+        Arma el reporte de arranque.
+
+        Parámetros:
+            limite (int): Cantidad de módulos a listar, los de mayor tiempo propio primero
+
+        Retorna:
+            list: Líneas de texto listas para imprimir
+        """
+        lineas = []
+        if self._inicio is not None:
+            lineas.append(f"Arranque: {(time.perf_counter() - self._inicio) * 1000:.1f} ms desde --profile-startup")
+        ordenadas = sorted(self.importaciones.items(), key=lambda item: item[1][1], reverse=True)[:limite]
+        ancho = max([32] + [len(nombre) for nombre, _ in self.etapas + ordenadas])
+
+        lineas.append("Etapas de inicialización:")
+        for etapa, segundos in self.etapas:
+            lineas.append(f"  {etapa:<{ancho}} {segundos * 1000:8.1f} ms")
+        lineas.append(f"Importaciones ({len(self.importaciones)} módulos, propio / con dependencias):")
+        for nombre, (total, propio) in ordenadas:
+            lineas.append(f"  {nombre:<{ancho}} {propio * 1000:8.1f} ms {total * 1000:8.1f} ms")
+        return lineas
+
+# Perfil compartido por main.py y headless.py
+perfil_arranque = PerfilArranque()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Configuración de la geometría del contenedor, sus alimentadores y su drenaje.
+
+Este módulo reúne los valores que definen el contenedor simulado (ancho,
+alto, unidades por celda, implementación de grilla, bocas de llenado y
+compuertas de descarga) a partir de tres fuentes, en orden de prioridad
+creciente:
+1. Las constantes por defecto de core/constantes.py
+2. Un archivo JSON de configuración (perlita.json o el indicado con --config)
+3. Los argumentos de línea de comandos
+
+Ejemplo de archivo de configuración para un silo ancho con dos bocas:
+    {"ancho": 1200, "alto": 900, "celda": 1, "backend": "auto",
+     "alimentadores": [
+         {"posicion": 0.3, "tasa": 400, "distribucion": "gaussiana", "dispersion": 0.03},
+         {"posicion": 0.7, "tasa": 250, "distribucion": "boquilla", "cluster": [2, 2]}
+     ],
+     "drenaje": "compuertas",
+     "compuertas": [{"posicion": 0.5, "ancho": 0.1, "caudal": 12}]}
+"""
+
+import json
+import os
+from core.constantes import (ANCHO_AREA_JUEGO, ALTO_AREA_JUEGO, TAMANO_CELDA_INICIAL,
+                             ARCHIVO_CONFIGURACION, POLITICA_DRENAJE_POR_DEFECTO)
+
+# Directorio raíz del proyecto, donde se busca el archivo de configuración por defecto
+RUTA_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Claves reconocidas en el archivo de configuración y su tipo
+CLAVES_CONTENEDOR = {
+    "ancho": int,      # Ancho del contenedor en unidades de simulación
+    "alto": int,       # Alto del contenedor en unidades de simulación
+    "celda": int,      # Unidades por celda
+    "backend": str,    # Implementación de grilla: "auto", "objetos", "compacta" o "dispersa"
+    "drenaje": str     # Política de drenaje: "compuertas" o "temporizado"
+}
+
+# Claves con listas de objetos (bocas de llenado y compuertas de descarga)
+CLAVES_LISTAS = ("alimentadores", "compuertas")
+
+def configuracion_por_defecto():
+    """Retorna la geometría del contenedor definida en las constantes"""
+    return {
+        "ancho": ANCHO_AREA_JUEGO,
+        "alto": ALTO_AREA_JUEGO,
+        "celda": TAMANO_CELDA_INICIAL,
+        "backend": "auto",
+        "drenaje": POLITICA_DRENAJE_POR_DEFECTO,
+        "alimentadores": [],
+        "compuertas": []
+    }
+
+def cargar_configuracion(ruta=None):
+    """
+    Carga la geometría del contenedor desde un archivo JSON.
+
+    Parámetros:
+        ruta (str, opcional): Archivo a leer. Si no se indica se usa
+                              ARCHIVO_CONFIGURACION en la raíz del proyecto,
+                              y si ese archivo no existe se usan los valores
+                              por defecto.
+
+    Retorna:
+        dict: Configuración con las claves de CLAVES_CONTENEDOR
+
+    Lanza:
+        ValueError: Si el archivo no es JSON válido o tiene valores de tipo incorrecto
+        FileNotFoundError: Si se indicó una ruta explícita que no existe
+    """
+    configuracion = configuracion_por_defecto()
+
+    if ruta is None:
+        ruta = os.path.join(RUTA_BASE, ARCHIVO_CONFIGURACION)
+        if not os.path.exists(ruta):
+            return configuracion
+
+    with open(ruta, encoding="utf-8") as archivo:
+        try:
+            datos = json.load(archivo)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Archivo de configuración inválido ({ruta}): {error}")
+
+    if not isinstance(datos, dict):
+        raise ValueError(f"El archivo de configuración debe contener un objeto JSON: {ruta}")
+
+    for clave, tipo in CLAVES_CONTENEDOR.items():
+        if clave in datos:
+            try:
+                configuracion[clave] = tipo(datos[clave])
+            except (TypeError, ValueError):
+                raise ValueError(f"Valor inválido para '{clave}' en {ruta}: {datos[clave]!r}")
+
+    for clave in CLAVES_LISTAS:
+        if clave in datos:
+            elementos = datos[clave]
+            if not isinstance(elementos, list) or not all(isinstance(e, dict) for e in elementos):
+                raise ValueError(f"'{clave}' debe ser una lista de objetos en {ruta}")
+            configuracion[clave] = elementos
+    return configuracion
+
+def interpretar_alimentador(texto):
+    """
+    Convierte la descripción de un alimentador de línea de comandos en diccionario.
+
+    Formato: clave=valor separados por comas, con el cluster como ANCHOxALTO.
+    Ejemplo: "posicion=0.25,tasa=400,distribucion=gaussiana,dispersion=0.03,cluster=3x2"
+
+    Lanza:
+        ValueError: Si el texto no respeta el formato
+    """
+    return _interpretar_pares(texto, "Alimentador")
+
+def interpretar_compuerta(texto):
+    """
+    Convierte la descripción de una compuerta de línea de comandos en diccionario.
+
+    Formato: clave=valor separados por comas.
+    Ejemplo: "posicion=0.5,ancho=0.1,caudal=12"
+    """
+    return _interpretar_pares(texto, "Compuerta")
+
+def _interpretar_pares(texto, descripcion):
+    """Interpreta pares clave=valor separados por comas (el cluster como ANCHOxALTO)"""
+    datos = {}
+    for par in texto.split(","):
+        if "=" not in par:
+            raise ValueError(f"{descripcion} con formato inválido, se esperaba clave=valor: {par!r}")
+        clave, valor = (parte.strip() for parte in par.split("=", 1))
+        if clave == "cluster":
+            datos[clave] = [int(lado) for lado in valor.lower().split("x")]
+        else:
+            datos[clave] = valor
+    return datos
+
+def agregar_argumentos_contenedor(parser):
+    """Agrega al parser los argumentos de geometría del contenedor"""
+    parser.add_argument("--config", default=None,
+                        help="Archivo JSON con la geometría del contenedor")
+    parser.add_argument("--ancho", type=int, default=None,
+                        help="Ancho del contenedor en unidades de simulación")
+    parser.add_argument("--alto", type=int, default=None,
+                        help="Alto del contenedor en unidades de simulación")
+    parser.add_argument("--celda", type=int, default=None,
+                        help="Unidades por celda (1 = una celda por unidad)")
+    parser.add_argument("--backend", choices=["auto", "objetos", "compacta", "dispersa"], default=None,
+                        help="Implementación de la grilla")
+    parser.add_argument("--alimentador", action="append", default=None, dest="alimentadores",
+                        help="Boca de llenado, p. ej. posicion=0.3,tasa=400,distribucion=gaussiana "
+                             "(se puede repetir; reemplaza a los del archivo)")
+    parser.add_argument("--drenaje", choices=["compuertas", "temporizado"], default=None,
+                        help="Política de drenaje: compuertas en el fondo o vaciado temporizado")
+    parser.add_argument("--compuerta", action="append", default=None, dest="compuertas",
+                        help="Compuerta de descarga, p. ej. posicion=0.5,ancho=0.1,caudal=12 "
+                             "(se puede repetir; reemplaza a las del archivo)")
+    return parser
+
+def resolver_configuracion(argumentos):
+    """
+    Combina el archivo de configuración con los argumentos de línea de comandos.
+
+    Parámetros:
+        argumentos (argparse.Namespace): Argumentos con los valores de
+                                         agregar_argumentos_contenedor
+
+    Retorna:
+        dict: Configuración final del contenedor
+    """
+    configuracion = cargar_configuracion(argumentos.config)
+    for clave in CLAVES_CONTENEDOR:
+        valor = getattr(argumentos, clave, None)
+        if valor is not None:
+            configuracion[clave] = valor
+
+    if getattr(argumentos, "alimentadores", None):
+        configuracion["alimentadores"] = [interpretar_alimentador(texto) for texto in argumentos.alimentadores]
+    if getattr(argumentos, "compuertas", None):
+        configuracion["compuertas"] = [interpretar_compuerta(texto) for texto in argumentos.compuertas]
+
+    if configuracion["ancho"] < 1 or configuracion["alto"] < 1 or configuracion["celda"] < 1:
+        raise ValueError("Ancho, alto y celda deben ser enteros positivos")
+    return configuracion
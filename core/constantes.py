@@ -13,9 +13,23 @@ organizadas por categorías para facilitar su mantenimiento y modificación.
 # Colores del borde y área de juego
 COLOR_BORDE = (0, 255, 0)              # Color verde del contorno del área de juego
 ANCHO_BORDE = 20                       # Ancho en píxeles del borde verde
-ANCHO_AREA_JUEGO = 200                 # Ancho en píxeles del área de simulación
-ALTO_AREA_JUEGO = 600                  # Alto en píxeles del área de simulación
-TAMANO_CELDA_INICIAL = 3               # Tamaño inicial en píxeles de cada celda de la grilla
+ANCHO_AREA_JUEGO = 200                 # Ancho por defecto del contenedor en unidades de simulación
+ALTO_AREA_JUEGO = 600                  # Alto por defecto del contenedor (ver core/configuracion.py)
+TAMANO_CELDA_INICIAL = 3               # Unidades por celda (resolución inicial de la grilla)
+ANCHO_PANEL_LATERAL = 380              # Ancho reservado a cada lado para las instrucciones
+ALTO_FRANJA_MENSAJES = 60              # Alto reservado arriba y abajo para los mensajes
+
+# Límites de geometría del contenedor y memoria de la grilla
+DIMENSION_MAXIMA_GRILLA = 8000         # Máximo de celdas por lado de la grilla
+CELDAS_MAXIMAS_GRILLA_OBJETOS = 500000 # Por encima se usa la grilla compacta (backend "auto")
+FRACCION_MEMORIA_GRILLA = 0.5          # Fracción de la memoria disponible que puede ocupar la grilla
+TAMANO_TESELA = 32                     # Celdas por lado de cada tesela de la grilla dispersa
+ALTO_MAXIMO_GRILLA_DISPERSA = 1000000  # Máximo de filas de la grilla dispersa (silos altos)
+ARCHIVO_CONFIGURACION = "perlita.json" # Configuración opcional (relativa a la raíz del proyecto)
+
+# Zoom de la vista del área de juego
+ESCALA_MAXIMA_VISTA = 32.0             # Máximo de píxeles de pantalla por celda al acercar
+FACTOR_ZOOM_RUEDA = 1.25               # Factor aplicado en cada paso de la rueda del mouse
 
 # =============================================================================
 # SISTEMA DE NIVEL Y DRENAJE
@@ -25,6 +39,17 @@ TAMANO_CELDA_INICIAL = 3               # Tamaño inicial en píxeles de cada cel
 TIEMPO_DRENAJE_SEGUNDOS = 2.0          # Duración en segundos del proceso de drenaje
 COLOR_LINEA_NIVEL = (255, 0, 0)        # Color rojo de la línea indicadora de nivel
 ANCHO_LINEA_NIVEL = 5                  # Grosor en píxeles de la línea de nivel
+UMBRAL_NIVEL_LLENO = 0.95              # Fracción de celdas disponibles con perlita que dispara el drenaje
+
+# Políticas de drenaje (ver sistema/compuertas.py)
+POLITICA_DRENAJE_POR_DEFECTO = "compuertas"  # "compuertas" (salida gradual por el fondo) o "temporizado"
+PRESUPUESTO_DRENAJE_POR_FRAME = 2000   # Máximo de granos retirados por frame (amortiza el vaciado)
+ANCHO_COMPUERTA_POR_DEFECTO = 0.5      # Ancho de la compuerta como fracción del ancho del contenedor
+CAUDAL_COMPUERTA_POR_DEFECTO = 20.0    # Granos por paso que deja salir cada compuerta
+FRAMES_COMPUERTA_SIN_FLUJO = 120       # Frames sin salida de granos que dan por terminado el ciclo
+
+# Métricas de producción
+CAPACIDAD_HISTORIAL_METRICAS = 64      # Ciclos de drenaje guardados en los buffers de métricas
 
 # =============================================================================
 # PALETA DE COLORES (estilo 8-bit inspirados en perlita expandida)
@@ -85,9 +110,32 @@ class EstadosJuego:
 # Parámetros de simulación física
 PROBABILIDAD_APARICION_PERLITA = 0.15    # Probabilidad de que aparezca una partícula de perlita
 FRAMES_POR_SEGUNDO = 120                 # FPS objetivo de la simulación
+PRESUPUESTO_FISICA_MS = 6.0              # Tiempo máximo de física por frame (de los ~8.3 ms a 120 FPS)
+ALTO_BANDA_FISICA = 16                   # Filas por banda en el paso de física por bandas marcadas
+USAR_NUCLEO_JIT = True                   # Física de la grilla compacta con numba, si está instalado
+MOTORES_FISICA = ("secuencial", "margolus")  # Recorrido grano por grano o bloques de 2x2 (tecla M)
+MOTOR_FISICA_POR_DEFECTO = "secuencial"  # Motor de física al iniciar
+
+# Recolector de basura y asignaciones por frame (ver core/memoria.py)
+UMBRALES_GC_JUEGO = (10000, 20, 50)      # Umbrales de gc.set_threshold con --gc-juego (por defecto 700, 10, 10)
+FRAMES_PREVIOS_MEDICION = 120            # Frames que se descartan antes de medir asignaciones
+ASIGNACION_MAXIMA_POR_FRAME = 4096       # Bytes asignados por paso (pico promedio) que admite --medir-asignaciones
+
+# Prueba de resistencia (ver resistencia.py)
+INTERVALO_MUESTRAS_RESISTENCIA = 30.0    # Segundos entre muestras de memoria, objetos y tiempos
+CALENTAMIENTO_RESISTENCIA = 60.0         # Segundos iniciales que no entran en la comparación (llenado inicial)
+CRECIMIENTO_MEMORIA_MAXIMO_MB = 32.0     # Crecimiento de RSS admitido entre el primer y el último tercio
+CRECIMIENTO_OBJETOS_MAXIMO = 20000       # Crecimiento de objetos del recolector admitido entre tercios
+DERIVA_PASO_MAXIMA = 0.25                # Aumento relativo admitido del tiempo medio por paso entre tercios
+CRECIMIENTO_DIFERIDOS_MAXIMO = 0.05      # Aumento admitido de la fracción de frames con bandas diferidas entre tercios
+ESPERA_CICLO_MAXIMA_RESISTENCIA = 300.0  # Segundos sin terminar un ciclo de drenaje que se consideran un atasco
+
+# Configuración del pincel de dibujo
+TAMANO_PINCEL_POR_DEFECTO = 3          # Tamaño inicial del pincel de dibujo (lado en celdas)
+TAMANO_PINCEL_MAXIMO = 40              # Tamaño máximo del pincel (teclas + y -)
+FORMAS_PINCEL = ("cuadrado", "circulo")  # Máscaras de pincel disponibles (tecla C)
 
 # Configuración de controles (no implementado, se lo deja planteado para futuras versiones)
-TAMANO_PINCEL_POR_DEFECTO = 3          # Tamaño inicial del pincel de dibujo
 SENSIBILIDAD_MOUSE = 1.0               # Sensibilidad del mouse para dibujar
 
 # =============================================================================
@@ -99,6 +147,37 @@ ANCHO_VENTANA_INICIAL = 1200           # Ancho inicial de la ventana del juego
 ALTO_VENTANA_INICIAL = 800             # Alto inicial de la ventana del juego
 TITULO_VENTANA = "Simulación de Acumulación de Partículas de Perlita"
 
+# Cache de renderizado de texto
+CAPACIDAD_CACHE_TEXTO = 256            # Máximo de superficies de texto guardadas en cache
+
 # Configuración de pantalla completa
 MARGEN_PANTALLA = 100                  # Margen en píxeles desde los bordes de la pantalla
-TIEMPO_PRESENTACION = 10               # Tiempo en segundos antes de avanzar automáticamente 
\ No newline at end of file
+TIEMPO_PRESENTACION = 10               # Tiempo en segundos antes de avanzar automáticamente
+ARCHIVO_LOGO = "logo_tucumordor.png"   # Imagen del logo (relativa a la raíz del proyecto) 
+
+# =============================================================================
+# VISOR Y TELEMETRÍA (OTROS PROCESOS)
+# =============================================================================
+
+# Frames publicados en memoria compartida (ver sistema/compartido.py y visor.py)
+NOMBRE_MEMORIA_VISOR = "perlita_visor"  # Nombre del bloque de memoria compartida
+FRAMES_PUBLICADOS_POR_SEGUNDO = 30      # Frames por segundo que se copian al bloque
+BYTES_ESTADO_VISOR = 16384              # Espacio para el estado (JSON) de cada frame
+INTERVALO_CONEXION_VISOR = 0.5          # Segundos entre intentos de conexión del visor
+
+# Telemetría por TCP local (ver sistema/telemetria.py)
+PUERTO_TELEMETRIA = 8765                # Puerto por defecto del servidor de telemetría
+FRAMES_TELEMETRIA_POR_SEGUNDO = 10      # Actualizaciones por segundo enviadas a los clientes
+LIMITE_BUFFER_TELEMETRIA = 1048576      # Bytes pendientes por cliente a partir de los que se omiten frames
+SEGUNDOS_CLIENTE_LENTO = 10.0           # Segundos omitiendo frames antes de desconectar a un cliente
+
+# Control remoto por JSON-RPC local (ver sistema/control.py)
+PUERTO_CONTROL = 8766                   # Puerto por defecto del servidor de control
+LOTES_CONTROL_PENDIENTES = 1024         # Lotes en espera del próximo paso antes de rechazar nuevos
+
+# Métricas para Prometheus (ver sistema/exportador.py)
+PUERTO_METRICAS = 9464                  # Puerto por defecto del endpoint HTTP /metrics
+INTERVALO_CONTEO_METRICAS = 1.0         # Segundos entre conteos de granos por tipo
+LIMITES_HISTOGRAMA_FRAME = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0)
+LIMITES_HISTOGRAMA_CICLO = (1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+LIMITES_HISTOGRAMA_GC = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
\ No newline at end of file
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Recolector de basura y asignaciones de memoria durante el juego.
+
+Este módulo reúne dos herramientas para que el bucle de frames no genere
+pausas del recolector de basura:
+1. RecoleccionJuego: con --gc-juego, al entrar al juego congela con
+   gc.freeze los objetos que ya existen (grilla, sistemas, fuentes), así
+   las recolecciones no los vuelven a recorrer, y sube los umbrales de
+   gc.set_threshold para que las recolecciones sean menos frecuentes.
+2. medir_asignaciones: mide con tracemalloc cuántos bytes asigna cada paso
+   de la simulación, para verificar que el camino por frame no crea objetos
+   (headless.py --medir-asignaciones).
+"""
+
+import gc
+import tracemalloc
+from core.constantes import UMBRALES_GC_JUEGO, FRAMES_PREVIOS_MEDICION
+
+class RecoleccionJuego:
+    """
+    Modo de recolección de basura para las sesiones de juego.
+
+    Los objetos congelados no se recolectan aunque formen ciclos, así que
+    antes de descartar una simulación (volver al menú) o reemplazar su
+    grilla (cambio de resolución) hay que descongelar: desactivar() y
+    vigilar() se encargan de eso.
+
+    Atributos:
+        umbrales (tuple): Umbrales de gc.set_threshold mientras está activo
+        activo (bool): Si los objetos están congelados y los umbrales ajustados
+    """
+
+    def __init__(self, umbrales=UMBRALES_GC_JUEGO):
+        self.umbrales = umbrales
+        self.activo = False
+        self._umbrales_previos = None
+        self._vigilado = None
+
+    def activar(self, vigilado=None):
+        """
+        Recolecta una vez, congela lo que quedó vivo y ajusta los umbrales.
+
+        Parámetros:
+            vigilado (object, opcional): Objeto cuyo reemplazo obliga a volver a
+                congelar (la grilla de la simulación, ver vigilar)
+        """
+        if self.activo:
+            self.desactivar()
+        self._umbrales_previos = gc.get_threshold()
+        gc.collect()
+        gc.freeze()
+        gc.set_threshold(*self.umbrales)
+        self._vigilado = vigilado
+        self.activo = True
+
+    def vigilar(self, vigilado):
+        """
+        Vuelve a congelar si el objeto vigilado fue reemplazado.
+
+        Se llama una vez por frame (es una comparación de identidad): cuando
+        la simulación reemplaza su grilla, la anterior se descongela para que
+        se pueda recolectar y se congela la nueva.
+        """
+        if self.activo and vigilado is not self._vigilado:
+            self.activar(vigilado)
+
+    def desactivar(self):
+        """Descongela los objetos y restituye los umbrales anteriores"""
+        if not self.activo:
+            return
+        gc.unfreeze()
+        gc.set_threshold(*self._umbrales_previos)
+        self._vigilado = None
+        self.activo = False
+
+def medir_asignaciones(paso, frames, previos=FRAMES_PREVIOS_MEDICION):
+    """
+    Mide con tracemalloc la memoria que asigna cada llamada a paso.
+
+    Parámetros:
+        paso (callable): Función sin argumentos que avanza un frame
+        frames (int): Frames medidos
+        previos (int): Frames que se corren antes de medir (caches y marcas
+            de bandas ya armadas)
+
+    Retorna:
+        dict: Bytes por frame: pico_promedio y pico_maximo (lo máximo que se
+              asignó por encima de lo que había al empezar el frame, aunque
+              se haya liberado antes de terminar) y crecimiento (memoria que
+              quedó asignada, promedio por frame)
+
+    Algoritmo:
+        1. Corre los frames previos sin medir
+        2. Antes de cada frame reinicia el pico de tracemalloc y anota la
+           memoria actual; al terminar, la diferencia con el pico es lo que
+           el frame llegó a asignar
+        3. Acumula suma y máximo (sin guardar una lista por frame, que
+           sería una asignación de la propia medición)
+    """
+    for _ in range(previos):
+        paso()
+
+    ya_activo = tracemalloc.is_tracing()
+    if not ya_activo:
+        tracemalloc.start()
+    try:
+        inicio = tracemalloc.get_traced_memory()[0]
+        suma = 0
+        maximo = 0
+        for _ in range(frames):
+            antes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            paso()
+            pico = tracemalloc.get_traced_memory()[1] - antes
+            suma += pico
+            if pico > maximo:
+                maximo = pico
+        crecimiento = tracemalloc.get_traced_memory()[0] - inicio
+    finally:
+        if not ya_activo:
+            tracemalloc.stop()
+
+    return {
+        'pico_promedio': suma / max(frames, 1),
+        'pico_maximo': maximo,
+        'crecimiento': crecimiento / max(frames, 1)
+    }
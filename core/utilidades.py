@@ -1,4 +1,4 @@
-import pygame
+import os
 import math
 import random
 
@@ -34,3 +34,68 @@ def normalizar_vector(vector):
 def generar_color_aleatorio():
     """Genera un color aleatorio"""
     return (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+
+def memoria_disponible():
+    """
+    Estima la memoria física disponible en bytes.
+
+    Lee MemAvailable de /proc/meminfo en Linux; en otros sistemas usa
+    os.sysconf con las páginas libres. Retorna None si no se puede saber,
+    en cuyo caso no se limita el tamaño de la grilla.
+    """
+    try:
+        with open("/proc/meminfo") as archivo:
+            for linea in archivo:
+                if linea.startswith("MemAvailable:"):
+                    return int(linea.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def memoria_residente():
+    """
+    Memoria física que usa este proceso (RSS) en bytes.
+
+    Lee /proc/self/statm en Linux. Retorna None en otros sistemas, donde
+    getrusage solo informa el máximo y no sirve para seguir el consumo.
+    """
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def linea_bresenham(fila_inicio, columna_inicio, fila_fin, columna_fin):
+    """
+    Calcula las celdas de la recta entre dos celdas con el algoritmo de Bresenham.
+
+    Usa solo aritmética entera y devuelve una celda por paso sobre el eje
+    dominante, incluyendo los dos extremos, así un trazo rápido del mouse
+    no deja huecos entre un frame y el siguiente.
+
+    Retorna:
+        list: Celdas (fila, columna) desde el inicio hasta el fin
+    """
+    delta_fila = abs(fila_fin - fila_inicio)
+    delta_columna = abs(columna_fin - columna_inicio)
+    paso_fila = 1 if fila_fin >= fila_inicio else -1
+    paso_columna = 1 if columna_fin >= columna_inicio else -1
+    error = delta_columna - delta_fila
+
+    celdas = []
+    fila, columna = fila_inicio, columna_inicio
+    while True:
+        celdas.append((fila, columna))
+        if fila == fila_fin and columna == columna_fin:
+            return celdas
+        doble_error = 2 * error
+        if doble_error > -delta_fila:
+            error -= delta_fila
+            columna += paso_columna
+        if doble_error < delta_columna:
+            error += delta_columna
+            fila += paso_fila
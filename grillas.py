@@ -12,11 +12,131 @@ Funcionalidades principales:
 - Renderizado visual de todas las partículas
 - Validación de límites y detección de colisiones
 - Limpieza completa del espacio de simulación
+- Exportación a planos compactos y remuestreo entre resoluciones
+
+Implementaciones disponibles:
+- Grilla: Matriz de objetos partícula (una instancia por grano)
+- GrillaCompacta: Planos de arreglos (un byte de tipo y un color empaquetado por
+  celda), para contenedores grandes donde la matriz de objetos no entra en memoria
+- GrillaDispersa: Teselas con los mismos planos, reservadas solo donde hay
+  granos, para silos altos donde casi todo el volumen está vacío
+- GrillaMapeada: GrillaCompacta con los planos en un archivo mapeado en
+  memoria, para contenedores fuera de memoria y lectura desde otros procesos
 """
 
-import pygame
+import mmap
+import struct
+import sys
+import time
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate
+from particulas import VACIO, CLASES_POR_TIPO
+from core.constantes import (
+	DIMENSION_MAXIMA_GRILLA, CELDAS_MAXIMAS_GRILLA_OBJETOS, FRACCION_MEMORIA_GRILLA,
+	TAMANO_TESELA, ALTO_MAXIMO_GRILLA_DISPERSA
+)
+from core.utilidades import memoria_disponible
+from core.arranque import importar_diferido
+
+# pygame solo se usa en dibujar(); se carga recién ahí (ver core/arranque.py)
+pygame = importar_diferido("pygame")
+
+class _ConSensores:
+	"""
+	Registro de sensores de nivel, compartido por todas las implementaciones de grilla.
+	
+	Un sensor (ver sistema/sensores.py) vigila las filas desde su línea hacia
+	abajo. La grilla solo le avisa cuando un grano entra o sale de esa región:
+	al agregarse o eliminarse debajo de alguna línea, o al moverse cruzando una.
+	
+	_cortes_sensores[fila] cuenta las líneas de sensores en o por encima de la
+	fila, así cada operación decide en O(1) si tiene que avisar: un cambio en
+	una fila afecta a algún sensor si el conteo es mayor que cero, y un
+	movimiento cruza alguna línea si el conteo difiere entre origen y destino.
+	Sin sensores registrados el costo es una única comparación con None.
+	"""
+	
+	sensores = ()
+	_cortes_sensores = None
+	
+	def registrar_sensor(self, sensor):
+		"""Registra un sensor de nivel y calcula sus conteos iniciales con un único recorrido"""
+		self.sensores = list(self.sensores) + [sensor]
+		self._actualizar_cortes()
+		sensor.recalcular(self)
+	
+	def quitar_sensor(self, sensor):
+		"""Deja de avisar a un sensor registrado"""
+		self.sensores = [registrado for registrado in self.sensores if registrado is not sensor]
+		self._actualizar_cortes()
+	
+	def _actualizar_cortes(self):
+		"""Recalcula el conteo acumulado de líneas de sensores por fila"""
+		if not self.sensores:
+			self._cortes_sensores = None
+			return
+		lineas = array('H', [0]) * self.filas
+		for sensor in self.sensores:
+			if 0 <= sensor.fila < self.filas:
+				lineas[sensor.fila] += 1
+			elif sensor.fila < 0:
+				lineas[0] += 1
+		self._cortes_sensores = array('H', accumulate(lineas))
+	
+	def _avisar_cambio(self, tipo, fila, delta):
+		"""Avisa a los sensores que un grano entró (delta 1) o salió (delta -1) de una fila"""
+		for sensor in self.sensores:
+			sensor.registrar_cambio(tipo, fila, delta)
+	
+	def _avisar_movimiento(self, tipo, fila, nueva_fila):
+		"""Avisa a los sensores que un grano cruzó al menos una línea"""
+		for sensor in self.sensores:
+			sensor.registrar_movimiento(tipo, fila, nueva_fila)
+	
+	def _reiniciar_sensores(self):
+		"""Vuelve a contar desde cero en todos los sensores (después de limpiar)"""
+		for sensor in self.sensores:
+			sensor.recalcular(self)
 
-class Grilla:
+class _ConBandasSucias:
+	"""
+	Marcas de las bandas de filas modificadas, compartidas por todas las grillas.
+	
+	Mientras las marcas están activas la grilla se divide en bandas de
+	alto_banda filas, y cada operación que agrega, quita o mueve un grano
+	marca la banda de la celda. Al vaciar una celda también se marca la banda
+	de la fila de arriba, porque sus granos pueden caer al hueco. El motor de
+	física recorre solo las bandas marcadas (ver MotorFisicas.actualizar_por_bandas):
+	una banda donde nada cambió no tiene granos que puedan moverse.
+	"""
+	
+	bandas_sucias = None
+	alto_banda = 0
+	
+	def activar_bandas_sucias(self, alto_banda):
+		"""Activa las marcas por banda, con todas las bandas marcadas"""
+		self.alto_banda = alto_banda
+		self.bandas_sucias = bytearray(b"\x01") * ((self.filas + alto_banda - 1) // alto_banda)
+	
+	def _marcar_llenado(self, fila):
+		"""Marca la banda de una celda que recibió un grano"""
+		if self.bandas_sucias is not None:
+			self.bandas_sucias[fila // self.alto_banda] = 1
+	
+	def _marcar_vaciado(self, fila):
+		"""Marca la banda de una celda vaciada y la de la fila de arriba"""
+		if self.bandas_sucias is not None:
+			self.bandas_sucias[fila // self.alto_banda] = 1
+			if fila:
+				self.bandas_sucias[(fila - 1) // self.alto_banda] = 1
+	
+	def _limpiar_bandas_sucias(self):
+		"""Desmarca todas las bandas (la grilla quedó vacía, no hay nada que mover)"""
+		if self.bandas_sucias is not None:
+			self.bandas_sucias[:] = bytes(len(self.bandas_sucias))
+
+class Grilla(_ConSensores, _ConBandasSucias):
 	"""
 	Representa la grilla bidimensional donde se almacenan las partículas.
 	
@@ -51,38 +171,41 @@ class Grilla:
 		# Inicializar matriz de celdas vacías
 		self.celdas = [[None for _ in range(self.columnas)] for _ in range(self.filas)]
 
-	def dibujar(self, ventana):
+	def dibujar(self, ventana, tamaño=None, region=None, paso=1):
 		"""
 		Dibuja todas las partículas de la grilla en la ventana especificada.
 		
 		Parámetros:
 			ventana (pygame.Surface): Superficie donde dibujar las partículas
+			tamaño (int, opcional): Lado en píxeles de cada celda dibujada
+				(por defecto tamaño_celda)
+			region (tuple, opcional): (fila, columna, filas, columnas) de la parte
+				visible; solo se dibujan esas celdas, con su esquina en (0, 0)
+			paso (int, opcional): Dibuja una de cada `paso` celdas por eje; se usa
+				cuando la vista muestra varias celdas por píxel de pantalla
 			
 		Este método recorre toda la grilla y dibuja cada partícula existente
 		como un rectángulo del color correspondiente a la partícula.
 		Las celdas vacías (None) no se dibujan.
 		
 		Algoritmo:
-		1. Recorre todas las filas y columnas de la grilla
+		1. Recorre las filas y columnas de la región (de a `paso` celdas)
 		2. Para cada celda que contiene una partícula:
 		   - Obtiene el color de la partícula
 		   - Calcula la posición en píxeles
 		   - Dibuja un rectángulo del tamaño de la celda
 		"""
-		for fila in range(self.filas):
-			for columna in range(self.columnas):
-				particula = self.celdas[fila][columna]
+		if tamaño is None:
+			tamaño = self.tamaño_celda
+		fila_inicio, columna_inicio, filas, columnas = _region_completa(self, region)
+		
+		for y, fila in enumerate(range(fila_inicio, fila_inicio + filas, paso)):
+			celdas_fila = self.celdas[fila]
+			for x, columna in enumerate(range(columna_inicio, columna_inicio + columnas, paso)):
+				particula = celdas_fila[columna]
 				if particula is not None:
-					# Obtener color de la partícula
-					color = particula.color
-					
-					# Calcular posición en píxeles
-					x = columna * self.tamaño_celda
-					y = fila * self.tamaño_celda
-					
 					# Dibujar rectángulo representando la partícula
-					pygame.draw.rect(ventana, color, 
-								   (x, y, self.tamaño_celda, self.tamaño_celda))
+					ventana.fill(particula.color, (x * tamaño, y * tamaño, tamaño, tamaño))
 
 	def agregar_particula(self, fila, columna, tipo_particula):
 		"""
@@ -99,12 +222,47 @@ class Grilla:
 		
 		Si se cumplen las condiciones, se crea una nueva instancia
 		del tipo de partícula especificado y se coloca en la celda.
+		
+		Retorna:
+			bool: True si la partícula fue agregada, False en caso contrario
 		"""
 		if (0 <= fila < self.filas and 
 			0 <= columna < self.columnas and 
 			self.esta_celda_vacia(fila, columna)):
 			# Crear nueva instancia de la partícula y colocarla
-			self.celdas[fila][columna] = tipo_particula()
+			particula = self.celdas[fila][columna] = tipo_particula()
+			self._marcar_llenado(fila)
+			if self._cortes_sensores is not None and self._cortes_sensores[fila]:
+				self._avisar_cambio(particula.tipo, fila, 1)
+			return True
+		return False
+
+	def agregar_particulas_lote(self, celdas, tipo, colores):
+		"""
+		Agrega un lote de partículas de un mismo tipo en una sola operación.
+		
+		Parámetros:
+			celdas (iterable): Posiciones (fila, columna); las que están fuera de
+				límites u ocupadas se descartan
+			tipo (int): Código de tipo de las partículas (PERLITA o ROCA)
+			colores (list): Color RGB de cada partícula, en el mismo orden que celdas
+			
+		Retorna:
+			int: Cantidad de partículas efectivamente agregadas
+		"""
+		clase = CLASES_POR_TIPO[tipo]
+		cortes = self._cortes_sensores
+		agregadas = 0
+		for (fila, columna), color in zip(celdas, colores):
+			if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+				celdas_fila = self.celdas[fila]
+				if celdas_fila[columna] is None:
+					celdas_fila[columna] = clase(color)
+					agregadas += 1
+					self._marcar_llenado(fila)
+					if cortes is not None and cortes[fila]:
+						self._avisar_cambio(tipo, fila, 1)
+		return agregadas
 
 	def eliminar_particula(self, fila, columna):
 		"""
@@ -119,7 +277,37 @@ class Grilla:
 		efectivamente cualquier partícula que estuviera allí.
 		"""
 		if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+			particula = self.celdas[fila][columna]
 			self.celdas[fila][columna] = None
+			if particula is not None:
+				self._marcar_vaciado(fila)
+				if self._cortes_sensores is not None and self._cortes_sensores[fila]:
+					self._avisar_cambio(particula.tipo, fila, -1)
+
+	def eliminar_particulas_lote(self, celdas):
+		"""
+		Vacía un lote de celdas en una sola operación.
+		
+		Parámetros:
+			celdas (iterable): Posiciones (fila, columna); las que están fuera de
+				límites se descartan
+			
+		Retorna:
+			int: Cantidad de partículas efectivamente eliminadas
+		"""
+		cortes = self._cortes_sensores
+		eliminadas = 0
+		for fila, columna in celdas:
+			if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+				celdas_fila = self.celdas[fila]
+				particula = celdas_fila[columna]
+				if particula is not None:
+					celdas_fila[columna] = None
+					eliminadas += 1
+					self._marcar_vaciado(fila)
+					if cortes is not None and cortes[fila]:
+						self._avisar_cambio(particula.tipo, fila, -1)
+		return eliminadas
 
 	def esta_celda_vacia(self, fila, columna):
 		"""
@@ -157,7 +345,40 @@ class Grilla:
 		Solo opera si la posición está dentro de los límites.
 		"""
 		if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+			anterior = self.celdas[fila][columna]
 			self.celdas[fila][columna] = particula
+			self._marcar_vaciado(fila)
+			if self._cortes_sensores is not None and self._cortes_sensores[fila]:
+				if anterior is not None:
+					self._avisar_cambio(anterior.tipo, fila, -1)
+				if particula is not None:
+					self._avisar_cambio(particula.tipo, fila, 1)
+
+	def mover_particula(self, fila, columna, nueva_fila, nueva_columna):
+		"""
+		Mueve la partícula de una celda a otra, dejando vacía la de origen.
+		
+		Parámetros:
+			fila, columna (int): Celda de origen
+			nueva_fila, nueva_columna (int): Celda de destino (debe estar vacía)
+			
+		La partícula conserva su identidad y su color. Solo opera si ambas
+		posiciones están dentro de los límites.
+		"""
+		if (0 <= fila < self.filas and 0 <= columna < self.columnas and
+			0 <= nueva_fila < self.filas and 0 <= nueva_columna < self.columnas):
+			particula = self.celdas[nueva_fila][nueva_columna] = self.celdas[fila][columna]
+			self.celdas[fila][columna] = None
+			sucias = self.bandas_sucias
+			if sucias is not None:
+				alto = self.alto_banda
+				sucias[nueva_fila // alto] = 1
+				sucias[fila // alto] = 1
+				if fila:
+					sucias[(fila - 1) // alto] = 1
+			cortes = self._cortes_sensores
+			if cortes is not None and particula is not None and cortes[fila] != cortes[nueva_fila]:
+				self._avisar_movimiento(particula.tipo, fila, nueva_fila)
 
 	def obtener_celda(self, fila, columna):
 		"""
@@ -194,3 +415,1167 @@ class Grilla:
 		for fila in range(self.filas):
 			for columna in range(self.columnas):
 				self.eliminar_particula(fila, columna)
+
+	def contar_particulas(self):
+		"""
+		Cuenta las partículas (de cualquier tipo) presentes en la grilla.
+		
+		Retorna:
+			int: Cantidad de celdas ocupadas
+		"""
+		return sum(self.columnas - fila.count(None) for fila in self.celdas)
+
+	def segmentos_activos(self, fila):
+		"""
+		Obtiene los tramos de columnas de una fila que pueden tener partículas.
+		
+		Retorna:
+			list: Tramos (columna_inicio, columna_fin) a recorrer; vacío si la
+			      fila no tiene partículas
+		"""
+		if self.celdas[fila].count(None) == self.columnas:
+			return []
+		return [(0, self.columnas)]
+
+	def rango_filas_activas(self):
+		"""Retorna (fila_inicio, fila_fin) del rango de filas que pueden tener partículas"""
+		return 0, self.filas
+
+	def tipos_fila(self, fila):
+		"""
+		Obtiene el código de tipo de cada celda de una fila.
+		
+		Retorna:
+			bytes: Un byte por columna (VACIO en las celdas vacías), para que los
+			       recorridos por bloques operen sobre la fila entera en C
+		"""
+		return bytes(VACIO if particula is None else particula.tipo for particula in self.celdas[fila])
+
+	def exportar_planos(self):
+		"""
+		Exporta el contenido de la grilla como planos compactos.
+		
+		Retorna:
+			tuple: (tipos, colores) donde tipos es un bytearray de filas*columnas
+			       con el código de tipo de cada celda (fila por fila) y colores
+			       es un array('I') de igual largo con el color empaquetado
+			       0xFFRRGGBB de cada partícula (0 en las celdas vacías)
+		"""
+		tipos = bytearray()
+		colores = array('I')
+		for fila in self.celdas:
+			tipos.extend(VACIO if particula is None else particula.tipo for particula in fila)
+			colores.extend(0 if particula is None else empaquetar_color(particula.color) for particula in fila)
+		return tipos, colores
+	
+	@classmethod
+	def desde_planos(cls, tipos, colores, filas, columnas, tamaño_celda):
+		"""
+		Crea una grilla a partir de planos compactos.
+		
+		Parámetros:
+			tipos (bytearray): Código de tipo de cada celda, fila por fila
+			colores (array): Color empaquetado de cada celda
+			filas (int): Cantidad de filas de los planos
+			columnas (int): Cantidad de columnas de los planos
+			tamaño_celda (int): Tamaño de cada celda en píxeles
+			
+		Retorna:
+			Grilla: Nueva grilla con las partículas y sus colores originales
+		"""
+		grilla = cls(columnas * tamaño_celda, filas * tamaño_celda, tamaño_celda)
+		for fila in range(filas):
+			inicio = fila * columnas
+			celdas_fila = grilla.celdas[fila]
+			for columna in range(columnas):
+				tipo = tipos[inicio + columna]
+				if tipo != VACIO:
+					celdas_fila[columna] = CLASES_POR_TIPO[tipo](desempaquetar_color(colores[inicio + columna]))
+		return grilla
+
+class GrillaCompacta(_ConSensores, _ConBandasSucias):
+	"""
+	Grilla con almacenamiento compacto en planos de arreglos.
+	
+	Ofrece la misma interfaz que Grilla, pero en lugar de una matriz de
+	objetos guarda dos planos planos (fila por fila):
+	- tipos: bytearray con el código de tipo de cada celda (1 byte por celda)
+	- colores: array('I') con el color empaquetado 0xFFRRGGBB (4 bytes por celda, 0 si está vacía)
+	
+	Con 5 bytes por celda, un contenedor de 4000x4000 celdas ocupa unos 80 MB,
+	mientras que la matriz de objetos necesitaría varios GB.
+	
+	Como no hay una instancia por grano, obtener_celda retorna una partícula
+	representativa compartida por todas las celdas del mismo tipo: sirve para
+	consultar el tipo (isinstance) pero su color no corresponde a la celda.
+	El color real se obtiene con obtener_color.
+	"""
+	
+	def __init__(self, ancho, alto, tamaño_celda):
+		"""
+		Inicializa una nueva grilla compacta con las dimensiones especificadas.
+		
+		Parámetros:
+			ancho (int): Ancho total de la grilla en unidades de simulación
+			alto (int): Alto total de la grilla en unidades de simulación
+			tamaño_celda (int): Unidades por celda
+		"""
+		self.filas = alto // tamaño_celda
+		self.columnas = ancho // tamaño_celda
+		self.tamaño_celda = tamaño_celda
+		
+		# Planos de tipos y colores, todas las celdas vacías
+		self.tipos = bytearray(self.filas * self.columnas)
+		self.colores = array('I', [0]) * (self.filas * self.columnas)
+
+	def dibujar(self, ventana, tamaño=None, region=None, paso=1):
+		"""
+		Dibuja las partículas de la grilla (o de la región visible) en la ventana.
+		
+		Parámetros:
+			ventana (pygame.Surface): Superficie donde dibujar las partículas
+			tamaño (int, opcional): Lado en píxeles de cada celda dibujada
+			region (tuple, opcional): (fila, columna, filas, columnas) visibles
+			paso (int, opcional): Dibuja una de cada `paso` celdas por eje
+			
+		A un píxel por celda no se recorre celda por celda: las filas visibles
+		del plano de colores se copian a un buffer y pygame lo convierte en una
+		superficie de una vez. Las celdas vacías tienen color 0 (alfa 0), así
+		que el fondo de la ventana queda visible debajo.
+		"""
+		if tamaño is None:
+			tamaño = self.tamaño_celda
+		fila_inicio, columna_inicio, filas, columnas = _region_completa(self, region)
+		if filas <= 0 or columnas <= 0:
+			return
+		
+		colores = self.colores
+		if tamaño == 1:
+			# Copiar las filas visibles (muestreadas) a un buffer contiguo
+			if columna_inicio == 0 and columnas == self.columnas and paso == 1:
+				inicio = fila_inicio * self.columnas
+				buffer = colores[inicio:inicio + filas * columnas]
+			else:
+				buffer = array('I')
+				for fila in range(fila_inicio, fila_inicio + filas, paso):
+					base = fila * self.columnas + columna_inicio
+					buffer.extend(colores[base:base + columnas:paso])
+			ancho = len(range(0, columnas, paso))
+			superficie = pygame.image.frombuffer(buffer, (ancho, len(buffer) // ancho), FORMATO_COLOR)
+			ventana.blit(superficie, (0, 0))
+			return
+		
+		tipos = self.tipos
+		for y, fila in enumerate(range(fila_inicio, fila_inicio + filas, paso)):
+			base = fila * self.columnas + columna_inicio
+			for x, indice in enumerate(range(base, base + columnas, paso)):
+				if tipos[indice]:
+					ventana.fill(desempaquetar_color(colores[indice]),
+								 (x * tamaño, y * tamaño, tamaño, tamaño))
+
+	def agregar_particula(self, fila, columna, tipo_particula):
+		"""
+		Agrega una nueva partícula en la posición especificada si la celda está vacía.
+		
+		Retorna:
+			bool: True si la partícula fue agregada, False en caso contrario
+		"""
+		if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+			indice = fila * self.columnas + columna
+			if self.tipos[indice] == VACIO:
+				particula = tipo_particula()
+				self.tipos[indice] = particula.tipo
+				self.colores[indice] = empaquetar_color(particula.color)
+				self._marcar_llenado(fila)
+				if self._cortes_sensores is not None and self._cortes_sensores[fila]:
+					self._avisar_cambio(particula.tipo, fila, 1)
+				return True
+		return False
+
+	def agregar_particulas_lote(self, celdas, tipo, colores):
+		"""Agrega un lote de partículas de un tipo escribiendo directo en los planos (ver Grilla)"""
+		tipos = self.tipos
+		planos_colores = self.colores
+		cortes = self._cortes_sensores
+		agregadas = 0
+		for (fila, columna), color in zip(celdas, colores):
+			if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+				indice = fila * self.columnas + columna
+				if tipos[indice] == VACIO:
+					tipos[indice] = tipo
+					planos_colores[indice] = empaquetar_color(color)
+					agregadas += 1
+					self._marcar_llenado(fila)
+					if cortes is not None and cortes[fila]:
+						self._avisar_cambio(tipo, fila, 1)
+		return agregadas
+
+	def eliminar_particula(self, fila, columna):
+		"""Elimina la partícula en la posición especificada"""
+		if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+			indice = fila * self.columnas + columna
+			tipo = self.tipos[indice]
+			self.tipos[indice] = VACIO
+			self.colores[indice] = 0
+			if tipo != VACIO:
+				self._marcar_vaciado(fila)
+				if self._cortes_sensores is not None and self._cortes_sensores[fila]:
+					self._avisar_cambio(tipo, fila, -1)
+
+	def eliminar_particulas_lote(self, celdas):
+		"""Vacía un lote de celdas escribiendo directo en los planos (ver Grilla)"""
+		tipos = self.tipos
+		planos_colores = self.colores
+		cortes = self._cortes_sensores
+		eliminadas = 0
+		for fila, columna in celdas:
+			if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+				indice = fila * self.columnas + columna
+				tipo = tipos[indice]
+				if tipo != VACIO:
+					tipos[indice] = VACIO
+					planos_colores[indice] = 0
+					eliminadas += 1
+					self._marcar_vaciado(fila)
+					if cortes is not None and cortes[fila]:
+						self._avisar_cambio(tipo, fila, -1)
+		return eliminadas
+
+	def esta_celda_vacia(self, fila, columna):
+		"""Verifica si una celda está vacía (fuera de límites se considera ocupada)"""
+		if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+			return self.tipos[fila * self.columnas + columna] == VACIO
+		return False
+
+	def establecer_celda(self, fila, columna, particula):
+		"""Guarda el tipo y el color de una partícula en la celda indicada"""
+		if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+			indice = fila * self.columnas + columna
+			anterior = self.tipos[indice]
+			if particula is None:
+				self.tipos[indice] = VACIO
+				self.colores[indice] = 0
+			else:
+				self.tipos[indice] = particula.tipo
+				self.colores[indice] = empaquetar_color(particula.color)
+			self._marcar_vaciado(fila)
+			if self._cortes_sensores is not None and self._cortes_sensores[fila]:
+				if anterior != VACIO:
+					self._avisar_cambio(anterior, fila, -1)
+				if particula is not None:
+					self._avisar_cambio(particula.tipo, fila, 1)
+
+	def mover_particula(self, fila, columna, nueva_fila, nueva_columna):
+		"""Mueve tipo y color de una celda a otra, dejando vacía la de origen"""
+		if (0 <= fila < self.filas and 0 <= columna < self.columnas and
+			0 <= nueva_fila < self.filas and 0 <= nueva_columna < self.columnas):
+			origen = fila * self.columnas + columna
+			destino = nueva_fila * self.columnas + nueva_columna
+			tipo = self.tipos[destino] = self.tipos[origen]
+			self.colores[destino] = self.colores[origen]
+			self.tipos[origen] = VACIO
+			self.colores[origen] = 0
+			sucias = self.bandas_sucias
+			if sucias is not None:
+				alto = self.alto_banda
+				sucias[nueva_fila // alto] = 1
+				sucias[fila // alto] = 1
+				if fila:
+					sucias[(fila - 1) // alto] = 1
+			cortes = self._cortes_sensores
+			if cortes is not None and tipo != VACIO and cortes[fila] != cortes[nueva_fila]:
+				self._avisar_movimiento(tipo, fila, nueva_fila)
+
+	def obtener_celda(self, fila, columna):
+		"""
+		Obtiene la partícula representativa del tipo de la celda.
+		
+		Retorna:
+			Particle o None: Instancia compartida del tipo de la celda, o None si
+			                 está vacía o fuera de límites
+		"""
+		if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+			return _PROTOTIPOS.get(self.tipos[fila * self.columnas + columna])
+		return None
+
+	def obtener_color(self, fila, columna):
+		"""Obtiene el color RGB de la partícula de la celda, o None si está vacía"""
+		if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+			indice = fila * self.columnas + columna
+			if self.tipos[indice] != VACIO:
+				return desempaquetar_color(self.colores[indice])
+		return None
+
+	def limpiar(self):
+		"""Elimina todas las partículas de la grilla"""
+		self.tipos[:] = bytes(len(self.tipos))
+		self.colores[:] = array('I', [0]) * len(self.colores)
+		self._limpiar_bandas_sucias()
+		self._reiniciar_sensores()
+
+	def contar_particulas(self):
+		"""Cuenta las celdas ocupadas (el conteo sobre el bytearray corre en C)"""
+		return len(self.tipos) - self.contar_celdas(VACIO)
+
+	def contar_celdas(self, tipo, inicio=0, fin=None):
+		"""Cuenta las celdas de un tipo entre los índices inicio y fin del plano"""
+		return self.tipos.count(tipo, inicio, len(self.tipos) if fin is None else fin)
+
+	def segmentos_activos(self, fila):
+		"""Tramos (columna_inicio, columna_fin) de la fila a recorrer; vacío si la fila está vacía"""
+		base = fila * self.columnas
+		if not any(self.tipos[base:base + self.columnas]):
+			return []
+		return [(0, self.columnas)]
+
+	def rango_filas_activas(self):
+		"""Retorna (fila_inicio, fila_fin) del rango de filas que pueden tener partículas"""
+		return 0, self.filas
+
+	def tipos_fila(self, fila):
+		"""Retorna una copia de la fila del plano de tipos (ver Grilla)"""
+		base = fila * self.columnas
+		return self.tipos[base:base + self.columnas]
+
+	def exportar_planos(self):
+		"""Retorna copias de los planos de tipos y colores"""
+		return bytearray(self.tipos), array('I', self.colores)
+
+	@classmethod
+	def desde_planos(cls, tipos, colores, filas, columnas, tamaño_celda):
+		"""Crea una grilla compacta adoptando los planos indicados"""
+		grilla = cls(columnas * tamaño_celda, filas * tamaño_celda, tamaño_celda)
+		grilla.tipos[:] = tipos
+		grilla.colores[:] = array('I', colores)
+		return grilla
+
+class GrillaMapeada(GrillaCompacta):
+	"""
+	Grilla compacta cuyos planos viven en un archivo mapeado en memoria.
+
+	Es la misma GrillaCompacta, pero los planos de tipos y colores son vistas
+	de un archivo abierto con mmap en lugar de arreglos en memoria. El
+	sistema operativo carga y descarga las páginas del archivo según se usan,
+	así un contenedor más grande que la memoria disponible se puede simular
+	igual, y otro proceso (un visor o una herramienta de análisis) puede
+	abrir el mismo archivo con LectorGrillaMapeada y leer los planos en el
+	lugar, sin copiarlos.
+
+	Formato del archivo:
+	- Cabecera (una página): ver _CABECERA_MAPEADA, con las dimensiones, los
+	  desplazamientos de los planos y el contador de generación
+	- Plano de tipos: un byte por celda, fila por fila, desde una página propia
+	- Plano de colores: un entero 0xFFRRGGBB de 32 bits por celda, en el orden
+	  de bytes de la máquina, también desde una página propia
+
+	El contador de generación funciona como un seqlock: es impar mientras un
+	paso escribe en los planos y par cuando el frame está completo (ver
+	escritura). Un lector que ve la misma generación par antes y después de
+	leer sabe que leyó un frame entero.
+
+	La resolución es fija: cambiarla cambiaría el tamaño del archivo bajo los
+	lectores, así que Simulacion.cambiar_tamaño_grano la rechaza.
+	"""
+
+	def __init__(self, ancho, alto, tamaño_celda, ruta):
+		"""
+		Crea (o sobrescribe) el archivo de la grilla y lo mapea en memoria.
+
+		Parámetros:
+			ancho (int): Ancho total de la grilla en unidades de simulación
+			alto (int): Alto total de la grilla en unidades de simulación
+			tamaño_celda (int): Unidades por celda
+			ruta (str): Archivo donde viven los planos
+
+		Lanza:
+			ValueError: Si las dimensiones superan el máximo por lado
+			OSError: Si no se puede crear o mapear el archivo
+		"""
+		self.filas = alto // tamaño_celda
+		self.columnas = ancho // tamaño_celda
+		self.tamaño_celda = tamaño_celda
+		self.ruta = ruta
+		if not (1 <= self.filas <= DIMENSION_MAXIMA_GRILLA and 1 <= self.columnas <= DIMENSION_MAXIMA_GRILLA):
+			raise ValueError(f"Dimensiones de grilla fuera de rango: {self.columnas}x{self.filas} "
+							 f"(máximo {DIMENSION_MAXIMA_GRILLA} por lado)")
+
+		# Cada región empieza en un múltiplo de la granularidad de mmap
+		celdas = self.filas * self.columnas
+		inicio_tipos = _redondear_pagina(_CABECERA_MAPEADA.size)
+		inicio_colores = inicio_tipos + _redondear_pagina(celdas)
+
+		# truncate deja el archivo disperso y en ceros: todas las celdas vacías
+		self._archivo = open(ruta, "w+b")
+		self._archivo.truncate(inicio_colores + 4 * celdas)
+		descriptor = self._archivo.fileno()
+		self._cabecera = mmap.mmap(descriptor, _CABECERA_MAPEADA.size, access=mmap.ACCESS_WRITE)
+		self.tipos = mmap.mmap(descriptor, celdas, access=mmap.ACCESS_WRITE, offset=inicio_tipos)
+		self._mapa_colores = mmap.mmap(descriptor, 4 * celdas, access=mmap.ACCESS_WRITE, offset=inicio_colores)
+		self.colores = memoryview(self._mapa_colores).cast('I')
+
+		self.generacion = 0
+		_CABECERA_MAPEADA.pack_into(self._cabecera, 0, MAGIA_GRILLA_MAPEADA, VERSION_GRILLA_MAPEADA,
+									self.filas, self.columnas, tamaño_celda, self.generacion,
+									inicio_tipos, inicio_colores)
+
+	@contextmanager
+	def escritura(self):
+		"""
+		Marca un paso de escritura en el contador de generación.
+
+		Al entrar la generación pasa a impar (los lectores descartan lo que
+		lean) y al salir, aunque el paso falle, pasa al siguiente número par.
+		"""
+		self._publicar_generacion(self.generacion + 1)
+		try:
+			yield
+		finally:
+			self._publicar_generacion(self.generacion + 1)
+
+	def _publicar_generacion(self, generacion):
+		"""Escribe el contador en la cabecera (8 bytes alineados, una sola escritura)"""
+		self.generacion = generacion
+		struct.pack_into("<Q", self._cabecera, _DESPLAZAMIENTO_GENERACION, generacion)
+
+	def contar_celdas(self, tipo, inicio=0, fin=None):
+		"""Cuenta las celdas de un tipo leyendo el plano por bloques (mmap no tiene count)"""
+		fin = len(self.tipos) if fin is None else fin
+		return sum(self.tipos[desde:min(desde + _BLOQUE_CONTEO, fin)].count(tipo)
+				   for desde in range(inicio, fin, _BLOQUE_CONTEO))
+
+	def exportar_planos(self):
+		"""Retorna copias en memoria de los planos de tipos y colores"""
+		colores = array('I')
+		colores.frombytes(self._mapa_colores)
+		return bytearray(self.tipos), colores
+
+	def sincronizar(self):
+		"""Pide al sistema operativo que escriba en disco las páginas modificadas"""
+		self.tipos.flush()
+		self._mapa_colores.flush()
+		self._cabecera.flush()
+
+	def cerrar(self):
+		"""Libera los mapas y el archivo; el archivo queda con el último frame publicado"""
+		self.colores.release()
+		for mapa in (self._mapa_colores, self.tipos, self._cabecera):
+			mapa.close()
+		self._archivo.close()
+
+class LectorGrillaMapeada:
+	"""
+	Acceso de solo lectura, desde otro proceso, al archivo de una GrillaMapeada.
+
+	Los planos se exponen como vistas del archivo (sin copia): tipos es un
+	mmap de un byte por celda y colores una memoryview de enteros de 32 bits.
+	Para leerlos de forma consistente se usa el protocolo del seqlock:
+
+		generacion = lector.comenzar_lectura()
+		... leer lector.tipos / lector.colores ...
+		if not lector.lectura_valida(generacion):
+			... descartar y volver a leer ...
+
+	leer_planos hace ese ciclo y retorna copias de un frame completo.
+
+	Atributos:
+		filas, columnas, tamaño_celda (int): Geometría de la grilla
+		tipos (mmap): Plano de tipos
+		colores (memoryview): Plano de colores empaquetados
+	"""
+
+	def __init__(self, ruta):
+		"""
+		Abre y valida el archivo de una grilla mapeada.
+
+		Lanza:
+			ValueError: Si el archivo no es una grilla mapeada de esta versión
+		"""
+		self._archivo = open(ruta, "rb")
+		descriptor = self._archivo.fileno()
+		self._cabecera = mmap.mmap(descriptor, _CABECERA_MAPEADA.size, access=mmap.ACCESS_READ)
+		(magia, version, self.filas, self.columnas, self.tamaño_celda,
+		 _, inicio_tipos, inicio_colores) = _CABECERA_MAPEADA.unpack_from(self._cabecera)
+		if magia != MAGIA_GRILLA_MAPEADA or version != VERSION_GRILLA_MAPEADA:
+			self._cabecera.close()
+			self._archivo.close()
+			raise ValueError(f"{ruta} no es una grilla mapeada (versión {VERSION_GRILLA_MAPEADA})")
+
+		celdas = self.filas * self.columnas
+		self.tipos = mmap.mmap(descriptor, celdas, access=mmap.ACCESS_READ, offset=inicio_tipos)
+		self._mapa_colores = mmap.mmap(descriptor, 4 * celdas, access=mmap.ACCESS_READ, offset=inicio_colores)
+		self.colores = memoryview(self._mapa_colores).cast('I')
+
+	@property
+	def generacion(self):
+		"""Contador de generación actual del escritor"""
+		return struct.unpack_from("<Q", self._cabecera, _DESPLAZAMIENTO_GENERACION)[0]
+
+	def comenzar_lectura(self, espera=1.0):
+		"""
+		Espera a que no haya un paso escribiendo y retorna la generación.
+
+		Parámetros:
+			espera (float): Segundos máximos de espera
+
+		Lanza:
+			TimeoutError: Si el escritor no termina el paso a tiempo (por
+				ejemplo, si el proceso terminó en medio de un paso)
+		"""
+		limite = time.monotonic() + espera
+		generacion = self.generacion
+		while generacion % 2:
+			if time.monotonic() > limite:
+				raise TimeoutError(f"La grilla mapeada sigue en escritura (generación {generacion})")
+			time.sleep(0)
+			generacion = self.generacion
+		return generacion
+
+	def lectura_valida(self, generacion):
+		"""Indica si nada se escribió desde comenzar_lectura"""
+		return self.generacion == generacion
+
+	def leer_planos(self, espera=1.0):
+		"""
+		Copia un frame completo de los planos.
+
+		Retorna:
+			tuple: (generacion, tipos, colores) con tipos como bytes y colores como array('I')
+		"""
+		limite = time.monotonic() + espera
+		while True:
+			generacion = self.comenzar_lectura(max(0.0, limite - time.monotonic()))
+			tipos = self.tipos[:]
+			colores = array('I')
+			colores.frombytes(self._mapa_colores)
+			if self.lectura_valida(generacion):
+				return generacion, tipos, colores
+			if time.monotonic() > limite:
+				raise TimeoutError("La grilla mapeada cambió durante todas las lecturas")
+
+	def cerrar(self):
+		"""Libera los mapas y el archivo"""
+		self.colores.release()
+		for mapa in (self._mapa_colores, self.tipos, self._cabecera):
+			mapa.close()
+		self._archivo.close()
+
+class _Tesela:
+	"""Bloque cuadrado de celdas de GrillaDispersa con sus planos de tipos y colores"""
+	
+	__slots__ = ("tipos", "colores", "ocupadas", "por_fila")
+	
+	def __init__(self, lado):
+		self.tipos = bytearray(lado * lado)
+		self.colores = array('I', [0]) * (lado * lado)
+		self.ocupadas = 0   # Celdas no vacías; al llegar a 0 la tesela se libera
+		self.por_fila = array('H', [0]) * lado   # Celdas no vacías de cada fila de la tesela
+
+class GrillaDispersa(_ConSensores, _ConBandasSucias):
+	"""
+	Grilla dispersa formada por teselas cuadradas reservadas a demanda.
+	
+	Ofrece la misma interfaz que Grilla. El contenedor se divide en teselas de
+	lado_tesela x lado_tesela celdas; una tesela se reserva cuando recibe su
+	primera partícula y se libera cuando queda vacía. Las teselas se guardan
+	en un diccionario por fila de teselas:
+	
+		teselas[fila_tesela][columna_tesela] -> _Tesela
+	
+	Cada tesela usa los mismos planos que GrillaCompacta (byte de tipo y color
+	empaquetado), así que la memoria crece con la cantidad de granos y no con
+	el área del contenedor: en un silo alto casi todo el volumen sobre la pila
+	es aire y no ocupa memoria.
+	
+	Los recorridos (física, nivel, dibujo) consultan segmentos_activos y
+	rango_filas_activas para visitar solo las teselas reservadas.
+	
+	Como GrillaCompacta, obtener_celda retorna la partícula representativa
+	del tipo; el color real se obtiene con obtener_color.
+	"""
+	
+	def __init__(self, ancho, alto, tamaño_celda, lado_tesela=TAMANO_TESELA):
+		"""
+		Inicializa una grilla dispersa vacía (sin teselas reservadas).
+		
+		Parámetros:
+			ancho (int): Ancho total de la grilla en unidades de simulación
+			alto (int): Alto total de la grilla en unidades de simulación
+			tamaño_celda (int): Unidades por celda
+			lado_tesela (int): Celdas por lado de cada tesela
+		"""
+		self.filas = alto // tamaño_celda
+		self.columnas = ancho // tamaño_celda
+		self.tamaño_celda = tamaño_celda
+		self.lado_tesela = lado_tesela
+		
+		# Teselas reservadas por fila de teselas y, ordenadas por columna, las de cada una
+		self.teselas = {}
+		self._teselas_ordenadas = {}
+
+	def _ubicar(self, fila, columna):
+		"""Retorna (tesela, índice) de una celda, con tesela None si no está reservada"""
+		lado = self.lado_tesela
+		fila_teselas = self.teselas.get(fila // lado)
+		if fila_teselas is None:
+			return None, 0
+		return fila_teselas.get(columna // lado), (fila % lado) * lado + columna % lado
+
+	def _reservar(self, fila, columna):
+		"""Retorna (tesela, índice) de una celda, reservando la tesela si hace falta"""
+		lado = self.lado_tesela
+		fila_tesela = fila // lado
+		columna_tesela = columna // lado
+		fila_teselas = self.teselas.get(fila_tesela)
+		if fila_teselas is None:
+			fila_teselas = self.teselas[fila_tesela] = {}
+		tesela = fila_teselas.get(columna_tesela)
+		if tesela is None:
+			tesela = fila_teselas[columna_tesela] = _Tesela(lado)
+			self._teselas_ordenadas.pop(fila_tesela, None)
+		return tesela, (fila % lado) * lado + columna % lado
+
+	def _escribir(self, fila, columna, tipo, color):
+		"""Guarda tipo y color empaquetado en una celda dentro de los límites"""
+		tesela, indice = self._reservar(fila, columna)
+		if tesela.tipos[indice] == VACIO:
+			tesela.ocupadas += 1
+			tesela.por_fila[indice // self.lado_tesela] += 1
+		tesela.tipos[indice] = tipo
+		tesela.colores[indice] = color
+
+	def _vaciar(self, fila, columna):
+		"""
+		Vacía una celda dentro de los límites y libera su tesela si quedó vacía.
+		
+		Retorna:
+			int: Código de tipo que tenía la celda (VACIO si ya estaba vacía)
+		"""
+		tesela, indice = self._ubicar(fila, columna)
+		if tesela is None or tesela.tipos[indice] == VACIO:
+			return VACIO
+		tipo = tesela.tipos[indice]
+		self._vaciar_indice(tesela, indice, fila, columna)
+		return tipo
+
+	def _vaciar_indice(self, tesela, indice, fila, columna):
+		"""Vacía una celda ocupada de una tesela ya ubicada y libera la tesela si quedó vacía"""
+		tesela.tipos[indice] = VACIO
+		tesela.colores[indice] = 0
+		tesela.ocupadas -= 1
+		lado = self.lado_tesela
+		tesela.por_fila[indice // lado] -= 1
+		if tesela.ocupadas == 0:
+			fila_tesela = fila // lado
+			fila_teselas = self.teselas[fila_tesela]
+			del fila_teselas[columna // lado]
+			if not fila_teselas:
+				del self.teselas[fila_tesela]
+			self._teselas_ordenadas.pop(fila_tesela, None)
+
+	def _dentro(self, fila, columna):
+		"""Indica si la celda está dentro de los límites de la grilla"""
+		return 0 <= fila < self.filas and 0 <= columna < self.columnas
+
+	def dibujar(self, ventana, tamaño=None, region=None, paso=1):
+		"""
+		Dibuja las partículas de las teselas reservadas que caen en la región.
+		
+		Parámetros:
+			ventana (pygame.Surface): Superficie donde dibujar las partículas
+			tamaño (int, opcional): Lado en píxeles de cada celda dibujada
+			region (tuple, opcional): (fila, columna, filas, columnas) visibles
+			paso (int, opcional): Dibuja una de cada `paso` celdas por eje
+			
+		A un píxel por celda, cada tesela se convierte en superficie desde su
+		plano de colores y se copia con un único blit.
+		"""
+		if tamaño is None:
+			tamaño = self.tamaño_celda
+		fila_inicio, columna_inicio, filas, columnas = _region_completa(self, region)
+		fila_fin = fila_inicio + filas
+		columna_fin = columna_inicio + columnas
+		lado = self.lado_tesela
+		
+		for fila_tesela in range(fila_inicio // lado, (fila_fin - 1) // lado + 1):
+			fila_teselas = self.teselas.get(fila_tesela)
+			if not fila_teselas:
+				continue
+			y_tesela = fila_tesela * lado
+			for columna_tesela, tesela in fila_teselas.items():
+				x_tesela = columna_tesela * lado
+				if x_tesela >= columna_fin or x_tesela + lado <= columna_inicio:
+					continue
+				
+				if tamaño == 1 and paso == 1:
+					superficie = pygame.image.frombuffer(tesela.colores, (lado, lado), FORMATO_COLOR)
+					ventana.blit(superficie, (x_tesela - columna_inicio, y_tesela - fila_inicio))
+					continue
+				
+				# Primera fila y columna de la tesela alineadas al muestreo de la región
+				primera_fila = max(y_tesela, fila_inicio)
+				primera_fila += -(primera_fila - fila_inicio) % paso
+				primera_columna = max(x_tesela, columna_inicio)
+				primera_columna += -(primera_columna - columna_inicio) % paso
+				for fila in range(primera_fila, min(y_tesela + lado, fila_fin), paso):
+					y = (fila - fila_inicio) // paso * tamaño
+					base = (fila - y_tesela) * lado - x_tesela
+					for columna in range(primera_columna, min(x_tesela + lado, columna_fin), paso):
+						if tesela.tipos[base + columna]:
+							ventana.fill(desempaquetar_color(tesela.colores[base + columna]),
+										 ((columna - columna_inicio) // paso * tamaño, y, tamaño, tamaño))
+
+	def agregar_particula(self, fila, columna, tipo_particula):
+		"""
+		Agrega una nueva partícula en la posición especificada si la celda está vacía.
+		
+		Retorna:
+			bool: True si la partícula fue agregada, False en caso contrario
+		"""
+		if self.esta_celda_vacia(fila, columna):
+			particula = tipo_particula()
+			self._escribir(fila, columna, particula.tipo, empaquetar_color(particula.color))
+			self._marcar_llenado(fila)
+			if self._cortes_sensores is not None and self._cortes_sensores[fila]:
+				self._avisar_cambio(particula.tipo, fila, 1)
+			return True
+		return False
+
+	def agregar_particulas_lote(self, celdas, tipo, colores):
+		"""Agrega un lote de partículas de un tipo, reservando las teselas necesarias (ver Grilla)"""
+		cortes = self._cortes_sensores
+		agregadas = 0
+		for (fila, columna), color in zip(celdas, colores):
+			if self.esta_celda_vacia(fila, columna):
+				self._escribir(fila, columna, tipo, empaquetar_color(color))
+				agregadas += 1
+				self._marcar_llenado(fila)
+				if cortes is not None and cortes[fila]:
+					self._avisar_cambio(tipo, fila, 1)
+		return agregadas
+
+	def eliminar_particula(self, fila, columna):
+		"""Elimina la partícula en la posición especificada"""
+		if self._dentro(fila, columna):
+			tipo = self._vaciar(fila, columna)
+			if tipo != VACIO:
+				self._marcar_vaciado(fila)
+				if self._cortes_sensores is not None and self._cortes_sensores[fila]:
+					self._avisar_cambio(tipo, fila, -1)
+
+	def eliminar_particulas_lote(self, celdas):
+		"""Vacía un lote de celdas, liberando las teselas que queden vacías (ver Grilla)"""
+		cortes = self._cortes_sensores
+		eliminadas = 0
+		for fila, columna in celdas:
+			if self._dentro(fila, columna):
+				tipo = self._vaciar(fila, columna)
+				if tipo != VACIO:
+					eliminadas += 1
+					self._marcar_vaciado(fila)
+					if cortes is not None and cortes[fila]:
+						self._avisar_cambio(tipo, fila, -1)
+		return eliminadas
+
+	def esta_celda_vacia(self, fila, columna):
+		"""Verifica si una celda está vacía (fuera de límites se considera ocupada)"""
+		if not self._dentro(fila, columna):
+			return False
+		tesela, indice = self._ubicar(fila, columna)
+		return tesela is None or tesela.tipos[indice] == VACIO
+
+	def establecer_celda(self, fila, columna, particula):
+		"""Guarda el tipo y el color de una partícula en la celda indicada"""
+		if self._dentro(fila, columna):
+			tesela, indice = self._ubicar(fila, columna)
+			anterior = VACIO if tesela is None else tesela.tipos[indice]
+			if particula is None:
+				self._vaciar(fila, columna)
+			else:
+				self._escribir(fila, columna, particula.tipo, empaquetar_color(particula.color))
+			self._marcar_vaciado(fila)
+			if self._cortes_sensores is not None and self._cortes_sensores[fila]:
+				if anterior != VACIO:
+					self._avisar_cambio(anterior, fila, -1)
+				if particula is not None:
+					self._avisar_cambio(particula.tipo, fila, 1)
+
+	def mover_particula(self, fila, columna, nueva_fila, nueva_columna):
+		"""Mueve tipo y color de una celda a otra, dejando vacía la de origen"""
+		if self._dentro(fila, columna) and self._dentro(nueva_fila, nueva_columna):
+			tesela, indice = self._ubicar(fila, columna)
+			if tesela is None or tesela.tipos[indice] == VACIO:
+				return
+			self.mover_desde_tesela(tesela, indice, fila, columna, nueva_fila, nueva_columna)
+
+	def mover_desde_tesela(self, tesela, indice, fila, columna, nueva_fila, nueva_columna):
+		"""
+		Mueve el grano de una celda cuya tesela e índice ya se conocen (ver mover_particula).
+		
+		Es el camino de la física por teselas, que ya tiene ubicado el origen:
+		solo se ubica (o reserva) la tesela de destino. Las dos celdas deben
+		estar dentro de la grilla y el origen debe estar ocupado.
+		"""
+		# Escribir primero el destino para no liberar una tesela que se sigue usando
+		tipo = tesela.tipos[indice]
+		self._escribir(nueva_fila, nueva_columna, tipo, tesela.colores[indice])
+		self._vaciar_indice(tesela, indice, fila, columna)
+		sucias = self.bandas_sucias
+		if sucias is not None:
+			alto = self.alto_banda
+			sucias[nueva_fila // alto] = 1
+			sucias[fila // alto] = 1
+			if fila:
+				sucias[(fila - 1) // alto] = 1
+		cortes = self._cortes_sensores
+		if cortes is not None and cortes[fila] != cortes[nueva_fila]:
+			self._avisar_movimiento(tipo, fila, nueva_fila)
+
+	def obtener_celda(self, fila, columna):
+		"""Obtiene la partícula representativa del tipo de la celda, o None si está vacía"""
+		if self._dentro(fila, columna):
+			tesela, indice = self._ubicar(fila, columna)
+			if tesela is not None:
+				return _PROTOTIPOS.get(tesela.tipos[indice])
+		return None
+
+	def obtener_color(self, fila, columna):
+		"""Obtiene el color RGB de la partícula de la celda, o None si está vacía"""
+		if self._dentro(fila, columna):
+			tesela, indice = self._ubicar(fila, columna)
+			if tesela is not None and tesela.tipos[indice] != VACIO:
+				return desempaquetar_color(tesela.colores[indice])
+		return None
+
+	def limpiar(self):
+		"""Elimina todas las partículas liberando todas las teselas"""
+		self.teselas.clear()
+		self._teselas_ordenadas.clear()
+		self._limpiar_bandas_sucias()
+		self._reiniciar_sensores()
+
+	def contar_particulas(self):
+		"""Cuenta las celdas ocupadas sumando el contador de cada tesela"""
+		return sum(tesela.ocupadas for fila_teselas in self.teselas.values()
+				   for tesela in fila_teselas.values())
+
+	def cantidad_teselas(self):
+		"""Cantidad de teselas reservadas (la memoria usada es proporcional a este valor)"""
+		return sum(len(fila_teselas) for fila_teselas in self.teselas.values())
+
+	def teselas_ordenadas(self, fila_tesela):
+		"""
+		Obtiene las teselas reservadas de una fila de teselas, ordenadas por columna.
+		
+		La lista se guarda hasta que se reserva o libera una tesela de esa fila.
+		
+		Retorna:
+			list: Pares (columna_tesela, tesela)
+		"""
+		ordenadas = self._teselas_ordenadas.get(fila_tesela)
+		if ordenadas is None:
+			fila_teselas = self.teselas.get(fila_tesela, {})
+			ordenadas = [(columna_tesela, fila_teselas[columna_tesela]) for columna_tesela in sorted(fila_teselas)]
+			self._teselas_ordenadas[fila_tesela] = ordenadas
+		return ordenadas
+
+	def segmentos_activos(self, fila):
+		"""
+		Obtiene los tramos de columnas de una fila cubiertos por teselas con granos en esa fila.
+		
+		Las teselas sin granos en la fila pedida se saltean (según su conteo
+		por_fila), así los recorridos no visitan el aire de las teselas
+		reservadas. Las teselas contiguas se unen en un único tramo.
+		
+		Retorna:
+			list: Tramos (columna_inicio, columna_fin) a recorrer
+		"""
+		lado = self.lado_tesela
+		desplazamiento = fila % lado
+		segmentos = []
+		for columna_tesela, tesela in self.teselas_ordenadas(fila // lado):
+			if not tesela.por_fila[desplazamiento]:
+				continue
+			inicio = columna_tesela * lado
+			fin = min(inicio + lado, self.columnas)
+			if segmentos and segmentos[-1][1] == inicio:
+				segmentos[-1] = (segmentos[-1][0], fin)
+			else:
+				segmentos.append((inicio, fin))
+		return segmentos
+
+	def rango_filas_activas(self):
+		"""Retorna (fila_inicio, fila_fin) que cubre todas las teselas reservadas"""
+		if not self.teselas:
+			return 0, 0
+		lado = self.lado_tesela
+		return min(self.teselas) * lado, min((max(self.teselas) + 1) * lado, self.filas)
+
+	def tipos_fila(self, fila):
+		"""Arma los tipos de una fila copiando el tramo de cada tesela reservada (ver Grilla)"""
+		tipos = bytearray(self.columnas)
+		lado = self.lado_tesela
+		origen = (fila % lado) * lado
+		for columna_tesela, tesela in self.teselas.get(fila // lado, {}).items():
+			inicio = columna_tesela * lado
+			ancho = min(lado, self.columnas - inicio)
+			tipos[inicio:inicio + ancho] = tesela.tipos[origen:origen + ancho]
+		return tipos
+
+	def exportar_planos(self):
+		"""
+		Exporta el contenido como planos densos de tipos y colores.
+		
+		Nota: los planos ocupan filas*columnas celdas; para contenedores muy
+		altos conviene no cambiar la resolución.
+		"""
+		tipos = bytearray(self.filas * self.columnas)
+		colores = array('I', [0]) * (self.filas * self.columnas)
+		lado = self.lado_tesela
+		for fila_tesela, fila_teselas in self.teselas.items():
+			for columna_tesela, tesela in fila_teselas.items():
+				x_tesela = columna_tesela * lado
+				ancho = min(lado, self.columnas - x_tesela)
+				for desplazamiento in range(min(lado, self.filas - fila_tesela * lado)):
+					destino = (fila_tesela * lado + desplazamiento) * self.columnas + x_tesela
+					origen = desplazamiento * lado
+					tipos[destino:destino + ancho] = tesela.tipos[origen:origen + ancho]
+					colores[destino:destino + ancho] = tesela.colores[origen:origen + ancho]
+		return tipos, colores
+
+	@classmethod
+	def desde_planos(cls, tipos, colores, filas, columnas, tamaño_celda):
+		"""Crea una grilla dispersa reservando solo las teselas con partículas"""
+		grilla = cls(columnas * tamaño_celda, filas * tamaño_celda, tamaño_celda)
+		for fila in range(filas):
+			base = fila * columnas
+			if not any(tipos[base:base + columnas]):
+				continue
+			for columna in range(columnas):
+				tipo = tipos[base + columna]
+				if tipo != VACIO:
+					grilla._escribir(fila, columna, tipo, colores[base + columna])
+		return grilla
+
+# Partícula representativa de cada tipo, compartida por las celdas de GrillaCompacta y GrillaDispersa
+_PROTOTIPOS = {tipo: clase(color=(0, 0, 0)) for tipo, clase in CLASES_POR_TIPO.items()}
+
+# Orden de bytes de un color empaquetado en memoria, para pygame.image.frombuffer
+FORMATO_COLOR = "BGRA" if sys.byteorder == "little" else "ARGB"
+
+# Cabecera del archivo de GrillaMapeada: magia, versión, filas, columnas,
+# tamaño de celda, generación y desplazamientos de los planos de tipos y colores
+MAGIA_GRILLA_MAPEADA = b"PERLITA\x00"
+VERSION_GRILLA_MAPEADA = 1
+_CABECERA_MAPEADA = struct.Struct("<8sIIIIQQQ")
+_DESPLAZAMIENTO_GENERACION = 24
+
+# Celdas por bloque al contar sobre un plano mapeado (acota la copia temporal)
+_BLOQUE_CONTEO = 1 << 20
+
+def _redondear_pagina(tamaño):
+	"""Redondea hacia arriba al múltiplo de la granularidad de mmap (los desplazamientos deben serlo)"""
+	granularidad = mmap.ALLOCATIONGRANULARITY
+	return (tamaño + granularidad - 1) // granularidad * granularidad
+
+# Implementaciones de grilla disponibles por nombre
+BACKENDS_GRILLA = {
+	"objetos": Grilla,
+	"compacta": GrillaCompacta,
+	"dispersa": GrillaDispersa
+}
+
+# Bytes por celda estimados de cada implementación densa (con el contenedor lleno)
+BYTES_POR_CELDA = {
+	"objetos": 8 + 200,   # Puntero de la lista más instancia con diccionario y tupla de color
+	"compacta": 1 + 4     # Byte de tipo más color empaquetado
+}
+
+def empaquetar_color(color):
+	"""Convierte un color (r, g, b) en un entero 0xFFRRGGBB (opaco; 0 queda para vacío)"""
+	return 0xFF000000 | (color[0] << 16) | (color[1] << 8) | color[2]
+
+def desempaquetar_color(valor):
+	"""Convierte un entero 0xFFRRGGBB en un color (r, g, b)"""
+	return ((valor >> 16) & 0xFF, (valor >> 8) & 0xFF, valor & 0xFF)
+
+def _region_completa(grilla, region):
+	"""Normaliza una región (fila, columna, filas, columnas) a los límites de la grilla"""
+	if region is None:
+		return 0, 0, grilla.filas, grilla.columnas
+	fila, columna, filas, columnas = region
+	fila = max(0, min(fila, grilla.filas))
+	columna = max(0, min(columna, grilla.columnas))
+	return fila, columna, min(filas, grilla.filas - fila), min(columnas, grilla.columnas - columna)
+
+def _tramos(origen, destino):
+	"""
+	Calcula qué tramo de índices de origen cubre cada índice de destino.
+	
+	Al reducir, cada índice de destino cubre un bloque de varios índices de
+	origen. Al ampliar, cada uno cubre exactamente el índice de origen más
+	cercano, que queda replicado.
+	"""
+	tramos = []
+	for indice in range(destino):
+		inicio = indice * origen // destino
+		fin = max(inicio + 1, (indice + 1) * origen // destino)
+		tramos.append((inicio, fin))
+	return tramos
+
+def remuestrear_planos(tipos, colores, filas, columnas, nuevas_filas, nuevas_columnas):
+	"""
+	Remuestrea los planos de una grilla a otra resolución.
+	
+	Parámetros:
+		tipos (bytearray): Plano de tipos de origen (filas*columnas)
+		colores (array): Plano de colores empaquetados de origen
+		filas, columnas (int): Dimensiones de origen
+		nuevas_filas, nuevas_columnas (int): Dimensiones de destino
+		
+	Retorna:
+		tuple: (tipos, colores) con las dimensiones de destino
+		
+	Algoritmo:
+		1. Cada celda de destino cubre un bloque de celdas de origen
+		2. Al ampliar el bloque es de 1x1: la celda se replica (vecino más cercano)
+		3. Al reducir, la fracción ocupada de cada bloque se acumula con difusión
+		   del error: la celda se llena cuando el acumulado llega a medio grano,
+		   así la masa total se conserva en lugar de colapsar varios granos en uno
+		4. Una celda llena toma el tipo mayoritario del bloque y el color del
+		   primer grano de ese tipo
+	"""
+	tramos_filas = _tramos(filas, nuevas_filas)
+	tramos_columnas = _tramos(columnas, nuevas_columnas)
+	
+	nuevos_tipos = bytearray(nuevas_filas * nuevas_columnas)
+	nuevos_colores = array('I', [0]) * (nuevas_filas * nuevas_columnas)
+	acumulado = 0.0
+	
+	for nueva_fila, (fila_inicio, fila_fin) in enumerate(tramos_filas):
+		base_destino = nueva_fila * nuevas_columnas
+		filas_origen = [fila * columnas for fila in range(fila_inicio, fila_fin)]
+		
+		for nueva_columna, (columna_inicio, columna_fin) in enumerate(tramos_columnas):
+			if len(filas_origen) == 1 and columna_fin - columna_inicio == 1:
+				# Bloque de una sola celda: copiar directamente
+				indice = filas_origen[0] + columna_inicio
+				tipo = tipos[indice]
+				if tipo != VACIO:
+					nuevos_tipos[base_destino + nueva_columna] = tipo
+					nuevos_colores[base_destino + nueva_columna] = colores[indice]
+				continue
+			
+			# Contar cada tipo en el bloque (el conteo sobre bytes corre en C)
+			conteos = {}
+			for base in filas_origen:
+				tramo = tipos[base + columna_inicio:base + columna_fin]
+				for tipo in CLASES_POR_TIPO:
+					conteos[tipo] = conteos.get(tipo, 0) + tramo.count(tipo)
+			
+			ocupadas = sum(conteos.values())
+			if ocupadas == 0:
+				continue
+			
+			# Difusión del error: la fracción ocupada del bloque se acumula y la
+			# celda se llena solo cuando el acumulado alcanza medio grano, así
+			# la masa total se conserva en lugar de redondear cada bloque
+			acumulado += ocupadas / (len(filas_origen) * (columna_fin - columna_inicio))
+			if acumulado < 0.5:
+				continue
+			acumulado -= 1.0
+			tipo_mayoritario = max(conteos, key=conteos.get)
+			
+			# Conservar el color del primer grano del tipo elegido
+			for base in filas_origen:
+				tramo = tipos[base + columna_inicio:base + columna_fin]
+				posicion = tramo.find(tipo_mayoritario)
+				if posicion >= 0:
+					nuevos_tipos[base_destino + nueva_columna] = tipo_mayoritario
+					nuevos_colores[base_destino + nueva_columna] = colores[base + columna_inicio + posicion]
+					break
+	
+	return nuevos_tipos, nuevos_colores
+
+def estimar_memoria_grilla(filas, columnas, backend):
+	"""
+	Estima los bytes que ocupa una grilla con el contenedor lleno.
+	
+	La grilla dispersa no se estima por área: arranca sin teselas y crece con
+	los granos, así que se cuenta solo su índice de filas de teselas.
+	
+	Parámetros:
+		filas, columnas (int): Dimensiones de la grilla en celdas
+		backend (str): Nombre de la implementación ("objetos", "compacta" o "dispersa")
+		
+	Retorna:
+		int: Bytes estimados
+	"""
+	if backend == "dispersa":
+		return (filas // TAMANO_TESELA + 1) * 100
+	return filas * columnas * BYTES_POR_CELDA[backend]
+
+def elegir_backend(filas, columnas, backend="auto"):
+	"""
+	Elige la implementación de grilla verificando la memoria antes de crearla.
+	
+	Parámetros:
+		filas, columnas (int): Dimensiones de la grilla en celdas
+		backend (str): "objetos", "compacta", "dispersa" o "auto"
+		
+	Retorna:
+		str: Nombre de la implementación a usar
+		
+	Algoritmo:
+		1. Valida que las dimensiones no superen el máximo permitido (la grilla
+		   dispersa admite contenedores mucho más altos)
+		2. En modo "auto" usa la matriz de objetos si la grilla es chica y entra
+		   holgada en memoria; si no, la grilla compacta; y si la compacta
+		   tampoco entra o el contenedor es más alto que el máximo denso, la
+		   grilla dispersa
+		3. Verifica que la implementación elegida entre en la memoria disponible
+		
+	Lanza:
+		ValueError: Si las dimensiones son inválidas o el backend no existe
+		MemoryError: Si la grilla no entra en la memoria disponible
+	"""
+	if backend != "auto" and backend not in BACKENDS_GRILLA:
+		raise ValueError(f"Backend de grilla desconocido: {backend}")
+	alto_maximo = DIMENSION_MAXIMA_GRILLA if backend in ("objetos", "compacta") else ALTO_MAXIMO_GRILLA_DISPERSA
+	if not (1 <= filas <= alto_maximo and 1 <= columnas <= DIMENSION_MAXIMA_GRILLA):
+		raise ValueError(f"Dimensiones de grilla fuera de rango: {columnas}x{filas} "
+						 f"(máximo {DIMENSION_MAXIMA_GRILLA} columnas y {alto_maximo} filas)")
+	
+	disponible = memoria_disponible()
+	limite = None if disponible is None else disponible * FRACCION_MEMORIA_GRILLA
+	
+	if backend == "auto":
+		backend = "objetos"
+		if (filas * columnas > CELDAS_MAXIMAS_GRILLA_OBJETOS or
+			(limite is not None and estimar_memoria_grilla(filas, columnas, "objetos") > limite)):
+			# Respaldo: la grilla compacta ocupa 5 bytes por celda
+			backend = "compacta"
+		if backend == "compacta" and (filas > DIMENSION_MAXIMA_GRILLA or
+			(limite is not None and estimar_memoria_grilla(filas, columnas, "compacta") > limite)):
+			# Último respaldo: la grilla dispersa solo ocupa memoria donde hay granos
+			backend = "dispersa"
+	
+	necesaria = estimar_memoria_grilla(filas, columnas, backend)
+	if limite is not None and necesaria > limite:
+		raise MemoryError(f"La grilla de {columnas}x{filas} celdas ({backend}) necesita "
+						  f"{necesaria // (1024 * 1024)} MB y hay {int(limite) // (1024 * 1024)} MB disponibles")
+	return backend
+
+def crear_grilla(ancho, alto, tamaño_celda, backend="auto"):
+	"""
+	Crea una grilla con la implementación adecuada para su tamaño.
+	
+	Parámetros:
+		ancho, alto (int): Dimensiones del contenedor en unidades de simulación
+		tamaño_celda (int): Unidades por celda
+		backend (str): "objetos", "compacta", "dispersa" o "auto"
+		
+	Retorna:
+		Grilla, GrillaCompacta o GrillaDispersa: Grilla vacía lista para usar
+	"""
+	backend = elegir_backend(alto // tamaño_celda, ancho // tamaño_celda, backend)
+	return BACKENDS_GRILLA[backend](ancho, alto, tamaño_celda)
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Ejecución sin ventana del Simulador de Perlita.
+
+Este módulo corre la simulación completa (aparición, física, nivel y drenaje)
+sin abrir la ventana de pygame, y reporta por consola las métricas de
+producción de la línea de empaquetado. Es útil para medir el rendimiento
+de una configuración sin depender de la velocidad del renderizado.
+
+Uso:
+    python headless.py --segundos 60 --velocidad 3 --cluster 4
+    python headless.py --ancho 4000 --alto 4000 --celda 1 --frames 100
+    python headless.py --alimentador posicion=0.3,tasa=400 --alimentador posicion=0.7,tasa=250,distribucion=boquilla
+    python headless.py --drenaje compuertas --compuerta posicion=0.5,ancho=0.1,caudal=12
+    python headless.py --ancho 4000 --alto 4000 --presupuesto-fisica 0
+    python headless.py --frames 0 --profile-startup
+    python headless.py --backend compacta --sin-jit
+    python headless.py --motor margolus
+    python headless.py --ancho 8000 --alto 8000 --celda 1 --archivo-grilla /tmp/perlita.grilla
+    python headless.py --segundos 600 --publicar-frames     (y en otra terminal: python visor.py)
+    python headless.py --segundos 600 --telemetria 8765     (y en otra: python -m sistema.telemetria)
+    python headless.py --segundos 600 --control 8766        (operaciones del teclado por JSON-RPC)
+    python headless.py --segundos 36000 --metricas 9464     (Prometheus en http://127.0.0.1:9464/metrics)
+    python headless.py --segundos 600 --gc-juego
+    python headless.py --medir-asignaciones 500 --backend compacta --sin-jit
+"""
+
+import argparse
+import sys
+import time
+from core.arranque import perfil_arranque
+from core.configuracion import agregar_argumentos_contenedor, resolver_configuracion
+from core.constantes import *
+
+def crear_parser():
+    """Crea el parser de argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Simulación de perlita sin ventana")
+    parser.add_argument("--segundos", type=float, default=30.0,
+                        help="Duración de la corrida en segundos")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="Cantidad de frames a simular (tiene prioridad sobre --segundos)")
+    parser.add_argument("--velocidad", type=float, default=VELOCIDAD_APARICION_POR_DEFECTO,
+                        help="Velocidad de aparición de partículas")
+    parser.add_argument("--cluster", type=int, default=TAMANO_CLUSTER_POR_DEFECTO,
+                        help="Tamaño del cluster de aparición")
+    parser.add_argument("--nivel", type=float, default=0.5,
+                        help="Posición de la línea de nivel (0.0 = arriba, 1.0 = abajo)")
+    parser.add_argument("--reporte", type=float, default=5.0,
+                        help="Intervalo en segundos entre reportes parciales")
+    parser.add_argument("--presupuesto-fisica", type=float, default=PRESUPUESTO_FISICA_MS,
+                        help="Milisegundos de física por frame (0 = sin límite, todas las bandas marcadas)")
+    parser.add_argument("--motor", choices=MOTORES_FISICA, default=MOTOR_FISICA_POR_DEFECTO,
+                        help="Motor de física: recorrido secuencial o bloques de Margolus")
+    parser.add_argument("--archivo-grilla", default=None,
+                        help="Guarda los planos de la grilla en este archivo mapeado en memoria "
+                             "(otros procesos pueden leerlo con grillas.LectorGrillaMapeada)")
+    parser.add_argument("--publicar-frames", nargs="?", const=NOMBRE_MEMORIA_VISOR, default=None,
+                        metavar="NOMBRE",
+                        help="Publica los frames en memoria compartida para visor.py "
+                             f"(bloque {NOMBRE_MEMORIA_VISOR!r} si no se indica otro)")
+    parser.add_argument("--telemetria", nargs="?", type=int, const=PUERTO_TELEMETRIA, default=None,
+                        metavar="PUERTO",
+                        help=f"Envía el estado por TCP local (puerto {PUERTO_TELEMETRIA} si no se indica otro)")
+    parser.add_argument("--telemetria-fps", type=float, default=FRAMES_TELEMETRIA_POR_SEGUNDO,
+                        help="Actualizaciones de telemetría por segundo")
+    parser.add_argument("--control", nargs="?", type=int, const=PUERTO_CONTROL, default=None,
+                        metavar="PUERTO",
+                        help="Acepta las operaciones del teclado por JSON-RPC en TCP local "
+                             f"(puerto {PUERTO_CONTROL} si no se indica otro)")
+    parser.add_argument("--metricas", nargs="?", type=int, const=PUERTO_METRICAS, default=None,
+                        metavar="PUERTO",
+                        help="Sirve /metrics para Prometheus por HTTP local "
+                             f"(puerto {PUERTO_METRICAS} si no se indica otro)")
+    parser.add_argument("--gc-juego", action="store_true",
+                        help="Congela los objetos creados al inicio (gc.freeze) y sube los umbrales del recolector")
+    parser.add_argument("--medir-asignaciones", type=int, default=None, metavar="FRAMES",
+                        help="Mide con tracemalloc los bytes asignados por paso y termina con error si "
+                             f"el promedio supera {ASIGNACION_MAXIMA_POR_FRAME} bytes")
+    parser.add_argument("--sin-jit", action="store_true",
+                        help="Usa siempre la física en Python aunque numba esté instalado")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Informa el tiempo de importación e inicialización de cada módulo")
+    agregar_argumentos_contenedor(parser)
+    return parser
+
+def crear_simulacion(argumentos):
+    """
+    Crea y configura una simulación lista para correr sin ventana.
+
+    Parámetros:
+        argumentos (argparse.Namespace): Argumentos de línea de comandos
+
+    Retorna:
+        Simulacion: Simulación con aparición automática y modo nivel activos
+    """
+    # La simulación (grilla y sistemas) se importa recién acá, ya con el perfil activo
+    from simulacion import Simulacion
+    
+    configuracion = resolver_configuracion(argumentos)
+    simulacion = Simulacion(configuracion["ancho"], configuracion["alto"],
+                            configuracion["celda"], configuracion["backend"],
+                            archivo_grilla=argumentos.archivo_grilla)
+    simulacion.configurar_constantes_nivel(
+        TIEMPO_DRENAJE_SEGUNDOS,
+        COLOR_LINEA_NIVEL,
+        ANCHO_LINEA_NIVEL
+    )
+    simulacion.sistema_aparicion.configurar_alimentadores(configuracion["alimentadores"])
+    simulacion.sistema_nivel.configurar_drenaje(configuracion["drenaje"], configuracion["compuertas"])
+
+    simulacion.sistema_aparicion.velocidad = max(
+        VELOCIDAD_APARICION_MINIMA, min(VELOCIDAD_APARICION_MAXIMA, argumentos.velocidad))
+    simulacion.sistema_aparicion.tamaño_cluster = max(
+        1, min(TAMANO_CLUSTER_MAXIMO, argumentos.cluster))
+    simulacion.sistema_aparicion.ancho_area = simulacion.grilla.columnas
+    simulacion.sistema_nivel.modo_activo = True
+    simulacion.sistema_nivel.posicion_linea = max(0.1, min(0.9, argumentos.nivel))
+    simulacion.presupuesto_fisica = (argumentos.presupuesto_fisica / 1000.0
+                                     if argumentos.presupuesto_fisica > 0 else None)
+    simulacion.motor_fisicas.usar_jit = not argumentos.sin_jit
+    simulacion.motor_fisicas.motor = argumentos.motor
+    return simulacion
+
+def formatear_metricas(resumen):
+    """Convierte el resumen de métricas en una línea de texto para consola"""
+    return (f"entrada={resumen['granos_aparecidos']} "
+            f"drenados={resumen['granos_drenados']} "
+            f"ciclos={resumen['ciclos']} "
+            f"ultimo_ciclo={resumen['drenados_ultimo_ciclo']} "
+            f"duracion_ciclo={resumen['duracion_ciclo_promedio']:.2f}s "
+            f"entre_drenajes={resumen['tiempo_entre_drenajes_promedio']:.2f}s "
+            f"llenado={resumen['granos_por_segundo']:.1f} granos/s")
+
+def ejecutar(argumentos):
+    """
+    Corre la simulación sin ventana e imprime las métricas.
+
+    Parámetros:
+        argumentos (argparse.Namespace): Argumentos de línea de comandos
+
+    Retorna:
+        dict: Resumen final de métricas de producción
+    """
+    with perfil_arranque.medir("crear_simulacion"):
+        simulacion = crear_simulacion(argumentos)
+    if perfil_arranque.activo:
+        for linea in perfil_arranque.reporte():
+            print(linea)
+    fisicas = simulacion.motor_fisicas
+    if fisicas.motor == "margolus":
+        descripcion_fisica = "bloques de Margolus"
+    elif fisicas.nucleo_para(simulacion.grilla):
+        descripcion_fisica = "secuencial compilada con numba"
+    else:
+        descripcion_fisica = "secuencial en Python"
+    print(f"Grilla: {simulacion.grilla.columnas}x{simulacion.grilla.filas} celdas "
+          f"({type(simulacion.grilla).__name__}, física {descripcion_fisica})")
+    if argumentos.archivo_grilla:
+        print(f"Planos mapeados en {argumentos.archivo_grilla}")
+
+    publicador = None
+    if argumentos.publicar_frames:
+        from sistema.compartido import PublicadorFrames
+        publicador = PublicadorFrames(argumentos.publicar_frames)
+        print(f"Publicando frames en la memoria compartida {argumentos.publicar_frames!r}")
+    telemetria = None
+    if argumentos.telemetria is not None:
+        from sistema.telemetria import ServidorTelemetria
+        telemetria = ServidorTelemetria(argumentos.telemetria, frames_por_segundo=argumentos.telemetria_fps)
+        telemetria.iniciar()
+        print(f"Telemetría en {telemetria.host}:{telemetria.puerto}")
+    control = None
+    if argumentos.control is not None:
+        from sistema.control import ServidorControl
+        control = ServidorControl(argumentos.control)
+        control.iniciar()
+        print(f"Control remoto en {control.host}:{control.puerto}")
+    exportador = None
+    if argumentos.metricas is not None:
+        from sistema.exportador import ExportadorMetricas
+        exportador = ExportadorMetricas(argumentos.metricas)
+        exportador.conectar(simulacion)
+        exportador.iniciar()
+        print(f"Métricas en http://{exportador.host}:{exportador.puerto}/metrics")
+    recoleccion = None
+    if argumentos.gc_juego:
+        from core.memoria import RecoleccionJuego
+        recoleccion = RecoleccionJuego()
+        recoleccion.activar(simulacion.grilla)
+    
+    inicio = time.time()
+    ultimo_reporte = inicio
+    frames = 0
+
+    try:
+        while True:
+            ahora = time.time()
+            if argumentos.frames is not None:
+                if frames >= argumentos.frames:
+                    break
+            elif ahora - inicio >= argumentos.segundos:
+                break
+
+            inicio_frame = time.perf_counter()
+            # Los lotes de control se aplican enteros entre dos pasos
+            if control is not None:
+                control.aplicar_pendientes(simulacion)
+            simulacion.actualizar()
+            frames += 1
+            if recoleccion is not None:
+                # Un cambio de resolución por control remoto reemplaza la grilla congelada
+                recoleccion.vigilar(simulacion.grilla)
+            if publicador is not None:
+                publicador.publicar(simulacion)
+            if telemetria is not None:
+                telemetria.publicar(simulacion)
+            if exportador is not None:
+                exportador.registrar_frame(simulacion, time.perf_counter() - inicio_frame)
+
+            # Reporte parcial periódico
+            if ahora - ultimo_reporte >= argumentos.reporte:
+                print(f"[{ahora - inicio:7.1f}s] {formatear_metricas(simulacion.sistema_metricas.resumen())}")
+                ultimo_reporte = ahora
+    finally:
+        if publicador is not None:
+            # Los visores conectados ven el bloque inactivo y vuelven a esperar
+            publicador.cerrar()
+        if telemetria is not None:
+            telemetria.detener()
+        if control is not None:
+            control.detener()
+        if exportador is not None:
+            exportador.detener()
+        if recoleccion is not None:
+            recoleccion.desactivar()
+    
+    transcurrido = time.time() - inicio
+    resumen = simulacion.sistema_metricas.resumen()
+    print(f"Frames: {frames} en {transcurrido:.1f}s ({frames / max(transcurrido, 1e-9):.1f} frames/s)")
+    print(f"Final: {formatear_metricas(resumen)}")
+    print(f"Física: {fisicas.bandas_diferidas_total} bandas diferidas en "
+          f"{fisicas.frames_con_diferidas} frames sobre presupuesto")
+    for alimentador in simulacion.sistema_aparicion.alimentadores:
+        datos = alimentador.resumen()
+        print(f"  {datos['nombre']}: posicion={datos['posicion']:.2f} {datos['distribucion']} "
+              f"tasa={datos['tasa']:.0f} granos/s entrada={datos['granos_aparecidos']}")
+    if simulacion.sistema_nivel.politica_drenaje == "compuertas":
+        for compuerta in simulacion.sistema_nivel.compuertas:
+            datos = compuerta.resumen()
+            print(f"  {datos['nombre']}: posicion={datos['posicion']:.2f} ancho={datos['ancho']:.2f} "
+                  f"caudal={datos['caudal']:.1f} granos/paso salida={datos['granos_descargados']}")
+    if argumentos.archivo_grilla:
+        # El archivo conserva el último frame publicado para analizarlo después
+        simulacion.grilla.cerrar()
+    return resumen
+
+def medir(argumentos):
+    """
+    Mide los bytes que asigna cada paso de la simulación (sin publicar ni reportar).
+
+    Retorna:
+        bool: True si el pico promedio por frame no supera ASIGNACION_MAXIMA_POR_FRAME
+    """
+    from core.memoria import medir_asignaciones
+    simulacion = crear_simulacion(argumentos)
+    print(f"Grilla: {simulacion.grilla.columnas}x{simulacion.grilla.filas} celdas "
+          f"({type(simulacion.grilla).__name__})")
+    resultado = medir_asignaciones(simulacion.actualizar, argumentos.medir_asignaciones)
+    print(f"Asignaciones por frame: pico promedio {resultado['pico_promedio']:.0f} bytes, "
+          f"pico máximo {resultado['pico_maximo']} bytes, "
+          f"crecimiento {resultado['crecimiento']:.1f} bytes")
+    if resultado['pico_promedio'] > ASIGNACION_MAXIMA_POR_FRAME:
+        print(f"ERROR: el promedio supera el límite de {ASIGNACION_MAXIMA_POR_FRAME} bytes por frame")
+        return False
+    return True
+
+if __name__ == "__main__":
+    argumentos = crear_parser().parse_args()
+    if argumentos.profile_startup:
+        perfil_arranque.activar()
+    if argumentos.medir_asignaciones is not None:
+        sys.exit(0 if medir(argumentos) else 1)
+    ejecutar(argumentos)
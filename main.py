@@ -17,15 +17,26 @@ Características principales:
 - Ventana redimensionable con contenido centrado
 - Integración completa con sistema de simulación
 - Manejo de eventos y controles del usuario
+- Arranque diferido: la simulación, el HUD y el renderizador del juego se
+  crean al entrar al juego, y --profile-startup reporta los tiempos de arranque
 """
 
-import pygame
+import argparse
 import sys
 import time
-from simulacion import Simulacion
-from ui.hud import HUD
+from core.arranque import perfil_arranque
+
+# --profile-startup se atiende antes de las demás importaciones para cronometrarlas
+# también a ellas (argparse valida el argumento después, junto con el resto)
+if __name__ == "__main__" and "--profile-startup" in sys.argv:
+    perfil_arranque.activar()
+
+import pygame
 from ui.render_menu import RenderizadorMenu
-from ui.render_juego import RenderizadorJuego
+from ui.cursor import CursorPersonalizado
+from ui.recursos import recursos
+from ui.compositor import Compositor
+from core.configuracion import configuracion_por_defecto, agregar_argumentos_contenedor, resolver_configuracion
 from core.constantes import *
 
 class PerlitaSimulator:
@@ -58,42 +69,65 @@ class PerlitaSimulator:
         alto_pantalla (int): Alto actual de la ventana
     """
     
-    def __init__(self):
+    def __init__(self, configuracion=None, gc_juego=False):
         """
         Inicializa el simulador principal.
         
+        Parámetros:
+            configuracion (dict, opcional): Geometría del contenedor (ancho, alto,
+                celda, backend), alimentadores y drenaje, ver core/configuracion.py. Por defecto se usan
+                las constantes.
+            gc_juego (bool): Congela los objetos al entrar al juego y sube los
+                umbrales del recolector de basura (ver core/memoria.py)
+        
         Configura pygame, crea la ventana redimensionable, inicializa
         todos los sistemas gráficos, define la paleta de colores
         estilo 8-bit y prepara el estado inicial de la aplicación.
         
         Proceso de inicialización:
-        1. Inicialización de pygame y configuración de ventana
+        1. Inicialización de los módulos de pygame que se usan y de la ventana
         2. Configuración del área de juego con constantes
-        3. Definición de paleta de colores estilo perlita
-        4. Carga de fuentes pixeladas para interfaz
-        5. Inicialización de sistemas (HUD, estado, reloj)
-        6. Configuración de cursor personalizado
-        """
-        pygame.init()
-        
-        # Configuración de ventana redimensionable (no pantalla completa)
-        self.screen_info = pygame.display.Info()
-        # Comenzar con un tamaño inicial cómodo
-        self.ancho_inicial = min(ANCHO_VENTANA_INICIAL, self.screen_info.current_w - MARGEN_PANTALLA)
-        self.alto_inicial = min(ALTO_VENTANA_INICIAL, self.screen_info.current_h - MARGEN_PANTALLA)
-        
-        # Crear ventana redimensionable
-        self.screen = pygame.display.set_mode(
-            (self.ancho_inicial, self.alto_inicial), 
-            pygame.RESIZABLE
-        )
-        pygame.display.set_caption(TITULO_VENTANA)
-        pygame.mouse.set_visible(False)  # Ocultamos cursor del sistema para dibujar uno personalizado
+        3. Inicialización de sistemas (estado, reloj, renderizador de menús)
+        4. Configuración de cursor personalizado
         
-        # Configuración del área de juego usando constantes (tamaño fijo)
-        self.ancho_juego = ANCHO_AREA_JUEGO
-        self.alto_juego = ALTO_AREA_JUEGO
-        self.tamaño_celda = TAMANO_CELDA_INICIAL
+        Las fuentes, el HUD, el renderizador del juego y la simulación no se
+        crean acá sino al usarse por primera vez, así el splash aparece sin
+        esperar nada que todavía no se muestra.
+        """
+        # Solo video y fuentes: pygame.init() también abriría el audio, que no se usa
+        with perfil_arranque.medir("pygame.display y pygame.font"):
+            pygame.display.init()
+            pygame.font.init()
+        
+        with perfil_arranque.medir("ventana"):
+            # Configuración de ventana redimensionable (no pantalla completa)
+            self.screen_info = pygame.display.Info()
+            # Comenzar con un tamaño inicial cómodo
+            self.ancho_inicial = min(ANCHO_VENTANA_INICIAL, self.screen_info.current_w - MARGEN_PANTALLA)
+            self.alto_inicial = min(ALTO_VENTANA_INICIAL, self.screen_info.current_h - MARGEN_PANTALLA)
+            
+            # Crear ventana redimensionable
+            self.screen = pygame.display.set_mode(
+                (self.ancho_inicial, self.alto_inicial), 
+                pygame.RESIZABLE
+            )
+            pygame.display.set_caption(TITULO_VENTANA)
+        
+        # Cursor personalizado: de hardware si está disponible, si no se dibuja por software
+        with perfil_arranque.medir("cursor"):
+            self.cursor = CursorPersonalizado()
+            self.cursor.activar_hardware()
+        
+        # Geometría del contenedor (archivo de configuración o línea de comandos)
+        if configuracion is None:
+            configuracion = configuracion_por_defecto()
+        self.ancho_juego = configuracion["ancho"]
+        self.alto_juego = configuracion["alto"]
+        self.tamaño_celda = configuracion["celda"]
+        self.backend = configuracion["backend"]
+        self.alimentadores = configuracion.get("alimentadores", [])
+        self.drenaje = configuracion.get("drenaje", POLITICA_DRENAJE_POR_DEFECTO)
+        self.compuertas = configuracion.get("compuertas", [])
         # Border constants are used directly from constantes.py
         
         # Variables de pantalla (se actualizarán con redimensionamiento)
@@ -106,18 +140,49 @@ class PerlitaSimulator:
         self.estado = EstadosJuego.PRESENTACION
         self.tiempo_splash = time.time()
         
-        # HUD para información debug
-        self.hud = HUD()
+        # HUD y renderizador de juego: se crean al entrar al juego (ver propiedades)
+        self._hud = None
+        self._renderizador_juego = None
         
         # Renderizador de menús
         self.renderizador_menu = RenderizadorMenu()
         
-        # Renderizador de juego
-        self.renderizador_juego = RenderizadorJuego()
+        # Compositor para actualizar solo las regiones de pantalla que cambian
+        self.compositor = Compositor()
+        
+        # La simulación se crea al comenzar el juego
+        self.simulacion = None
+        
+        # Modo de recolección de basura para el juego (--gc-juego)
+        self.recoleccion = None
+        if gc_juego:
+            from core.memoria import RecoleccionJuego
+            self.recoleccion = RecoleccionJuego()
         
         # Clock
         self.clock = pygame.time.Clock()
         
+        # Con --profile-startup se informa una vez al presentar el primer frame
+        self._arranque_reportado = False
+    
+    @property
+    def hud(self):
+        """HUD de debug y métricas, importado y creado al dibujar el primer frame de juego"""
+        if self._hud is None:
+            with perfil_arranque.medir("HUD"):
+                from ui.hud import HUD
+                self._hud = HUD()
+        return self._hud
+    
+    @property
+    def renderizador_juego(self):
+        """Renderizador de la pantalla de juego, importado y creado al entrar al juego"""
+        if self._renderizador_juego is None:
+            with perfil_arranque.medir("renderizador de juego"):
+                from ui.render_juego import RenderizadorJuego
+                self._renderizador_juego = RenderizadorJuego()
+        return self._renderizador_juego
+        
     def run(self):
         """
         Ejecuta el bucle principal de la aplicación.
@@ -146,6 +211,8 @@ class PerlitaSimulator:
             
             self.clock.tick(FRAMES_POR_SEGUNDO)
         
+        if perfil_arranque.activo:
+            self.reportar_arranque("Perfil de la sesión (incluye lo cargado al entrar al juego)")
         pygame.quit()
         sys.exit()
     
@@ -165,12 +232,28 @@ class PerlitaSimulator:
         if time.time() - self.tiempo_splash > TIEMPO_PRESENTACION:
             self.estado = EstadosJuego.MENU
         
-        self.renderizador_menu.dibujar_splash(self.screen)
+        # El splash es estático: se dibuja una vez y luego solo se actualiza el cursor
+        if self.compositor.preparar(("splash", self.screen.get_size())):
+            self.renderizador_menu.dibujar_splash(self.screen)
+            self.compositor.capturar_fondo(self.screen)
+        else:
+            self.compositor.limpiar_capas(self.screen)
+        
         # Dibujar cursor personalizado
-        self.dibujar_cursor_personalizado()
-        pygame.display.flip()
+        self.compositor.registrar_capa("cursor", self.dibujar_cursor_personalizado())
+        self.compositor.presentar()
+        
+        if perfil_arranque.activo and not self._arranque_reportado:
+            self._arranque_reportado = True
+            self.reportar_arranque("Perfil hasta el primer frame")
         return True
     
+    def reportar_arranque(self, titulo):
+        """Imprime el perfil de arranque (--profile-startup) por consola"""
+        print(titulo)
+        for linea in perfil_arranque.reporte():
+            print(linea)
+    
     def manejar_menu(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -187,10 +270,16 @@ class PerlitaSimulator:
                 if self.boton_comenzar_click(mouse_pos):
                     self.iniciar_juego()
         
-        self.boton_comenzar_rect = self.renderizador_menu.dibujar_menu(self.screen)
+        # El menú es estático: se dibuja una vez y luego solo se actualiza el cursor
+        if self.compositor.preparar(("menu", self.screen.get_size())):
+            self.boton_comenzar_rect = self.renderizador_menu.dibujar_menu(self.screen)
+            self.compositor.capturar_fondo(self.screen)
+        else:
+            self.compositor.limpiar_capas(self.screen)
+        
         # Dibujar cursor personalizado
-        self.dibujar_cursor_personalizado()
-        pygame.display.flip()
+        self.compositor.registrar_capa("cursor", self.dibujar_cursor_personalizado())
+        self.compositor.presentar()
         return True
     
     def manejar_juego(self):
@@ -204,22 +293,33 @@ class PerlitaSimulator:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.estado = EstadosJuego.MENU
+                    if self.recoleccion is not None:
+                        # La simulación se descarta al comenzar otro juego: que se pueda recolectar
+                        self.recoleccion.desactivar()
                     return True
         
         # Procesar eventos en la simulación con todos los eventos
         self.simulacion.manejar_controles_con_eventos(events)
         self.simulacion.actualizar()
+        if self.recoleccion is not None:
+            # Las teclas 1-9 reemplazan la grilla congelada
+            self.recoleccion.vigilar(self.simulacion.grilla)
         
-        # Usar el renderizador de juego
-        self.renderizador_juego.dibujar(self.screen, self.simulacion, ANCHO_BORDE, COLOR_BORDE)
+        # Usar el renderizador de juego (redibuja el fondo estático solo si cambió el layout)
+        self.renderizador_juego.dibujar(self.screen, self.simulacion, ANCHO_BORDE, COLOR_BORDE,
+                                        self.compositor)
         
         # Dibujar información de debug si está activada
-        self.hud.dibujar_info_debug(self.screen, self.simulacion)
+        self.compositor.registrar_capa("debug", self.hud.dibujar_info_debug(self.screen, self.simulacion))
+        
+        # Dibujar métricas de producción si el modo nivel está activo
+        self.compositor.registrar_capa("metricas", self.hud.dibujar_metricas(self.screen, self.simulacion))
         
         # Dibujar cursor personalizado (SOLO fuera del área de juego)
-        self.dibujar_cursor_personalizado_juego()
+        self.compositor.registrar_capa("cursor", self.dibujar_cursor_personalizado_juego())
         
-        pygame.display.flip()
+        # Enviar al display solo las regiones que cambiaron
+        self.compositor.presentar()
         return True
     
     def manejar_redimensionar(self, event):
@@ -237,10 +337,11 @@ class PerlitaSimulator:
         Proceso de redimensionamiento:
         1. Actualiza variables internas de dimensiones de pantalla
         2. Reconfigura la superficie de pygame con nuevas dimensiones
-        3. Actualiza offset del mouse si hay simulación activa
+        3. Invalida los recursos escalados y el fondo del compositor
         
         El redimensionamiento afecta:
-        - Posición centrada del área de juego
+        - Posición centrada y escala del área de juego (la vista se
+          reajusta en el siguiente frame)
         - Coordenadas de interacción del mouse
         - Posición de elementos de interfaz
         - Distribución de instrucciones laterales
@@ -251,48 +352,9 @@ class PerlitaSimulator:
         self.alto_pantalla = event.h
         self.screen = pygame.display.set_mode((self.ancho_pantalla, self.alto_pantalla), pygame.RESIZABLE)
         
-        # Si estamos en juego, actualizar el offset del mouse
-        if self.simulacion is not None:
-            self.actualizar_offset_mouse()
-
-    def actualizar_offset_mouse(self):
-        """
-        Actualiza el offset del mouse para mantener precisión al redimensionar.
-        
-        Recalcula y actualiza las coordenadas de desplazamiento del mouse
-        para que las interacciones del usuario en el área de juego sigan
-        siendo precisas después de redimensionar la ventana.
-        
-        Algoritmo de cálculo:
-        1. Obtiene dimensiones reales de la grilla de simulación
-        2. Calcula el área total incluyendo bordes
-        3. Determina la posición centrada en la ventana actual
-        4. Configura el offset en la simulación
-        
-        El offset es necesario porque:
-        - El área de juego está centrada en la ventana
-        - La ventana es redimensionable por el usuario
-        - Las coordenadas del mouse son relativas a la ventana completa
-        - La simulación necesita coordenadas relativas al área de juego
-        
-        Sin este offset, las interacciones del mouse estarían desalineadas
-        con la posición visual de los elementos en pantalla.
-        """
-        if self.simulacion is not None:
-            # Calcular dimensiones reales de la grilla
-            ancho_juego_real = self.simulacion.grilla.columnas * self.simulacion.tamaño_celda
-            alto_juego_real = self.simulacion.grilla.filas * self.simulacion.tamaño_celda
-            
-            # Calcular nueva posición centrada
-            ancho_total = ancho_juego_real + 2 * ANCHO_BORDE
-            alto_total = alto_juego_real + 2 * ANCHO_BORDE
-            centrado_x = (self.ancho_pantalla - ancho_total) // 2
-            centrado_y = (self.alto_pantalla - alto_total) // 2
-            
-            # Actualizar offset del mouse
-            offset_x = centrado_x + ANCHO_BORDE
-            offset_y = centrado_y + ANCHO_BORDE
-            self.simulacion.configurar_offset_mouse(offset_x, offset_y)
+        # Descartar fondos y logos escalados para el tamaño anterior
+        recursos.limpiar_escalados()
+        self.compositor.invalidar()
 
     def iniciar_juego(self):
         """
@@ -306,16 +368,20 @@ class PerlitaSimulator:
         Proceso de inicialización:
         1. Crea nueva instancia de Simulacion con dimensiones configuradas
         2. Configura constantes del sistema de nivel y drenaje
-        3. Actualiza offset del mouse para área de juego centrada
-        4. Cambia el estado de la aplicación a JUEGO
+        3. Cambia el estado de la aplicación a JUEGO
         
         La simulación se crea con:
-        - Ancho y alto del área de juego (constantes)
-        - Tamaño de celda configurable por el usuario
+        - Ancho y alto del contenedor (configurables por archivo o argumentos)
+        - Tamaño de celda (resolución de simulación) configurable por el usuario
         - Sistemas integrados (física, aparición, nivel, entrada)
         """
-        # Inicializar simulación con tamaño de celda configurado
-        self.simulacion = Simulacion(self.ancho_juego, self.alto_juego, self.tamaño_celda)
+        # La simulación y sus sistemas se importan recién al comenzar el primer juego
+        with perfil_arranque.medir("simulacion"):
+            from simulacion import Simulacion
+            
+            # Inicializar simulación con la geometría configurada
+            self.simulacion = Simulacion(self.ancho_juego, self.alto_juego, self.tamaño_celda,
+                                         self.backend)
         
         # Configurar constantes del sistema de nivel
         self.simulacion.configurar_constantes_nivel(
@@ -324,9 +390,18 @@ class PerlitaSimulator:
             ANCHO_LINEA_NIVEL
         )
         
-        # Configurar offset del mouse para el área de juego centrada
-        self.actualizar_offset_mouse()
+        # Bocas de llenado configuradas (sin alimentadores se usa la banda centrada)
+        self.simulacion.sistema_aparicion.configurar_alimentadores(self.alimentadores)
+        
+        # Política de drenaje y compuertas de descarga del fondo
+        self.simulacion.sistema_nivel.configurar_drenaje(self.drenaje, self.compuertas)
+        
+        # La vista del área de juego se ajusta al dibujar el primer frame
         self.estado = EstadosJuego.JUEGO
+        
+        # Con --gc-juego, lo creado hasta acá queda fuera de las recolecciones
+        if self.recoleccion is not None:
+            self.recoleccion.activar(self.simulacion.grilla)
     
     def dibujar_cursor_personalizado(self):
         """
@@ -335,74 +410,19 @@ class PerlitaSimulator:
         Renderiza un cursor pixelado personalizado siguiendo la estética
         8-bit del juego.
 
-        El cursor se dibuja píxel por píxel en la posición actual
-        del mouse del sistema.
+        El patrón del cursor se hornea una sola vez en un sprite al iniciar
+        (ver ui/cursor.py). Si el sistema soporta cursores a color, el sprite
+        se usa como cursor de hardware y no hay nada que dibujar; en caso
+        contrario se dibuja con un único blit en la posición del mouse.
         
         Características del cursor:
         - Diseño de puntero clásico pixelado (12x19 píxeles base)
         - Escalado x2 para mejor visibilidad
-        - Renderizado directo sobre la pantalla
         
-        Colores utilizados:
-        - color_base: Marrón rocoso (150, 75, 50)
-        - color_borde: Borde oscuro (60, 30, 20)
-        - color_resaltado: Highlight naranja/fuego (255, 150, 100)
-        
-        El patrón del cursor está definido como una matriz 2D donde
-        cada número representa un tipo de píxel diferente, permitiendo
-        un control preciso sobre la apariencia final.
+        Retorna:
+            pygame.Rect o None: Área ocupada por el cursor dibujado por software
         """
-        mouse_pos = pygame.mouse.get_pos()
-        
-        # Colores del cursor estilo roca y fuego (8-bit)
-        color_base = (150, 75, 50)         # Color marrón rocoso
-        color_borde = (60, 30, 20)         # Borde más oscuro
-        color_resaltado = (255, 150, 100)  # Highlight naranja/fuego
-        
-        # Patrón del cursor estilo puntero pixelado (12x19 píxeles)
-        cursor_patron = [
-            [1],
-            [1,1],
-            [1,2,1],
-            [1,2,2,1],
-            [1,2,2,2,1],
-            [1,2,1,2,2,1],
-            [1,2,2,2,2,2,1],
-            [1,2,2,1,2,1,2,1],
-            [1,2,1,1,2,2,2,1,1],
-            [1,2,2,2,2,1,1,1,1,1],
-            [1,2,2,1,2,2,1],
-            [1,2,1,0,1,2,2,1],
-            [1,1,0,0,1,2,2,1],
-            [1,0,0,0,0,1,2,2,1],
-            [0,0,0,0,0,1,2,2,1],
-            [0,0,0,0,0,0,1,2,1],
-            [0,0,0,0,0,0,1,1,1],
-            [0,0,0,0,0,0,0,1],
-            [0,0,0,0,0,0,0,0,1]
-        ]
-        
-        # Escala del cursor
-        escala = 2
-        
-        # Dibujar el cursor píxel por píxel
-        for y, fila in enumerate(cursor_patron):
-            for x, pixel in enumerate(fila):
-                if pixel > 0:  # Solo dibujar píxeles no transparentes
-                    pixel_x = mouse_pos[0] + x * escala
-                    pixel_y = mouse_pos[1] + y * escala
-                    
-                    # Elegir color según el valor del píxel
-                    if pixel == 1:
-                        color = color_borde
-                    elif pixel == 2:
-                        color = color_base
-                    else:
-                        color = color_resaltado
-                    
-                    # Dibujar píxel escalado
-                    pygame.draw.rect(self.screen, color, 
-                                   (pixel_x, pixel_y, escala, escala))
+        return self.cursor.dibujar(self.screen)
     
     def dibujar_cursor_personalizado_juego(self):
         """
@@ -414,7 +434,7 @@ class PerlitaSimulator:
         
         Algoritmo de funcionamiento:
         1. Obtiene la posición actual del mouse
-        2. Calcula las dimensiones y posición del área de juego
+        2. Consulta el área de juego asignada por la vista
         3. Verifica si el mouse está dentro del área de simulación
         4. Solo dibuja el cursor personalizado si está FUERA del área
         
@@ -423,33 +443,31 @@ class PerlitaSimulator:
         - Preservar el sistema de pincel visual en el área de juego
         - Proporcionar feedback visual consistente al usuario
         
-        El área de juego se calcula dinámicamente basándose en:
-        - Dimensiones reales de la grilla de simulación
-        - Tamaño de celda actual
-        - Bordes definidos por constantes
-        - Posición centrada en la pantalla
+        El área de juego es la que asignó la vista de la simulación en el
+        último frame dibujado (posición centrada y escala según la ventana).
         """
         if self.simulacion is not None:
-            mouse_pos = pygame.mouse.get_pos()
-            
-            # Calcular dimensiones del área de juego
-            ancho_juego_real = self.simulacion.grilla.columnas * self.simulacion.tamaño_celda
-            alto_juego_real = self.simulacion.grilla.filas * self.simulacion.tamaño_celda
-            ancho_total = ancho_juego_real + 2 * ANCHO_BORDE
-            alto_total = alto_juego_real + 2 * ANCHO_BORDE
-            centrado_x = (self.ancho_pantalla - ancho_total) // 2
-            centrado_y = (self.alto_pantalla - alto_total) // 2
-            area_juego_x = centrado_x + ANCHO_BORDE
-            area_juego_y = centrado_y + ANCHO_BORDE
-            
             # Solo dibujar cursor si está FUERA del área de juego
-            if not (area_juego_x <= mouse_pos[0] <= area_juego_x + ancho_juego_real and
-                    area_juego_y <= mouse_pos[1] <= area_juego_y + alto_juego_real):
-                self.dibujar_cursor_personalizado()
+            if not self.simulacion.sistema_vista.contiene(pygame.mouse.get_pos()):
+                return self.dibujar_cursor_personalizado()
+            
+            # Dentro del área de juego se muestra el pincel en lugar del cursor
+            self.cursor.ocultar()
+        return None
 
     def boton_comenzar_click(self, mouse_pos):
         return hasattr(self, 'boton_comenzar_rect') and self.boton_comenzar_rect.collidepoint(mouse_pos)
 
 if __name__ == "__main__":
-    game = PerlitaSimulator()
+    parser = agregar_argumentos_contenedor(
+        argparse.ArgumentParser(description="Simulador de partículas de perlita"))
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Informa el tiempo de importación e inicialización de cada módulo")
+    parser.add_argument("--gc-juego", action="store_true",
+                        help="Congela los objetos al entrar al juego (gc.freeze) y sube los umbrales del recolector")
+    argumentos = parser.parse_args()
+    if argumentos.profile_startup:
+        perfil_arranque.activar()
+    configuracion = resolver_configuracion(argumentos)
+    game = PerlitaSimulator(configuracion, argumentos.gc_juego)
     game.run()
\ No newline at end of file
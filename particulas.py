@@ -12,12 +12,21 @@ Tipos de partículas:
 
 Funciones auxiliares:
 - generar_color_perlita(): Genera colores realistas para perlita expandida
+- generar_colores(): Colores de un lote de partículas (escrituras por lote)
 - generar_color_aleatorio(): Utilidad para generar colores HSV aleatorios
+
+Códigos de tipo:
+- VACIO, PERLITA, ROCA: Valores enteros usados en los planos compactos de la grilla
 """
 
 import random
 import colorsys
 
+# Códigos de tipo de celda usados en los planos de la grilla
+VACIO = 0
+PERLITA = 1
+ROCA = 2
+
 class ParticulaPerlita:
 	"""
 	Representa una partícula de perlita expandida.
@@ -33,15 +42,21 @@ class ParticulaPerlita:
 	- Comportamiento: Busca espacios libres para moverse
 	"""
 	
-	def __init__(self):
+	tipo = PERLITA
+	
+	def __init__(self, color=None):
 		"""
 		Inicializa una nueva partícula de perlita expandida.
 		
+		Parámetros:
+			color (tuple, opcional): Color RGB a conservar (por ejemplo al
+				reconstruir la grilla). Si no se indica, se genera uno nuevo.
+		
 		Genera un color aleatorio que simula los tonos naturales
 		de la perlita expandida (blancos perlados con variaciones).
 		"""
 		# Generar color realista de perlita expandida
-		self.color = generar_color_perlita()
+		self.color = color if color is not None else generar_color_perlita()
 
 	def actualizar(self, grilla, fila, columna):
 		"""
@@ -58,29 +73,32 @@ class ParticulaPerlita:
 			columna (int): Columna actual de la partícula
 			
 		Retorna:
-			tuple: Nueva posición (fila, columna) de la partícula
+			int o None: Columna de la fila siguiente a la que cae la partícula,
+			            o None si no puede moverse (toda caída baja una fila)
 			
 		Algoritmo de movimiento:
 		1. Verificar si puede caer directamente (celda inferior libre)
-		2. Si no, intentar caer en diagonal (izquierda o derecha aleatoria)
+		2. Si no, intentar caer en diagonal (primero hacia un lado elegido al azar)
 		3. Si ningún movimiento es posible, mantener posición actual
+		
+		Se llama una vez por grano y por frame: no arma tuplas ni listas, solo
+		retorna un entero (o None) que el motor compara sin crear objetos.
 		"""
 		# Intentar caer directamente hacia abajo (gravedad principal)
 		if grilla.esta_celda_vacia(fila + 1, columna):
-			return fila + 1, columna
-		else:
-			# Si no puede caer directamente, intentar deslizarse en diagonal
-			desplazamientos_laterales = [-1, 1]  # Izquierda y derecha
-			random.shuffle(desplazamientos_laterales)  # Orden aleatorio para evitar sesgos
-			
-			for desplazamiento in desplazamientos_laterales:
-				nueva_columna = columna + desplazamiento
-				# Verificar si puede caer en diagonal
-				if grilla.esta_celda_vacia(fila + 1, nueva_columna):
-					return fila + 1, nueva_columna
+			return columna
+		
+		# Si no puede caer directamente, intentar deslizarse en diagonal.
+		# El lado que se prueba primero sale de un bit del generador (una palabra
+		# de 32 bits por grano, igual que el núcleo compilado de sistema/fisicas_jit.py)
+		lado = -1 if random.getrandbits(1) else 1
+		if grilla.esta_celda_vacia(fila + 1, columna + lado):
+			return columna + lado
+		if grilla.esta_celda_vacia(fila + 1, columna - lado):
+			return columna - lado
 
 		# Si no hay movimiento posible, mantener posición actual
-		return fila, columna
+		return None
 
 class ParticulaRoca:
 	"""
@@ -96,13 +114,23 @@ class ParticulaRoca:
 	- Función: Actúa como obstáculo para otras partículas
 	"""
 	
-	def __init__(self):
+	tipo = ROCA
+	
+	def __init__(self, color=None):
 		"""
 		Inicializa una nueva partícula de roca.
 		
+		Parámetros:
+			color (tuple, opcional): Color RGB a conservar. Si no se indica,
+				se genera uno nuevo.
+		
 		Genera un color gris oscuro aleatorio para simular
 		las variaciones naturales en el color de las rocas.
 		"""
+		if color is not None:
+			self.color = color
+			return
+		
 		# Generar color gris oscuro para simular roca
 		self.color = generar_color_aleatorio(
 			rango_matiz=(0.0, 0.1),        # Sin matiz (gris)
@@ -110,6 +138,33 @@ class ParticulaRoca:
 			rango_valor=(0.3, 0.5)         # Valor medio-bajo (oscuro)
 		)
 
+# Clase de partícula correspondiente a cada código de tipo
+CLASES_POR_TIPO = {
+	PERLITA: ParticulaPerlita,
+	ROCA: ParticulaRoca
+}
+
+def generar_colores(tipo, cantidad):
+	"""
+	Genera los colores de un lote de partículas nuevas de un mismo tipo.
+	
+	Se usa en las escrituras por lote de la grilla, para no crear una
+	instancia de partícula por grano solo para obtener su color.
+	
+	Parámetros:
+		tipo (int): Código de tipo (PERLITA o ROCA)
+		cantidad (int): Cantidad de colores a generar
+		
+	Retorna:
+		list: Colores RGB con la misma distribución que los constructores
+	"""
+	if tipo == PERLITA:
+		# generar_color_perlita solo depende de la variación, así que alcanza
+		# con elegir de la paleta precalculada
+		return random.choices(PALETA_PERLITA, k=cantidad)
+	return [CLASES_POR_TIPO[tipo]().color for _ in range(cantidad)]
+
+
 def generar_color_perlita():
 	"""
 	Genera colores aleatorios realistas para perlita expandida.
@@ -138,6 +193,14 @@ def generar_color_perlita():
 	
 	return (rojo, verde, azul)
 
+# Todos los colores posibles de generar_color_perlita (uno por variación)
+PALETA_PERLITA = [
+	(max(225, min(255, 240 + variacion)),
+	 max(225, min(255, 240 + variacion)),
+	 max(220, min(255, 240 + variacion - 5)))
+	for variacion in range(-15, 16)
+]
+
 def generar_color_aleatorio(rango_matiz, rango_saturacion, rango_valor):
 	"""
 	Genera un color aleatorio usando el espacio de color HSV.
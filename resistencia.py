@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+Prueba de resistencia del Simulador de Perlita.
+
+Este módulo corre la simulación sin ventana durante un turno (o los minutos
+que se indiquen) con aparición automática, modo nivel y drenajes repetidos,
+y toma muestras periódicas de:
+- Memoria residente del proceso (RSS)
+- Objetos del recolector de basura por tipo (resumen de gc.get_objects)
+- Tiempo por paso (promedio y máximo del intervalo)
+- Frames y bandas que la física dejó para el frame siguiente por falta de
+  presupuesto (MotorFisicas.frames_con_diferidas y bandas_diferidas_total)
+- Granos en la grilla, granos drenados y ciclos de drenaje
+
+Al terminar compara el primer tercio de las muestras con el último (sin el
+calentamiento, mientras el contenedor se llena por primera vez) y termina
+con error si la memoria o los objetos crecieron, o si el tiempo por paso se
+fue haciendo más lento, más allá de los límites configurados. Con el
+presupuesto de física por defecto el paso no puede pasar de
+PRESUPUESTO_FISICA_MS: una física más lenta no alarga el paso sino que
+difiere bandas, así que también falla si crece la fracción de frames con
+bandas diferidas. Comparar tercios en lugar de muestras sueltas promedia la
+variación propia de cada ciclo de llenado y drenaje.
+
+Memoria y tiempos estables no alcanzan: una simulación atascada (sin
+drenajes, con la grilla llena) también los tiene. Por eso la prueba falla
+además si pasa demasiado tiempo sin terminar un ciclo de drenaje que haya
+drenado granos, si termina un ciclo sin drenar ninguno o si la grilla queda
+llena en dos muestras seguidas.
+
+Uso:
+    python resistencia.py --minutos 480
+    python resistencia.py --minutos 10 --intervalo 10 --backend compacta --csv resistencia.csv
+"""
+
+import argparse
+import gc
+import sys
+import time
+from collections import Counter
+from headless import crear_simulacion, formatear_metricas
+from core.configuracion import agregar_argumentos_contenedor
+from core.utilidades import memoria_residente
+from particulas import CLASES_POR_TIPO
+from core.constantes import *
+
+# Tipos que se listan en el informe cuando los objetos crecen
+TIPOS_INFORMADOS = 8
+
+# Con la grilla de objetos cada grano es una instancia: su cantidad sigue al
+# llenado y drenaje del contenedor, así que no entra en la comparación
+TIPOS_GRANO = tuple(clase.__name__ for clase in CLASES_POR_TIPO.values())
+
+def crear_parser():
+    """Crea el parser de argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Prueba de resistencia de la simulación de perlita")
+    parser.add_argument("--minutos", type=float, default=60.0,
+                        help="Duración de la prueba en minutos (un turno son 480)")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_MUESTRAS_RESISTENCIA,
+                        help="Segundos entre muestras")
+    parser.add_argument("--calentamiento", type=float, default=CALENTAMIENTO_RESISTENCIA,
+                        help="Segundos iniciales que no se comparan")
+    parser.add_argument("--memoria-maxima", type=float, default=CRECIMIENTO_MEMORIA_MAXIMO_MB,
+                        help="Crecimiento de RSS admitido en MB")
+    parser.add_argument("--objetos-maximo", type=int, default=CRECIMIENTO_OBJETOS_MAXIMO,
+                        help="Crecimiento admitido de objetos del recolector de basura")
+    parser.add_argument("--deriva-maxima", type=float, default=DERIVA_PASO_MAXIMA,
+                        help="Aumento relativo admitido del tiempo por paso (0.25 = 25%%)")
+    parser.add_argument("--diferidos-maximo", type=float, default=CRECIMIENTO_DIFERIDOS_MAXIMO,
+                        help="Aumento admitido de la fracción de frames con bandas diferidas (0.05 = 5 puntos)")
+    parser.add_argument("--espera-ciclo", type=float, default=ESPERA_CICLO_MAXIMA_RESISTENCIA,
+                        help="Segundos sin terminar un ciclo de drenaje que hacen fallar la prueba")
+    parser.add_argument("--csv", default=None,
+                        help="Guarda las muestras en este archivo CSV")
+    parser.add_argument("--velocidad", type=float, default=VELOCIDAD_APARICION_POR_DEFECTO,
+                        help="Velocidad de aparición de partículas")
+    parser.add_argument("--cluster", type=int, default=TAMANO_CLUSTER_POR_DEFECTO,
+                        help="Tamaño del cluster de aparición")
+    parser.add_argument("--nivel", type=float, default=0.5,
+                        help="Posición de la línea de nivel (0.0 = arriba, 1.0 = abajo)")
+    parser.add_argument("--presupuesto-fisica", type=float, default=PRESUPUESTO_FISICA_MS,
+                        help="Milisegundos de física por frame (0 = sin límite)")
+    parser.add_argument("--motor", choices=MOTORES_FISICA, default=MOTOR_FISICA_POR_DEFECTO,
+                        help="Motor de física")
+    parser.add_argument("--sin-jit", action="store_true",
+                        help="Usa siempre la física en Python aunque numba esté instalado")
+    parser.add_argument("--gc-juego", action="store_true",
+                        help="Corre con el modo de recolección de juego (gc.freeze y umbrales altos)")
+    agregar_argumentos_contenedor(parser)
+    # La prueba siempre usa la grilla en memoria (crear_simulacion lee este argumento de headless.py)
+    parser.set_defaults(archivo_grilla=None)
+    return parser
+
+def contar_objetos():
+    """Resumen de gc.get_objects: cantidad de objetos por nombre de tipo"""
+    return Counter(type(objeto).__name__ for objeto in gc.get_objects())
+
+def tomar_muestra(simulacion, transcurrido, frames, tiempo_pasos, paso_maximo):
+    """
+    Toma una muestra del estado del proceso y de la simulación.
+
+    Parámetros:
+        simulacion (Simulacion): Simulación en curso
+        transcurrido (float): Segundos desde el inicio de la prueba
+        frames (int): Frames del intervalo
+        tiempo_pasos (float): Segundos de simulacion.actualizar en el intervalo
+        paso_maximo (float): Paso más lento del intervalo, en segundos
+
+    Retorna:
+        tuple: (muestra, tipos): los valores de la muestra ('objetos' sin
+               contar las instancias de granos) y el Counter de objetos por
+               tipo. El detalle va aparte porque la muestra se guarda entera y
+               con solo números no la sigue el recolector, así la propia
+               lista de muestras no aparece como crecimiento de objetos
+    """
+    tipos = contar_objetos()
+    metricas = simulacion.sistema_metricas
+    fisicas = simulacion.motor_fisicas
+    granos = simulacion.grilla.contar_particulas()
+    muestra = {
+        'segundos': transcurrido,
+        'frames': frames,
+        'paso_promedio': tiempo_pasos / max(frames, 1),
+        'paso_maximo': paso_maximo,
+        'memoria': memoria_residente(),
+        'objetos': sum(tipos.values()) - sum(tipos[tipo] for tipo in TIPOS_GRANO),
+        'granos': granos,
+        'llena': granos >= simulacion.grilla.filas * simulacion.grilla.columnas,
+        'ciclos': metricas.ciclos_completados,
+        'drenados': metricas.granos_drenados,
+        # Acumulados de la sesión: la diferencia entre muestras da los del intervalo
+        'frames_diferidos': fisicas.frames_con_diferidas,
+        'bandas_diferidas': fisicas.bandas_diferidas_total
+    }
+    return muestra, tipos
+
+def formatear_muestra(muestra):
+    """Convierte una muestra en una línea de texto para consola"""
+    memoria = "-" if muestra['memoria'] is None else f"{muestra['memoria'] / 2**20:.1f}MB"
+    return (f"[{muestra['segundos'] / 60:7.1f}min] rss={memoria} objetos={muestra['objetos']} "
+            f"paso={muestra['paso_promedio'] * 1000:.2f}ms max={muestra['paso_maximo'] * 1000:.1f}ms "
+            f"granos={muestra['granos']} ciclos={muestra['ciclos']} drenados={muestra['drenados']} "
+            f"diferidas={muestra['bandas_diferidas']}")
+
+def _promedio(muestras, clave):
+    return sum(muestra[clave] for muestra in muestras) / len(muestras)
+
+def _fraccion_diferidos(intervalos):
+    """Fracción de frames que difirieron bandas en una lista de (frames diferidos, frames)"""
+    frames = sum(total for _, total in intervalos)
+    return sum(diferidos for diferidos, _ in intervalos) / frames if frames else 0.0
+
+def verificar_ciclos(comparables, espera_maxima):
+    """
+    Verifica que los drenajes se sigan repitiendo después del calentamiento.
+
+    Parámetros:
+        comparables (list): Muestras posteriores al calentamiento
+        espera_maxima (float): Segundos admitidos sin terminar un ciclo
+
+    Retorna:
+        list: Mensajes de falla (vacía si los ciclos avanzan)
+
+    Un ciclo solo cuenta como avance si en el mismo intervalo salieron
+    granos: un ciclo que termina sin drenar nada (compuertas tapadas) no
+    es producción y además se informa como falla.
+    """
+    fallas = []
+    ultimo_ciclo = comparables[0]['segundos']
+    espera = 0.0
+    vacios = 0
+    for anterior, muestra in zip(comparables, comparables[1:]):
+        if muestra['ciclos'] > anterior['ciclos']:
+            if muestra['drenados'] > anterior['drenados']:
+                ultimo_ciclo = muestra['segundos']
+            else:
+                vacios += muestra['ciclos'] - anterior['ciclos']
+        espera = max(espera, muestra['segundos'] - ultimo_ciclo)
+    print(f"Ciclos de drenaje: {comparables[-1]['ciclos'] - comparables[0]['ciclos']} después del "
+          f"calentamiento ({comparables[-1]['drenados'] - comparables[0]['drenados']} granos), "
+          f"espera máxima {espera:.0f}s")
+    if espera > espera_maxima:
+        fallas.append(f"pasaron {espera:.0f}s sin terminar un ciclo de drenaje (límite {espera_maxima:.0f}s)")
+    if vacios:
+        fallas.append(f"{vacios} ciclos de drenaje terminaron sin drenar granos")
+
+    if any(anterior['llena'] and muestra['llena'] for anterior, muestra in zip(comparables, comparables[1:])):
+        fallas.append("la grilla quedó llena en muestras seguidas (el drenaje no da abasto o se detuvo)")
+    return fallas
+
+def evaluar(muestras, argumentos, diferencia_tipos):
+    """
+    Compara el primer tercio de las muestras (después del calentamiento) con el último.
+
+    Parámetros:
+        muestras (list): Muestras de toda la prueba
+        argumentos (Namespace): Límites y calentamiento
+        diferencia_tipos (Counter): Objetos por tipo que aparecieron entre la
+            primera muestra comparada y la última (se informa si los objetos crecen)
+
+    Retorna:
+        list: Mensajes de los límites superados (vacía si la prueba pasó)
+
+    Lanza:
+        ValueError: Si no hay al menos tres muestras después del calentamiento
+    """
+    comparables = [muestra for muestra in muestras if muestra['segundos'] >= argumentos.calentamiento]
+    if len(comparables) < 3:
+        raise ValueError(f"Hay {len(comparables)} muestras después del calentamiento; se necesitan al "
+                         "menos 3 (alargar --minutos o acortar --intervalo / --calentamiento)")
+    tercio = len(comparables) // 3
+    primeras, ultimas = comparables[:tercio], comparables[-tercio:]
+    fallas = verificar_ciclos(comparables, argumentos.espera_ciclo)
+
+    if primeras[0]['memoria'] is not None:
+        crecimiento = (_promedio(ultimas, 'memoria') - _promedio(primeras, 'memoria')) / 2**20
+        print(f"Memoria: {crecimiento:+.1f} MB entre el primer y el último tercio")
+        if crecimiento > argumentos.memoria_maxima:
+            fallas.append(f"la memoria creció {crecimiento:.1f} MB (límite {argumentos.memoria_maxima} MB)")
+
+    crecimiento = _promedio(ultimas, 'objetos') - _promedio(primeras, 'objetos')
+    print(f"Objetos: {crecimiento:+.0f}")
+    if crecimiento > argumentos.objetos_maximo:
+        fallas.append(f"los objetos crecieron {crecimiento:.0f} (límite {argumentos.objetos_maximo})")
+        for tipo in TIPOS_GRANO:
+            del diferencia_tipos[tipo]
+        for tipo, cantidad in diferencia_tipos.most_common(TIPOS_INFORMADOS):
+            print(f"  {tipo}: +{cantidad}")
+
+    antes, despues = _promedio(primeras, 'paso_promedio'), _promedio(ultimas, 'paso_promedio')
+    deriva = despues / antes - 1 if antes > 0 else 0.0
+    print(f"Tiempo por paso: {antes * 1000:.2f}ms -> {despues * 1000:.2f}ms ({deriva:+.0%})")
+    if deriva > argumentos.deriva_maxima:
+        fallas.append(f"el paso se hizo {deriva:.0%} más lento (límite {argumentos.deriva_maxima:.0%})")
+
+    # Con presupuesto de física el paso queda acotado: la lentitud aparece como bandas diferidas.
+    # Los contadores son acumulados desde el arranque, la primera muestra se compara contra cero
+    intervalos = [(muestra['frames_diferidos'] - anterior, muestra['frames'])
+                  for anterior, muestra in zip([0] + [previa['frames_diferidos'] for previa in muestras], muestras)
+                  if muestra['segundos'] >= argumentos.calentamiento]
+    antes, despues = _fraccion_diferidos(intervalos[:tercio]), _fraccion_diferidos(intervalos[-tercio:])
+    print(f"Frames con bandas diferidas: {antes:.1%} -> {despues:.1%}")
+    if despues - antes > argumentos.diferidos_maximo:
+        fallas.append(f"los frames con bandas diferidas pasaron de {antes:.1%} a {despues:.1%} "
+                      f"(límite +{argumentos.diferidos_maximo:.0%})")
+    return fallas
+
+def guardar_csv(ruta, muestras):
+    """Guarda las muestras (sin el detalle por tipo) en un archivo CSV"""
+    columnas = ('segundos', 'frames', 'paso_promedio', 'paso_maximo', 'memoria', 'objetos', 'granos', 'llena',
+                'ciclos', 'drenados', 'frames_diferidos', 'bandas_diferidas')
+    with open(ruta, "w") as archivo:
+        archivo.write(",".join(columnas) + "\n")
+        for muestra in muestras:
+            archivo.write(",".join("" if muestra[columna] is None else str(muestra[columna])
+                                   for columna in columnas) + "\n")
+
+def ejecutar(argumentos):
+    """
+    Corre la prueba y evalúa las muestras.
+
+    Retorna:
+        bool: True si ningún límite se superó
+    """
+    simulacion = crear_simulacion(argumentos)
+    print(f"Grilla: {simulacion.grilla.columnas}x{simulacion.grilla.filas} celdas "
+          f"({type(simulacion.grilla).__name__}); {argumentos.minutos:g} minutos, "
+          f"una muestra cada {argumentos.intervalo:g}s")
+    recoleccion = None
+    if argumentos.gc_juego:
+        from core.memoria import RecoleccionJuego
+        recoleccion = RecoleccionJuego()
+        recoleccion.activar(simulacion.grilla)
+
+    muestras = []
+    tipos_iniciales = tipos = Counter()
+    inicio = time.perf_counter()
+    fin = inicio + argumentos.minutos * 60
+    proxima_muestra = inicio + argumentos.intervalo
+    frames = 0
+    tiempo_pasos = 0.0
+    paso_maximo = 0.0
+    try:
+        while True:
+            antes = time.perf_counter()
+            simulacion.actualizar()
+            ahora = time.perf_counter()
+            paso = ahora - antes
+            frames += 1
+            tiempo_pasos += paso
+            if paso > paso_maximo:
+                paso_maximo = paso
+
+            if ahora >= proxima_muestra:
+                muestra, tipos = tomar_muestra(simulacion, ahora - inicio, frames, tiempo_pasos, paso_maximo)
+                if not tipos_iniciales and muestra['segundos'] >= argumentos.calentamiento:
+                    tipos_iniciales = tipos
+                muestras.append(muestra)
+                print(formatear_muestra(muestra))
+                frames, tiempo_pasos, paso_maximo = 0, 0.0, 0.0
+                # La muestra (gc.get_objects) no cuenta como tiempo de paso del intervalo siguiente
+                proxima_muestra = time.perf_counter() + argumentos.intervalo
+            if ahora >= fin:
+                break
+    finally:
+        if recoleccion is not None:
+            recoleccion.desactivar()
+
+    print(f"Final: {formatear_metricas(simulacion.sistema_metricas.resumen())}")
+    if argumentos.csv:
+        guardar_csv(argumentos.csv, muestras)
+
+    try:
+        fallas = evaluar(muestras, argumentos, tipos - tipos_iniciales)
+    except ValueError as error:
+        print(f"ERROR: {error}")
+        return False
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if not fallas:
+        print("OK: drenajes repetidos, sin crecimiento de memoria ni deriva del tiempo por paso o de las bandas diferidas")
+    return not fallas
+
+if __name__ == "__main__":
+    sys.exit(0 if ejecutar(crear_parser().parse_args()) else 1)
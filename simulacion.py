@@ -14,14 +14,20 @@ La simulación maneja el ciclo principal de actualización y renderizado,
 así como la comunicación entre todos los subsistemas.
 """
 
-import pygame
-from grillas import Grilla
+import time
+from grillas import crear_grilla, elegir_backend, remuestrear_planos, BACKENDS_GRILLA, GrillaMapeada
 from sistema.mensajes import SistemaMensajes
 from sistema.aparicion import SistemaAparicion
 from sistema.nivel import SistemaNivel
 from sistema.input import ManejadorInput
 from sistema.fisicas import MotorFisicas
+from sistema.metricas import SistemaMetricas
+from sistema.vista import SistemaVista
 from core.constantes import *
+from core.arranque import importar_diferido
+
+# pygame se carga recién al dibujar o leer el mouse (la simulación sin ventana no lo usa)
+pygame = importar_diferido("pygame")
 
 class Simulacion:
     """
@@ -38,39 +44,87 @@ class Simulacion:
     - SistemaNivel: Control de nivel de llenado y drenaje
     - ManejadorInput: Procesamiento de entrada del usuario
     - MotorFisicas: Simulación física de partículas
+    - SistemaMetricas: Contadores de rendimiento de la línea de empaquetado
+    - SistemaVista: Correspondencia entre la grilla y su área en pantalla
     """
     
-    def __init__(self, ancho, alto, tamaño_celda):
+    def __init__(self, ancho, alto, tamaño_celda, backend="auto", archivo_grilla=None):
         """
         Inicializa la simulación con las dimensiones especificadas.
         
         Parámetros:
-            ancho (int): Ancho del área de simulación en píxeles
-            alto (int): Alto del área de simulación en píxeles
-            tamaño_celda (int): Tamaño de cada celda en píxeles
+            ancho (int): Ancho del contenedor en unidades de simulación
+            alto (int): Alto del contenedor en unidades de simulación
+            tamaño_celda (int): Unidades por celda; define la resolución de la
+                grilla (ancho // tamaño_celda columnas), no el tamaño en pantalla
+            backend (str): Implementación de la grilla ("objetos", "compacta" o
+                "auto" para elegir según el tamaño y la memoria disponible)
+            archivo_grilla (str, opcional): Si se indica, la grilla es una
+                GrillaMapeada con sus planos en ese archivo (ignora backend)
+                
+        Lanza:
+            ValueError: Si las dimensiones exceden el máximo de celdas por lado
+            MemoryError: Si la grilla no entra en la memoria disponible
         """
-        # Configuración básica de la grilla
+        # Geometría del contenedor (configurable por archivo o línea de comandos)
+        self.ancho = ancho
+        self.alto = alto
+        self.backend = backend
+        
+        # Configuración básica de la grilla (la memoria se verifica antes de crearla)
         self.tamaño_celda = tamaño_celda
-        self.grilla = Grilla(ancho, alto, tamaño_celda)
+        if archivo_grilla is None:
+            self.grilla = crear_grilla(ancho, alto, tamaño_celda, backend)
+        else:
+            self.grilla = GrillaMapeada(ancho, alto, tamaño_celda, archivo_grilla)
+        
+        # Superficies de la región visible a un píxel por celda y escalada (se reusan entre frames)
+        self._superficie_grilla = None
+        self._superficie_escalada = None
         
         # Modo debug (inicialmente desactivado)
         self.debug_mode = False
         
         # Inicializar todos los sistemas del juego
+        self.sistema_metricas = SistemaMetricas()
         self.sistema_mensajes = SistemaMensajes()
         self.sistema_aparicion = SistemaAparicion()
-        self.sistema_nivel = SistemaNivel()
+        self.sistema_nivel = SistemaNivel(self.sistema_metricas)
         self.manejador_entrada = ManejadorInput()
         self.motor_fisicas = MotorFisicas()
         
-        # Diccionario de sistemas para fácil acceso desde otros módulos
-        self.sistemas = {
-            'mensajes': self.sistema_mensajes,
-            'aparicion': self.sistema_aparicion,
-            'nivel': self.sistema_nivel,
-            'input': self.manejador_entrada,
-            'fisicas': self.motor_fisicas
-        }
+        # La vista se crea al dibujar o procesar el primer evento (ver sistema_vista)
+        self._sistema_vista = None
+        self._sistemas = None
+        
+        # Segundos de física por frame; None procesa siempre todas las bandas marcadas
+        self.presupuesto_fisica = PRESUPUESTO_FISICA_MS / 1000.0
+        
+        # Función opcional que recibe los segundos de cada fase del paso
+        # (drenaje, aparición, física); la usa el exportador de métricas
+        self.registro_fases = None
+    
+    @property
+    def sistema_vista(self):
+        """Vista de la grilla en pantalla, creada al primer uso (sin ventana nunca se crea)"""
+        if self._sistema_vista is None:
+            self._sistema_vista = SistemaVista()
+        return self._sistema_vista
+    
+    @property
+    def sistemas(self):
+        """Diccionario de sistemas para fácil acceso desde otros módulos (se arma al primer uso)"""
+        if self._sistemas is None:
+            self._sistemas = {
+                'mensajes': self.sistema_mensajes,
+                'aparicion': self.sistema_aparicion,
+                'nivel': self.sistema_nivel,
+                'input': self.manejador_entrada,
+                'fisicas': self.motor_fisicas,
+                'metricas': self.sistema_metricas,
+                'vista': self.sistema_vista
+            }
+        return self._sistemas
     
     def configurar_constantes_nivel(self, tiempo_drenaje, color_linea, ancho_linea):
         """
@@ -83,16 +137,6 @@ class Simulacion:
         """
         self.sistema_nivel.configurar_constantes(tiempo_drenaje, color_linea, ancho_linea)
     
-    def configurar_desplazamiento_mouse(self, desplazamiento_x, desplazamiento_y):
-        """
-        Configura el desplazamiento del mouse para el área de juego.
-        
-        Parámetros:
-            desplazamiento_x (int): Desplazamiento horizontal en píxeles
-            desplazamiento_y (int): Desplazamiento vertical en píxeles
-        """
-        self.manejador_entrada.configurar_offset_mouse(desplazamiento_x, desplazamiento_y)
-    
     def actualizar(self):
         """
         Actualiza todos los sistemas de la simulación.
@@ -101,8 +145,10 @@ class Simulacion:
         1. Actualiza el sistema de mensajes (siempre activo)
         2. Si no está pausado, actualiza física y sistemas activos
         3. Procesa generación automática de partículas
-        4. Actualiza física de partículas existentes
-        5. Verifica condiciones de drenaje automático
+        4. Actualiza física de las bandas marcadas dentro del presupuesto del frame
+        
+        El drenaje automático no se verifica acá: el sensor de nivel registrado
+        en la grilla dispara el evento cuando la perlita cruza el umbral.
         """
         # Actualizar sistema de mensajes siempre (incluso si está pausado)
         self.sistema_mensajes.actualizar()
@@ -111,20 +157,38 @@ class Simulacion:
         if self.manejador_entrada.pausado:
             return
         
+        # Con la grilla mapeada, el paso se publica como una generación nueva
+        # para los procesos que leen el archivo
+        if isinstance(self.grilla, GrillaMapeada):
+            with self.grilla.escritura():
+                self._actualizar_grilla()
+        else:
+            self._actualizar_grilla()
+    
+    def _actualizar_grilla(self):
+        """Aplica drenaje, aparición y física a la grilla (un paso sin pausa)"""
+        inicio = time.perf_counter()
+        
+        # Mantener el sensor de nivel conectado a la grilla y a la línea actuales (O(1))
+        self.sistema_nivel.sincronizar_sensor(self.grilla)
+        
         # Actualizar sistema de nivel (procesar drenaje si está activo)
         self.sistema_nivel.actualizar_drenaje(self.grilla)
+        fin_drenaje = time.perf_counter()
         
         # Generar partículas automáticamente si está habilitado y en modo perlita
         if (self.sistema_aparicion.habilitado and 
             self.manejador_entrada.modo == "perlita"):
             self._generar_particulas_automaticas()
+        fin_aparicion = time.perf_counter()
         
-        # Actualizar física de todas las partículas existentes
-        self.motor_fisicas.actualizar_particulas(self.grilla)
+        # Actualizar física de las bandas con movimiento; lo que no entra en el
+        # presupuesto queda marcado para el frame siguiente
+        self.motor_fisicas.actualizar(self.grilla, self.presupuesto_fisica)
         
-        # Verificar si se debe activar el drenaje automático
-        if self.sistema_nivel.modo_activo and not self.sistema_nivel.esta_drenando:
-            self.sistema_nivel.verificar_nivel_lleno(self.grilla)
+        if self.registro_fases is not None:
+            self.registro_fases(fin_drenaje - inicio, fin_aparicion - fin_drenaje,
+                                time.perf_counter() - fin_aparicion)
     
     def _generar_particulas_automaticas(self):
         """
@@ -136,21 +200,51 @@ class Simulacion:
         
         Algoritmo:
         1. Calcula número de apariciones basado en velocidad y tiempo
-        2. Para cada aparición, determina posición aleatoria
-        3. Genera cluster de partículas según intensidad configurada
+        2. Calcula de una vez las columnas de todas las apariciones
+        3. Genera todos los clusters del frame con una única escritura por lote
         """
-        numero_apariciones = self.sistema_aparicion.calcular_apariciones()
-        
-        for _ in range(numero_apariciones):
-            # Calcular posición aleatoria dentro del área de aparición
-            columna = self.sistema_aparicion.calcular_posicion(self.grilla.columnas)
-            fila = 0  # Las partículas siempre aparecen en la fila superior
+        if self.sistema_aparicion.alimentadores:
+            granos_agregados = self._alimentar()
+        else:
+            numero_apariciones = self.sistema_aparicion.calcular_apariciones()
+            if not numero_apariciones:
+                return
             
-            # Agregar cluster de perlita según el tamaño de intensidad configurado
-            self.motor_fisicas.agregar_cluster_perlita(
-                self.grilla, fila, columna, 
-                self.sistema_aparicion.tamaño_cluster
+            # Las partículas siempre aparecen en la fila superior
+            columnas = self.sistema_aparicion.calcular_posiciones(numero_apariciones, self.grilla.columnas)
+            granos_agregados = self.motor_fisicas.agregar_lote_perlita(
+                self.grilla, 0, columnas, self.sistema_aparicion.tamaño_cluster
+            )
+        
+        # Registrar los granos que entraron al contenedor
+        if granos_agregados:
+            self.sistema_metricas.registrar_aparicion(granos_agregados)
+    
+    def _alimentar(self):
+        """
+        Genera los granos de todos los alimentadores configurados.
+        
+        Cada alimentador calcula sus clusters del frame según su caudal,
+        sortea sus columnas con su tabla alias y escribe su lote en la fila
+        superior. Los alimentadores se procesan en orden, así que cuando sus
+        áreas se superponen los primeros tienen prioridad sobre las celdas.
+        
+        Retorna:
+            int: Total de granos que entraron al contenedor en este frame
+        """
+        factor = self.sistema_aparicion.factor_caudal()
+        total = 0
+        for alimentador in self.sistema_aparicion.alimentadores:
+            apariciones = alimentador.calcular_apariciones(factor)
+            if not apariciones:
+                continue
+            columnas = alimentador.calcular_posiciones(apariciones, self.grilla.columnas)
+            agregados = self.motor_fisicas.agregar_lote_perlita(
+                self.grilla, 0, columnas, forma=alimentador.forma
             )
+            alimentador.granos_aparecidos += agregados
+            total += agregados
+        return total
     
     def manejar_controles_con_eventos(self, eventos):
         """
@@ -170,9 +264,21 @@ class Simulacion:
             columna (int): Columna donde aplicar el pincel
             modo_pincel (str): Modo del pincel ("perlita", "roca", "borrador")
         """
-        self.motor_fisicas.aplicar_pincel(
-            self.grilla, fila, columna, modo_pincel, 
-            self.manejador_entrada.tamaño_pincel
+        self.aplicar_trazo((fila, columna), (fila, columna), modo_pincel)
+    
+    def aplicar_trazo(self, desde, hasta, modo_pincel):
+        """
+        Aplica el pincel del usuario a lo largo del segmento entre dos celdas.
+        
+        Parámetros:
+            desde (tuple): Celda (fila, columna) del cursor en el frame anterior
+            hasta (tuple): Celda (fila, columna) actual del cursor
+            modo_pincel (str): Modo del pincel ("perlita", "roca", "borrador")
+        """
+        self.motor_fisicas.aplicar_trazo(
+            self.grilla, desde, hasta, modo_pincel,
+            self.manejador_entrada.tamaño_pincel,
+            self.manejador_entrada.forma_pincel
         )
     
     def reiniciar(self):
@@ -186,75 +292,92 @@ class Simulacion:
         # Resetear estado de drenaje si estaba activo
         self.sistema_nivel.esta_drenando = False
         self.sistema_nivel.timer_mensaje_drenaje = 0
+        self.sistema_nivel.compuertas_bloqueadas = False
     
     def cambiar_tamaño_grano(self, nuevo_tamaño):
         """
-        Cambia el tamaño visual de los granos de perlita.
+        Cambia la resolución de la simulación (tamaño de cada grano).
         
-        Este método permite cambiar dinámicamente el tamaño de visualización
-        de las partículas, manteniendo la simulación activa y escalando
-        las partículas existentes proporcionalmente.
+        Este método permite cambiar dinámicamente cuántas celdas tiene la
+        grilla, manteniendo la simulación activa y remuestreando las
+        partículas existentes. El tamaño en pantalla no depende de este
+        valor: la vista escala la grilla al espacio disponible.
         
         Parámetros:
-            nuevo_tamaño (int): Nuevo tamaño en píxeles para cada celda
+            nuevo_tamaño (int): Unidades de simulación por celda (1 = máxima resolución)
             
         Algoritmo:
-        1. Calcula nuevas dimensiones de grilla basadas en área constante
-        2. Guarda posiciones actuales de partículas
-        3. Escala posiciones proporcionalmente
-        4. Crea nueva grilla con nuevo tamaño
-        5. Restaura partículas en posiciones escaladas
+        1. Calcula nuevas dimensiones de grilla basadas en el contenedor configurado
+        2. Verifica que la nueva grilla entre en memoria (antes de tocar la actual)
+        3. Exporta la grilla actual a planos compactos de tipos y colores
+        4. Remuestrea los planos (difusión de error al reducir, réplica al ampliar)
+        5. Reconstruye la grilla desde los planos conservando los colores
+        
+        Lanza:
+            ValueError, MemoryError: Si la nueva resolución no es posible; la
+                grilla actual queda intacta
         """
-        tamaño_anterior = self.tamaño_celda
-        self.tamaño_celda = nuevo_tamaño
+        if nuevo_tamaño == self.tamaño_celda:
+            return
+        if isinstance(self.grilla, GrillaMapeada):
+            raise ValueError("La grilla mapeada a archivo tiene resolución fija")
         
-        # Calcular dimensiones que resulten en un área de juego similar
-        columnas_objetivo = ANCHO_AREA_JUEGO // nuevo_tamaño
-        filas_objetivo = ALTO_AREA_JUEGO // nuevo_tamaño
+        # Calcular dimensiones que resulten en el mismo contenedor
+        columnas_objetivo = self.ancho // nuevo_tamaño
+        filas_objetivo = self.alto // nuevo_tamaño
+        backend = elegir_backend(filas_objetivo, columnas_objetivo, self.backend)
+        self.tamaño_celda = nuevo_tamaño
         
-        # Calcular las dimensiones reales que usará la nueva grilla
-        ancho_ventana = columnas_objetivo * nuevo_tamaño
-        alto_ventana = filas_objetivo * nuevo_tamaño
+        # Remuestrear el contenido actual a la nueva resolución
+        tipos, colores = self.grilla.exportar_planos()
+        tipos, colores = remuestrear_planos(
+            tipos, colores,
+            self.grilla.filas, self.grilla.columnas,
+            filas_objetivo, columnas_objetivo
+        )
         
-        # Guardar las partículas actuales con escalado apropiado
-        particulas_guardadas = []
-        if hasattr(self.grilla, 'filas') and hasattr(self.grilla, 'columnas'):
-            # Calcular factores de escala para mantener proporciones
-            factor_escala_x = columnas_objetivo / self.grilla.columnas
-            factor_escala_y = filas_objetivo / self.grilla.filas
-            
-            # Recorrer todas las celdas y guardar partículas existentes
-            for fila in range(self.grilla.filas):
-                for columna in range(self.grilla.columnas):
-                    particula = self.grilla.obtener_celda(fila, columna)
-                    if particula is not None:
-                        # Escalar posición para mantener proporción relativa
-                        nueva_fila = int(fila * factor_escala_y)
-                        nueva_columna = int(columna * factor_escala_x)
-                        particulas_guardadas.append((nueva_fila, nueva_columna, type(particula)))
-        
-        # Crear nueva grilla con dimensiones calculadas
-        self.grilla = Grilla(ancho_ventana, alto_ventana, self.tamaño_celda)
-        
-        # Restaurar partículas en sus nuevas posiciones escaladas
-        for nueva_fila, nueva_columna, tipo_particula in particulas_guardadas:
-            if (0 <= nueva_fila < self.grilla.filas and 0 <= nueva_columna < self.grilla.columnas):
-                self.grilla.agregar_particula(nueva_fila, nueva_columna, tipo_particula)
+        # Crear nueva grilla con dimensiones calculadas y las partículas remuestreadas
+        self.grilla = BACKENDS_GRILLA[backend].desde_planos(
+            tipos, colores, filas_objetivo, columnas_objetivo, self.tamaño_celda
+        )
     
     def dibujar(self, superficie):
         """
         Dibuja toda la simulación en la superficie especificada.
         
         Parámetros:
-            superficie (pygame.Surface): Superficie donde dibujar la simulación
+            superficie (pygame.Surface): Superficie del tamaño del área de la vista
             
         Elementos dibujados:
-        1. Grilla y todas las partículas
+        1. Partículas de la región visible (a un píxel por celda, escaladas a la vista)
         2. Indicador visual del pincel del usuario
         3. Línea de nivel (si está activada)
+        
+        Solo se recorren las celdas que muestra la vista: con zoom, la región
+        visible; con la grilla completa en pantalla y varias celdas por píxel,
+        una de cada `paso` celdas por eje.
         """
-        # Dibujar grilla base y todas las partículas
-        self.grilla.dibujar(superficie)
+        region, paso, desfase = self.sistema_vista.region_visible()
+        filas, columnas = region[2], region[3]
+        
+        # Dibujar la región visible en resolución de simulación
+        tamaño_region = (len(range(0, columnas, paso)), len(range(0, filas, paso)))
+        if self._superficie_grilla is None or self._superficie_grilla.get_size() != tamaño_region:
+            self._superficie_grilla = pygame.Surface(tamaño_region)
+        self._superficie_grilla.fill(GRIS)
+        self.grilla.dibujar(self._superficie_grilla, 1, region, paso)
+        
+        # Escalar al tamaño de la vista
+        if desfase == (0, 0) and region[:2] == (0, 0) and \
+           (columnas, filas) == (self.grilla.columnas, self.grilla.filas):
+            pygame.transform.scale(self._superficie_grilla, superficie.get_size(), superficie)
+        else:
+            escala = self.sistema_vista.escala
+            tamaño_escalado = (max(1, int(columnas * escala)), max(1, int(filas * escala)))
+            if self._superficie_escalada is None or self._superficie_escalada.get_size() != tamaño_escalado:
+                self._superficie_escalada = pygame.Surface(tamaño_escalado)
+            pygame.transform.scale(self._superficie_grilla, tamaño_escalado, self._superficie_escalada)
+            superficie.blit(self._superficie_escalada, (-desfase[0], -desfase[1]))
         
         # Dibujar indicador visual del pincel
         self._dibujar_pincel(superficie)
@@ -268,47 +391,47 @@ class Simulacion:
         Dibuja el indicador visual del pincel para mostrar dónde se va a dibujar.
         
         Parámetros:
-            superficie (pygame.Surface): Superficie donde dibujar el pincel
+            superficie (pygame.Surface): Superficie del área de juego en escala de pantalla
             
-        El pincel se muestra como un rectángulo del color correspondiente
-        al modo actual, siguiendo la posición del mouse del usuario.
+        El pincel se muestra como un cuadrado o un círculo del color
+        correspondiente al modo actual, centrado en la posición del mouse.
         """
-        posicion_mouse = pygame.mouse.get_pos()
-        
-        # Ajustar posición considerando el desplazamiento del área de juego
-        x_ajustado = posicion_mouse[0] - self.manejador_entrada.offset_mouse_x
-        y_ajustado = posicion_mouse[1] - self.manejador_entrada.offset_mouse_y
+        # Convertir posición de pantalla a coordenadas de grilla
+        celda = self.sistema_vista.pantalla_a_celda(pygame.mouse.get_pos())
         
         # Solo dibujar el pincel si está dentro del área de juego
-        if (0 <= x_ajustado < self.grilla.columnas * self.tamaño_celda and 
-            0 <= y_ajustado < self.grilla.filas * self.tamaño_celda):
-            
-            # Convertir posición de píxeles a coordenadas de grilla
-            columna = x_ajustado // self.tamaño_celda
-            fila = y_ajustado // self.tamaño_celda
+        if celda is not None:
+            fila, columna = celda
+            tamaño_pincel = self.manejador_entrada.tamaño_pincel
+            # Esquina superior izquierda de la máscara, centrada en la celda del cursor
+            x, y = self.sistema_vista.celda_a_local(fila - tamaño_pincel // 2,
+                                                    columna - tamaño_pincel // 2)
 
-            # Calcular tamaño visual del pincel
-            tamaño_visual_pincel = self.manejador_entrada.tamaño_pincel * self.tamaño_celda
+            # Calcular tamaño visual del pincel según la escala de la vista
+            tamaño_visual_pincel = max(1, int(tamaño_pincel * self.sistema_vista.escala))
             color_pincel = self.manejador_entrada.obtener_color_pincel()
 
-            # Dibujar el pincel como un rectángulo con relleno completo
-            pygame.draw.rect(superficie, color_pincel, 
-                           (columna * self.tamaño_celda, fila * self.tamaño_celda, 
-                            tamaño_visual_pincel, tamaño_visual_pincel))
+            # Dibujar el pincel con relleno completo según su forma
+            rectangulo = (x, y, tamaño_visual_pincel, tamaño_visual_pincel)
+            if self.manejador_entrada.forma_pincel == "circulo":
+                pygame.draw.ellipse(superficie, color_pincel, rectangulo)
+            else:
+                pygame.draw.rect(superficie, color_pincel, rectangulo)
     
     def _dibujar_linea_nivel(self, superficie):
         """
         Dibuja la línea indicadora de nivel de llenado.
         
         Parámetros:
-            superficie (pygame.Surface): Superficie donde dibujar la línea
+            superficie (pygame.Surface): Superficie del área de juego en escala de pantalla
             
         La línea se dibuja horizontalmente a través de toda la grilla
-        en la posición configurada por el usuario.
+        en la posición configurada por el usuario. Con la política de
+        compuertas también se marcan las compuertas sobre el fondo.
         """
         # Obtener posición vertical de la línea en píxeles
         posicion_y_linea = self.sistema_nivel.obtener_posicion_linea_pixeles(
-            self.grilla.filas, self.tamaño_celda
+            self.grilla.filas, self.sistema_vista
         )
         
         # Obtener propiedades visuales de la línea
@@ -318,8 +441,13 @@ class Simulacion:
         # Dibujar línea horizontal que atraviesa toda la grilla
         pygame.draw.rect(superficie, color_linea, 
                         (0, posicion_y_linea - ancho_linea//2, 
-                         self.grilla.columnas * self.tamaño_celda, ancho_linea))
-    
-    def configurar_offset_mouse(self, offset_x, offset_y):
-        """Método de compatibilidad para configurar offset del mouse."""
-        self.configurar_desplazamiento_mouse(offset_x, offset_y) 
\ No newline at end of file
+                         superficie.get_width(), ancho_linea))
+        
+        # Marcar las compuertas de descarga sobre la última fila
+        if self.sistema_nivel.politica_drenaje == "compuertas":
+            for compuerta in self.sistema_nivel.compuertas:
+                columnas = compuerta.columnas(self.grilla.columnas)
+                x_inicio, y = self.sistema_vista.celda_a_local(self.grilla.filas, columnas.start)
+                x_fin, _ = self.sistema_vista.celda_a_local(self.grilla.filas, columnas.stop)
+                pygame.draw.rect(superficie, color_linea,
+                                 (x_inicio, y - ancho_linea, max(1, x_fin - x_inicio), ancho_linea))
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Alimentadores (tolvas) de partículas.
+
+Este módulo modela las bocas de llenado de la línea: cada alimentador tiene
+su propia posición, caudal en granos por segundo, forma de cluster y
+distribución horizontal de los granos (uniforme, gaussiana o boquilla fija).
+Varios alimentadores pueden trabajar a la vez sobre el mismo contenedor.
+
+Las columnas de aparición se sortean con una tabla alias de Vose armada una
+sola vez por ancho de grilla, así cada sorteo cuesta O(1) sin importar la
+distribución ni el ancho del contenedor.
+"""
+
+import math
+import random
+from core.constantes import PROBABILIDAD_APARICION_PERLITA, FRAMES_POR_SEGUNDO
+
+# Distribuciones horizontales soportadas
+DISTRIBUCIONES = ("uniforme", "gaussiana", "boquilla")
+
+class TablaAlias:
+    """
+    Tabla alias de Vose para sortear índices con pesos arbitrarios en O(1).
+
+    Cada casillero i guarda una probabilidad de quedarse con i y un alias
+    al que se deriva en caso contrario. Un sorteo elige un casillero al azar
+    y lanza una única moneda sesgada.
+
+    Atributos:
+        probabilidades (list): Probabilidad de aceptar cada casillero
+        alias (list): Índice alternativo de cada casillero
+    """
+
+    def __init__(self, pesos):
+        """
+        Arma la tabla a partir de pesos no negativos.
+
+        Parámetros:
+            pesos (list): Peso de cada índice (al menos uno positivo)
+
+        Algoritmo (Vose):
+            1. Escala los pesos para que su promedio sea 1
+            2. Separa los casilleros en chicos (< 1) y grandes (>= 1)
+            3. Completa cada chico con un grande, que queda como su alias, y
+               devuelve el sobrante del grande a la lista que corresponda
+            4. Los casilleros que quedan tienen probabilidad 1
+        """
+        total = float(sum(pesos))
+        if total <= 0:
+            raise ValueError("La tabla alias necesita al menos un peso positivo")
+
+        cantidad = len(pesos)
+        escalados = [peso * cantidad / total for peso in pesos]
+        self.probabilidades = [1.0] * cantidad
+        self.alias = list(range(cantidad))
+
+        chicos = [i for i, peso in enumerate(escalados) if peso < 1.0]
+        grandes = [i for i, peso in enumerate(escalados) if peso >= 1.0]
+        while chicos and grandes:
+            chico = chicos.pop()
+            grande = grandes.pop()
+            self.probabilidades[chico] = escalados[chico]
+            self.alias[chico] = grande
+            escalados[grande] -= 1.0 - escalados[chico]
+            if escalados[grande] < 1.0:
+                chicos.append(grande)
+            else:
+                grandes.append(grande)
+        # Los restantes (por redondeo) quedan con probabilidad 1
+
+    def muestrear(self):
+        """Sortea un índice según los pesos de la tabla"""
+        indice = int(random.random() * len(self.probabilidades))
+        if random.random() < self.probabilidades[indice]:
+            return indice
+        return self.alias[indice]
+
+    def muestrear_lote(self, cantidad):
+        """Sortea `cantidad` índices según los pesos de la tabla"""
+        probabilidades = self.probabilidades
+        alias = self.alias
+        largo = len(probabilidades)
+        aleatorio = random.random
+        resultado = []
+        for _ in range(cantidad):
+            indice = int(aleatorio() * largo)
+            resultado.append(indice if aleatorio() < probabilidades[indice] else alias[indice])
+        return resultado
+
+class Alimentador:
+    """
+    Una boca de llenado independiente sobre la parte superior del contenedor.
+
+    Atributos:
+        nombre (str): Identificador para reportes
+        posicion (float): Centro de la boca como fracción del ancho (0.0 a 1.0)
+        tasa (float): Caudal en granos por segundo simulado
+        distribucion (str): "uniforme", "gaussiana" o "boquilla"
+        dispersion (float): Ancho de la banda (uniforme) o desvío (gaussiana),
+                            como fracción del ancho del contenedor
+        forma_cluster (tuple): (ancho, alto) en celdas del cluster de cada aparición
+        granos_aparecidos (int): Granos que efectivamente entraron por esta boca
+    """
+
+    def __init__(self, nombre, posicion, tasa, distribucion="uniforme", dispersion=0.1,
+                 forma_cluster=(1, 1)):
+        if distribucion not in DISTRIBUCIONES:
+            raise ValueError(f"Distribución desconocida: {distribucion} "
+                             f"(opciones: {', '.join(DISTRIBUCIONES)})")
+        if not 0.0 <= posicion <= 1.0:
+            raise ValueError(f"La posición del alimentador debe estar entre 0 y 1: {posicion}")
+        if tasa < 0 or dispersion < 0:
+            raise ValueError("La tasa y la dispersión del alimentador no pueden ser negativas")
+
+        self.nombre = nombre
+        self.posicion = posicion
+        self.tasa = tasa
+        self.distribucion = distribucion
+        self.dispersion = dispersion
+        self.forma_cluster = (max(1, int(forma_cluster[0])), max(1, int(forma_cluster[1])))
+        self.granos_aparecidos = 0
+
+        # Celdas relativas del cluster (fila, columna), centrado en la columna sorteada
+        ancho, alto = self.forma_cluster
+        self.forma = [(fila, columna - ancho // 2) for fila in range(alto) for columna in range(ancho)]
+
+        self._tabla = None
+        self._columnas_tabla = None
+        self._acumulado = 0.0
+
+    @classmethod
+    def desde_dict(cls, datos, indice=0):
+        """
+        Crea un alimentador desde un diccionario de configuración.
+
+        Ejemplo:
+            {"nombre": "boca 1", "posicion": 0.25, "tasa": 400,
+             "distribucion": "gaussiana", "dispersion": 0.03, "cluster": [3, 2]}
+
+        Lanza:
+            ValueError: Si faltan claves obligatorias o hay valores inválidos
+        """
+        try:
+            return cls(
+                nombre=str(datos.get("nombre", f"alimentador {indice + 1}")),
+                posicion=float(datos["posicion"]),
+                tasa=float(datos["tasa"]),
+                distribucion=str(datos.get("distribucion", "uniforme")),
+                dispersion=float(datos.get("dispersion", 0.1)),
+                forma_cluster=tuple(datos.get("cluster", (1, 1)))
+            )
+        except KeyError as error:
+            raise ValueError(f"Falta la clave {error} en el alimentador {indice + 1}")
+        except (TypeError, IndexError):
+            raise ValueError(f"Valores inválidos en el alimentador {indice + 1}: {datos!r}")
+
+    def _pesos(self, columnas):
+        """Calcula el peso de cada columna según la distribución del alimentador"""
+        centro = self.posicion * (columnas - 1)
+        if self.distribucion == "boquilla":
+            pesos = [0.0] * columnas
+            pesos[int(round(centro))] = 1.0
+            return pesos
+
+        if self.distribucion == "uniforme":
+            medio_ancho = max(0.5, self.dispersion * columnas / 2)
+            return [1.0 if abs(columna - centro) <= medio_ancho else 0.0 for columna in range(columnas)]
+
+        # Gaussiana, truncada a los bordes del contenedor
+        desvio = max(0.5, self.dispersion * columnas)
+        return [math.exp(-0.5 * ((columna - centro) / desvio) ** 2) for columna in range(columnas)]
+
+    def tabla(self, columnas):
+        """Obtiene la tabla alias para un ancho de grilla, armándola solo si cambió"""
+        if self._columnas_tabla != columnas:
+            self._tabla = TablaAlias(self._pesos(columnas))
+            self._columnas_tabla = columnas
+        return self._tabla
+
+    def calcular_apariciones(self, factor=1.0, probabilidad=PROBABILIDAD_APARICION_PERLITA):
+        """
+        Calcula cuántos clusters generar en este frame para sostener el caudal.
+
+        Los clusters por frame se derivan de la tasa en granos por segundo:
+        tasa / (FPS * celdas del cluster * probabilidad por celda). La parte
+        fraccionaria se acumula entre frames, así el caudal promedio es exacto.
+
+        Parámetros:
+            factor (float): Multiplicador del caudal (controles de velocidad)
+            probabilidad (float): Probabilidad de que cada celda del cluster tenga grano
+        """
+        granos_por_cluster = len(self.forma) * probabilidad
+        if granos_por_cluster <= 0:
+            return 0
+        self._acumulado += self.tasa * factor / (FRAMES_POR_SEGUNDO * granos_por_cluster)
+        apariciones = int(self._acumulado)
+        self._acumulado -= apariciones
+        return apariciones
+
+    def calcular_posiciones(self, cantidad, columnas_grilla):
+        """Sortea las columnas centrales de `cantidad` clusters (O(1) cada una)"""
+        return self.tabla(columnas_grilla).muestrear_lote(cantidad)
+
+    def resumen(self):
+        """Retorna el estado del alimentador para reportes"""
+        return {
+            "nombre": self.nombre,
+            "posicion": self.posicion,
+            "tasa": self.tasa,
+            "distribucion": self.distribucion,
+            "granos_aparecidos": self.granos_aparecidos
+        }
@@ -5,9 +5,15 @@ Sistema de aparición automática de partículas.
 Este módulo controla la generación automática de partículas en la simulación,
 incluyendo la velocidad de aparición, el área donde aparecen las partículas,
 el tamaño de los clusters y la posición donde se generan.
+
+Por defecto las partículas aparecen en una banda centrada controlada con las
+flechas. Si se configuran alimentadores (ver sistema/alimentadores.py), cada
+uno aporta granos con su propio caudal y distribución, y la velocidad pasa a
+escalar el caudal de todos.
 """
 
 import random
+from sistema.alimentadores import Alimentador
 from core.constantes import (
     VELOCIDAD_APARICION_POR_DEFECTO, VELOCIDAD_APARICION_MAXIMA, VELOCIDAD_APARICION_MINIMA,
     INCREMENTO_VELOCIDAD, ANCHO_APARICION_POR_DEFECTO, TAMANO_CLUSTER_POR_DEFECTO, 
@@ -27,6 +33,7 @@ class SistemaAparicion:
         velocidad (float): Velocidad actual de aparición (partículas por frame)
         ancho_area (int): Ancho del área donde aparecen las partículas
         tamaño_cluster (int): Tamaño del cluster de partículas a generar
+        alimentadores (list): Alimentadores configurados (vacío = banda centrada)
     """
     
     def __init__(self):
@@ -40,6 +47,7 @@ class SistemaAparicion:
         self.velocidad = VELOCIDAD_APARICION_POR_DEFECTO           # Velocidad inicial de aparición
         self.ancho_area = ANCHO_APARICION_POR_DEFECTO              # Ancho inicial del área de aparición
         self.tamaño_cluster = TAMANO_CLUSTER_POR_DEFECTO           # Tamaño inicial de clusters
+        self.alimentadores = []                                    # Bocas de llenado independientes
     
     def calcular_apariciones(self):
         """
@@ -111,6 +119,55 @@ class SistemaAparicion:
             # Elegir columna aleatoria dentro del área
             return random.randint(limite_izquierdo, limite_derecho)
     
+    def calcular_posiciones(self, cantidad, columnas_grilla):
+        """
+        Calcula de una vez las columnas de todas las apariciones de un frame.
+        
+        Equivale a llamar `cantidad` veces a calcular_posicion, pero los
+        límites del área se calculan una sola vez.
+        
+        Parámetros:
+            cantidad (int): Número de apariciones
+            columnas_grilla (int): Número total de columnas disponibles en la grilla
+            
+        Retorna:
+            list: Columnas de aparición (0-indexadas)
+        """
+        if self.ancho_area >= columnas_grilla:
+            limite_izquierdo, limite_derecho = 0, columnas_grilla - 1
+        else:
+            centro_columna = columnas_grilla // 2
+            rango_aparicion = self.ancho_area // 2
+            limite_izquierdo = max(0, centro_columna - rango_aparicion)
+            limite_derecho = min(columnas_grilla - 1, centro_columna + rango_aparicion)
+        
+        return random.choices(range(limite_izquierdo, limite_derecho + 1), k=cantidad)
+    
+    def configurar_alimentadores(self, configuraciones):
+        """
+        Reemplaza los alimentadores a partir de su configuración.
+        
+        Parámetros:
+            configuraciones (list): Diccionarios de alimentador (ver Alimentador.desde_dict)
+            
+        Retorna:
+            list: Alimentadores creados
+            
+        Lanza:
+            ValueError: Si alguna configuración es inválida
+        """
+        self.alimentadores = [Alimentador.desde_dict(datos, i) for i, datos in enumerate(configuraciones or [])]
+        return self.alimentadores
+    
+    def factor_caudal(self):
+        """
+        Multiplicador del caudal de los alimentadores según la velocidad actual.
+        
+        Con la velocidad por defecto cada alimentador entrega su tasa
+        configurada; las flechas la escalan proporcionalmente.
+        """
+        return self.velocidad / VELOCIDAD_APARICION_POR_DEFECTO
+    
     def aumentar_velocidad(self):
         """
         Incrementa la velocidad de aparición.
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Frames de la simulación en memoria compartida.
+
+La simulación sin ventana (headless.py --publicar-frames) copia cada tanto
+los planos de la grilla y un resumen de su estado a un bloque de
+multiprocessing.shared_memory. Un visor en otro proceso (visor.py) lee ese
+bloque y dibuja con los mismos renderizadores del juego. El publicador
+nunca espera al visor: si el visor es lento o su ventana se arrastra, solo
+se pierde frames, la física sigue a su ritmo.
+
+Consistencia (seqlock):
+El contador de secuencia de la cabecera es impar mientras el publicador
+copia un frame y par cuando terminó. El lector copia el frame y lo acepta
+solo si vio la misma secuencia par antes y después de copiarlo; si no,
+reintenta o se queda con el frame anterior.
+
+Disposición del bloque:
+- Cabecera de 64 bytes (ver _CABECERA)
+- Plano de colores: un entero 0xFFRRGGBB de 32 bits por celda
+- Plano de tipos: un byte por celda
+- Estado: JSON con el nivel, la aparición, la física y las métricas
+
+El visor puede conectarse y desconectarse en cualquier momento. Al terminar,
+el publicador marca el bloque como inactivo antes de liberarlo, así el
+visor sabe que tiene que volver a esperar.
+"""
+
+import json
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+from grillas import GrillaCompacta
+from core.constantes import FRAMES_PUBLICADOS_POR_SEGUNDO, BYTES_ESTADO_VISOR
+
+# Cabecera: magia, versión, filas, columnas, tamaño de celda, secuencia,
+# publicador activo y largo del estado
+MAGIA_FRAMES = b"PERLVIS\x00"
+VERSION_FRAMES = 1
+_CABECERA = struct.Struct("<8sIIIIQII")
+_DESPLAZAMIENTO_SECUENCIA = 24
+_DESPLAZAMIENTO_ACTIVO = 32
+_DESPLAZAMIENTO_LARGO_ESTADO = 36
+_TAMANO_CABECERA = 64
+
+# Reintentos de lectura cuando el frame cambia mientras se copia
+_INTENTOS_LECTURA = 3
+
+def estado_simulacion(simulacion):
+    """
+    Resume el estado de la simulación que se muestra junto a la grilla.
+
+    Retorna:
+        dict: Valores simples (serializables como JSON) del nivel, la
+              aparición, la entrada, la física y las métricas
+    """
+    nivel = simulacion.sistema_nivel
+    aparicion = simulacion.sistema_aparicion
+    entrada = simulacion.manejador_entrada
+    fisicas = simulacion.motor_fisicas
+    return {
+        "mensaje": simulacion.sistema_mensajes.obtener_mensaje(),
+        "entrada": {"modo": entrada.modo, "pausado": entrada.pausado},
+        "aparicion": {
+            "habilitado": aparicion.habilitado,
+            "velocidad": aparicion.velocidad,
+            "ancho_area": aparicion.ancho_area,
+            "tamaño_cluster": aparicion.tamaño_cluster
+        },
+        "nivel": {
+            "modo_activo": nivel.modo_activo,
+            "posicion_linea": nivel.posicion_linea,
+            "esta_drenando": nivel.esta_drenando,
+            "timer_mensaje_drenaje": nivel.timer_mensaje_drenaje,
+            "compuertas_bloqueadas": nivel.compuertas_bloqueadas,
+            "ocupacion": nivel.sensor.ocupacion() if nivel.sensor is not None else None,
+            "politica_drenaje": nivel.politica_drenaje,
+            "compuertas": [compuerta.resumen() for compuerta in nivel.compuertas]
+        },
+        "fisicas": {"motor": fisicas.motor, "bandas_diferidas": fisicas.bandas_diferidas},
+        "metricas": simulacion.sistema_metricas.resumen()
+    }
+
+def _abrir_bloque(nombre):
+    """
+    Abre un bloque existente sin que este proceso se haga cargo de liberarlo.
+
+    Hasta Python 3.12 el resource tracker registra también los bloques que
+    solo se abren, y los borra cuando termina el proceso que los abrió: un
+    visor que se cierra se llevaría el bloque del publicador.
+    """
+    try:
+        return shared_memory.SharedMemory(nombre, track=False)
+    except TypeError:
+        bloque = shared_memory.SharedMemory(nombre)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(bloque._name, "shared_memory")
+        return bloque
+
+class PublicadorFrames:
+    """
+    Copia frames de la simulación a un bloque de memoria compartida.
+
+    Atributos:
+        nombre (str): Nombre del bloque
+        intervalo (float): Segundos mínimos entre frames publicados
+        publicados (int): Frames copiados al bloque
+    """
+
+    def __init__(self, nombre, frames_por_segundo=FRAMES_PUBLICADOS_POR_SEGUNDO):
+        self.nombre = nombre
+        self.intervalo = 1.0 / frames_por_segundo if frames_por_segundo > 0 else 0.0
+        self.publicados = 0
+        self._bloque = None
+        self._geometria = None
+        self._secuencia = 0
+        self._proximo = 0.0
+
+    def publicar(self, simulacion):
+        """
+        Publica el frame actual si pasó el intervalo desde el anterior.
+
+        Retorna:
+            bool: True si el frame se copió al bloque
+
+        Algoritmo:
+            1. Crea el bloque la primera vez (o si cambió la geometría de la grilla)
+            2. Pasa la secuencia a impar, copia los planos y el estado
+            3. Pasa la secuencia al siguiente par
+        """
+        ahora = time.perf_counter()
+        if ahora < self._proximo:
+            return False
+        self._proximo = ahora + self.intervalo
+
+        grilla = simulacion.grilla
+        geometria = (grilla.filas, grilla.columnas, grilla.tamaño_celda)
+        if geometria != self._geometria:
+            self._crear_bloque(geometria)
+
+        # La grilla compacta se copia directo de sus planos; las demás exportan una copia
+        if isinstance(grilla, GrillaCompacta):
+            tipos, colores = grilla.tipos, grilla.colores
+        else:
+            tipos, colores = grilla.exportar_planos()
+        estado = json.dumps(estado_simulacion(simulacion)).encode("utf-8")
+        if len(estado) > BYTES_ESTADO_VISOR:
+            estado = b""   # El visor conserva el estado anterior
+
+        self._escribir_secuencia(self._secuencia + 1)
+        self._colores[:] = memoryview(colores).cast('B')
+        self._tipos[:] = tipos
+        self._estado[:len(estado)] = estado
+        struct.pack_into("<I", self._bloque.buf, _DESPLAZAMIENTO_LARGO_ESTADO, len(estado))
+        self._escribir_secuencia(self._secuencia + 1)
+        self.publicados += 1
+        return True
+
+    def _crear_bloque(self, geometria):
+        """Crea el bloque para una geometría (reemplaza uno anterior del mismo nombre)"""
+        self.cerrar()
+        filas, columnas, tamaño_celda = geometria
+        celdas = filas * columnas
+        tamaño = _TAMANO_CABECERA + 5 * celdas + BYTES_ESTADO_VISOR
+        try:
+            self._bloque = shared_memory.SharedMemory(self.nombre, create=True, size=tamaño)
+        except FileExistsError:
+            # Bloque huérfano de una corrida que terminó sin liberarlo
+            huerfano = shared_memory.SharedMemory(self.nombre)
+            huerfano.close()
+            huerfano.unlink()
+            self._bloque = shared_memory.SharedMemory(self.nombre, create=True, size=tamaño)
+
+        buffer = self._bloque.buf
+        self._colores = buffer[_TAMANO_CABECERA:_TAMANO_CABECERA + 4 * celdas]
+        self._tipos = buffer[_TAMANO_CABECERA + 4 * celdas:_TAMANO_CABECERA + 5 * celdas]
+        self._estado = buffer[_TAMANO_CABECERA + 5 * celdas:]
+        self._geometria = geometria
+        self._secuencia = 0
+        _CABECERA.pack_into(buffer, 0, MAGIA_FRAMES, VERSION_FRAMES, filas, columnas,
+                            tamaño_celda, 0, 1, 0)
+
+    def _escribir_secuencia(self, secuencia):
+        """Escribe la secuencia en la cabecera (8 bytes alineados)"""
+        self._secuencia = secuencia
+        struct.pack_into("<Q", self._bloque.buf, _DESPLAZAMIENTO_SECUENCIA, secuencia)
+
+    def cerrar(self):
+        """Marca el bloque como inactivo y lo libera (los visores conectados lo sueltan)"""
+        if self._bloque is None:
+            return
+        struct.pack_into("<I", self._bloque.buf, _DESPLAZAMIENTO_ACTIVO, 0)
+        for vista in (self._colores, self._tipos, self._estado):
+            vista.release()
+        self._bloque.close()
+        self._bloque.unlink()
+        self._bloque = None
+        self._geometria = None
+
+class LectorFrames:
+    """
+    Lee desde otro proceso los frames de un PublicadorFrames.
+
+    Atributos:
+        filas, columnas, tamaño_celda (int): Geometría de la grilla publicada
+        secuencia (int): Secuencia del último frame leído
+    """
+
+    def __init__(self, nombre):
+        """
+        Se conecta a un bloque publicado.
+
+        Lanza:
+            FileNotFoundError: Si no hay un bloque con ese nombre
+            ValueError: Si el bloque no es de frames de esta versión o ya fue cerrado
+        """
+        self._bloque = _abrir_bloque(nombre)
+        buffer = self._bloque.buf
+        (magia, version, self.filas, self.columnas, self.tamaño_celda,
+         _, activo, _) = _CABECERA.unpack_from(buffer)
+        if magia != MAGIA_FRAMES or version != VERSION_FRAMES or not activo:
+            self._bloque.close()
+            raise ValueError(f"El bloque {nombre!r} no tiene frames publicados")
+
+        celdas = self.filas * self.columnas
+        self._colores = buffer[_TAMANO_CABECERA:_TAMANO_CABECERA + 4 * celdas]
+        self._tipos = buffer[_TAMANO_CABECERA + 4 * celdas:_TAMANO_CABECERA + 5 * celdas]
+        self._estado = buffer[_TAMANO_CABECERA + 5 * celdas:]
+        self.secuencia = 0
+
+    @property
+    def activo(self):
+        """False cuando el publicador terminó y el bloque ya no se actualiza"""
+        return bool(struct.unpack_from("<I", self._bloque.buf, _DESPLAZAMIENTO_ACTIVO)[0])
+
+    def _leer_secuencia(self):
+        return struct.unpack_from("<Q", self._bloque.buf, _DESPLAZAMIENTO_SECUENCIA)[0]
+
+    def leer(self, tipos, colores):
+        """
+        Copia el último frame publicado a los planos indicados.
+
+        Parámetros:
+            tipos (bytearray): Plano de tipos de destino (filas*columnas)
+            colores (array): Plano de colores de destino, array('I')
+
+        Retorna:
+            dict o None: Estado del frame, o None si no hay un frame nuevo o no
+                         se pudo copiar uno entero (los planos pueden quedar con
+                         una copia parcial que el próximo frame reemplaza)
+        """
+        destino_colores = memoryview(colores).cast('B')
+        for _ in range(_INTENTOS_LECTURA):
+            secuencia = self._leer_secuencia()
+            if secuencia == self.secuencia:
+                return None
+            if secuencia % 2:
+                continue
+            destino_colores[:] = self._colores
+            tipos[:] = self._tipos
+            largo = struct.unpack_from("<I", self._bloque.buf, _DESPLAZAMIENTO_LARGO_ESTADO)[0]
+            estado = bytes(self._estado[:largo])
+            if self._leer_secuencia() == secuencia:
+                self.secuencia = secuencia
+                return json.loads(estado) if estado else {}
+        return None
+
+    def cerrar(self):
+        """Se desconecta del bloque sin liberarlo"""
+        for vista in (self._colores, self._tipos, self._estado):
+            vista.release()
+        self._bloque.close()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Compuertas de descarga del contenedor.
+
+Este módulo modela las bocas de salida del fondo del contenedor: cada
+compuerta ocupa un tramo de columnas de la última fila y deja salir hasta
+`caudal` granos de perlita por paso de simulación. La física normal hace el
+resto: al vaciarse las celdas de la compuerta, los granos de arriba caen y
+se forma el embudo de descarga, así el ciclo de drenaje refleja el caudal
+real de embolsado en lugar de borrar el contenedor de golpe.
+"""
+
+import random
+from particulas import ParticulaPerlita
+from core.constantes import ANCHO_COMPUERTA_POR_DEFECTO, CAUDAL_COMPUERTA_POR_DEFECTO
+
+# Políticas de drenaje soportadas por SistemaNivel
+POLITICAS_DRENAJE = ("compuertas", "temporizado")
+
+class Compuerta:
+    """
+    Una boca de descarga en el fondo del contenedor.
+
+    Atributos:
+        nombre (str): Identificador para reportes
+        posicion (float): Centro de la compuerta como fracción del ancho (0.0 a 1.0)
+        ancho (float): Ancho de la compuerta como fracción del ancho del contenedor
+        caudal (float): Granos por paso que deja salir la compuerta
+        granos_descargados (int): Granos que efectivamente salieron por esta compuerta
+    """
+
+    def __init__(self, nombre, posicion=0.5, ancho=ANCHO_COMPUERTA_POR_DEFECTO,
+                 caudal=CAUDAL_COMPUERTA_POR_DEFECTO):
+        if not 0.0 <= posicion <= 1.0:
+            raise ValueError(f"La posición de la compuerta debe estar entre 0 y 1: {posicion}")
+        if not 0.0 < ancho <= 1.0:
+            raise ValueError(f"El ancho de la compuerta debe estar entre 0 y 1: {ancho}")
+        if caudal <= 0:
+            raise ValueError(f"El caudal de la compuerta debe ser positivo: {caudal}")
+
+        self.nombre = nombre
+        self.posicion = posicion
+        self.ancho = ancho
+        self.caudal = caudal
+        self.granos_descargados = 0
+        self._acumulado = 0.0
+
+    @classmethod
+    def desde_dict(cls, datos, indice=0):
+        """
+        Crea una compuerta desde un diccionario de configuración.
+
+        Ejemplo:
+            {"nombre": "salida 1", "posicion": 0.5, "ancho": 0.1, "caudal": 12}
+
+        Lanza:
+            ValueError: Si hay valores inválidos
+        """
+        try:
+            return cls(
+                nombre=str(datos.get("nombre", f"compuerta {indice + 1}")),
+                posicion=float(datos.get("posicion", 0.5)),
+                ancho=float(datos.get("ancho", ANCHO_COMPUERTA_POR_DEFECTO)),
+                caudal=float(datos.get("caudal", CAUDAL_COMPUERTA_POR_DEFECTO))
+            )
+        except (TypeError, AttributeError):
+            raise ValueError(f"Valores inválidos en la compuerta {indice + 1}: {datos!r}")
+
+    def columnas(self, columnas_grilla):
+        """Retorna el rango de columnas de la grilla que ocupa la compuerta (al menos una)"""
+        ancho = max(1, int(round(self.ancho * columnas_grilla)))
+        inicio = int(round(self.posicion * (columnas_grilla - 1))) - ancho // 2
+        inicio = max(0, min(columnas_grilla - ancho, inicio))
+        return range(inicio, inicio + ancho)
+
+    def tiene_perlita(self, grilla):
+        """Indica si hay perlita en alguna celda de la compuerta (última fila)"""
+        fila = grilla.filas - 1
+        return any(isinstance(grilla.obtener_celda(fila, columna), ParticulaPerlita)
+                   for columna in self.columnas(grilla.columnas))
+
+    def descargar(self, grilla, presupuesto):
+        """
+        Deja salir la perlita de la compuerta en este paso.
+
+        Parámetros:
+            grilla: Grilla del contenedor
+            presupuesto (int): Máximo de granos que todavía se pueden retirar este frame
+
+        Retorna:
+            int: Granos retirados
+
+        El caudal fraccionario se acumula entre pasos, pero el crédito no
+        supera un paso de caudal: una compuerta sin granos encima no junta
+        una descarga grande para el momento en que vuelvan a llegar.
+        """
+        self._acumulado = min(self._acumulado + self.caudal, max(1.0, self.caudal))
+        cupo = min(int(self._acumulado), presupuesto)
+        if cupo <= 0:
+            return 0
+
+        fila = grilla.filas - 1
+        celdas = [(fila, columna) for columna in self.columnas(grilla.columnas)
+                  if isinstance(grilla.obtener_celda(fila, columna), ParticulaPerlita)]
+        if len(celdas) > cupo:
+            # Sortear qué celdas salen para no sesgar el embudo hacia un lado
+            celdas = random.sample(celdas, cupo)
+
+        descargados = grilla.eliminar_particulas_lote(celdas)
+        self._acumulado -= descargados
+        self.granos_descargados += descargados
+        return descargados
+
+    def resumen(self):
+        """Retorna el estado de la compuerta para reportes"""
+        return {
+            "nombre": self.nombre,
+            "posicion": self.posicion,
+            "ancho": self.ancho,
+            "caudal": self.caudal,
+            "granos_descargados": self.granos_descargados
+        }
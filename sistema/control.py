@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+"""
+Control remoto de la simulación por JSON-RPC local.
+
+Expone las mismas operaciones que el teclado (ManejadorInput._manejar_tecla)
+a un programa externo, por ejemplo el controlador de la línea, que ajusta
+la aparición y el nivel a alta frecuencia (headless.py --control).
+
+Protocolo (solo en la interfaz local):
+JSON-RPC 2.0 sobre TCP, un mensaje JSON por línea. Cada línea es una
+petición o un lote (una lista de peticiones); las respuestas vuelven en el
+mismo orden, también una por línea. Las notificaciones (sin "id") se
+aplican pero no se responden. Un cliente puede enviar varias líneas sin
+esperar las respuestas.
+
+Atomicidad:
+El servidor solo valida las peticiones y las encola; el hilo de la
+simulación las aplica entre dos pasos (aplicar_pendientes), de a un lote
+por vez. Un lote se aplica completo en el mismo límite de paso o no se
+aplica:
+- Si alguna petición del lote es inválida, se rechaza el lote entero
+- Un lote admite como máximo una operación que cambia la grilla (reiniciar
+  o cambiar_tamaño_grano); si esa operación falla, los parámetros que el
+  lote ya había cambiado se restauran
+"""
+
+import asyncio
+import json
+from collections import deque, namedtuple
+from sistema.compartido import estado_simulacion
+from sistema.telemetria import ServidorAsyncio
+from core.constantes import (PUERTO_CONTROL, LOTES_CONTROL_PENDIENTES, MOTORES_FISICA,
+                             VELOCIDAD_APARICION_MINIMA, VELOCIDAD_APARICION_MAXIMA,
+                             TAMANO_CLUSTER_MAXIMO)
+
+# Códigos de error de JSON-RPC 2.0 y los propios del servidor
+ERROR_FORMATO = -32700
+ERROR_PETICION = -32600
+ERROR_METODO = -32601
+ERROR_PARAMETROS = -32602
+ERROR_APLICACION = -32000
+ERROR_LOTE_RECHAZADO = -32001
+ERROR_COLA_LLENA = -32002
+
+# Modos de pincel que se pueden elegir (teclas P, R y B)
+MODOS_ENTRADA = ("perlita", "roca", "borrador")
+
+# Parámetros que un lote puede cambiar y se restauran si el lote falla
+_PARAMETROS = (
+    ("sistema_aparicion", "habilitado"), ("sistema_aparicion", "velocidad"),
+    ("sistema_aparicion", "ancho_area"), ("sistema_aparicion", "tamaño_cluster"),
+    ("sistema_nivel", "modo_activo"), ("sistema_nivel", "posicion_linea"),
+    ("manejador_entrada", "modo"), ("manejador_entrada", "pausado"),
+    ("motor_fisicas", "motor")
+)
+
+def parametros_simulacion(simulacion):
+    """Retorna los parámetros de control actuales (los que cambia configurar)"""
+    aparicion = simulacion.sistema_aparicion
+    nivel = simulacion.sistema_nivel
+    return {
+        "aparicion": aparicion.habilitado,
+        "velocidad": aparicion.velocidad,
+        "ancho_area": aparicion.ancho_area,
+        "tamaño_cluster": aparicion.tamaño_cluster,
+        "modo_nivel": nivel.modo_activo,
+        "posicion_linea": nivel.posicion_linea,
+        "modo": simulacion.manejador_entrada.modo,
+        "pausado": simulacion.manejador_entrada.pausado,
+        "motor": simulacion.motor_fisicas.motor
+    }
+
+def _numero(nombre, valor):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise TypeError(f"{nombre} debe ser un número")
+    return valor
+
+def _booleano(nombre, valor):
+    if not isinstance(valor, bool):
+        raise TypeError(f"{nombre} debe ser true o false")
+    return valor
+
+def _validar_sin_parametros():
+    return {}
+
+def _validar_modo(modo):
+    if modo not in MODOS_ENTRADA:
+        raise ValueError(f"Modo desconocido: {modo} (opciones: {', '.join(MODOS_ENTRADA)})")
+    return {"modo": modo}
+
+def _validar_tamaño_grano(tamaño):
+    if isinstance(tamaño, bool) or not isinstance(tamaño, int) or not 1 <= tamaño <= 9:
+        raise ValueError("tamaño debe ser un entero de 1 a 9 (como las teclas 1-9)")
+    return {"tamaño": tamaño}
+
+def _validar_configuracion(aparicion=None, velocidad=None, ancho_area=None, tamaño_cluster=None,
+                           modo_nivel=None, posicion_linea=None, modo=None, pausado=None, motor=None):
+    valores = {}
+    for nombre, valor in (("aparicion", aparicion), ("modo_nivel", modo_nivel), ("pausado", pausado)):
+        if valor is not None:
+            valores[nombre] = _booleano(nombre, valor)
+    for nombre, valor in (("velocidad", velocidad), ("posicion_linea", posicion_linea)):
+        if valor is not None:
+            valores[nombre] = float(_numero(nombre, valor))
+    for nombre, valor in (("ancho_area", ancho_area), ("tamaño_cluster", tamaño_cluster)):
+        if valor is not None:
+            valores[nombre] = int(_numero(nombre, valor))
+    if modo is not None:
+        valores.update(_validar_modo(modo))
+    if motor is not None:
+        if motor not in MOTORES_FISICA:
+            raise ValueError(f"Motor desconocido: {motor} (opciones: {', '.join(MOTORES_FISICA)})")
+        valores["motor"] = motor
+    return valores
+
+def _configurar(simulacion, **valores):
+    """Fija parámetros absolutos, con los mismos límites que el teclado"""
+    aparicion = simulacion.sistema_aparicion
+    nivel = simulacion.sistema_nivel
+    if "aparicion" in valores:
+        aparicion.habilitado = valores["aparicion"]
+    if "velocidad" in valores:
+        aparicion.velocidad = max(VELOCIDAD_APARICION_MINIMA, min(VELOCIDAD_APARICION_MAXIMA, valores["velocidad"]))
+    if "ancho_area" in valores:
+        aparicion.ancho_area = max(5, min(simulacion.grilla.columnas, valores["ancho_area"]))
+    if "tamaño_cluster" in valores:
+        aparicion.tamaño_cluster = max(1, min(TAMANO_CLUSTER_MAXIMO, valores["tamaño_cluster"]))
+    if "modo_nivel" in valores:
+        nivel.modo_activo = valores["modo_nivel"]
+    if "posicion_linea" in valores:
+        nivel.posicion_linea = max(0.1, min(0.9, valores["posicion_linea"]))
+    if "modo" in valores:
+        simulacion.manejador_entrada.modo = valores["modo"]
+    if "pausado" in valores:
+        simulacion.manejador_entrada.pausado = valores["pausado"]
+    if "motor" in valores:
+        simulacion.motor_fisicas.motor = valores["motor"]
+    return parametros_simulacion(simulacion)
+
+def _alternar_pausa(simulacion):
+    entrada = simulacion.manejador_entrada
+    entrada.pausado = not entrada.pausado
+    return entrada.pausado
+
+def _cambiar_modo(simulacion, modo):
+    simulacion.manejador_entrada.modo = modo
+    return modo
+
+def _cambiar_tamaño_grano(simulacion, tamaño):
+    simulacion.cambiar_tamaño_grano(tamaño)
+    return {"columnas": simulacion.grilla.columnas, "filas": simulacion.grilla.filas}
+
+def _reiniciar(simulacion):
+    simulacion.reiniciar()
+    return True
+
+# funcion(simulacion, **parametros validados); validar(*params, **params) -> parámetros validados
+Operacion = namedtuple("Operacion", "funcion validar modifica_grilla")
+
+OPERACIONES = {
+    # Aparición (flechas, Re Pág / Av Pág y A)
+    "aumentar_velocidad": Operacion(lambda simulacion: simulacion.sistema_aparicion.aumentar_velocidad(),
+                                    _validar_sin_parametros, False),
+    "disminuir_velocidad": Operacion(lambda simulacion: simulacion.sistema_aparicion.disminuir_velocidad(),
+                                     _validar_sin_parametros, False),
+    "aumentar_ancho": Operacion(lambda simulacion: simulacion.sistema_aparicion.aumentar_ancho(
+                                    simulacion.grilla.columnas),
+                                _validar_sin_parametros, False),
+    "disminuir_ancho": Operacion(lambda simulacion: simulacion.sistema_aparicion.disminuir_ancho(),
+                                 _validar_sin_parametros, False),
+    "aumentar_cluster": Operacion(lambda simulacion: simulacion.sistema_aparicion.aumentar_cluster(),
+                                  _validar_sin_parametros, False),
+    "disminuir_cluster": Operacion(lambda simulacion: simulacion.sistema_aparicion.disminuir_cluster(),
+                                   _validar_sin_parametros, False),
+    "alternar_aparicion": Operacion(lambda simulacion: simulacion.sistema_aparicion.alternar_estado(),
+                                    _validar_sin_parametros, False),
+    # Nivel (L, Inicio y Fin)
+    "alternar_nivel": Operacion(lambda simulacion: simulacion.sistema_nivel.alternar_modo(),
+                                _validar_sin_parametros, False),
+    "mover_linea_arriba": Operacion(lambda simulacion: simulacion.sistema_nivel.mover_linea_arriba(),
+                                    _validar_sin_parametros, False),
+    "mover_linea_abajo": Operacion(lambda simulacion: simulacion.sistema_nivel.mover_linea_abajo(),
+                                   _validar_sin_parametros, False),
+    # Entrada y física (P / R / B, O y M)
+    "cambiar_modo": Operacion(_cambiar_modo, _validar_modo, False),
+    "alternar_pausa": Operacion(_alternar_pausa, _validar_sin_parametros, False),
+    "alternar_motor": Operacion(lambda simulacion: simulacion.motor_fisicas.alternar_motor(),
+                                _validar_sin_parametros, False),
+    # Valores absolutos y consulta (sin tecla)
+    "configurar": Operacion(_configurar, _validar_configuracion, False),
+    "estado": Operacion(estado_simulacion, _validar_sin_parametros, False),
+    # Grilla (Espacio y 1-9)
+    "reiniciar": Operacion(_reiniciar, _validar_sin_parametros, True),
+    "cambiar_tamaño_grano": Operacion(_cambiar_tamaño_grano, _validar_tamaño_grano, True),
+}
+
+def _error(identificador, codigo, mensaje):
+    return {"jsonrpc": "2.0", "id": identificador, "error": {"code": codigo, "message": mensaje}}
+
+def _resultado(identificador, resultado):
+    return {"jsonrpc": "2.0", "id": identificador, "result": resultado}
+
+class _PeticionInvalida(Exception):
+    """Petición rechazada antes de encolarla; lleva la respuesta de error"""
+
+    def __init__(self, respuesta):
+        super().__init__(respuesta["error"]["message"])
+        self.respuesta = respuesta
+
+def _preparar(peticion):
+    """
+    Valida una petición y la convierte en (id, notificación, operación, parámetros).
+
+    Lanza:
+        _PeticionInvalida: Con el id (si se pudo leer) y la respuesta de error
+    """
+    if not isinstance(peticion, dict) or peticion.get("jsonrpc") != "2.0":
+        raise _PeticionInvalida(_error(None, ERROR_PETICION, "Petición JSON-RPC 2.0 inválida"))
+    notificacion = "id" not in peticion
+    identificador = peticion.get("id")
+    metodo = peticion.get("method")
+    parametros = peticion.get("params", [])
+    if not isinstance(metodo, str) or not isinstance(parametros, (list, dict)):
+        raise _PeticionInvalida(_error(identificador, ERROR_PETICION, "Falta method o params no es lista ni objeto"))
+    operacion = OPERACIONES.get(metodo)
+    if operacion is None:
+        raise _PeticionInvalida(_error(identificador, ERROR_METODO, f"Operación desconocida: {metodo}"))
+    try:
+        if isinstance(parametros, list):
+            validados = operacion.validar(*parametros)
+        else:
+            validados = operacion.validar(**parametros)
+    except (TypeError, ValueError) as error:
+        raise _PeticionInvalida(_error(identificador, ERROR_PARAMETROS, f"{metodo}: {error}"))
+    return identificador, notificacion, operacion, validados
+
+class ServidorControl(ServidorAsyncio):
+    """
+    Servidor de control en un hilo con su propio bucle de asyncio.
+
+    El servidor nunca toca la simulación: valida los lotes y los deja en una
+    cola. El hilo de la simulación llama a aplicar_pendientes() entre dos
+    pasos, aplica los lotes en orden de llegada y el servidor envía las
+    respuestas. Al detenerlo, los lotes sin aplicar se descartan.
+
+    Atributos:
+        host (str): Dirección local donde escucha
+        puerto (int): Puerto TCP (el asignado si se pidió 0)
+        lotes_aplicados (int): Lotes aplicados por la simulación
+        lotes_fallidos (int): Lotes deshechos porque una operación falló
+    """
+
+    nombre_hilo = "control"
+
+    def __init__(self, puerto=PUERTO_CONTROL, host="127.0.0.1"):
+        """
+        Lanza:
+            ValueError: Si host no es una dirección de loopback
+        """
+        super().__init__(puerto, host, "El control remoto")
+        self.lotes_aplicados = 0
+        self.lotes_fallidos = 0
+
+        self._conexiones = set()
+        # deque: append y popleft son seguros entre el hilo del servidor y el de la simulación
+        self._cola = deque()
+
+    def _cerrar_conexiones(self):
+        for tarea in list(self._conexiones):
+            tarea.cancel()
+        self._cola.clear()
+
+    def aplicar_pendientes(self, simulacion):
+        """
+        Aplica los lotes encolados (llamar desde el hilo de la simulación, entre pasos).
+
+        Retorna:
+            int: Lotes aplicados en esta llamada
+        """
+        aplicados = 0
+        while self._cola:
+            preparadas, futuro = self._cola.popleft()
+            respuestas = self._aplicar_lote(simulacion, preparadas)
+            self._bucle.call_soon_threadsafe(_resolver, futuro, respuestas)
+            aplicados += 1
+        return aplicados
+
+    def _aplicar_lote(self, simulacion, preparadas):
+        """
+        Aplica un lote completo o, si una operación falla, restaura los parámetros.
+
+        Cualquier excepción de una operación deshace el lote y se responde
+        con ERROR_APLICACION: el cliente nunca queda esperando un futuro que
+        no se resuelve y el hilo de la simulación sigue corriendo.
+
+        Retorna:
+            list: Una respuesta por petición (None para las notificaciones)
+        """
+        anteriores = [(sistema, atributo, getattr(getattr(simulacion, sistema), atributo))
+                      for sistema, atributo in _PARAMETROS]
+        resultados = []
+        try:
+            for _, _, operacion, parametros in preparadas:
+                resultados.append(operacion.funcion(simulacion, **parametros))
+        except Exception as error:
+            for sistema, atributo, valor in anteriores:
+                setattr(getattr(simulacion, sistema), atributo, valor)
+            self.lotes_fallidos += 1
+            mensaje = (f"Lote deshecho: {error}" if isinstance(error, ValueError)
+                       else f"Lote deshecho: {type(error).__name__}: {error}")
+            return [None if notificacion else _error(identificador, ERROR_APLICACION, mensaje)
+                    for identificador, notificacion, _, _ in preparadas]
+        self.lotes_aplicados += 1
+        return [None if notificacion else _resultado(identificador, resultado)
+                for (identificador, notificacion, _, _), resultado in zip(preparadas, resultados)]
+
+    async def _atender(self, lector, escritor):
+        """
+        Lee las líneas de un cliente y envía las respuestas en el mismo orden.
+
+        Una tarea lee y encola; otra espera cada respuesta y la escribe, así
+        un cliente puede enviar varias líneas sin esperar a que se apliquen.
+        La cola propia de la conexión está acotada: si el cliente no lee sus
+        respuestas, deja de leerse lo que envía.
+        """
+        tarea = asyncio.current_task()
+        self._conexiones.add(tarea)
+        respuestas = asyncio.Queue(LOTES_CONTROL_PENDIENTES)
+        escritura = asyncio.ensure_future(self._escribir(escritor, respuestas))
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                if linea.strip():
+                    await respuestas.put(self._recibir(linea))
+            await respuestas.put(None)
+            await escritura
+        except (ConnectionError, ValueError, asyncio.CancelledError):
+            # ValueError: línea más larga que el límite del lector
+            pass
+        finally:
+            escritura.cancel()
+            self._conexiones.discard(tarea)
+            escritor.close()
+
+    def _recibir(self, linea):
+        """
+        Valida una línea y encola su lote.
+
+        Retorna:
+            (asyncio.Future, bool): Futuro con la lista de respuestas y si la
+                línea era un lote (las respuestas de un lote van en una lista)
+        """
+        futuro = self._bucle.create_future()
+        try:
+            mensaje = json.loads(linea)
+        except ValueError:
+            futuro.set_result([_error(None, ERROR_FORMATO, "JSON inválido")])
+            return futuro, False
+        es_lote = isinstance(mensaje, list)
+        peticiones = mensaje if es_lote else [mensaje]
+        if not peticiones:
+            futuro.set_result([_error(None, ERROR_PETICION, "Lote vacío")])
+            return futuro, False
+
+        preparadas, errores = [], []
+        for peticion in peticiones:
+            try:
+                preparadas.append(_preparar(peticion))
+            except _PeticionInvalida as invalida:
+                errores.append(invalida.respuesta)
+        modifican_grilla = sum(operacion.modifica_grilla for _, _, operacion, _ in preparadas)
+        if not errores and modifican_grilla > 1:
+            errores.append(_error(None, ERROR_PETICION, "Un lote admite una sola operación sobre la grilla"))
+
+        if errores:
+            rechazadas = [_error(identificador, ERROR_LOTE_RECHAZADO, "Lote rechazado: no se aplicó ninguna operación")
+                          for identificador, notificacion, _, _ in preparadas if not notificacion]
+            futuro.set_result(errores + rechazadas)
+        elif len(self._cola) >= LOTES_CONTROL_PENDIENTES:
+            futuro.set_result([None if notificacion else
+                               _error(identificador, ERROR_COLA_LLENA, "Demasiados lotes sin aplicar")
+                               for identificador, notificacion, _, _ in preparadas])
+        else:
+            self._cola.append((preparadas, futuro))
+        return futuro, es_lote
+
+    async def _escribir(self, escritor, respuestas):
+        """Escribe las respuestas en el orden en que llegaron las líneas"""
+        while True:
+            pendiente = await respuestas.get()
+            if pendiente is None:
+                return
+            futuro, es_lote = pendiente
+            contenido = [respuesta for respuesta in await futuro if respuesta is not None]
+            if not contenido:
+                continue   # Solo notificaciones
+            escritor.write(json.dumps(contenido if es_lote else contenido[0]).encode("utf-8") + b"\n")
+            await escritor.drain()
+
+def _resolver(futuro, respuestas):
+    """Completa el futuro de un lote (en el hilo del servidor) si nadie lo canceló"""
+    if not futuro.done():
+        futuro.set_result(respuestas)
+
+class ClienteControl:
+    """
+    Cliente asyncio del control remoto.
+
+    Ejemplo:
+        cliente = await ClienteControl.conectar(8766)
+        await cliente.llamar("configurar", velocidad=2.5, posicion_linea=0.4)
+        await cliente.lote([("aumentar_cluster", {}), ("mover_linea_arriba", {})])
+    """
+
+    def __init__(self, lector, escritor):
+        self._lector = lector
+        self._escritor = escritor
+        self._siguiente_id = 0
+
+    @classmethod
+    async def conectar(cls, puerto=PUERTO_CONTROL, host="127.0.0.1"):
+        lector, escritor = await asyncio.open_connection(host, puerto)
+        return cls(lector, escritor)
+
+    def _peticion(self, metodo, parametros):
+        self._siguiente_id += 1
+        return {"jsonrpc": "2.0", "id": self._siguiente_id, "method": metodo, "params": parametros}
+
+    async def _enviar(self, mensaje):
+        self._escritor.write(json.dumps(mensaje).encode("utf-8") + b"\n")
+        await self._escritor.drain()
+        return json.loads(await self._lector.readline())
+
+    async def llamar(self, metodo, *args, **kwargs):
+        """
+        Aplica una operación y retorna su resultado.
+
+        Lanza:
+            RuntimeError: Si el servidor respondió con un error
+        """
+        respuesta = await self._enviar(self._peticion(metodo, kwargs or list(args)))
+        if "error" in respuesta:
+            raise RuntimeError(respuesta["error"]["message"])
+        return respuesta["result"]
+
+    async def lote(self, operaciones):
+        """
+        Aplica varias operaciones en el mismo paso.
+
+        Parámetros:
+            operaciones (list): Pares (método, parámetros como lista o dict)
+
+        Retorna:
+            list: Resultados en el mismo orden
+
+        Lanza:
+            RuntimeError: Si el lote fue rechazado o deshecho
+        """
+        peticiones = [self._peticion(metodo, parametros) for metodo, parametros in operaciones]
+        respuestas = await self._enviar(peticiones)
+        if isinstance(respuestas, dict):
+            respuestas = [respuestas]   # Error de todo el mensaje
+        errores = [respuesta["error"]["message"] for respuesta in respuestas if "error" in respuesta]
+        if errores:
+            raise RuntimeError("; ".join(errores))
+        por_id = {respuesta["id"]: respuesta["result"] for respuesta in respuestas}
+        return [por_id[peticion["id"]] for peticion in peticiones]
+
+    async def cerrar(self):
+        self._escritor.close()
+        await self._escritor.wait_closed()
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas de la simulación en formato Prometheus.
+
+Para las corridas largas (pruebas de resistencia de horas) headless.py
+--metricas sirve un endpoint HTTP /metrics desde un hilo aparte. Las
+series permiten ver pérdidas de memoria y frames que se vuelven lentos
+con el tiempo:
+- perlita_duracion_fase_segundos: histograma por fase del paso (drenaje,
+  aparición y física) y perlita_duracion_frame_segundos para el frame entero
+- perlita_granos: granos en la grilla por tipo
+- perlita_granos_aparecidos_total, perlita_granos_drenados_total y
+  perlita_ciclos_drenaje_total: contadores de la línea
+- perlita_duracion_ciclo_drenaje_segundos: histograma de los ciclos de drenaje
+- perlita_pausa_gc_segundos: histograma de las pausas del recolector de
+  basura por generación (gc.callbacks)
+- perlita_memoria_residente_bytes: memoria física del proceso (RSS)
+
+Los valores los escribe el hilo de la simulación (registrar_frame) y el
+recolector de basura; el hilo HTTP solo los lee para armar el texto.
+Los granos se cuentan en el hilo de la simulación cada
+INTERVALO_CONTEO_METRICAS segundos, así el servidor nunca recorre la grilla.
+"""
+
+import bisect
+import gc
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from grillas import GrillaCompacta
+from particulas import PERLITA, ROCA
+from sistema.telemetria import verificar_host_local
+from core.utilidades import memoria_residente
+from core.constantes import (PUERTO_METRICAS, INTERVALO_CONTEO_METRICAS, LIMITES_HISTOGRAMA_FRAME,
+                             LIMITES_HISTOGRAMA_CICLO, LIMITES_HISTOGRAMA_GC)
+
+# Tipos de grano que se cuentan, con el nombre de su etiqueta
+TIPOS_CONTADOS = (("perlita", PERLITA), ("roca", ROCA))
+
+FASES_PASO = ("drenaje", "aparicion", "fisica")
+
+class Histograma:
+    """
+    Histograma acumulativo con límites fijos, como los de Prometheus.
+
+    observar() solo incrementa una cubeta y la suma, sin crear objetos, así
+    se puede llamar en cada frame y desde gc.callbacks.
+    """
+
+    def __init__(self, limites):
+        self.limites = tuple(limites)
+        self.cubetas = [0] * (len(self.limites) + 1)   # La última es +Inf
+        self.suma = 0.0
+
+    def observar(self, valor):
+        self.cubetas[bisect.bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+
+    def lineas(self, nombre, etiquetas=""):
+        """Líneas de texto de las cubetas acumuladas, la suma y la cuenta"""
+        separador = "," if etiquetas else ""
+        acumulado = 0
+        lineas = []
+        for limite, cantidad in zip(self.limites + ("+Inf",), list(self.cubetas)):
+            acumulado += cantidad
+            lineas.append(f'{nombre}_bucket{{{etiquetas}{separador}le="{limite}"}} {acumulado}')
+        etiquetas = f"{{{etiquetas}}}" if etiquetas else ""
+        lineas.append(f"{nombre}_sum{etiquetas} {self.suma}")
+        lineas.append(f"{nombre}_count{etiquetas} {acumulado}")
+        return lineas
+
+def contar_granos(grilla):
+    """Cuenta las celdas de cada tipo de TIPOS_CONTADOS"""
+    if isinstance(grilla, GrillaCompacta):
+        return {nombre: grilla.contar_celdas(tipo) for nombre, tipo in TIPOS_CONTADOS}
+    tipos = grilla.exportar_planos()[0]
+    return {nombre: tipos.count(tipo) for nombre, tipo in TIPOS_CONTADOS}
+
+class ExportadorMetricas:
+    """
+    Servidor HTTP de /metrics en un hilo aparte.
+
+    Uso desde el bucle de la simulación:
+        exportador.conectar(simulacion)     # tiempos por fase y contadores
+        exportador.registrar_frame(simulacion, segundos)
+
+    Atributos:
+        host (str): Dirección local donde escucha
+        puerto (int): Puerto TCP (el asignado si se pidió 0)
+    """
+
+    def __init__(self, puerto=PUERTO_METRICAS, host="127.0.0.1"):
+        """
+        Lanza:
+            ValueError: Si host no es una dirección de loopback
+        """
+        verificar_host_local(host, "El exportador de métricas")
+        self.host = host
+        self.puerto = puerto
+
+        self.fases = {fase: Histograma(LIMITES_HISTOGRAMA_FRAME) for fase in FASES_PASO}
+        self.frames = Histograma(LIMITES_HISTOGRAMA_FRAME)
+        self.ciclos = Histograma(LIMITES_HISTOGRAMA_CICLO)
+        self.pausas_gc = [Histograma(LIMITES_HISTOGRAMA_GC) for _ in range(3)]
+        self.recolectados_gc = 0
+        self.granos = {nombre: 0 for nombre, _ in TIPOS_CONTADOS}
+
+        self._metricas = None
+        self._ciclos_vistos = 0
+        self._proximo_conteo = 0.0
+        self._inicio_gc = None
+        self._servidor = None
+        self._hilo = None
+
+    def conectar(self, simulacion):
+        """Registra los tiempos de cada fase de los pasos de esta simulación y sus contadores"""
+        simulacion.registro_fases = self.registrar_fases
+        self._metricas = simulacion.sistema_metricas
+        self._ciclos_vistos = self._metricas.ciclos_completados
+
+    def registrar_fases(self, drenaje, aparicion, fisica):
+        """Observa los segundos de cada fase de un paso (lo llama Simulacion)"""
+        self.fases["drenaje"].observar(drenaje)
+        self.fases["aparicion"].observar(aparicion)
+        self.fases["fisica"].observar(fisica)
+
+    def registrar_frame(self, simulacion, segundos):
+        """
+        Observa la duración de un frame y los ciclos de drenaje terminados.
+
+        Parámetros:
+            simulacion (Simulacion): Simulación que se mide
+            segundos (float): Duración del frame completo, incluida la publicación
+
+        Algoritmo:
+            1. Agrega el frame al histograma
+            2. Observa los ciclos de drenaje que terminaron desde el frame anterior
+            3. Cada INTERVALO_CONTEO_METRICAS segundos, cuenta los granos por tipo
+        """
+        self.frames.observar(segundos)
+        metricas = simulacion.sistema_metricas
+        nuevos = metricas.ciclos_completados - self._ciclos_vistos
+        if nuevos:
+            # El historial es circular: si terminaron más ciclos que su capacidad, se observan los que quedan
+            for duracion in list(metricas.duracion_ciclos)[-nuevos:]:
+                self.ciclos.observar(duracion)
+            self._ciclos_vistos = metricas.ciclos_completados
+
+        ahora = time.perf_counter()
+        if ahora >= self._proximo_conteo:
+            self._proximo_conteo = ahora + INTERVALO_CONTEO_METRICAS
+            self.granos = contar_granos(simulacion.grilla)
+
+    def _al_recolectar(self, fase, informacion):
+        """Mide cada pausa del recolector de basura (callback de gc.callbacks)"""
+        if fase == "start":
+            self._inicio_gc = time.perf_counter()
+        elif self._inicio_gc is not None:
+            self.pausas_gc[informacion["generation"]].observar(time.perf_counter() - self._inicio_gc)
+            self.recolectados_gc += informacion["collected"]
+            self._inicio_gc = None
+
+    def texto(self):
+        """Arma el texto de /metrics (formato de exposición de Prometheus 0.0.4)"""
+        lineas = ["# HELP perlita_duracion_fase_segundos Duración de cada fase del paso de simulación",
+                  "# TYPE perlita_duracion_fase_segundos histogram"]
+        for fase, histograma in self.fases.items():
+            lineas += histograma.lineas("perlita_duracion_fase_segundos", f'fase="{fase}"')
+        lineas += ["# HELP perlita_duracion_frame_segundos Duración del frame completo",
+                   "# TYPE perlita_duracion_frame_segundos histogram"]
+        lineas += self.frames.lineas("perlita_duracion_frame_segundos")
+
+        lineas += ["# HELP perlita_granos Granos en la grilla por tipo",
+                   "# TYPE perlita_granos gauge"]
+        lineas += [f'perlita_granos{{tipo="{tipo}"}} {cantidad}' for tipo, cantidad in self.granos.items()]
+        # Los contadores se leen directo de SistemaMetricas (enteros que solo crecen)
+        metricas = self._metricas
+        for nombre, atributo, ayuda in (
+                ("perlita_granos_aparecidos_total", "granos_aparecidos", "Granos generados"),
+                ("perlita_granos_drenados_total", "granos_drenados", "Granos retirados por el drenaje"),
+                ("perlita_ciclos_drenaje_total", "ciclos_completados", "Ciclos de drenaje terminados")):
+            valor = getattr(metricas, atributo) if metricas is not None else 0
+            lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} counter", f"{nombre} {valor}"]
+        lineas += ["# HELP perlita_duracion_ciclo_drenaje_segundos Duración de los ciclos de drenaje",
+                   "# TYPE perlita_duracion_ciclo_drenaje_segundos histogram"]
+        lineas += self.ciclos.lineas("perlita_duracion_ciclo_drenaje_segundos")
+
+        lineas += ["# HELP perlita_pausa_gc_segundos Pausas del recolector de basura por generación",
+                   "# TYPE perlita_pausa_gc_segundos histogram"]
+        for generacion, histograma in enumerate(self.pausas_gc):
+            lineas += histograma.lineas("perlita_pausa_gc_segundos", f'generacion="{generacion}"')
+        lineas += ["# HELP perlita_gc_recolectados_total Objetos liberados por el recolector de basura",
+                   "# TYPE perlita_gc_recolectados_total counter",
+                   f"perlita_gc_recolectados_total {self.recolectados_gc}",
+                   "# HELP perlita_gc_pendientes Objetos contados por generación desde la última recolección",
+                   "# TYPE perlita_gc_pendientes gauge"]
+        lineas += [f'perlita_gc_pendientes{{generacion="{generacion}"}} {cantidad}'
+                   for generacion, cantidad in enumerate(gc.get_count())]
+
+        residente = memoria_residente()
+        if residente is not None:
+            lineas += ["# HELP perlita_memoria_residente_bytes Memoria física del proceso (RSS)",
+                       "# TYPE perlita_memoria_residente_bytes gauge",
+                       f"perlita_memoria_residente_bytes {residente}"]
+        return "\n".join(lineas) + "\n"
+
+    def iniciar(self):
+        """Arranca el servidor HTTP en un hilo y empieza a medir las pausas del recolector"""
+        exportador = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                contenido = exportador.texto().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(contenido)))
+                self.end_headers()
+                self.wfile.write(contenido)
+
+            def log_message(self, formato, *args):
+                pass   # Un scrape cada pocos segundos no debe ensuciar la consola
+
+        self._servidor = ThreadingHTTPServer((self.host, self.puerto), Manejador)
+        self._servidor.daemon_threads = True
+        self.puerto = self._servidor.server_address[1]
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name="metricas", daemon=True)
+        self._hilo.start()
+        gc.callbacks.append(self._al_recolectar)
+
+    def detener(self):
+        """Deja de medir el recolector, cierra el servidor y espera al hilo"""
+        if self._servidor is None:
+            return
+        if self._al_recolectar in gc.callbacks:
+            gc.callbacks.remove(self._al_recolectar)
+        self._servidor.shutdown()
+        self._servidor.server_close()
+        self._hilo.join()
+        self._servidor = None
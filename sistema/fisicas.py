@@ -8,12 +8,24 @@ de colisiones, aplicación de gravedad y manejo de clusters de partículas.
 
 Funcionalidades principales:
 - Actualización de física de partículas con gravedad
-- Generación de clusters de partículas de perlita
+- Generación de clusters de partículas de perlita (individual o por lote)
 - Aplicación de herramientas de dibujo (pincel)
 - Optimización de rendimiento con procesamiento direccional alternado
+- Paso por bandas marcadas con presupuesto de tiempo por frame
+- Núcleo compilado opcional (numba) para la grilla compacta, ver sistema/fisicas_jit.py
+- Motor alternativo por bloques de Margolus, ver sistema/margolus.py
 """
 
-from core.constantes import PROBABILIDAD_APARICION_PERLITA
+import math
+import random
+import time
+from particulas import ParticulaPerlita, ParticulaRoca, VACIO, PERLITA, ROCA, generar_colores
+from grillas import GrillaCompacta, GrillaDispersa
+from core.constantes import (PROBABILIDAD_APARICION_PERLITA, ALTO_BANDA_FISICA, USAR_NUCLEO_JIT,
+                             MOTORES_FISICA, MOTOR_FISICA_POR_DEFECTO)
+from core.utilidades import linea_bresenham
+from sistema.fisicas_jit import cargar_nucleo
+from sistema.margolus import MotorMargolus
 
 class MotorFisicas:
     """
@@ -28,9 +40,50 @@ class MotorFisicas:
         """
         Inicializa el motor de físicas.
         
-        Queda planteado para futuras implementaciones.
+        Guarda el caché de máscaras del pincel, indexado por (tamaño, forma),
+        y el estado del paso por bandas entre frames.
         """
-        pass
+        self._mascaras_pincel = {}
+        
+        # Banda donde se cortó el último frame por falta de presupuesto (None = ninguna)
+        self._banda_pendiente = None
+        self.bandas_diferidas = 0          # Bandas que quedaron para el frame siguiente
+        self.bandas_diferidas_total = 0    # Acumulado de bandas diferidas en la sesión
+        self.frames_con_diferidas = 0      # Frames que no alcanzaron a procesar todas las bandas
+        
+        # Núcleo compilado para la grilla compacta; se carga al primer paso que lo necesita
+        self.usar_jit = USAR_NUCLEO_JIT
+        self._nucleo = None                # None = sin resolver, False = numba no disponible
+        
+        # Motor activo: recorrido secuencial por bandas o bloques de Margolus
+        self.motor = MOTOR_FISICA_POR_DEFECTO
+        self.margolus = MotorMargolus()
+    
+    def actualizar(self, grilla, presupuesto=None):
+        """
+        Aplica un paso de física con el motor activo.
+        
+        Parámetros:
+            grilla: La grilla que contiene las partículas a actualizar
+            presupuesto (float, opcional): Segundos disponibles para el motor
+                secuencial (ver actualizar_por_bandas); el de Margolus procesa
+                siempre la región activa completa
+                
+        Retorna:
+            int: Bandas que quedaron para el frame siguiente (0 con Margolus)
+        """
+        if self.motor == "margolus":
+            self.margolus.paso(grilla)
+            self.bandas_diferidas = 0
+            return 0
+        return self.actualizar_por_bandas(grilla, presupuesto)
+    
+    def alternar_motor(self):
+        """Pasa al siguiente motor de MOTORES_FISICA y retorna su nombre"""
+        self.motor = MOTORES_FISICA[(MOTORES_FISICA.index(self.motor) + 1) % len(MOTORES_FISICA)]
+        # Al volver al secuencial se revisan todas las bandas: Margolus no las desmarca
+        self._banda_pendiente = None
+        return self.motor
     
     def actualizar_particulas(self, grilla):
         """
@@ -45,31 +98,212 @@ class MotorFisicas:
             grilla: La grilla que contiene las partículas a actualizar
             
         Algoritmo:
-            1. Procesa filas desde abajo hacia arriba (gravedad)
+            1. Procesa filas desde abajo hacia arriba (gravedad), solo en el
+               rango y los tramos de columnas que la grilla reporta como activos
             2. Alterna dirección de columnas para evitar sesgos visuales
             3. Actualiza posición de cada partícula de perlita
             4. Mueve partículas a nuevas posiciones si es necesario
         """
-        from particulas import ParticulaPerlita
+        # Recorrer solo las filas y tramos de columnas que pueden tener partículas
+        # (en la grilla dispersa, las teselas reservadas)
+        fila_inicio, fila_fin = grilla.rango_filas_activas()
         
         # Actualizar partículas existentes desde abajo hacia arriba para simular gravedad
-        for fila in range(grilla.filas - 2, -1, -1):
-            # Alternar dirección de procesamiento para evitar sesgos visuales
-            if fila % 2 == 0:
-                rango_columnas = range(grilla.columnas)
-            else:
-                rango_columnas = reversed(range(grilla.columnas))
-
-            for columna in rango_columnas:
-                particula = grilla.obtener_celda(fila, columna)
-                if isinstance(particula, ParticulaPerlita):
-                    # Calcular nueva posición basada en física de la partícula
-                    nueva_posicion = particula.actualizar(grilla, fila, columna)
-                    
-                    # Si la partícula se movió, actualizar su posición en la grilla
-                    if nueva_posicion != (fila, columna):
-                        grilla.establecer_celda(nueva_posicion[0], nueva_posicion[1], particula)
-                        grilla.eliminar_particula(fila, columna)
+        self._actualizar_filas(grilla, fila_inicio, min(fila_fin, grilla.filas - 1))
+    
+    def actualizar_por_bandas(self, grilla, presupuesto=None):
+        """
+        Actualiza solo las bandas de filas marcadas, dentro de un presupuesto de tiempo.
+        
+        Parámetros:
+            grilla: La grilla que contiene las partículas a actualizar
+            presupuesto (float, opcional): Segundos disponibles para la física
+                en este frame; None procesa todas las bandas marcadas
+                
+        Retorna:
+            int: Cantidad de bandas que quedaron para el frame siguiente
+            
+        Algoritmo:
+            1. Activa las marcas de la grilla la primera vez (todas marcadas)
+            2. Recorre las bandas de abajo hacia arriba, empezando por
+               la banda donde se cortó el frame anterior: el trabajo pendiente
+               va primero y ninguna banda queda postergada indefinidamente
+            3. Procesa banda por banda (desmarcándola antes; los granos que se
+               mueven la vuelven a marcar) hasta agotar el presupuesto,
+               siempre al menos una banda por frame
+            4. Las bandas sin procesar conservan su marca y se informan como
+               diferidas; la simulación se hace más lenta en vez de trabar el frame
+        """
+        if grilla.bandas_sucias is None:
+            grilla.activar_bandas_sucias(ALTO_BANDA_FISICA)
+        sucias = grilla.bandas_sucias
+        alto = grilla.alto_banda
+        
+        # La última fila nunca se mueve: los granos del fondo no tienen adónde caer
+        fila_inicio, fila_fin = grilla.rango_filas_activas()
+        fila_fin = min(fila_fin, grilla.filas - 1)
+        if fila_fin <= fila_inicio:
+            self._banda_pendiente = None
+            self.bandas_diferidas = 0
+            return 0
+        
+        # Orden de visita: de abajo hacia arriba, empezando por la banda pendiente
+        bandas = range((fila_fin - 1) // alto, fila_inicio // alto - 1, -1)
+        pendiente = self._banda_pendiente
+        if pendiente is not None and bandas[-1] <= pendiente <= bandas[0]:
+            corte = bandas.index(pendiente)
+            bandas = list(bandas[corte:]) + list(bandas[:corte])
+        
+        # Las marcas se consultan al visitar cada banda: un grano que sale de la
+        # fila superior de una banda despierta a la de arriba en el mismo frame
+        limite = None if presupuesto is None else time.perf_counter() + presupuesto
+        procesadas = 0
+        diferidas = 0
+        self._banda_pendiente = None
+        for indice, banda in enumerate(bandas):
+            if not sucias[banda]:
+                continue
+            if procesadas and limite is not None and time.perf_counter() >= limite:
+                diferidas = sum(1 for resto in bandas[indice:] if sucias[resto])
+                self._banda_pendiente = banda
+                break
+            sucias[banda] = 0
+            procesadas += 1
+            self._actualizar_filas(grilla, max(banda * alto, fila_inicio), min((banda + 1) * alto, fila_fin))
+        
+        self.bandas_diferidas = diferidas
+        if diferidas:
+            self.bandas_diferidas_total += diferidas
+            self.frames_con_diferidas += 1
+        return diferidas
+    
+    def nucleo_para(self, grilla):
+        """
+        Obtiene el núcleo compilado si corresponde usarlo con esta grilla.
+        
+        Retorna:
+            NucleoCaida o None: El núcleo si usar_jit está activo, la grilla es
+            compacta y numba está instalado; None para seguir por el camino de Python
+        """
+        if not self.usar_jit or not isinstance(grilla, GrillaCompacta):
+            return None
+        if self._nucleo is None:
+            self._nucleo = cargar_nucleo() or False
+        return self._nucleo or None
+    
+    def _actualizar_filas(self, grilla, fila_inicio, fila_fin):
+        """Aplica la física a las filas fila_fin - 1 ... fila_inicio, con el núcleo compilado si está disponible"""
+        nucleo = self.nucleo_para(grilla)
+        if nucleo is not None:
+            nucleo.actualizar_filas(grilla, fila_inicio, fila_fin)
+            return
+        if isinstance(grilla, GrillaDispersa):
+            for fila in range(fila_fin - 1, fila_inicio - 1, -1):
+                self._actualizar_fila_dispersa(grilla, fila)
+            return
+        for fila in range(fila_fin - 1, fila_inicio - 1, -1):
+            self._actualizar_fila(grilla, fila)
+    
+    def _actualizar_fila(self, grilla, fila):
+        """Aplica la física a los granos de perlita de una fila (ver actualizar_particulas)"""
+        segmentos = grilla.segmentos_activos(fila)
+        if not segmentos:
+            return
+        
+        # Alternar dirección de procesamiento para evitar sesgos visuales (los
+        # tramos se recorren con range, sin armar una lista de columnas por fila)
+        if fila % 2 == 0:
+            for inicio, fin in segmentos:
+                self._actualizar_tramo(grilla, fila, range(inicio, fin))
+        else:
+            for inicio, fin in reversed(segmentos):
+                self._actualizar_tramo(grilla, fila, range(fin - 1, inicio - 1, -1))
+    
+    def _actualizar_tramo(self, grilla, fila, columnas):
+        """Mueve los granos de perlita de un tramo de la fila, en el orden de columnas"""
+        obtener_celda = grilla.obtener_celda
+        for columna in columnas:
+            particula = obtener_celda(fila, columna)
+            if isinstance(particula, ParticulaPerlita):
+                # Columna de la fila siguiente adonde cae, o None si queda en su lugar
+                destino = particula.actualizar(grilla, fila, columna)
+                if destino is not None:
+                    grilla.mover_particula(fila, columna, fila + 1, destino)
+    
+    def _actualizar_fila_dispersa(self, grilla, fila):
+        """
+        Aplica la física a una fila de GrillaDispersa leyendo los planos de sus teselas.
+        
+        Recorre las teselas en el mismo orden que _actualizar_fila y aplica la
+        misma regla que ParticulaPerlita.actualizar (con el mismo consumo de
+        random), pero busca la perlita con bytearray.find dentro de la fila de
+        cada tesela y consulta la fila de abajo indexando el plano de tipos de
+        la tesela de abajo, sin pasar por obtener_celda. Solo las diagonales
+        que salen de la tesela buscan la vecina en el diccionario.
+        """
+        lado = grilla.lado_tesela
+        desplazamiento = fila % lado
+        teselas = grilla.teselas
+        if fila // lado not in teselas:
+            return
+        columnas = grilla.columnas
+        fila_abajo = fila + 1
+        fila_tesela_abajo = fila_abajo // lado
+        base_abajo = (fila_abajo % lado) * lado
+        mover = grilla.mover_desde_tesela
+        
+        ordenadas = grilla.teselas_ordenadas(fila // lado)
+        hacia_izquierda = fila % 2 == 1
+        for columna_tesela, tesela in (reversed(ordenadas) if hacia_izquierda else ordenadas):
+            if not tesela.por_fila[desplazamiento]:
+                continue
+            tipos = tesela.tipos
+            x_tesela = columna_tesela * lado
+            ancho = min(lado, columnas - x_tesela)
+            inicio = desplazamiento * lado
+            fin = inicio + ancho
+            teselas_abajo = teselas.get(fila_tesela_abajo)
+            abajo = teselas_abajo.get(columna_tesela) if teselas_abajo is not None else None
+            tipos_abajo = abajo.tipos if abajo is not None else None
+            
+            # Índice del próximo grano a revisar; -1 cuando no quedan en la fila de la tesela
+            indice = tipos.rfind(PERLITA, inicio, fin) if hacia_izquierda else tipos.find(PERLITA, inicio, fin)
+            while indice >= 0:
+                local = indice - inicio
+                columna = x_tesela + local
+                if tipos_abajo is None or tipos_abajo[base_abajo + local] == VACIO:
+                    destino = columna
+                else:
+                    destino = None
+                    lado_caida = -1 if random.getrandbits(1) else 1
+                    for vecina in (local + lado_caida, local - lado_caida):
+                        if 0 <= vecina < ancho:
+                            if tipos_abajo[base_abajo + vecina] == VACIO:
+                                destino = x_tesela + vecina
+                                break
+                        elif (0 <= x_tesela + vecina < columnas and
+                                self._vacia_dispersa(teselas, fila_tesela_abajo, base_abajo, lado,
+                                                     x_tesela + vecina)):
+                            destino = x_tesela + vecina
+                            break
+                
+                if destino is not None:
+                    mover(tesela, indice, fila, columna, fila_abajo, destino)
+                    if tipos_abajo is None and destino - x_tesela == local:
+                        # La caída reservó la tesela de abajo
+                        tipos_abajo = teselas[fila_tesela_abajo][columna_tesela].tipos
+                
+                if hacia_izquierda:
+                    indice = tipos.rfind(PERLITA, inicio, indice)
+                else:
+                    indice = tipos.find(PERLITA, indice + 1, fin)
+    
+    @staticmethod
+    def _vacia_dispersa(teselas, fila_tesela, base, lado, columna):
+        """Indica si la celda de la fila base de una fila de teselas está vacía (sin tesela o tipo VACIO)"""
+        fila_teselas = teselas.get(fila_tesela)
+        tesela = fila_teselas.get(columna // lado) if fila_teselas is not None else None
+        return tesela is None or tesela.tipos[base + columna % lado] == VACIO
     
     def agregar_particula(self, grilla, fila, columna, tipo_particula, probabilidad=None):
         """
@@ -82,13 +316,13 @@ class MotorFisicas:
             tipo_particula (str): Tipo de partícula ("perlita" o "roca")
             probabilidad (float, opcional): Probabilidad de aparición para perlita
             
+        Retorna:
+            bool: True si se agregó una partícula a la grilla
+            
         Nota:
             Para partículas de perlita, se usa probabilidad para simular
             aparición natural. Las rocas siempre se colocan.
         """
-        import random
-        from particulas import ParticulaPerlita, ParticulaRoca
-        
         # Usar probabilidad por defecto si no se especifica
         if probabilidad is None:
             probabilidad = PROBABILIDAD_APARICION_PERLITA
@@ -96,10 +330,11 @@ class MotorFisicas:
         if tipo_particula == "perlita":
             # Las partículas de perlita aparecen con cierta probabilidad
             if random.random() < probabilidad:
-                grilla.agregar_particula(fila, columna, ParticulaPerlita)
+                return grilla.agregar_particula(fila, columna, ParticulaPerlita)
         elif tipo_particula == "roca":
             # Las rocas siempre se colocan cuando se solicita
-            grilla.agregar_particula(fila, columna, ParticulaRoca)
+            return grilla.agregar_particula(fila, columna, ParticulaRoca)
+        return False
     
     def agregar_cluster_perlita(self, grilla, fila_inicio, columna_inicio, tamaño_cluster):
         """
@@ -107,7 +342,7 @@ class MotorFisicas:
         
         Este método crea un área cuadrada de partículas de perlita, útil para
         la generación automática de partículas o para herramientas de dibujo
-        con mayor intensidad.
+        con mayor intensidad. Es un lote de un solo cluster (ver agregar_lote_perlita).
         
         Parámetros:
             grilla: La grilla donde agregar el cluster
@@ -115,60 +350,171 @@ class MotorFisicas:
             columna_inicio (int): Columna superior izquierda del cluster
             tamaño_cluster (int): Tamaño del lado del cluster (cuadrado)
             
+        Retorna:
+            int: Cantidad de partículas efectivamente agregadas
+            
         Ejemplo:
             Para tamaño_cluster=3, se creará un área de 3x3 partículas
+        """
+        return self.agregar_lote_perlita(grilla, fila_inicio, [columna_inicio], tamaño_cluster)
+    
+    def agregar_lote_perlita(self, grilla, fila_inicio, columnas, tamaño_cluster=1, probabilidad=None,
+                             forma=None):
+        """
+        Agrega de una vez los clusters de perlita de todas las apariciones de un frame.
+        
+        Parámetros:
+            grilla: La grilla donde agregar los clusters
+            fila_inicio (int): Fila superior de todos los clusters
+            columnas (list): Columna izquierda de cada cluster
+            tamaño_cluster (int): Tamaño del lado de cada cluster (cuadrado)
+            probabilidad (float, opcional): Probabilidad de que cada celda reciba
+                un grano (por defecto PROBABILIDAD_APARICION_PERLITA)
+            forma (list, opcional): Celdas (fila, columna) de cada cluster relativas
+                a su posición; si no se indica, un cuadrado de tamaño_cluster
+            
+        Retorna:
+            int: Cantidad de partículas efectivamente agregadas
             
         Algoritmo:
-            1. Itera sobre el área cuadrada especificada
-            2. Verifica límites de la grilla
-            3. Solo agrega partículas en celdas vacías
-            4. Usa probabilidad estándar para cada partícula
-        """
-        for desplazamiento_fila in range(tamaño_cluster):
-            for desplazamiento_columna in range(tamaño_cluster):
-                fila_actual = fila_inicio + desplazamiento_fila
-                columna_actual = columna_inicio + desplazamiento_columna
-                
-                # Verificar que la posición esté dentro de los límites de la grilla
-                if (0 <= fila_actual < grilla.filas and 
-                    0 <= columna_actual < grilla.columnas and
-                    grilla.obtener_celda(fila_actual, columna_actual) is None):
-                    # Agregar partícula de perlita en la posición válida
-                    self.agregar_particula(grilla, fila_actual, columna_actual, "perlita")
+            1. Trata las celdas de todos los clusters como una única secuencia
+               de N * celdas_del_cluster ensayos de Bernoulli
+            2. Genera solo los éxitos, saltando entre ellos con una distancia
+               geométrica: con p = 0.15 se sortean ~0.15 números por celda en
+               lugar de uno
+            3. Convierte cada éxito en su celda (cluster, fila, columna)
+            4. Genera los colores del lote y los escribe en la grilla con una
+               única escritura por lote (las celdas ocupadas o fuera de límites
+               se descartan)
+        """
+        if probabilidad is None:
+            probabilidad = PROBABILIDAD_APARICION_PERLITA
+        
+        if forma is None:
+            forma = [(fila, columna) for fila in range(tamaño_cluster) for columna in range(tamaño_cluster)]
+        celdas_cluster = len(forma)
+        exitos = self._muestrear_bernoulli(len(columnas) * celdas_cluster, probabilidad)
+        if not exitos:
+            return 0
+        
+        celdas = []
+        for indice in exitos:
+            cluster, celda = divmod(indice, celdas_cluster)
+            desplazamiento_fila, desplazamiento_columna = forma[celda]
+            celdas.append((fila_inicio + desplazamiento_fila, columnas[cluster] + desplazamiento_columna))
+        
+        return grilla.agregar_particulas_lote(celdas, PERLITA, generar_colores(PERLITA, len(celdas)))
     
-    def aplicar_pincel(self, grilla, fila, columna, modo_pincel, tamaño_pincel=3):
+    def _muestrear_bernoulli(self, total, probabilidad):
         """
-        Aplica el pincel en la posición especificada según el modo seleccionado.
+        Retorna los índices de los éxitos de `total` ensayos de Bernoulli(probabilidad).
         
-        Esta función implementa las herramientas de dibujo del usuario,
-        permitiendo agregar perlita, rocas o borrar partículas en un área
-        determinada por el tamaño del pincel.
+        La distancia entre éxitos consecutivos sigue una distribución geométrica,
+        así que se salta directamente de un éxito al siguiente.
+        """
+        if probabilidad <= 0 or total <= 0:
+            return []
+        if probabilidad >= 1:
+            return list(range(total))
+        
+        log_fracaso = math.log(1.0 - probabilidad)
+        exitos = []
+        indice = -1
+        while True:
+            # Ensayos fallidos antes del próximo éxito: floor(log(U) / log(1 - p))
+            indice += 1 + int(math.log(1.0 - random.random()) / log_fracaso)
+            if indice >= total:
+                return exitos
+            exitos.append(indice)
+    
+    def mascara_pincel(self, tamaño_pincel, forma_pincel="cuadrado"):
+        """
+        Obtiene las celdas relativas que cubre el pincel, centradas en el cursor.
+        
+        Parámetros:
+            tamaño_pincel (int): Lado del pincel en celdas
+            forma_pincel (str): "cuadrado" o "circulo"
+            
+        Retorna:
+            list: Desplazamientos (fila, columna) de la máscara
+            
+        Las máscaras se calculan una sola vez por combinación de tamaño y forma.
+        """
+        clave = (tamaño_pincel, forma_pincel)
+        mascara = self._mascaras_pincel.get(clave)
+        if mascara is None:
+            inicio = -(tamaño_pincel // 2)
+            desplazamientos = range(inicio, inicio + tamaño_pincel)
+            if forma_pincel == "circulo":
+                # Centro geométrico del pincel (cae entre celdas si el lado es par)
+                centro = inicio + (tamaño_pincel - 1) / 2
+                radio_cuadrado = (tamaño_pincel / 2) ** 2
+                mascara = [(fila, columna) for fila in desplazamientos for columna in desplazamientos
+                           if (fila - centro) ** 2 + (columna - centro) ** 2 <= radio_cuadrado]
+            else:
+                mascara = [(fila, columna) for fila in desplazamientos for columna in desplazamientos]
+            self._mascaras_pincel[clave] = mascara
+        return mascara
+    
+    def aplicar_trazo(self, grilla, desde, hasta, modo_pincel, tamaño_pincel=3, forma_pincel="cuadrado"):
+        """
+        Aplica el pincel a lo largo del segmento entre dos celdas.
         
         Parámetros:
             grilla: La grilla donde aplicar el pincel
-            fila (int): Fila central donde aplicar el pincel
-            columna (int): Columna central donde aplicar el pincel
+            desde (tuple): Celda (fila, columna) donde estaba el cursor en el frame anterior
+            hasta (tuple): Celda (fila, columna) actual del cursor
             modo_pincel (str): Modo del pincel ("perlita", "roca", "borrador")
-            tamaño_pincel (int): Tamaño del área de efecto del pincel
+            tamaño_pincel (int): Lado del pincel en celdas
+            forma_pincel (str): Máscara del pincel ("cuadrado" o "circulo")
             
-        Modos disponibles:
-            - "perlita": Agrega partículas de perlita
-            - "roca": Agrega partículas de roca
-            - "borrador": Borra partículas existentes
+        Retorna:
+            int: Cantidad de celdas modificadas
             
         Algoritmo:
-            1. Itera sobre el área cuadrada del pincel
-            2. Para modo "borrador": elimina partículas
-            3. Para otros modos: agrega partículas del tipo correspondiente
-        """
-        for desplazamiento_fila in range(tamaño_pincel):
-            for desplazamiento_columna in range(tamaño_pincel):
-                fila_actual = fila + desplazamiento_fila
-                columna_actual = columna + desplazamiento_columna
-
-                if modo_pincel == "borrador":
-                    # Modo borrador: eliminar partículas existentes
-                    grilla.eliminar_particula(fila_actual, columna_actual)
-                else:
-                    # Modos de dibujo: agregar partículas del tipo especificado
-                    self.agregar_particula(grilla, fila_actual, columna_actual, modo_pincel) 
\ No newline at end of file
+            1. Recorre la recta de Bresenham entre las dos celdas, así un
+               arrastre rápido no deja huecos
+            2. Une la máscara del pincel en cada punto en un conjunto, para que
+               las celdas compartidas entre puntos se procesen una sola vez
+            3. Escribe todo el segmento en la grilla con una única operación
+               por lote: perlita con muestreo de Bernoulli, roca en todas las
+               celdas y borrador vaciándolas
+        """
+        mascara = self.mascara_pincel(tamaño_pincel, forma_pincel)
+        celdas = set()
+        for fila, columna in linea_bresenham(desde[0], desde[1], hasta[0], hasta[1]):
+            celdas.update([(fila + desplazamiento_fila, columna + desplazamiento_columna)
+                           for desplazamiento_fila, desplazamiento_columna in mascara])
+        
+        if modo_pincel == "borrador":
+            return grilla.eliminar_particulas_lote(celdas)
+        
+        celdas = list(celdas)
+        if modo_pincel == "perlita":
+            # Las partículas de perlita aparecen con cierta probabilidad en cada celda
+            celdas = [celdas[indice] for indice in
+                      self._muestrear_bernoulli(len(celdas), PROBABILIDAD_APARICION_PERLITA)]
+            tipo = PERLITA
+        elif modo_pincel == "roca":
+            tipo = ROCA
+        else:
+            return 0
+        return grilla.agregar_particulas_lote(celdas, tipo, generar_colores(tipo, len(celdas)))
+    
+    def aplicar_pincel(self, grilla, fila, columna, modo_pincel, tamaño_pincel=3, forma_pincel="cuadrado"):
+        """
+        Aplica el pincel en una única posición (un trazo de un solo punto).
+        
+        Parámetros:
+            grilla: La grilla donde aplicar el pincel
+            fila (int): Fila central donde aplicar el pincel
+            columna (int): Columna central donde aplicar el pincel
+            modo_pincel (str): Modo del pincel ("perlita", "roca", "borrador")
+            tamaño_pincel (int): Lado del pincel en celdas
+            forma_pincel (str): Máscara del pincel ("cuadrado" o "circulo")
+            
+        Retorna:
+            int: Cantidad de celdas modificadas
+        """
+        return self.aplicar_trazo(grilla, (fila, columna), (fila, columna),
+                                  modo_pincel, tamaño_pincel, forma_pincel)
\ No newline at end of file
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Núcleo compilado (opcional) de la física de caída.
+
+Este módulo compila con numba el mismo recorrido que MotorFisicas hace fila
+por fila: de abajo hacia arriba, alternando el sentido de las columnas en
+cada fila, y aplicando a cada grano de perlita la regla de
+ParticulaPerlita.actualizar. Trabaja directamente sobre los planos de
+GrillaCompacta (tipos como uint8 y colores como uint32) sin crear objetos.
+
+numba es una dependencia opcional: se importa recién la primera vez que se
+pide el núcleo y, si no está instalado, cargar_nucleo retorna None y la
+física sigue por el camino de Python sin ningún cambio.
+
+Paridad con el camino de Python:
+Cuando un grano no puede caer recto, la regla toma una palabra de 32 bits
+del generador random (random.getrandbits(1) usa el bit alto de una palabra)
+para decidir qué diagonal prueba primero. El núcleo recibe esas palabras
+sacadas del mismo generador y las consume en el mismo orden; al terminar se
+restaura el estado del generador y se avanza exactamente las palabras
+usadas. Así, con la misma semilla, los dos caminos dejan la grilla (y el
+generador) en el mismo estado.
+"""
+
+import random
+from particulas import PERLITA, VACIO
+
+# Núcleo ya resuelto: None = todavía no se intentó cargar, False = numba no disponible
+_nucleo = None
+
+def _caer_filas(tipos, colores, columnas, fila_inicio, fila_fin, palabras,
+                sucias, alto_banda, cortes, cruces):
+    """
+    Aplica la regla de caída a las filas fila_fin - 1 ... fila_inicio.
+
+    Es la función que compila numba (ver cargar_nucleo); sin compilar también
+    corre en Python sobre arreglos de numpy, con el mismo resultado.
+
+    Parámetros:
+        tipos (uint8[:]): Plano de tipos de la grilla, fila por fila
+        colores (uint32[:]): Plano de colores de la grilla
+        columnas (int): Columnas de la grilla
+        fila_inicio, fila_fin (int): Filas a recorrer (la última fila de la
+            grilla nunca se incluye: sus granos no tienen adónde caer)
+        palabras (uint32[:]): Palabras del generador, al menos una por grano
+        sucias (uint8[:]): Marcas de bandas de la grilla (vacío si no hay)
+        alto_banda (int): Filas por banda (0 si no hay marcas)
+        cortes (uint16[:]): Líneas de sensor por fila (vacío si no hay sensores)
+        cruces (int32[:]): Salida: granos que cruzaron una línea desde cada fila
+
+    Retorna:
+        int: Palabras del generador consumidas
+    """
+    usadas = 0
+    for fila in range(fila_fin - 1, fila_inicio - 1, -1):
+        base = fila * columnas
+        debajo = base + columnas
+        # Mismo sentido alternado que MotorFisicas._actualizar_fila
+        if fila % 2 == 0:
+            desde, hasta, paso = 0, columnas, 1
+        else:
+            desde, hasta, paso = columnas - 1, -1, -1
+
+        for columna in range(desde, hasta, paso):
+            if tipos[base + columna] != PERLITA:
+                continue
+
+            destino = -1
+            if tipos[debajo + columna] == VACIO:
+                destino = columna
+            else:
+                lado = -1 if palabras[usadas] >> 31 else 1
+                usadas += 1
+                if 0 <= columna + lado < columnas and tipos[debajo + columna + lado] == VACIO:
+                    destino = columna + lado
+                elif 0 <= columna - lado < columnas and tipos[debajo + columna - lado] == VACIO:
+                    destino = columna - lado
+            if destino < 0:
+                continue
+
+            # Mover el grano y su color, igual que GrillaCompacta.mover_particula
+            tipos[debajo + destino] = PERLITA
+            colores[debajo + destino] = colores[base + columna]
+            tipos[base + columna] = VACIO
+            colores[base + columna] = 0
+            if alto_banda:
+                sucias[(fila + 1) // alto_banda] = 1
+                sucias[fila // alto_banda] = 1
+                if fila:
+                    sucias[(fila - 1) // alto_banda] = 1
+            if len(cortes) and cortes[fila] != cortes[fila + 1]:
+                cruces[fila - fila_inicio] += 1
+    return usadas
+
+class NucleoCaida:
+    """
+    Núcleo compilado de la física para GrillaCompacta.
+
+    Atributos:
+        numpy (module): Módulo numpy con el que se arman las vistas de los planos
+        compilado (callable): _caer_filas compilada por numba
+    """
+
+    def __init__(self, numpy, compilado):
+        self.numpy = numpy
+        self.compilado = compilado
+        # Arreglos vacíos para cuando la grilla no tiene bandas o sensores
+        self._sin_bandas = numpy.zeros(0, dtype=numpy.uint8)
+        self._sin_cortes = numpy.zeros(0, dtype=numpy.uint16)
+
+    def actualizar_filas(self, grilla, fila_inicio, fila_fin):
+        """
+        Aplica la física a las filas fila_fin - 1 ... fila_inicio de una GrillaCompacta.
+
+        Las vistas de numpy se arman en cada llamada sobre los mismos planos
+        (sin copiar), así la grilla puede limpiarse o reemplazarse entre frames.
+        """
+        np = self.numpy
+        columnas = grilla.columnas
+        granos = grilla.contar_celdas(PERLITA, fila_inicio * columnas, fila_fin * columnas)
+        if not granos:
+            return
+
+        # Una palabra por grano alcanza: cada grano bloqueado consume exactamente una
+        estado = random.getstate()
+        palabras = np.frombuffer(random.getrandbits(32 * granos).to_bytes(4 * granos, "little"),
+                                 dtype="<u4").astype(np.uint32, copy=False)
+
+        sucias = grilla.bandas_sucias
+        cortes = grilla._cortes_sensores
+        cruces = np.zeros(fila_fin - fila_inicio if cortes is not None else 0, dtype=np.int32)
+        usadas = self.compilado(
+            np.frombuffer(grilla.tipos, dtype=np.uint8),
+            np.frombuffer(grilla.colores, dtype=np.uint32),
+            columnas, fila_inicio, fila_fin, palabras,
+            self._sin_bandas if sucias is None else np.frombuffer(sucias, dtype=np.uint8),
+            0 if sucias is None else grilla.alto_banda,
+            self._sin_cortes if cortes is None else np.frombuffer(cortes, dtype=np.uint16),
+            cruces
+        )
+
+        # Dejar el generador como si las palabras se hubieran pedido una por una
+        random.setstate(estado)
+        if usadas:
+            random.getrandbits(32 * usadas)
+
+        # Avisar a los sensores los granos que cruzaron su línea
+        for desplazamiento in np.flatnonzero(cruces):
+            fila = fila_inicio + int(desplazamiento)
+            for _ in range(int(cruces[desplazamiento])):
+                grilla._avisar_movimiento(PERLITA, fila, fila + 1)
+
+def cargar_nucleo():
+    """
+    Obtiene el núcleo compilado, importando numba y compilando solo la primera vez.
+
+    Retorna:
+        NucleoCaida o None: None si numba (o numpy) no está instalado
+
+    La compilación se guarda en el caché de numba (cache=True), así solo la
+    primera ejecución del programa paga el tiempo de compilar.
+    """
+    global _nucleo
+    if _nucleo is None:
+        try:
+            import numpy
+            from numba import njit
+        except ImportError:
+            _nucleo = False
+        else:
+            _nucleo = NucleoCaida(numpy, njit(cache=True, nogil=True)(_caer_filas))
+    return _nucleo or None
@@ -1,5 +1,9 @@
-import pygame
 import sys
+from core.constantes import TAMANO_PINCEL_POR_DEFECTO, TAMANO_PINCEL_MAXIMO, FORMAS_PINCEL
+from core.arranque import importar_diferido
+
+# Las teclas y el mouse solo se leen con ventana: pygame se carga al primer evento
+pygame = importar_diferido("pygame")
 
 class ManejadorInput:
     """Sistema para manejar la entrada del usuario (teclado y mouse)"""
@@ -7,23 +11,26 @@ class ManejadorInput:
     def __init__(self):
         self.modo = "perlita"
         self.pausado = False
-        self.tamaño_pincel = 3
-        self.offset_mouse_x = 0
-        self.offset_mouse_y = 0
-    
-    def configurar_offset_mouse(self, offset_x, offset_y):
-        """Configura el offset del mouse para el área de juego"""
-        self.offset_mouse_x = offset_x
-        self.offset_mouse_y = offset_y
+        self.tamaño_pincel = TAMANO_PINCEL_POR_DEFECTO
+        self.forma_pincel = FORMAS_PINCEL[0]
+        # Celda del cursor en el frame anterior mientras se arrastra el pincel
+        self._ultima_celda = None
     
     def procesar_eventos(self, eventos, sistemas, simulacion):
         """Procesa todos los eventos de entrada"""
+        vista = sistemas['vista']
         for evento in eventos:
             if evento.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             elif evento.type == pygame.KEYDOWN:
                 self._manejar_tecla(evento, sistemas, simulacion)
+            elif evento.type == pygame.MOUSEWHEEL:
+                # Rueda: acercar o alejar alrededor del puntero
+                vista.zoom(evento.y, pygame.mouse.get_pos())
+            elif evento.type == pygame.MOUSEMOTION and evento.buttons[2]:
+                # Arrastre con click derecho: desplazar la vista
+                vista.desplazar(evento.rel)
         
         # Manejar mouse
         self._manejar_mouse(simulacion)
@@ -118,12 +125,41 @@ class ManejadorInput:
             tamaño = aparicion.disminuir_cluster()
             mensajes.mostrar_mensaje(f"Intensidad: {tamaño}x{tamaño} particulas")
         
-        # Controles de tamaño visual (1-9)
+        # Controles de resolución de simulación (1-9)
         elif evento.key in [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5,
                            pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9]:
             nuevo_tamaño = evento.key - pygame.K_0  # Convertir tecla a número
-            simulacion.cambiar_tamaño_grano(nuevo_tamaño)
-            mensajes.mostrar_mensaje(f"Tamano visual: {nuevo_tamaño}x{nuevo_tamaño} pixeles")
+            try:
+                simulacion.cambiar_tamaño_grano(nuevo_tamaño)
+            except (MemoryError, ValueError) as error:
+                # La resolución pedida no entra en memoria o excede el máximo de celdas
+                mensajes.mostrar_mensaje(f"Resolucion no disponible: {error}")
+            else:
+                mensajes.mostrar_mensaje(f"Resolucion: {simulacion.grilla.columnas}x{simulacion.grilla.filas} celdas")
+        
+        # Pincel: tamaño y forma
+        elif evento.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            self.tamaño_pincel = min(TAMANO_PINCEL_MAXIMO, self.tamaño_pincel + 1)
+            mensajes.mostrar_mensaje(f"Pincel: {self.tamaño_pincel}x{self.tamaño_pincel} celdas")
+        
+        elif evento.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.tamaño_pincel = max(1, self.tamaño_pincel - 1)
+            mensajes.mostrar_mensaje(f"Pincel: {self.tamaño_pincel}x{self.tamaño_pincel} celdas")
+        
+        elif evento.key == pygame.K_c:
+            indice = (FORMAS_PINCEL.index(self.forma_pincel) + 1) % len(FORMAS_PINCEL)
+            self.forma_pincel = FORMAS_PINCEL[indice]
+            mensajes.mostrar_mensaje(f"Pincel: {self.forma_pincel}")
+        
+        # Motor de física
+        elif evento.key == pygame.K_m:
+            motor = sistemas['fisicas'].alternar_motor()
+            mensajes.mostrar_mensaje(f"Motor de fisica: {motor}")
+        
+        # Vista: volver al zoom ajustado al área disponible
+        elif evento.key == pygame.K_0:
+            sistemas['vista'].restablecer()
+            mensajes.mostrar_mensaje("Vista: completa")
         
         # Modo debug
         elif evento.key == pygame.K_d:
@@ -131,21 +167,24 @@ class ManejadorInput:
             mensajes.mostrar_mensaje(f"Modo debug: {'ON' if simulacion.debug_mode else 'OFF'}")
     
     def _manejar_mouse(self, simulacion):
-        """Maneja la entrada del mouse"""
+        """
+        Maneja la entrada del mouse.
+        
+        Mientras el botón izquierdo está presionado se pinta el segmento entre
+        la celda del frame anterior y la actual, así un arrastre rápido no deja
+        huecos. Al soltar el botón o salir del área de juego el trazo se corta.
+        """
         botones = pygame.mouse.get_pressed()
+        celda = None
         if botones[0]:  # Click izquierdo
-            pos = pygame.mouse.get_pos()
-            # Ajustar posición considerando el offset
-            x_ajustado = pos[0] - self.offset_mouse_x
-            y_ajustado = pos[1] - self.offset_mouse_y
+            # Convertir la posición de pantalla a celda según la vista actual
+            celda = simulacion.sistema_vista.pantalla_a_celda(pygame.mouse.get_pos())
             
             # Verificar que esté dentro del área de juego
-            if (0 <= x_ajustado < simulacion.grilla.columnas * simulacion.tamaño_celda and 
-                0 <= y_ajustado < simulacion.grilla.filas * simulacion.tamaño_celda):
-                fila = y_ajustado // simulacion.tamaño_celda
-                columna = x_ajustado // simulacion.tamaño_celda
-                
-                simulacion.aplicar_pincel(fila, columna, self.modo)
+            if celda is not None:
+                desde = self._ultima_celda if self._ultima_celda is not None else celda
+                simulacion.aplicar_trazo(desde, celda, self.modo)
+        self._ultima_celda = celda
     
     def obtener_color_pincel(self):
         """Obtiene el color del pincel según el modo actual"""
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de física por bloques de Margolus.
+
+En lugar de recorrer la grilla grano por grano (donde el resultado depende
+del orden del recorrido), este motor divide la grilla en bloques de 2x2
+celdas y actualiza cada bloque por separado con una tabla de transiciones.
+En el paso siguiente la partición se corre una celda en diagonal, así los
+granos pasan de un bloque a otro. Como los bloques de un paso no se
+superponen, el resultado no depende del orden en que se visitan: el paso es
+paralelizable y no hace falta alternar el sentido de las columnas.
+
+Cada celda del bloque se codifica en 2 bits (vacía, perlita o fija: roca o
+fuera de la grilla), así que un bloque es un número de 0 a 255 y la tabla
+tiene 256 entradas. Las reglas son simétricas izquierda/derecha:
+1. Un grano de arriba cae si la celda de abajo está vacía
+2. Si no puede caer, se desliza a la diagonal de abajo si está vacía
+
+Los índices de los bloques de un par de filas se calculan en C: las filas
+se traducen a códigos con bytes.translate, se empaquetan como enteros y se
+combinan con desplazamientos y sumas sin acarreo entre bytes. Solo se
+visitan los bloques cuya transición mueve algún grano.
+"""
+
+from particulas import VACIO, PERLITA
+
+# Código de 2 bits de cada celda dentro de un bloque
+CODIGO_VACIO = 0
+CODIGO_PERLITA = 1
+CODIGO_FIJO = 2
+
+# Posiciones de las celdas dentro del bloque
+ARRIBA_IZQUIERDA, ARRIBA_DERECHA, ABAJO_IZQUIERDA, ABAJO_DERECHA = range(4)
+
+# Tipo de partícula -> código (todo lo que no es vacío ni perlita queda fijo)
+_CODIGOS = bytes(CODIGO_VACIO if tipo == VACIO else CODIGO_PERLITA if tipo == PERLITA else CODIGO_FIJO
+                 for tipo in range(256))
+
+def indice_bloque(arriba_izquierda, arriba_derecha, abajo_izquierda, abajo_derecha):
+    """
+    Calcula el índice de un bloque a partir de los códigos de sus celdas.
+
+    El orden de los bits es el que produce el empaquetado por filas de
+    MotorMargolus: cada columna aporta (arriba + 4 * abajo) y la columna
+    derecha del bloque se suma multiplicada por 16.
+    """
+    return (arriba_izquierda + 4 * abajo_izquierda +
+            16 * arriba_derecha + 64 * abajo_derecha)
+
+def transicion(celdas):
+    """
+    Calcula los movimientos de un bloque.
+
+    Parámetros:
+        celdas (list): Códigos de las cuatro celdas, en el orden de las posiciones
+
+    Retorna:
+        tuple: Pares (origen, destino) de posiciones del bloque, en el orden en
+               que se aplican (cada destino está vacío al momento de moverse)
+    """
+    celdas = list(celdas)
+    movimientos = []
+
+    def mover(origen, destino):
+        celdas[destino] = celdas[origen]
+        celdas[origen] = CODIGO_VACIO
+        movimientos.append((origen, destino))
+
+    # Caída recta de cada grano de arriba
+    for arriba, abajo in ((ARRIBA_IZQUIERDA, ABAJO_IZQUIERDA), (ARRIBA_DERECHA, ABAJO_DERECHA)):
+        if celdas[arriba] == CODIGO_PERLITA and celdas[abajo] == CODIGO_VACIO:
+            mover(arriba, abajo)
+
+    # Deslizamiento diagonal: a lo sumo un grano puede hacerlo (el de la izquierda
+    # necesita ocupada la celda de abajo a la izquierda y el de la derecha vacía
+    # esa misma celda), así que el orden de las dos reglas no introduce sesgo
+    for arriba, abajo, diagonal in ((ARRIBA_IZQUIERDA, ABAJO_IZQUIERDA, ABAJO_DERECHA),
+                                    (ARRIBA_DERECHA, ABAJO_DERECHA, ABAJO_IZQUIERDA)):
+        if (celdas[arriba] == CODIGO_PERLITA and celdas[abajo] != CODIGO_VACIO and
+                celdas[diagonal] == CODIGO_VACIO):
+            mover(arriba, diagonal)
+
+    return tuple(movimientos)
+
+def construir_tabla():
+    """
+    Construye la tabla de transiciones de los 256 bloques posibles.
+
+    Retorna:
+        tuple: (tabla, moviles) donde tabla[i] son los movimientos del bloque i
+               y moviles es un bytes de 256 con 1 en los bloques que cambian
+    """
+    tabla = [()] * 256
+    for a in range(4):
+        for b in range(4):
+            for c in range(4):
+                for d in range(4):
+                    # El código 3 no se usa; se trata como fijo
+                    celdas = [min(codigo, CODIGO_FIJO) for codigo in (a, b, c, d)]
+                    tabla[indice_bloque(a, b, c, d)] = transicion(celdas)
+    moviles = bytes(1 if movimientos else 0 for movimientos in tabla)
+    return tuple(tabla), moviles
+
+TABLA_MARGOLUS, BLOQUES_MOVILES = construir_tabla()
+
+class MotorMargolus:
+    """
+    Motor de física por bloques de 2x2 con particiones alternadas.
+
+    Atributos:
+        desfase (int): Corrimiento de la partición en este paso (0 o 1, en filas y columnas)
+        pasos (int): Pasos aplicados
+        movimientos (int): Granos movidos en el último paso
+    """
+
+    def __init__(self):
+        self.desfase = 0
+        self.pasos = 0
+        self.movimientos = 0
+
+    def paso(self, grilla):
+        """
+        Aplica un paso de Margolus a toda la región activa de la grilla.
+
+        Parámetros:
+            grilla: Cualquier implementación de grilla (usa tipos_fila y mover_particula)
+
+        Retorna:
+            int: Cantidad de granos movidos
+
+        Algoritmo:
+            1. Recorre los pares de filas de la partición actual (las filas
+               fuera de la grilla cuentan como celdas fijas)
+            2. Descarta el par si la fila de arriba no tiene perlita
+            3. Calcula el índice de todos los bloques del par de una vez y
+               marca con la tabla de móviles los que cambian
+            4. Aplica los movimientos de esos bloques con mover_particula, así
+               los sensores y las bandas marcadas de la grilla siguen al tanto
+            5. Alterna el desfase para el paso siguiente
+        """
+        desfase = self.desfase
+        filas = grilla.filas
+        columnas = grilla.columnas
+        fila_inicio, fila_fin = grilla.rango_filas_activas()
+
+        # Con desfase 1 la primera columna forma bloque con una columna fija a su izquierda
+        columna_base = -desfase
+        relleno_izquierdo = b"\x02" * desfase
+        relleno_derecho = b"\x02" * ((columnas + desfase) % 2)
+        largo = columnas + desfase + len(relleno_derecho)
+
+        movidos = 0
+        primera = max(desfase, fila_inicio - (fila_inicio - desfase) % 2)
+        for fila in range(primera, min(fila_fin, filas - 1), 2):
+            arriba = grilla.tipos_fila(fila).translate(_CODIGOS)
+            if CODIGO_PERLITA not in arriba:
+                continue
+            abajo = grilla.tipos_fila(fila + 1).translate(_CODIGOS)
+
+            # Un byte por columna con (arriba + 4 * abajo) y luego, en cada
+            # columna par, el índice del bloque: columna + 16 * columna siguiente
+            columnas_combinadas = (int.from_bytes(relleno_izquierdo + arriba + relleno_derecho, "little") +
+                                   (int.from_bytes(relleno_izquierdo + abajo + relleno_derecho, "little") << 2))
+            bloques = (columnas_combinadas + ((columnas_combinadas >> 8) << 4)).to_bytes(largo, "little")[::2]
+
+            moviles = bloques.translate(BLOQUES_MOVILES)
+            indice = moviles.find(1)
+            while indice != -1:
+                columna = columna_base + 2 * indice
+                for origen, destino in TABLA_MARGOLUS[bloques[indice]]:
+                    grilla.mover_particula(fila + origen // 2, columna + origen % 2,
+                                           fila + destino // 2, columna + destino % 2)
+                    movidos += 1
+                indice = moviles.find(1, indice + 1)
+
+        self.desfase = 1 - desfase
+        self.pasos += 1
+        self.movimientos = movidos
+        return movidos
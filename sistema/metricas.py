@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Sistema de métricas de producción de la línea de empaquetado.
+
+Este módulo registra los números de rendimiento que se reportan a producción:
+cuántos granos entran al contenedor, cuántos se drenan en cada ciclo, cuánto
+dura cada ciclo de drenaje, el tiempo entre drenajes consecutivos y la tasa
+estable de llenado en granos por segundo.
+
+Los historiales se guardan en buffers circulares de tamaño fijo, por lo que
+el costo por frame es constante y la memoria no crece con el tiempo.
+"""
+
+import time
+from collections import deque
+from core.constantes import CAPACIDAD_HISTORIAL_METRICAS
+
+class SistemaMetricas:
+    """
+    Recolecta los contadores de rendimiento de la simulación.
+
+    Los contadores acumulados (granos aparecidos y drenados) crecen durante
+    toda la sesión; los historiales por ciclo se mantienen en buffers
+    circulares con los últimos ciclos de drenaje.
+
+    Atributos:
+        granos_aparecidos (int): Total de granos generados por la aparición automática
+        granos_drenados (int): Total de granos retirados por las compuertas
+        ciclos_completados (int): Total de ciclos de drenaje terminados
+        drenados_por_ciclo (deque): Granos drenados en cada uno de los últimos ciclos
+        duracion_ciclos (deque): Duración en segundos de cada uno de los últimos ciclos
+        tiempo_entre_drenajes (deque): Segundos entre inicios de drenajes consecutivos
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_HISTORIAL_METRICAS):
+        """
+        Inicializa el sistema de métricas con los contadores en cero.
+
+        Parámetros:
+            capacidad (int): Cantidad de ciclos que se guardan en cada historial
+        """
+        self.granos_aparecidos = 0                          # Total de granos generados
+        self.granos_drenados = 0                            # Total de granos drenados
+        self.ciclos_completados = 0                         # Total de ciclos (el historial guarda los últimos)
+        self.drenados_por_ciclo = deque(maxlen=capacidad)   # Granos drenados por ciclo
+        self.duracion_ciclos = deque(maxlen=capacidad)      # Duración de cada ciclo
+        self.tiempo_entre_drenajes = deque(maxlen=capacidad)  # Intervalo entre drenajes
+
+        # Estado del ciclo en curso
+        self._inicio_ciclo = None
+        self._inicio_ciclo_anterior = None
+        self._inicio_previo = None          # Para deshacer el inicio si el ciclo se cancela
+        self._drenados_ciclo_actual = 0
+
+    def registrar_aparicion(self, cantidad):
+        """
+        Suma granos generados al contador de entrada.
+
+        Parámetros:
+            cantidad (int): Granos efectivamente agregados a la grilla
+        """
+        self.granos_aparecidos += cantidad
+
+    def registrar_inicio_drenaje(self, tiempo=None):
+        """
+        Marca el comienzo de un ciclo de drenaje.
+
+        Parámetros:
+            tiempo (float, opcional): Marca de tiempo del inicio (por defecto time.time())
+        """
+        if tiempo is None:
+            tiempo = time.time()
+
+        # El intervalo se mide de inicio a inicio para reflejar el período del ciclo
+        if self._inicio_ciclo_anterior is not None:
+            self.tiempo_entre_drenajes.append(tiempo - self._inicio_ciclo_anterior)
+
+        self._inicio_previo = self._inicio_ciclo_anterior
+        self._inicio_ciclo_anterior = tiempo
+        self._inicio_ciclo = tiempo
+        self._drenados_ciclo_actual = 0
+
+    def registrar_granos_drenados(self, cantidad):
+        """
+        Suma granos retirados por las compuertas durante el ciclo actual.
+
+        Parámetros:
+            cantidad (int): Granos eliminados del contenedor
+        """
+        self.granos_drenados += cantidad
+        self._drenados_ciclo_actual += cantidad
+
+    def registrar_fin_drenaje(self, tiempo=None):
+        """
+        Cierra el ciclo de drenaje en curso y guarda sus valores en el historial.
+
+        Parámetros:
+            tiempo (float, opcional): Marca de tiempo del final (por defecto time.time())
+        """
+        if self._inicio_ciclo is None:
+            return
+        if tiempo is None:
+            tiempo = time.time()
+
+        self.drenados_por_ciclo.append(self._drenados_ciclo_actual)
+        self.duracion_ciclos.append(tiempo - self._inicio_ciclo)
+        self.ciclos_completados += 1
+        self._inicio_ciclo = None
+        self._drenados_ciclo_actual = 0
+
+    def registrar_drenaje_cancelado(self):
+        """
+        Descarta el ciclo de drenaje en curso sin contarlo como completado.
+
+        Se usa cuando el ciclo termina sin flujo (compuertas tapadas): no se
+        guarda en los historiales y se deshace el intervalo que abrió su
+        inicio, así el próximo ciclo real se mide desde el último que sí
+        descargó. Los granos que alcanzaron a salir quedan en granos_drenados.
+        """
+        if self._inicio_ciclo is None:
+            return
+
+        if self._inicio_previo is not None and self.tiempo_entre_drenajes:
+            self.tiempo_entre_drenajes.pop()
+        self._inicio_ciclo_anterior = self._inicio_previo
+        self._inicio_previo = None
+        self._inicio_ciclo = None
+        self._drenados_ciclo_actual = 0
+
+    def tasa_estable(self):
+        """
+        Calcula la tasa estable de llenado en granos por segundo.
+
+        Retorna:
+            float: Granos drenados por segundo en los ciclos del historial,
+                   o 0.0 si todavía no hay dos drenajes completos
+
+        Algoritmo:
+            Divide los granos drenados en los últimos ciclos por el tiempo
+            entre drenajes de esos mismos ciclos. Cada intervalo va desde el
+            inicio de un ciclo hasta el inicio del siguiente, así que se
+            empareja con el ciclo que lo abrió: si no hay un drenaje en curso,
+            el último ciclo terminado todavía no cerró su intervalo y queda
+            afuera. Como en régimen estable todo lo que entra termina saliendo
+            por las compuertas, este valor es el rendimiento real de la línea.
+        """
+        drenados = list(self.drenados_por_ciclo)
+        if self._inicio_ciclo is None:
+            drenados = drenados[:-1]
+        ciclos = min(len(self.tiempo_entre_drenajes), len(drenados))
+        if ciclos == 0:
+            return 0.0
+
+        granos = sum(drenados[-ciclos:])
+        segundos = sum(list(self.tiempo_entre_drenajes)[-ciclos:])
+        return granos / segundos if segundos > 0 else 0.0
+
+    def resumen(self):
+        """
+        Obtiene una copia de todas las métricas para reportar.
+
+        Retorna:
+            dict: Contadores acumulados y promedios de los historiales
+        """
+        return {
+            'granos_aparecidos': self.granos_aparecidos,
+            'granos_drenados': self.granos_drenados,
+            'ciclos': len(self.drenados_por_ciclo),
+            'drenados_ultimo_ciclo': self.drenados_por_ciclo[-1] if self.drenados_por_ciclo else 0,
+            'drenados_por_ciclo_promedio': _promedio(self.drenados_por_ciclo),
+            'duracion_ciclo_promedio': _promedio(self.duracion_ciclos),
+            'tiempo_entre_drenajes_promedio': _promedio(self.tiempo_entre_drenajes),
+            'granos_por_segundo': self.tasa_estable()
+        }
+
+def _promedio(valores):
+    """Promedio de un buffer, 0.0 si está vacío"""
+    return sum(valores) / len(valores) if valores else 0.0
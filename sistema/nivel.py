@@ -1,11 +1,16 @@
 import time
 import random
-from core.constantes import TIEMPO_DRENAJE_SEGUNDOS, COLOR_LINEA_NIVEL, ANCHO_LINEA_NIVEL
+from particulas import ParticulaPerlita
+from sistema.sensores import SensorNivel
+from sistema.compuertas import Compuerta, POLITICAS_DRENAJE
+from core.constantes import (TIEMPO_DRENAJE_SEGUNDOS, COLOR_LINEA_NIVEL, ANCHO_LINEA_NIVEL,
+                             POLITICA_DRENAJE_POR_DEFECTO, PRESUPUESTO_DRENAJE_POR_FRAME,
+                             FRAMES_COMPUERTA_SIN_FLUJO)
 
 class SistemaNivel:
     """Sistema para manejar el nivel de llenado y drenaje"""
     
-    def __init__(self):
+    def __init__(self, metricas=None):
         self.modo_activo = False
         self.posicion_linea = 0.5  # Posición de la línea (0.0 = arriba, 1.0 = abajo)
         self.esta_drenando = False
@@ -16,6 +21,28 @@ class SistemaNivel:
         self.tiempo_drenaje_segundos = TIEMPO_DRENAJE_SEGUNDOS
         self.color_linea = COLOR_LINEA_NIVEL
         self.ancho_linea = ANCHO_LINEA_NIVEL
+        
+        # Política de drenaje: compuertas en el fondo o vaciado al terminar el tiempo
+        self.politica_drenaje = POLITICA_DRENAJE_POR_DEFECTO
+        self.compuertas = [Compuerta("compuerta 1")]
+        self.presupuesto_drenaje = PRESUPUESTO_DRENAJE_POR_FRAME
+        
+        # Estado del ciclo en curso
+        self._carga_ciclo = None        # Granos a descargar por las compuertas (la carga de la bolsa)
+        self._drenados_ciclo = 0
+        self._frames_sin_flujo = 0
+        self._fila_vaciado = None       # Próxima fila del vaciado amortizado (política temporizada)
+        
+        # Compuertas tapadas: el último ciclo terminó sin flujo y no se rearma
+        # hasta que vuelva a haber perlita sobre alguna compuerta
+        self.compuertas_bloqueadas = False
+        
+        # Sistema de métricas opcional donde se reportan los ciclos de drenaje
+        self.metricas = metricas
+        
+        # Sensor de la línea y grilla donde está registrado (se conecta al activar el modo)
+        self.sensor = None
+        self._grilla_sensor = None
     
     def configurar_constantes(self, tiempo_drenaje, color_linea, ancho_linea):
         """Configura las constantes del sistema de nivel"""
@@ -23,6 +50,25 @@ class SistemaNivel:
         self.color_linea = color_linea
         self.ancho_linea = ancho_linea
     
+    def configurar_drenaje(self, politica, compuertas=None):
+        """
+        Configura la política de drenaje y sus compuertas.
+        
+        Parámetros:
+            politica (str): "compuertas" o "temporizado"
+            compuertas (list, opcional): Diccionarios de compuerta (ver
+                Compuerta.desde_dict); sin compuertas se usa una centrada
+                
+        Lanza:
+            ValueError: Si la política o alguna compuerta son inválidas
+        """
+        if politica not in POLITICAS_DRENAJE:
+            raise ValueError(f"Política de drenaje desconocida: {politica} "
+                             f"(opciones: {', '.join(POLITICAS_DRENAJE)})")
+        self.politica_drenaje = politica
+        self.compuertas = ([Compuerta.desde_dict(datos, i) for i, datos in enumerate(compuertas)]
+                           if compuertas else [Compuerta("compuerta 1")])
+    
     def alternar_modo(self):
         """Alterna el modo de nivel activado/desactivado"""
         self.modo_activo = not self.modo_activo
@@ -40,89 +86,216 @@ class SistemaNivel:
             self.posicion_linea = min(0.9, self.posicion_linea + 0.05)
         return self.posicion_linea
     
+    def sincronizar_sensor(self, grilla):
+        """
+        Mantiene el sensor registrado en la grilla actual y en la fila de la línea.
+        
+        Es O(1) salvo cuando cambia la grilla (resolución), se mueve la línea o
+        se activa el modo: solo entonces se registra un sensor nuevo, que cuenta
+        la región una vez. Con el modo desactivado el sensor se quita de la
+        grilla y vigilar el nivel no tiene costo.
+        """
+        if not self.modo_activo:
+            self._desconectar_sensor()
+            return
+        
+        fila_linea = int(self.posicion_linea * grilla.filas)
+        if (self.sensor is not None and self._grilla_sensor is grilla
+                and self.sensor.fila == fila_linea):
+            return
+        
+        self._desconectar_sensor()
+        self.sensor = SensorNivel(fila_linea, al_llenarse=self._al_llenarse)
+        self._grilla_sensor = grilla
+        grilla.registrar_sensor(self.sensor)
+    
+    def _desconectar_sensor(self):
+        """Quita el sensor de la grilla donde estaba registrado"""
+        if self.sensor is not None:
+            self._grilla_sensor.quitar_sensor(self.sensor)
+            self.sensor = None
+            self._grilla_sensor = None
+    
+    def _al_llenarse(self, sensor):
+        """Evento del sensor: el área debajo de la línea llegó al umbral de llenado"""
+        if self.modo_activo and not self.esta_drenando and not self.compuertas_bloqueadas:
+            self.iniciar_drenaje()
+    
     def verificar_nivel_lleno(self, grilla):
-        """Verifica si el área debajo de la línea está llena de perlita"""
+        """
+        Verifica si el área debajo de la línea está llena de perlita.
+        
+        Ya no recorre la grilla: consulta el estado del sensor, que la grilla
+        mantiene al día con cada grano que entra, sale o cruza la línea.
+        """
         if not self.modo_activo or self.esta_drenando:
             return False
-            
-        fila_linea = int(self.posicion_linea * grilla.filas)
-        
-        # Contar celdas llenas de perlita y celdas disponibles debajo de la línea
-        celdas_perlita = 0
-        celdas_disponibles = 0  # Celdas que pueden ser ocupadas por perlita (vacías o con rocas)
         
-        for fila in range(fila_linea, grilla.filas):
-            for col in range(grilla.columnas):
-                particula = grilla.obtener_celda(fila, col)
-                # Importar aquí para evitar dependencias circulares
-                from particulas import ParticulaPerlita
-                
-                if isinstance(particula, ParticulaPerlita):
-                    celdas_perlita += 1
-                    celdas_disponibles += 1
-                elif particula is None:  # Celda vacía
-                    celdas_disponibles += 1
-                # Las rocas no cuentan como disponibles ni como perlita
-        
-        # Si está 95% lleno de perlita (considerando solo espacios disponibles), activar drenaje
-        if celdas_disponibles > 0 and (celdas_perlita / celdas_disponibles) >= 0.95:
+        self.sincronizar_sensor(grilla)
+        if self.sensor.lleno and not self.esta_drenando and not self.compuertas_bloqueadas:
             self.iniciar_drenaje()
-            return True
-        return False
+        return self.esta_drenando
     
     def iniciar_drenaje(self):
         """Inicia el proceso de drenaje"""
         self.esta_drenando = True
         self.tiempo_inicio_drenaje = time.time()
-        self.timer_mensaje_drenaje = self.tiempo_drenaje_segundos
+        # Con compuertas el cartel dura lo que dura la descarga, no un tiempo fijo
+        self.timer_mensaje_drenaje = (self.tiempo_drenaje_segundos
+                                      if self.politica_drenaje == "temporizado" else 0)
+        
+        # La carga del ciclo es la perlita que había debajo de la línea al abrir
+        self._carga_ciclo = self.sensor.perlita if self.sensor is not None else None
+        self._drenados_ciclo = 0
+        self._frames_sin_flujo = 0
+        self._fila_vaciado = None
+        
+        if self.metricas is not None:
+            self.metricas.registrar_inicio_drenaje(self.tiempo_inicio_drenaje)
     
     def actualizar_drenaje(self, grilla):
-        """Actualiza el proceso de drenaje"""
+        """
+        Actualiza el proceso de drenaje según la política configurada.
+        
+        Con "compuertas" los granos salen por el fondo a su caudal hasta
+        descargar la carga del ciclo; con "temporizado" se simula la caída
+        durante tiempo_drenaje_segundos y después se vacía la perlita debajo
+        de la línea. En ambos casos se retiran como mucho presupuesto_drenaje
+        granos por frame, así el costo del drenaje se reparte entre frames.
+        
+        Si las compuertas se quedan sin flujo antes de descargar la carga, el
+        ciclo se cancela (no cuenta como completado) y el sistema queda con
+        compuertas_bloqueadas hasta que llegue perlita a alguna compuerta.
+        """
         if not self.esta_drenando:
+            if self.compuertas_bloqueadas:
+                self._revisar_compuertas(grilla)
             return
             
         tiempo_actual = time.time()
         transcurrido = tiempo_actual - self.tiempo_inicio_drenaje
         
-        # Actualizar timer del mensaje
-        self.timer_mensaje_drenaje = max(0, self.tiempo_drenaje_segundos - transcurrido)
-        
-        if transcurrido >= self.tiempo_drenaje_segundos:
-            # Terminar drenaje - limpiar solo perlita que quede debajo de la línea
-            fila_linea = int(self.posicion_linea * grilla.filas)
-            for fila in range(fila_linea, grilla.filas):
-                for col in range(grilla.columnas):
-                    particula = grilla.obtener_celda(fila, col)
-                    # Importar aquí para evitar dependencias circulares
-                    from particulas import ParticulaPerlita
-                    
-                    # Solo eliminar partículas de perlita, mantener rocas
-                    if isinstance(particula, ParticulaPerlita):
-                        grilla.eliminar_particula(fila, col)
-            
+        if self.politica_drenaje == "temporizado":
+            self.timer_mensaje_drenaje = max(0, self.tiempo_drenaje_segundos - transcurrido)
+        
+        fila_linea = int(self.posicion_linea * grilla.filas)
+        if self.politica_drenaje == "compuertas":
+            drenados, terminado = self._drenar_compuertas(grilla)
+        else:
+            drenados, terminado = self._drenar_temporizado(grilla, fila_linea, transcurrido)
+        self._drenados_ciclo += drenados
+        
+        if drenados and self.metricas is not None:
+            self.metricas.registrar_granos_drenados(drenados)
+        
+        if terminado:
             self.esta_drenando = False
             self.timer_mensaje_drenaje = 0
+            if self.compuertas_bloqueadas:
+                # Sin flujo no hubo bolsa: el ciclo no se cuenta ni se rearma
+                if self.metricas is not None:
+                    self.metricas.registrar_drenaje_cancelado()
+                return
+            if self.metricas is not None:
+                self.metricas.registrar_fin_drenaje(tiempo_actual)
+
+            # La aparición sigue llenando durante el drenaje: si la región quedó
+            # llena el sensor no ve un cruce nuevo, así que el ciclo siguiente
+            # se arranca desde acá
+            if self.sensor is not None:
+                self.sensor.reevaluar()
+
+    def _revisar_compuertas(self, grilla):
+        """Levanta el bloqueo cuando vuelve a haber perlita sobre alguna compuerta"""
+        if self.modo_activo and not any(compuerta.tiene_perlita(grilla) for compuerta in self.compuertas):
             return
+        self.compuertas_bloqueadas = False
+        if self.sensor is not None:
+            self.sensor.reevaluar()
+
+    def obtener_mensaje_drenaje(self):
+        """Retorna el cartel de drenaje a mostrar, o None"""
+        if self.compuertas_bloqueadas:
+            return "COMPUERTAS BLOQUEADAS"
+        if self.esta_drenando and (self.politica_drenaje == "compuertas" or self.timer_mensaje_drenaje > 0):
+            return "ABRIENDO COMPUERTAS"
+        return None
+
+    def _drenar_compuertas(self, grilla):
+        """
+        Abre las compuertas un paso.
         
-        # Efecto de gravedad - las partículas caen hacia abajo
-        fila_linea = int(self.posicion_linea * grilla.filas)
+        Retorna:
+            tuple: (granos retirados, si terminó el ciclo). El ciclo termina al
+                descargar la carga o cuando las compuertas pasan
+                FRAMES_COMPUERTA_SIN_FLUJO frames sin granos que dejar salir;
+                en ese caso además quedan marcadas como bloqueadas.
+        """
+        drenados = 0
+        for compuerta in self.compuertas:
+            drenados += compuerta.descargar(grilla, self.presupuesto_drenaje - drenados)
+        
+        self._frames_sin_flujo = 0 if drenados else self._frames_sin_flujo + 1
+        descargada = (self._carga_ciclo is not None and
+                      self._drenados_ciclo + drenados >= self._carga_ciclo)
+        if not descargada and self._frames_sin_flujo >= FRAMES_COMPUERTA_SIN_FLUJO:
+            self.compuertas_bloqueadas = True
+            return drenados, True
+        return drenados, descargada
+    
+    def _drenar_temporizado(self, grilla, fila_linea, transcurrido):
+        """
+        Simula la caída durante el tiempo de drenaje y después vacía por partes.
+        
+        Retorna:
+            tuple: (granos retirados, si terminó el ciclo)
+            
+        El vaciado final recorre las filas desde el fondo hasta la línea,
+        retomando cada frame donde quedó el anterior, y retira la perlita
+        (las rocas se mantienen) de a presupuesto_drenaje granos por frame.
+        """
+        if transcurrido < self.tiempo_drenaje_segundos:
+            # Calcular velocidad de caída basada en el progreso
+            progreso = transcurrido / self.tiempo_drenaje_segundos
+            velocidad_caida = max(1, int(progreso * 3))  # Velocidad aumenta con el tiempo
+            
+            # Hacer que las partículas caigan hacia abajo
+            drenados = 0
+            for _ in range(velocidad_caida):
+                drenados += self._simular_gravedad_drenaje(grilla, fila_linea)
+            return drenados, False
+        
+        fila_inicio, fila_fin = grilla.rango_filas_activas()
+        fila_tope = max(fila_linea, fila_inicio)
+        if self._fila_vaciado is None:
+            self._fila_vaciado = grilla.filas - 1
+        fila = min(self._fila_vaciado, fila_fin - 1)
         
-        # Calcular velocidad de caída basada en el progreso
-        progreso = transcurrido / self.tiempo_drenaje_segundos
-        velocidad_caida = max(1, int(progreso * 3))  # Velocidad aumenta con el tiempo
+        celdas = []
+        while fila >= fila_tope and len(celdas) < self.presupuesto_drenaje:
+            for inicio, fin in grilla.segmentos_activos(fila):
+                for col in range(inicio, fin):
+                    if isinstance(grilla.obtener_celda(fila, col), ParticulaPerlita):
+                        celdas.append((fila, col))
+            fila -= 1
+        self._fila_vaciado = fila
         
-        # Hacer que las partículas caigan hacia abajo
-        for _ in range(velocidad_caida):
-            self._simular_gravedad_drenaje(grilla, fila_linea)
+        return grilla.eliminar_particulas_lote(celdas), fila < fila_tope
     
     def _simular_gravedad_drenaje(self, grilla, fila_linea):
-        """Simula que las partículas de perlita caen por gravedad durante el drenaje"""
+        """
+        Simula que las partículas de perlita caen por gravedad durante el drenaje.
+        
+        Retorna la cantidad de partículas que salieron por el fondo del campo.
+        """
+        drenados = 0
+        
         # Procesar desde abajo hacia arriba para simular caída
-        for fila in range(grilla.filas - 1, fila_linea - 1, -1):
-            for col in range(grilla.columnas):
+        fila_inicio, fila_fin = grilla.rango_filas_activas()
+        for fila in range(fila_fin - 1, max(fila_linea, fila_inicio) - 1, -1):
+            columnas = [col for inicio, fin in grilla.segmentos_activos(fila) for col in range(inicio, fin)]
+            for col in columnas:
                 particula = grilla.obtener_celda(fila, col)
-                # Importar aquí para evitar dependencias circulares
-                from particulas import ParticulaPerlita
                 
                 # Solo procesar partículas de perlita, ignorar rocas
                 if isinstance(particula, ParticulaPerlita):
@@ -130,10 +303,10 @@ class SistemaNivel:
                     if fila == grilla.filas - 1:
                         # Si está en la fila inferior, eliminarla (cae fuera del campo)
                         grilla.eliminar_particula(fila, col)
+                        drenados += 1
                     elif grilla.obtener_celda(fila + 1, col) is None:
                         # Si hay espacio abajo, mover la partícula
-                        grilla.establecer_celda(fila + 1, col, particula)
-                        grilla.eliminar_particula(fila, col)
+                        grilla.mover_particula(fila, col, fila + 1, col)
                     else:
                         # Si no puede caer directamente, intentar caer en diagonal
                         direcciones = [-1, 1]  # Izquierda y derecha
@@ -143,10 +316,10 @@ class SistemaNivel:
                             nueva_col = col + direccion
                             if (0 <= nueva_col < grilla.columnas and 
                                 grilla.obtener_celda(fila + 1, nueva_col) is None):
-                                grilla.establecer_celda(fila + 1, nueva_col, particula)
-                                grilla.eliminar_particula(fila, col)
+                                grilla.mover_particula(fila, col, fila + 1, nueva_col)
                                 break
+        return drenados
     
-    def obtener_posicion_linea_pixeles(self, grilla_fila, tamaño_celda):
-        """Obtiene la posición de la línea en píxeles"""
-        return int(self.posicion_linea * grilla_fila * tamaño_celda) 
\ No newline at end of file
+    def obtener_posicion_linea_pixeles(self, grilla_fila, vista):
+        """Obtiene la posición de la línea en píxeles relativos al área visible de la vista"""
+        return vista.fila_a_local(self.posicion_linea * grilla_fila) 
\ No newline at end of file
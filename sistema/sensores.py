@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Sensores de nivel por eventos.
+
+Un sensor vigila la región del contenedor desde la fila de su línea hasta el
+fondo y lleva la cuenta de la perlita y las rocas que hay en ella. No recorre
+la grilla en cada frame: la grilla le avisa solo cuando un grano entra o sale
+de la región (al agregarse, eliminarse o cruzar la línea al moverse), así que
+el costo de vigilar el nivel no depende del tamaño del contenedor ni de la
+cantidad de sensores mientras los granos no crucen ninguna línea.
+
+Cuando la perlita alcanza el umbral de las celdas disponibles (todas las de la
+región menos las rocas) el sensor dispara el evento al_llenarse una sola vez,
+hasta que el nivel vuelva a bajar del umbral. Si quien atiende el evento
+termina su trabajo (un drenaje) con la región todavía llena, reevaluar()
+vuelve a dispararlo según el nivel actual.
+"""
+
+from particulas import PERLITA, ROCA
+from core.constantes import UMBRAL_NIVEL_LLENO
+
+class SensorNivel:
+    """
+    Sensor de llenado de la región debajo de una línea.
+
+    Atributos:
+        fila (int): Primera fila de la región vigilada (la de la línea)
+        umbral (float): Fracción de celdas disponibles que dispara el evento
+        perlita (int): Granos de perlita dentro de la región
+        rocas (int): Rocas dentro de la región
+        celdas (int): Celdas totales de la región
+        bajadas (int): Granos que cruzaron la línea hacia abajo
+        subidas (int): Granos que cruzaron la línea hacia arriba
+        lleno (bool): Si la región está por encima del umbral
+        al_llenarse (list): Funciones llamadas con el sensor al llegar al umbral
+    """
+
+    def __init__(self, fila, umbral=UMBRAL_NIVEL_LLENO, al_llenarse=None):
+        self.fila = fila
+        self.umbral = umbral
+        self.perlita = 0
+        self.rocas = 0
+        self.celdas = 0
+        self.bajadas = 0
+        self.subidas = 0
+        self.lleno = False
+        self.al_llenarse = [al_llenarse] if al_llenarse is not None else []
+
+    def recalcular(self, grilla):
+        """
+        Cuenta desde cero la perlita y las rocas de la región con un único recorrido.
+
+        Se usa al registrar el sensor en una grilla o cuando la grilla se vacía;
+        a partir de ahí los conteos se mantienen con los avisos de la grilla.
+        Solo se recorren los tramos activos: fuera de ellos las celdas están vacías.
+        """
+        perlita = 0
+        rocas = 0
+        fila_inicio, fila_fin = grilla.rango_filas_activas()
+        for fila in range(max(self.fila, fila_inicio), fila_fin):
+            for inicio, fin in grilla.segmentos_activos(fila):
+                for columna in range(inicio, fin):
+                    particula = grilla.obtener_celda(fila, columna)
+                    if particula is None:
+                        continue
+                    if particula.tipo == PERLITA:
+                        perlita += 1
+                    elif particula.tipo == ROCA:
+                        rocas += 1
+
+        self.perlita = perlita
+        self.rocas = rocas
+        self.celdas = max(0, grilla.filas - self.fila) * grilla.columnas
+        self._evaluar()
+
+    def registrar_cambio(self, tipo, fila, delta):
+        """Registra un grano agregado (delta 1) o eliminado (delta -1) en una fila"""
+        if fila >= self.fila:
+            self._contar(tipo, delta)
+            self._evaluar()
+
+    def registrar_movimiento(self, tipo, fila, nueva_fila):
+        """Registra un grano que se movió de fila; solo cuenta si cruzó la línea"""
+        if (fila >= self.fila) == (nueva_fila >= self.fila):
+            return
+        if nueva_fila >= self.fila:
+            self.bajadas += 1
+            self._contar(tipo, 1)
+        else:
+            self.subidas += 1
+            self._contar(tipo, -1)
+        self._evaluar()
+
+    def reevaluar(self):
+        """
+        Vuelve a disparar al_llenarse si la región sigue en el umbral o por encima.
+
+        El evento se dispara por flanco: mientras el nivel no baje del umbral
+        no se repite. Cuando un drenaje termina y la aparición ya volvió a
+        llenar la región, el sistema de nivel llama a este método para que
+        el próximo ciclo arranque sin esperar un nuevo cruce.
+        """
+        self.lleno = False
+        self._evaluar()
+
+    def ocupacion(self):
+        """Retorna la fracción de celdas disponibles (sin rocas) ocupadas por perlita"""
+        disponibles = self.celdas - self.rocas
+        if disponibles <= 0:
+            return 0.0
+        return self.perlita / disponibles
+
+    def _contar(self, tipo, delta):
+        """Suma delta al contador del tipo de grano"""
+        if tipo == PERLITA:
+            self.perlita += delta
+        elif tipo == ROCA:
+            self.rocas += delta
+
+    def _evaluar(self):
+        """Actualiza el estado de llenado y dispara el evento al cruzar el umbral"""
+        lleno = self.celdas - self.rocas > 0 and self.ocupacion() >= self.umbral
+        if lleno and not self.lleno:
+            self.lleno = True
+            for oyente in self.al_llenarse:
+                oyente(self)
+        else:
+            self.lleno = lleno
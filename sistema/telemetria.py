@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+Telemetría de la simulación por TCP local.
+
+Un servidor asyncio, en un hilo aparte, envía a los clientes conectados el
+estado de la grilla y las métricas de nivel, aparición y drenaje, a una
+tasa configurable. Sirve para seguir el llenado desde un tablero sin abrir
+la ventana de pygame (headless.py --telemetria).
+
+Protocolo (solo en la interfaz local):
+Cada mensaje es un entero de 4 bytes big-endian con el largo, un byte de
+tipo y el contenido:
+- b"H" cabecera, JSON: versión, filas, columnas, tamaño de celda y frames
+  por segundo. Se envía al conectarse y cada vez que cambia la geometría;
+  el cliente parte de un plano de tipos vacío.
+- b"G" grilla: número de frame (8 bytes big-endian) y el plano de tipos
+  codificado como diferencia con el último plano que recibió ese cliente:
+  XOR byte a byte comprimido con zlib. Las celdas que no cambiaron son
+  ceros, así un frame casi quieto ocupa unos pocos bytes.
+- b"E" estado, JSON: número de frame y el resumen de estado_simulacion
+  (nivel, aparición, física y métricas de producción).
+
+Contrapresión:
+El servidor no espera a ningún cliente. Si un cliente tiene más de
+LIMITE_BUFFER_TELEMETRIA bytes sin enviar, se le omiten frames; como cada
+cliente guarda su propio plano base, el primer frame que recibe al
+ponerse al día ya incluye todos los cambios omitidos. Un cliente que pasa
+SEGUNDOS_CLIENTE_LENTO omitiendo frames se desconecta.
+"""
+
+import asyncio
+import ipaddress
+import json
+import struct
+import threading
+import time
+import zlib
+from grillas import GrillaCompacta
+from sistema.compartido import estado_simulacion
+from core.constantes import (PUERTO_TELEMETRIA, FRAMES_TELEMETRIA_POR_SEGUNDO,
+                             LIMITE_BUFFER_TELEMETRIA, SEGUNDOS_CLIENTE_LENTO)
+
+VERSION_TELEMETRIA = 1
+
+# Tipos de mensaje
+MENSAJE_CABECERA = b"H"
+MENSAJE_GRILLA = b"G"
+MENSAJE_ESTADO = b"E"
+
+_PREFIJO = struct.Struct(">I")
+_FRAME = struct.Struct(">Q")
+
+def verificar_host_local(host, servicio):
+    """
+    Verifica que un servidor vaya a escuchar solo en la interfaz local.
+
+    Lanza:
+        ValueError: Si host no es "localhost" ni una dirección de loopback
+    """
+    if host != "localhost" and not ipaddress.ip_address(host).is_loopback:
+        raise ValueError(f"{servicio} solo escucha en la interfaz local, no en {host}")
+
+class ServidorAsyncio:
+    """
+    Servidor TCP local que corre en un hilo daemon con su propio bucle de asyncio.
+
+    Base común de la telemetría y el control remoto: arranca el bucle en el
+    hilo, espera a que el servidor escuche y lo detiene cerrando primero
+    las conexiones. Las subclases definen _atender(lector, escritor) y, si
+    guardan conexiones abiertas, _cerrar_conexiones().
+
+    Atributos:
+        host (str): Dirección local donde escucha
+        puerto (int): Puerto TCP (el asignado si se pidió 0)
+    """
+
+    nombre_hilo = "servidor"
+
+    def __init__(self, puerto, host, servicio):
+        """
+        Lanza:
+            ValueError: Si host no es una dirección de loopback
+        """
+        verificar_host_local(host, servicio)
+        self.host = host
+        self.puerto = puerto
+
+        self._bucle = None
+        self._hilo = None
+        self._servidor = None
+
+    def iniciar(self):
+        """
+        Arranca el hilo del servidor y espera a que escuche (puerto queda resuelto).
+
+        Lanza:
+            OSError: Si no se pudo abrir el puerto
+        """
+        listo = threading.Event()
+        errores = []
+
+        def correr():
+            bucle = asyncio.new_event_loop()
+            try:
+                self._servidor = bucle.run_until_complete(
+                    asyncio.start_server(self._atender, self.host, self.puerto))
+            except OSError as error:
+                bucle.close()
+                errores.append(error)
+                listo.set()
+                return
+            self._bucle = bucle
+            self.puerto = self._servidor.sockets[0].getsockname()[1]
+            listo.set()
+            bucle.run_forever()
+            bucle.close()
+
+        self._hilo = threading.Thread(target=correr, name=self.nombre_hilo, daemon=True)
+        self._hilo.start()
+        listo.wait()
+        if errores:
+            self._hilo.join()
+            self._hilo = None
+            raise errores[0]
+
+    def detener(self):
+        """Cierra las conexiones y el servidor y espera al hilo"""
+        if self._bucle is None or self._hilo is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._cerrar(), self._bucle).result()
+        self._bucle.call_soon_threadsafe(self._bucle.stop)
+        self._hilo.join()
+        self._hilo = None
+        self._bucle = None
+
+    async def _cerrar(self):
+        self._servidor.close()
+        self._cerrar_conexiones()
+        await self._servidor.wait_closed()
+
+    def _cerrar_conexiones(self):
+        """Cierra las conexiones abiertas (en el hilo del servidor)"""
+
+    async def _atender(self, lector, escritor):
+        raise NotImplementedError
+
+def empaquetar_mensaje(tipo, contenido):
+    """Arma un mensaje del protocolo: largo, tipo y contenido"""
+    return _PREFIJO.pack(len(contenido) + 1) + tipo + contenido
+
+def codificar_diferencia(base, plano):
+    """
+    Codifica un plano de tipos como diferencia con otro del mismo largo.
+
+    El XOR de los dos planos se calcula como enteros (en C) y se comprime
+    con zlib: las celdas iguales quedan en cero y casi no ocupan lugar.
+    """
+    diferencia = int.from_bytes(base, "little") ^ int.from_bytes(plano, "little")
+    return zlib.compress(diferencia.to_bytes(len(plano), "little"), 1)
+
+def aplicar_diferencia(base, codificada):
+    """Reconstruye el plano nuevo a partir del anterior y su diferencia codificada"""
+    diferencia = zlib.decompress(codificada)
+    return (int.from_bytes(base, "little") ^ int.from_bytes(diferencia, "little")).to_bytes(len(base), "little")
+
+class _Cliente:
+    """Conexión de un cliente con el último plano que recibió"""
+
+    __slots__ = ("escritor", "geometria", "frame_base", "plano_base", "lento_desde", "frames_omitidos")
+
+    def __init__(self, escritor):
+        self.escritor = escritor
+        self.geometria = None       # None = el cliente todavía necesita la cabecera
+        self.frame_base = 0         # Frame del plano base (0 = plano vacío)
+        self.plano_base = None
+        self.lento_desde = None
+        self.frames_omitidos = 0
+
+class ServidorTelemetria(ServidorAsyncio):
+    """
+    Servidor de telemetría en un hilo con su propio bucle de asyncio.
+
+    La simulación llama a publicar() en cada frame desde su propio hilo;
+    el servidor toma una instantánea a la tasa configurada y la reparte
+    entre los clientes sin bloquear la simulación.
+
+    Atributos:
+        host (str): Dirección local donde escucha
+        puerto (int): Puerto TCP (el asignado si se pidió 0)
+        intervalo (float): Segundos mínimos entre instantáneas
+        frames (int): Instantáneas tomadas
+        clientes_desconectados_por_lentitud (int): Clientes cortados por contrapresión
+    """
+
+    nombre_hilo = "telemetria"
+
+    def __init__(self, puerto=PUERTO_TELEMETRIA, host="127.0.0.1",
+                 frames_por_segundo=FRAMES_TELEMETRIA_POR_SEGUNDO):
+        """
+        Lanza:
+            ValueError: Si host no es una dirección de loopback
+        """
+        super().__init__(puerto, host, "La telemetría")
+        self.frames_por_segundo = frames_por_segundo
+        self.intervalo = 1.0 / frames_por_segundo if frames_por_segundo > 0 else 0.0
+        self.frames = 0
+        self.clientes_desconectados_por_lentitud = 0
+
+        self._clientes = []
+        self._proxima = 0.0
+        self._instantanea = None
+        self._cerrojo = threading.Lock()
+
+    def _cerrar_conexiones(self):
+        for cliente in list(self._clientes):
+            cliente.escritor.close()
+        self._clientes.clear()
+
+    def publicar(self, simulacion):
+        """
+        Toma una instantánea si pasó el intervalo y la entrega al hilo del servidor.
+
+        Se llama desde el hilo de la simulación. La copia del plano de tipos
+        es lo único que se hace acá; la codificación corre en el hilo del
+        servidor. Si el servidor todavía no repartió la instantánea anterior,
+        la nueva la reemplaza.
+        """
+        ahora = time.perf_counter()
+        if ahora < self._proxima or self._bucle is None:
+            return False
+        self._proxima = ahora + self.intervalo
+
+        grilla = simulacion.grilla
+        plano = bytes(grilla.tipos) if isinstance(grilla, GrillaCompacta) else bytes(grilla.exportar_planos()[0])
+        self.frames += 1
+        instantanea = (self.frames, (grilla.filas, grilla.columnas, grilla.tamaño_celda), plano,
+                       estado_simulacion(simulacion))
+        with self._cerrojo:
+            pendiente = self._instantanea is not None
+            self._instantanea = instantanea
+        if not pendiente:
+            self._bucle.call_soon_threadsafe(self._repartir)
+        return True
+
+    async def _atender(self, lector, escritor):
+        """Registra un cliente y espera a que se desconecte (los clientes no envían datos)"""
+        cliente = _Cliente(escritor)
+        self._clientes.append(cliente)
+        try:
+            while await lector.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            if cliente in self._clientes:
+                self._clientes.remove(cliente)
+            escritor.close()
+
+    def _repartir(self):
+        """
+        Envía la última instantánea a cada cliente (en el hilo del servidor).
+
+        Algoritmo:
+            1. A los clientes con el buffer de salida lleno se les omite el frame
+               (y se los desconecta si llevan demasiado tiempo así)
+            2. A los demás se les envía la diferencia entre su plano base y el
+               actual; los clientes con la misma base comparten la codificación
+            3. El plano actual pasa a ser la base de cada cliente que lo recibió
+        """
+        with self._cerrojo:
+            instantanea, self._instantanea = self._instantanea, None
+        if instantanea is None:
+            return
+        frame, geometria, plano, estado = instantanea
+        ahora = time.monotonic()
+        estado = empaquetar_mensaje(MENSAJE_ESTADO, json.dumps({"frame": frame, **estado}).encode("utf-8"))
+        cabecera = empaquetar_mensaje(MENSAJE_CABECERA, json.dumps({
+            "version": VERSION_TELEMETRIA, "filas": geometria[0], "columnas": geometria[1],
+            "tamaño_celda": geometria[2], "frames_por_segundo": self.frames_por_segundo
+        }).encode("utf-8"))
+        codificadas = {}
+
+        for cliente in list(self._clientes):
+            transporte = cliente.escritor.transport
+            if transporte.is_closing():
+                continue
+            if transporte.get_write_buffer_size() > LIMITE_BUFFER_TELEMETRIA:
+                cliente.frames_omitidos += 1
+                if cliente.lento_desde is None:
+                    cliente.lento_desde = ahora
+                elif ahora - cliente.lento_desde > SEGUNDOS_CLIENTE_LENTO:
+                    self.clientes_desconectados_por_lentitud += 1
+                    transporte.abort()
+                continue
+            cliente.lento_desde = None
+
+            mensajes = []
+            if cliente.geometria != geometria:
+                mensajes.append(cabecera)
+                cliente.geometria = geometria
+                cliente.frame_base, cliente.plano_base = 0, bytes(len(plano))
+            if cliente.frame_base not in codificadas:
+                codificadas[cliente.frame_base] = empaquetar_mensaje(
+                    MENSAJE_GRILLA, _FRAME.pack(frame) + codificar_diferencia(cliente.plano_base, plano))
+            mensajes.append(codificadas[cliente.frame_base])
+            mensajes.append(estado)
+            cliente.escritor.writelines(mensajes)
+            cliente.frame_base, cliente.plano_base = frame, plano
+
+async def recibir_telemetria(puerto=PUERTO_TELEMETRIA, host="127.0.0.1"):
+    """
+    Cliente de telemetría: se conecta y produce las actualizaciones decodificadas.
+
+    Produce:
+        tuple: (tipo, datos) con tipo "cabecera" (dict), "grilla" ((frame, plano
+               de tipos como bytes) ya reconstruido) o "estado" (dict)
+    """
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    plano = b""
+    try:
+        while True:
+            try:
+                largo = _PREFIJO.unpack(await lector.readexactly(_PREFIJO.size))[0]
+                mensaje = await lector.readexactly(largo)
+            except asyncio.IncompleteReadError:
+                return
+            tipo, contenido = mensaje[:1], mensaje[1:]
+            if tipo == MENSAJE_CABECERA:
+                cabecera = json.loads(contenido)
+                plano = bytes(cabecera["filas"] * cabecera["columnas"])
+                yield "cabecera", cabecera
+            elif tipo == MENSAJE_GRILLA:
+                plano = aplicar_diferencia(plano, contenido[_FRAME.size:])
+                yield "grilla", (_FRAME.unpack_from(contenido)[0], plano)
+            elif tipo == MENSAJE_ESTADO:
+                yield "estado", json.loads(contenido)
+    finally:
+        escritor.close()
+
+async def _mostrar(puerto, host):
+    """Imprime una línea por actualización de estado (cliente de consola)"""
+    async for tipo, datos in recibir_telemetria(puerto, host):
+        if tipo == "cabecera":
+            print(f"Grilla {datos['columnas']}x{datos['filas']} a {datos['frames_por_segundo']} frames/s")
+        elif tipo == "estado":
+            nivel = datos["nivel"]
+            metricas = datos["metricas"]
+            ocupacion = "-" if nivel["ocupacion"] is None else f"{nivel['ocupacion'] * 100:.0f}%"
+            print(f"frame={datos['frame']} nivel={ocupacion} drenando={nivel['esta_drenando']} "
+                  f"bloqueadas={nivel['compuertas_bloqueadas']} "
+                  f"entrada={metricas['granos_aparecidos']} drenados={metricas['granos_drenados']} "
+                  f"ciclos={metricas['ciclos']} llenado={metricas['granos_por_segundo']:.1f} granos/s")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Cliente de consola de la telemetría de perlita")
+    parser.add_argument("--puerto", type=int, default=PUERTO_TELEMETRIA)
+    parser.add_argument("--host", default="127.0.0.1")
+    argumentos = parser.parse_args()
+    try:
+        asyncio.run(_mostrar(argumentos.puerto, argumentos.host))
+    except KeyboardInterrupt:
+        pass
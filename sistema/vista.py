@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Sistema de vista del área de simulación.
+
+Este módulo separa la resolución de la simulación (cantidad de filas y
+columnas de la grilla) del tamaño con que se muestra en pantalla. La vista
+guarda el rectángulo de pantalla donde se dibuja la grilla y la escala en
+píxeles por celda, y convierte coordenadas entre pantalla y grilla.
+
+Así se puede simular con alta resolución y mostrar una vista previa chica,
+o simular con pocas celdas y mostrarlas grandes en una pantalla amplia.
+
+La vista también permite acercar y desplazar (rueda y arrastre con click
+derecho): en ese caso solo la región visible de la grilla se dibuja, lo que
+hace manejables contenedores de miles de celdas por lado.
+"""
+
+import math
+from core.constantes import ESCALA_MAXIMA_VISTA, FACTOR_ZOOM_RUEDA
+from core.arranque import importar_diferido
+
+# La vista recién carga pygame al crearse, es decir al dibujar el primer frame
+pygame = importar_diferido("pygame")
+
+class SistemaVista:
+    """
+    Mantiene la correspondencia entre la grilla y su área en pantalla.
+
+    Con zoom 1 la grilla entra completa en el área disponible. Al acercar,
+    la vista muestra solo una ventana de la grilla (la región visible) que
+    se puede desplazar; solo esas celdas se dibujan.
+
+    Atributos:
+        rect (pygame.Rect): Rectángulo de pantalla donde se muestra la grilla
+        escala (float): Tamaño en píxeles de pantalla de cada celda
+        zoom_actual (float): Acercamiento respecto de la vista ajustada (1 = completa)
+        origen (list): [columna, fila] (fraccionarias) de la esquina superior
+                       izquierda visible
+    """
+
+    def __init__(self):
+        """
+        Inicializa la vista con escala 1 en el origen de la pantalla.
+
+        El renderizador ajusta la vista en cada frame según el espacio
+        disponible en la ventana.
+        """
+        self.rect = pygame.Rect(0, 0, 0, 0)   # Área de pantalla ocupada por la grilla
+        self.escala = 1.0                     # Píxeles de pantalla por celda
+        self.zoom_actual = 1.0                # Acercamiento sobre la escala ajustada
+        self.origen = [0.0, 0.0]              # Celda (columna, fila) en la esquina visible
+        self.filas = 1
+        self.columnas = 1
+
+    def ajustar(self, area_disponible, filas, columnas):
+        """
+        Ajusta la vista al área disponible y al zoom actual.
+
+        Con zoom 1 la grilla conserva su proporción y queda centrada en el
+        área. Con zoom mayor, la grilla se agranda y la vista se recorta al
+        área disponible.
+
+        Parámetros:
+            area_disponible (pygame.Rect): Espacio de pantalla reservado para el campo
+            filas (int): Filas de la grilla
+            columnas (int): Columnas de la grilla
+
+        Retorna:
+            pygame.Rect: Rectángulo de pantalla asignado a la grilla
+        """
+        self.filas = filas
+        self.columnas = columnas
+        escala = min(area_disponible.width / columnas, area_disponible.height / filas)
+        escala = max(escala, 1.0 / max(filas, columnas))
+        self.escala = escala * self.zoom_actual
+
+        ancho = max(1, min(area_disponible.width, int(columnas * self.escala)))
+        alto = max(1, min(area_disponible.height, int(filas * self.escala)))
+        self.rect = pygame.Rect(0, 0, ancho, alto)
+        self.rect.center = area_disponible.center
+        self._limitar_origen()
+        return self.rect
+
+    def _limitar_origen(self):
+        """Mantiene la región visible dentro de la grilla"""
+        maximo_columna = max(0.0, self.columnas - self.rect.width / self.escala)
+        maximo_fila = max(0.0, self.filas - self.rect.height / self.escala)
+        self.origen[0] = min(max(self.origen[0], 0.0), maximo_columna)
+        self.origen[1] = min(max(self.origen[1], 0.0), maximo_fila)
+
+    def zoom(self, pasos, posicion):
+        """
+        Acerca (pasos > 0) o aleja (pasos < 0) la vista manteniendo fija la
+        celda que está bajo la posición indicada.
+
+        Parámetros:
+            pasos (int): Pasos de la rueda del mouse
+            posicion (tuple): Posición de pantalla que queda fija
+        """
+        if not self.rect.collidepoint(posicion):
+            posicion = self.rect.center
+        # El acercamiento máximo es por píxeles por celda, así un silo muy alto
+        # se puede acercar tanto como uno chico
+        escala_ajustada = self.escala / self.zoom_actual
+        zoom_maximo = max(1.0, ESCALA_MAXIMA_VISTA / escala_ajustada)
+        nuevo_zoom = min(zoom_maximo, max(1.0, self.zoom_actual * FACTOR_ZOOM_RUEDA ** pasos))
+        if nuevo_zoom == self.zoom_actual:
+            return
+
+        # Celda bajo el puntero antes del cambio
+        local_x = posicion[0] - self.rect.x
+        local_y = posicion[1] - self.rect.y
+        columna = self.origen[0] + local_x / self.escala
+        fila = self.origen[1] + local_y / self.escala
+
+        self.escala *= nuevo_zoom / self.zoom_actual
+        self.zoom_actual = nuevo_zoom
+        self.origen = [columna - local_x / self.escala, fila - local_y / self.escala]
+        # El rectángulo y los límites se recalculan en el próximo ajustar()
+
+    def desplazar(self, desplazamiento):
+        """Desplaza la vista según un movimiento del mouse en píxeles de pantalla"""
+        self.origen[0] -= desplazamiento[0] / self.escala
+        self.origen[1] -= desplazamiento[1] / self.escala
+        self._limitar_origen()
+
+    def restablecer(self):
+        """Vuelve a mostrar la grilla completa"""
+        self.zoom_actual = 1.0
+        self.origen = [0.0, 0.0]
+
+    def region_visible(self):
+        """
+        Calcula las celdas que cubren el área de pantalla de la vista.
+
+        Retorna:
+            tuple: ((fila, columna, filas, columnas), paso, desfase) donde paso
+                   es cada cuántas celdas se muestrea cuando una celda mide
+                   menos de un píxel, y desfase (x, y) son los píxeles a
+                   correr el dibujo por el origen fraccionario
+        """
+        paso = max(1, int(1 / self.escala))
+        columna = int(self.origen[0])
+        fila = int(self.origen[1])
+        columnas = min(self.columnas - columna, math.ceil(self.origen[0] + self.rect.width / self.escala) - columna)
+        filas = min(self.filas - fila, math.ceil(self.origen[1] + self.rect.height / self.escala) - fila)
+        desfase = (int((self.origen[0] - columna) * self.escala), int((self.origen[1] - fila) * self.escala))
+        return (fila, columna, max(1, filas), max(1, columnas)), paso, desfase
+
+    def pantalla_a_celda(self, posicion):
+        """
+        Convierte una posición de pantalla a coordenadas de grilla.
+
+        Parámetros:
+            posicion (tuple): Coordenadas (x, y) en píxeles de pantalla
+
+        Retorna:
+            tuple o None: (fila, columna) de la celda, o None si la posición
+                          está fuera del área de la grilla
+        """
+        if not self.rect.collidepoint(posicion):
+            return None
+        columna = int(self.origen[0] + (posicion[0] - self.rect.x) / self.escala)
+        fila = int(self.origen[1] + (posicion[1] - self.rect.y) / self.escala)
+        return fila, columna
+
+    def celda_a_local(self, fila, columna):
+        """
+        Convierte una celda a píxeles relativos a la esquina del área de la grilla.
+
+        Retorna:
+            tuple: Coordenadas (x, y) de la esquina superior izquierda de la celda
+        """
+        return int((columna - self.origen[0]) * self.escala), int((fila - self.origen[1]) * self.escala)
+
+    def fila_a_local(self, fila):
+        """Convierte una fila (puede ser fraccionaria) a píxeles relativos al área de la grilla"""
+        return int((fila - self.origen[1]) * self.escala)
+
+    def contiene(self, posicion):
+        """Indica si una posición de pantalla está dentro del área de la grilla"""
+        return self.rect.collidepoint(posicion)
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Configuración de las pruebas.
+
+Los módulos del simulador se importan desde la raíz del repositorio (como
+hacen main.py y headless.py), así que se agrega al camino de importación.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la aplicación de lotes del control remoto (sistema/control.py)"""
+
+from headless import crear_parser, crear_simulacion
+from sistema.control import ERROR_APLICACION, ServidorControl, _preparar
+
+def _peticion(identificador, metodo, **parametros):
+    return {"jsonrpc": "2.0", "id": identificador, "method": metodo, "params": parametros}
+
+def test_lote_con_excepcion_inesperada_se_deshace():
+    simulacion = crear_simulacion(crear_parser().parse_args(["--sin-jit"]))
+    velocidad = simulacion.sistema_aparicion.velocidad
+
+    def fallar():
+        raise RuntimeError("falla interna")
+    simulacion.sistema_aparicion.aumentar_cluster = fallar
+
+    servidor = ServidorControl(puerto=0)
+    preparadas = [_preparar(_peticion(1, "configurar", velocidad=velocidad + 2)),
+                  _preparar(_peticion(2, "aumentar_cluster"))]
+    respuestas = servidor._aplicar_lote(simulacion, preparadas)
+
+    assert simulacion.sistema_aparicion.velocidad == velocidad
+    assert [respuesta["error"]["code"] for respuesta in respuestas] == [ERROR_APLICACION] * 2
+    assert "RuntimeError" in respuestas[0]["error"]["message"]
+    assert (servidor.lotes_fallidos, servidor.lotes_aplicados) == (1, 0)
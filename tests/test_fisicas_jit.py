@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Paridad del núcleo de caída (sistema/fisicas_jit.py) con la física en Python.
+
+Con la misma semilla y la misma grilla, el camino de Python de MotorFisicas y
+_caer_filas deben dejar iguales los planos de tipos y colores, las marcas de
+bandas, los conteos del sensor y el estado del generador random. La variante
+sin numpy corre siempre; la de numpy y la compilada con numba se saltean si
+falta la dependencia.
+"""
+
+import random
+from array import array
+import pytest
+
+from grillas import GrillaCompacta
+from particulas import PERLITA, ParticulaPerlita, ParticulaRoca
+from sistema.fisicas import MotorFisicas
+from sistema.fisicas_jit import NucleoCaida, _caer_filas, cargar_nucleo
+from sistema.sensores import SensorNivel
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FRAMES = 80
+
+def _grilla(semilla):
+    """Grilla compacta de 48x64 celdas con perlita y rocas sueltas en la mitad de arriba"""
+    generador = random.Random(semilla)
+    grilla = GrillaCompacta(48, 64, 1)
+    for fila in range(grilla.filas // 2):
+        for columna in range(grilla.columnas):
+            sorteo = generador.random()
+            if sorteo < 0.45:
+                grilla.agregar_particula(fila, columna, ParticulaPerlita)
+            elif sorteo < 0.5:
+                grilla.agregar_particula(fila, columna, ParticulaRoca)
+    sensor = SensorNivel(grilla.filas * 3 // 4)
+    grilla.registrar_sensor(sensor)
+    return grilla, sensor
+
+def _correr(nucleo, semilla):
+    """Avanza FRAMES pasos con el núcleo dado (None = camino de Python) y retorna el estado final"""
+    # Los colores de los granos también salen de random
+    random.seed(semilla)
+    grilla, sensor = _grilla(semilla)
+    motor = MotorFisicas()
+    if nucleo is None:
+        motor.usar_jit = False
+    else:
+        motor._nucleo = nucleo
+    for _ in range(FRAMES):
+        motor.actualizar(grilla)
+    return (bytes(grilla.tipos), grilla.colores.tobytes(), bytes(grilla.bandas_sucias),
+            sensor.perlita, sensor.bajadas, random.getstate())
+
+class _NucleoSinNumpy:
+    """
+    _caer_filas sin compilar sobre los planos de la grilla como arreglos de la
+    biblioteca estándar; arma los argumentos igual que NucleoCaida.actualizar_filas
+    """
+
+    def actualizar_filas(self, grilla, fila_inicio, fila_fin):
+        columnas = grilla.columnas
+        granos = grilla.contar_celdas(PERLITA, fila_inicio * columnas, fila_fin * columnas)
+        if not granos:
+            return
+
+        estado = random.getstate()
+        palabras = array('I')
+        palabras.frombytes(random.getrandbits(32 * granos).to_bytes(4 * granos, "little"))
+
+        sucias = grilla.bandas_sucias
+        cortes = grilla._cortes_sensores
+        cruces = array('i', [0]) * (fila_fin - fila_inicio if cortes is not None else 0)
+        usadas = _caer_filas(grilla.tipos, grilla.colores, columnas, fila_inicio, fila_fin, palabras,
+                             bytearray() if sucias is None else sucias,
+                             0 if sucias is None else grilla.alto_banda,
+                             array('H') if cortes is None else cortes, cruces)
+
+        random.setstate(estado)
+        if usadas:
+            random.getrandbits(32 * usadas)
+
+        for desplazamiento, cantidad in enumerate(cruces):
+            for _ in range(cantidad):
+                grilla._avisar_movimiento(PERLITA, fila_inicio + desplazamiento, fila_inicio + desplazamiento + 1)
+
+def _nucleo(variante):
+    """Resuelve la variante del núcleo, salteando la prueba si falta su dependencia"""
+    if variante == "sin-numpy":
+        return _NucleoSinNumpy()
+    if variante == "numpy":
+        if numpy is None:
+            pytest.skip("numpy no está instalado")
+        return NucleoCaida(numpy, _caer_filas)
+    compilado = cargar_nucleo()
+    if compilado is None:
+        pytest.skip("numba no está instalado")
+    return compilado
+
+@pytest.mark.parametrize("variante", ["sin-numpy", "numpy", "numba"])
+@pytest.mark.parametrize("semilla", [1, 2024])
+def test_nucleo_deja_la_grilla_y_el_generador_igual_que_python(variante, semilla):
+    nucleo = _nucleo(variante)
+    esperado = _correr(None, semilla)
+    obtenido = _correr(nucleo, semilla)
+    assert obtenido[0] == esperado[0], "plano de tipos"
+    assert obtenido[1] == esperado[1], "plano de colores"
+    assert obtenido[2] == esperado[2], "marcas de bandas"
+    assert obtenido[3:5] == esperado[3:5], "conteos del sensor"
+    assert obtenido[5] == esperado[5], "estado de random"
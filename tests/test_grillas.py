@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la grilla dispersa"""
+
+import random
+from grillas import GrillaCompacta, GrillaDispersa
+from particulas import ParticulaPerlita, ParticulaRoca
+from sistema.fisicas import MotorFisicas
+
+def test_segmentos_activos_saltean_filas_sin_granos():
+    grilla = GrillaDispersa(100, 100, 1, lado_tesela=8)
+    grilla.agregar_particula(3, 2, ParticulaPerlita)
+    grilla.agregar_particula(5, 12, ParticulaPerlita)
+
+    assert grilla.segmentos_activos(3) == [(0, 8)]
+    assert grilla.segmentos_activos(5) == [(8, 16)]
+    assert grilla.segmentos_activos(4) == []
+
+    grilla.agregar_particula(3, 9, ParticulaPerlita)
+    assert grilla.segmentos_activos(3) == [(0, 16)]
+    grilla.eliminar_particula(3, 2)
+    assert grilla.segmentos_activos(3) == [(8, 16)]
+
+def _avanzar(clase, semilla, frames):
+    random.seed(semilla)
+    generador = random.Random(semilla)
+    grilla = clase(70, 120, 1)
+    for fila in range(0, 60):
+        for columna in range(grilla.columnas):
+            sorteo = generador.random()
+            if sorteo < 0.3:
+                grilla.agregar_particula(fila, columna, ParticulaPerlita)
+            elif sorteo < 0.33:
+                grilla.agregar_particula(fila, columna, ParticulaRoca)
+    motor = MotorFisicas()
+    motor.usar_jit = False
+    for _ in range(frames):
+        motor.actualizar(grilla)
+    tipos, colores = grilla.exportar_planos()
+    return bytes(tipos), colores.tobytes(), random.getstate()
+
+def test_fisica_por_teselas_igual_a_la_grilla_compacta():
+    for semilla in (1, 9):
+        assert _avanzar(GrillaDispersa, semilla, 120) == _avanzar(GrillaCompacta, semilla, 120)
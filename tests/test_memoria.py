@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de las asignaciones de memoria por frame (core/memoria.py)"""
+
+import random
+import pytest
+from headless import crear_parser, crear_simulacion
+from core.memoria import medir_asignaciones
+from core.constantes import ASIGNACION_MAXIMA_POR_FRAME
+
+FRAMES_MEDIDOS = 300
+
+@pytest.mark.parametrize("backend", ["compacta", "objetos"])
+def test_paso_asigna_menos_del_limite_por_frame(backend):
+    random.seed(3)
+    argumentos = crear_parser().parse_args(["--backend", backend, "--sin-jit"])
+    simulacion = crear_simulacion(argumentos)
+
+    resultado = medir_asignaciones(simulacion.actualizar, FRAMES_MEDIDOS)
+
+    assert simulacion.grilla.contar_particulas() > 0
+    assert resultado['pico_promedio'] < ASIGNACION_MAXIMA_POR_FRAME, resultado
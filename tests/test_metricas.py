@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de las métricas de producción"""
+
+from sistema.metricas import SistemaMetricas
+
+def test_tasa_estable_empareja_cada_intervalo_con_su_ciclo():
+    metricas = SistemaMetricas()
+    # Ciclo 1: 100 granos, abre un intervalo de 10 s; ciclo 2: 300 granos
+    metricas.registrar_inicio_drenaje(0.0)
+    metricas.registrar_granos_drenados(100)
+    metricas.registrar_fin_drenaje(2.0)
+    metricas.registrar_inicio_drenaje(10.0)
+    metricas.registrar_granos_drenados(300)
+    metricas.registrar_fin_drenaje(12.0)
+    # El intervalo del ciclo 2 sigue abierto: sus granos no entran
+    assert metricas.tasa_estable() == 100 / 10
+
+    # Al empezar el ciclo 3 se cierra el intervalo del ciclo 2 (20 s)
+    metricas.registrar_inicio_drenaje(30.0)
+    assert metricas.tasa_estable() == (100 + 300) / 30
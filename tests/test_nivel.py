@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del ciclo de llenado y drenaje del modo nivel"""
+
+import random
+from headless import crear_parser, crear_simulacion
+from particulas import ParticulaPerlita, ParticulaRoca
+
+def _simulacion(backend):
+    """Contenedor chico con aparición rápida: la región se vuelve a llenar durante cada drenaje"""
+    argumentos = crear_parser().parse_args(["--backend", backend, "--velocidad", "10", "--cluster", "6",
+                                            "--ancho", "120", "--alto", "150", "--sin-jit"])
+    return crear_simulacion(argumentos)
+
+def test_compuertas_repiten_ciclos_con_la_region_llena():
+    for backend in ("compacta", "objetos"):
+        random.seed(7)
+        simulacion = _simulacion(backend)
+        capacidad = simulacion.grilla.filas * simulacion.grilla.columnas
+        for _ in range(600):
+            simulacion.actualizar()
+
+        metricas = simulacion.sistema_metricas
+        assert metricas.ciclos_completados >= 4, backend
+        assert simulacion.grilla.contar_particulas() < capacidad, backend
+
+def test_compuertas_tapadas_no_cuentan_ciclos_ni_los_repiten():
+    random.seed(7)
+    simulacion = _simulacion("compacta")
+    grilla = simulacion.grilla
+    fondo = grilla.filas - 1
+    for columna in range(grilla.columnas):
+        grilla.agregar_particula(fondo, columna, ParticulaRoca)
+    fila_linea = int(simulacion.sistema_nivel.posicion_linea * grilla.filas)
+    for fila in range(fila_linea - 5, fondo):
+        for columna in range(grilla.columnas):
+            grilla.agregar_particula(fila, columna, ParticulaPerlita)
+    simulacion.sistema_aparicion.habilitado = False
+    for _ in range(2000):
+        simulacion.actualizar()
+
+    nivel = simulacion.sistema_nivel
+    metricas = simulacion.sistema_metricas
+    assert nivel.compuertas_bloqueadas and not nivel.esta_drenando
+    assert nivel.obtener_mensaje_drenaje() == "COMPUERTAS BLOQUEADAS"
+    assert metricas.ciclos_completados == 0
+    assert metricas.granos_drenados == 0
+    assert len(metricas.tiempo_entre_drenajes) == 0
+
+    # Al destapar las compuertas la perlita baja y el ciclo se rearma solo
+    for columna in range(grilla.columnas):
+        grilla.eliminar_particula(fondo, columna)
+    for _ in range(600):
+        simulacion.actualizar()
+    assert not nivel.compuertas_bloqueadas
+    assert metricas.ciclos_completados >= 1
+    assert metricas.granos_drenados > 0
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la evaluación de la prueba de resistencia"""
+
+from collections import Counter
+from resistencia import crear_parser, evaluar, verificar_ciclos
+
+def _muestras(ciclos, llenas=(), drenados=None):
+    if drenados is None:
+        drenados = [100 * cantidad for cantidad in ciclos]
+    return [{'segundos': 10.0 * indice, 'ciclos': cantidad, 'llena': indice in llenas, 'drenados': granos}
+            for indice, (cantidad, granos) in enumerate(zip(ciclos, drenados))]
+
+def test_ciclos_que_avanzan_pasan():
+    assert verificar_ciclos(_muestras([1, 1, 2, 2, 3, 4]), 30.0) == []
+
+def test_ciclos_detenidos_fallan():
+    fallas = verificar_ciclos(_muestras([1, 2, 2, 2, 2, 2]), 30.0)
+    assert len(fallas) == 1 and "ciclo de drenaje" in fallas[0]
+
+def test_ciclos_sin_granos_drenados_fallan():
+    fallas = verificar_ciclos(_muestras([1, 2, 3, 4, 5, 6], drenados=[100] * 6), 30.0)
+    assert any("sin drenar granos" in falla for falla in fallas)
+    assert any("pasaron" in falla for falla in fallas)
+
+def test_grilla_llena_en_muestras_seguidas_falla():
+    assert verificar_ciclos(_muestras([1, 2, 3, 4], llenas=(1,)), 30.0) == []
+    fallas = verificar_ciclos(_muestras([1, 2, 3, 4], llenas=(1, 2)), 30.0)
+    assert len(fallas) == 1 and "llena" in fallas[0]
+
+def _evaluar(frames_diferidos):
+    """Evalúa muestras estables salvo por los frames diferidos acumulados (100 frames por muestra)"""
+    muestras = _muestras(list(range(len(frames_diferidos))))
+    for muestra, diferidos in zip(muestras, frames_diferidos):
+        muestra.update(frames=100, paso_promedio=0.005, memoria=None, objetos=1000,
+                       frames_diferidos=diferidos)
+    argumentos = crear_parser().parse_args(["--calentamiento", "0"])
+    return evaluar(muestras, argumentos, Counter())
+
+def test_bandas_diferidas_estables_pasan():
+    assert _evaluar([10, 20, 30, 40, 50, 60]) == []
+
+def test_bandas_diferidas_que_crecen_fallan():
+    fallas = _evaluar([0, 0, 20, 50, 90, 140])
+    assert len(fallas) == 1 and "diferidas" in fallas[0]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del sensor de nivel por eventos"""
+
+from grillas import crear_grilla
+from particulas import ParticulaPerlita
+from sistema.sensores import SensorNivel
+
+def _grilla_con_sensor(backend):
+    """Grilla de 4x4 celdas con un sensor en la mitad y un registro de sus eventos"""
+    grilla = crear_grilla(4, 4, 1, backend)
+    eventos = []
+    sensor = SensorNivel(2, umbral=1.0, al_llenarse=eventos.append)
+    grilla.registrar_sensor(sensor)
+    return grilla, sensor, eventos
+
+def _llenar_region(grilla):
+    for fila in (2, 3):
+        for columna in range(grilla.columnas):
+            grilla.agregar_particula(fila, columna, ParticulaPerlita)
+
+def test_evento_se_dispara_una_vez_por_cruce():
+    for backend in ("objetos", "compacta"):
+        grilla, sensor, eventos = _grilla_con_sensor(backend)
+        _llenar_region(grilla)
+        assert sensor.lleno and len(eventos) == 1
+
+        # Un grano más encima de la línea no vuelve a disparar
+        grilla.agregar_particula(0, 0, ParticulaPerlita)
+        assert len(eventos) == 1
+
+        grilla.eliminar_particula(3, 0)
+        assert not sensor.lleno
+        grilla.agregar_particula(3, 0, ParticulaPerlita)
+        assert len(eventos) == 2
+
+def test_reevaluar_dispara_si_la_region_sigue_llena():
+    for backend in ("objetos", "compacta"):
+        grilla, sensor, eventos = _grilla_con_sensor(backend)
+        _llenar_region(grilla)
+        sensor.reevaluar()
+        assert sensor.lleno and len(eventos) == 2
+
+        grilla.eliminar_particula(3, 0)
+        sensor.reevaluar()
+        assert not sensor.lleno and len(eventos) == 2
@@ -0,0 +1,62 @@
+import pygame
+from collections import OrderedDict
+from core.constantes import CAPACIDAD_CACHE_TEXTO
+
+class CacheTexto:
+    """Cache de fuentes y superficies de texto renderizado con desalojo LRU"""
+
+    def __init__(self, capacidad=CAPACIDAD_CACHE_TEXTO):
+        self.capacidad = capacidad
+        self._fuentes = {}
+        self._superficies = OrderedDict()
+
+    def fuente(self, tamaño):
+        """Obtiene la fuente por defecto del tamaño pedido, creándola una sola vez"""
+        fuente = self._fuentes.get(tamaño)
+        if fuente is None:
+            fuente = pygame.font.Font(None, tamaño)
+            self._fuentes[tamaño] = fuente
+        return fuente
+
+    def render(self, fuente, texto, color):
+        """
+        Obtiene la superficie de un texto, renderizándolo solo si no está en cache.
+
+        La clave es (fuente, texto, color). Cada acceso mueve la entrada al final
+        de la cola; cuando se supera la capacidad se descarta la menos usada.
+        """
+        clave = (fuente, texto, color)
+        superficie = self._superficies.get(clave)
+        if superficie is not None:
+            self._superficies.move_to_end(clave)
+            return superficie
+
+        superficie = fuente.render(texto, True, color)
+        self._superficies[clave] = superficie
+        if len(self._superficies) > self.capacidad:
+            self._superficies.popitem(last=False)
+        return superficie
+
+    def limpiar(self):
+        """Descarta todas las superficies cacheadas"""
+        self._superficies.clear()
+
+# Cache compartida por el HUD y los renderizadores
+cache_texto = CacheTexto()
+
+class FuenteDiferida:
+    """
+    Atributo de clase que resuelve la fuente de un tamaño recién al usarla.
+
+    Los renderizadores declaran sus fuentes así en lugar de crearlas en
+    __init__: la pantalla de presentación no carga las fuentes del juego.
+    """
+
+    def __init__(self, tamaño):
+        self.tamaño = tamaño
+
+    def __get__(self, instancia, propietario):
+        if instancia is None:
+            return self
+        return cache_texto.fuente(self.tamaño)
+
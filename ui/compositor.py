@@ -0,0 +1,84 @@
+import pygame
+
+class Compositor:
+    """
+    Compositor de pantalla con actualización por rectángulos sucios.
+
+    Guarda una copia del fondo estático de la pantalla actual (bordes, paneles,
+    menús) y solo envía al display las regiones que cambiaron en cada frame.
+    Cada elemento dinámico se registra como una capa con nombre: antes de
+    redibujarla se restaura el fondo en el área que ocupaba en el frame anterior,
+    así los elementos que desaparecen o se mueven no dejan rastros.
+
+    El fondo se vuelve a componer completo cuando cambia la firma del layout
+    (tamaño de ventana, tamaño del área de juego, pantalla activa) o cuando se
+    invalida explícitamente.
+    """
+
+    def __init__(self):
+        self.fondo = None
+        self.firma = None
+        self._completo = True
+        self._sucios = []
+        self._capas = {}
+
+    def invalidar(self):
+        """Fuerza a recomponer el fondo y actualizar toda la pantalla en el próximo frame"""
+        self._completo = True
+
+    def preparar(self, firma):
+        """
+        Comienza un frame y determina si hay que redibujar el fondo estático.
+
+        Parámetros:
+            firma (tuple): Valores de los que depende el fondo estático
+
+        Retorna:
+            bool: True si el llamador debe dibujar el fondo completo y capturarlo
+        """
+        if firma != self.firma:
+            self.firma = firma
+            self._completo = True
+        return self._completo
+
+    def capturar_fondo(self, screen):
+        """Guarda el contenido estático recién dibujado como fondo de referencia"""
+        self.fondo = screen.copy()
+        self._capas.clear()
+
+    def limpiar_capas(self, screen):
+        """
+        Restaura el fondo en las áreas que ocupaban las capas en el frame anterior.
+
+        Debe llamarse antes de dibujar cualquier elemento dinámico del frame,
+        para que la restauración no tape lo que ya se dibujó.
+        """
+        for rect in self._capas.values():
+            self.restaurar(screen, rect)
+        self._capas.clear()
+
+    def registrar_capa(self, nombre, rect):
+        """Registra el área donde se dibujó una capa en este frame"""
+        if rect is not None:
+            self._capas[nombre] = rect
+            self.marcar(rect)
+
+    def restaurar(self, screen, rect):
+        """Copia el fondo estático sobre un área de la pantalla"""
+        if self.fondo is not None:
+            screen.blit(self.fondo, rect, rect)
+        self.marcar(rect)
+
+    def marcar(self, rect):
+        """Marca un área de la pantalla como modificada en este frame"""
+        if rect is not None and not self._completo:
+            self._sucios.append(pygame.Rect(rect))
+
+    def presentar(self):
+        """Envía el frame al display: completo la primera vez, luego solo las áreas sucias"""
+        if self._completo:
+            pygame.display.flip()
+            self._completo = False
+        elif self._sucios:
+            pygame.display.update(self._sucios)
+        self._sucios = []
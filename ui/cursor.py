@@ -0,0 +1,119 @@
+import pygame
+
+# Colores del cursor estilo roca y fuego (8-bit)
+COLOR_CURSOR_BASE = (150, 75, 50)          # Color marrón rocoso
+COLOR_CURSOR_BORDE = (60, 30, 20)          # Borde más oscuro
+COLOR_CURSOR_RESALTADO = (255, 150, 100)   # Highlight naranja/fuego
+
+# Patrón del cursor estilo puntero pixelado (12x19 píxeles)
+# 0 = transparente, 1 = borde, 2 = base, 3 = resaltado
+PATRON_CURSOR = [
+    [1],
+    [1,1],
+    [1,2,1],
+    [1,2,2,1],
+    [1,2,2,2,1],
+    [1,2,1,2,2,1],
+    [1,2,2,2,2,2,1],
+    [1,2,2,1,2,1,2,1],
+    [1,2,1,1,2,2,2,1,1],
+    [1,2,2,2,2,1,1,1,1,1],
+    [1,2,2,1,2,2,1],
+    [1,2,1,0,1,2,2,1],
+    [1,1,0,0,1,2,2,1],
+    [1,0,0,0,0,1,2,2,1],
+    [0,0,0,0,0,1,2,2,1],
+    [0,0,0,0,0,0,1,2,1],
+    [0,0,0,0,0,0,1,1,1],
+    [0,0,0,0,0,0,0,1],
+    [0,0,0,0,0,0,0,0,1]
+]
+
+class CursorPersonalizado:
+    """
+    Cursor personalizado estilo 8-bit pre-renderizado.
+
+    El patrón se hornea una sola vez por escala en una superficie transparente,
+    así dibujar el cursor cuesta un único blit. Si el sistema soporta cursores
+    a color de pygame, el sprite se instala como cursor de hardware y dibujarlo
+    no cuesta nada.
+    """
+
+    def __init__(self, escala=2):
+        self.escala = escala
+        self._sprites = {}
+        self.hardware = False
+        self._visible = None
+
+        # Hornear el sprite de la escala inicial al arrancar
+        self.sprite(escala)
+
+    def sprite(self, escala=None):
+        """Obtiene la superficie del cursor para la escala pedida, creándola si hace falta"""
+        if escala is None:
+            escala = self.escala
+
+        superficie = self._sprites.get(escala)
+        if superficie is None:
+            superficie = self._hornear(escala)
+            self._sprites[escala] = superficie
+        return superficie
+
+    def _hornear(self, escala):
+        """Dibuja el patrón píxel por píxel en una superficie transparente"""
+        ancho = max(len(fila) for fila in PATRON_CURSOR) * escala
+        alto = len(PATRON_CURSOR) * escala
+        superficie = pygame.Surface((ancho, alto), pygame.SRCALPHA)
+
+        colores = {1: COLOR_CURSOR_BORDE, 2: COLOR_CURSOR_BASE, 3: COLOR_CURSOR_RESALTADO}
+        for y, fila in enumerate(PATRON_CURSOR):
+            for x, pixel in enumerate(fila):
+                if pixel > 0:  # Solo dibujar píxeles no transparentes
+                    superficie.fill(colores[pixel], (x * escala, y * escala, escala, escala))
+        return superficie
+
+    def activar_hardware(self):
+        """
+        Intenta instalar el sprite como cursor del sistema.
+
+        Retorna:
+            bool: True si el cursor de hardware quedó activo
+        """
+        try:
+            pygame.mouse.set_cursor(pygame.cursors.Cursor((0, 0), self.sprite()))
+        except (pygame.error, AttributeError, TypeError):
+            # Versiones viejas de pygame o drivers sin soporte de cursores a color
+            self.hardware = False
+            pygame.mouse.set_visible(False)
+            return False
+
+        self.hardware = True
+        self._visible = None
+        return True
+
+    def dibujar(self, screen, posicion=None):
+        """
+        Muestra el cursor en la posición del mouse.
+
+        Retorna:
+            pygame.Rect o None: Área de pantalla ocupada por el cursor dibujado,
+                                None si lo muestra el cursor de hardware
+        """
+        if self.hardware:
+            self._cambiar_visibilidad(True)
+            return None
+
+        if posicion is None:
+            posicion = pygame.mouse.get_pos()
+        return screen.blit(self.sprite(), posicion)
+
+    def ocultar(self):
+        """Oculta el cursor de hardware (el cursor por software simplemente no se dibuja)"""
+        if self.hardware:
+            self._cambiar_visibilidad(False)
+
+    def _cambiar_visibilidad(self, visible):
+        """Cambia la visibilidad del cursor del sistema solo cuando es necesario"""
+        if self._visible != visible:
+            pygame.mouse.set_visible(visible)
+            self._visible = visible
@@ -1,15 +1,21 @@
 import pygame
 from core.constantes import *
+from ui.cache_texto import cache_texto, FuenteDiferida
 
 class HUD:
     """Elementos de interfaz de usuario adicionales"""
     
+    # Fuentes creadas al dibujar la primera línea
+    font_small = FuenteDiferida(32)
+    font_tiny = FuenteDiferida(22)
+    
     def __init__(self):
-        self.font_small = pygame.font.Font(None, 32)
-        self.font_tiny = pygame.font.Font(None, 22)
+        # Última superficie de cada línea de las columnas que cambian en cada
+        # frame; no pasan por cache_texto para no desalojar los textos fijos
+        self._lineas_variables = {}
     
     def dibujar_info_debug(self, screen, simulacion):
-        """Dibuja información de debug (opcional)"""
+        """Dibuja información de debug (opcional) y retorna el área ocupada"""
         if hasattr(simulacion, 'debug_mode') and simulacion.debug_mode:
             datos_debug = [
                 f"FPS: {pygame.time.Clock().get_fps():.1f}",
@@ -20,21 +26,61 @@ class HUD:
                 f"Modo: {simulacion.manejador_entrada.modo}",
                 f"Pausado: {simulacion.manejador_entrada.pausado}",
                 f"Nivel activo: {simulacion.sistema_nivel.modo_activo}",
-                f"Drenando: {simulacion.sistema_nivel.esta_drenando}"
+                f"Drenando: {simulacion.sistema_nivel.esta_drenando}",
+                f"Compuertas bloqueadas: {simulacion.sistema_nivel.compuertas_bloqueadas}"
             ]
+            sensor = simulacion.sistema_nivel.sensor
+            if sensor is not None:
+                datos_debug.append(f"Ocupacion nivel: {sensor.ocupacion() * 100:.0f}%")
+            datos_debug.append(f"Motor: {simulacion.motor_fisicas.motor}")
+            datos_debug.append(f"Bandas diferidas: {simulacion.motor_fisicas.bandas_diferidas}")
             
-            for i, line in enumerate(datos_debug):
+            return self._dibujar_lineas(screen, datos_debug, screen.get_width() - 175, 10, "debug")
+        return None
+    
+    def dibujar_metricas(self, screen, simulacion):
+        """Dibuja las métricas de producción mientras el modo nivel está activo"""
+        if not simulacion.sistema_nivel.modo_activo:
+            return None
+        
+        resumen = simulacion.sistema_metricas.resumen()
+        datos_metricas = [
+            f"Granos entrada: {resumen['granos_aparecidos']}",
+            f"Granos drenados: {resumen['granos_drenados']}",
+            f"Ultimo ciclo: {resumen['drenados_ultimo_ciclo']} granos",
+            f"Duracion ciclo: {resumen['duracion_ciclo_promedio']:.1f} s",
+            f"Entre drenajes: {resumen['tiempo_entre_drenajes_promedio']:.1f} s",
+            f"Llenado: {resumen['granos_por_segundo']:.1f} granos/s"
+        ]
+        
+        inicio_y = screen.get_height() - 10 - len(datos_metricas) * 20
+        return self._dibujar_lineas(screen, datos_metricas, 10, inicio_y, "metricas")
+    
+    def _dibujar_lineas(self, screen, lineas, x, y, columna):
+        """
+        Dibuja una columna de líneas de texto y retorna el rectángulo que las contiene.
+        
+        Cada línea se vuelve a renderizar solo cuando cambia su texto.
+        """
+        anteriores = self._lineas_variables.setdefault(columna, [])
+        del anteriores[len(lineas):]
+        area = None
+        for i, line in enumerate(lineas):
+            if i < len(anteriores) and anteriores[i][0] == line:
+                text = anteriores[i][1]
+            else:
                 text = self.font_tiny.render(line, True, AMARILLO)
-                screen.blit(text, (screen.get_width() - 175, 10 + i * 20))
+                if i < len(anteriores):
+                    anteriores[i] = (line, text)
+                else:
+                    anteriores.append((line, text))
+            rect = screen.blit(text, (x, y + i * 20))
+            area = rect if area is None else area.union(rect)
+        return area
     
     def _contar_particulas(self, grilla):
         """Cuenta el número total de partículas en la grilla"""
-        cuenta = 0
-        for fila in range(grilla.filas):
-            for col in range(grilla.columnas):
-                if grilla.obtener_celda(fila, col) is not None:
-                    cuenta += 1
-        return cuenta
+        return grilla.contar_particulas()
     
     def dibujar_indicador_modo(self, screen, modo_actual):
         """Dibuja un indicador del modo actual en la esquina"""
@@ -59,6 +105,7 @@ class HUD:
         pygame.draw.rect(screen, NEGRO, indicador_rect, 2)
         
         # Texto del modo
-        text = self.font_small.render(nombre, True, NEGRO)
+        text = cache_texto.render(self.font_small, nombre, NEGRO)
         text_rect = text.get_rect(center=indicador_rect.center)
-        screen.blit(text, text_rect) 
\ No newline at end of file
+        screen.blit(text, text_rect)
+        return indicador_rect 
\ No newline at end of file
@@ -0,0 +1,107 @@
+import os
+import pygame
+
+# Directorio raíz del proyecto, para no depender del directorio de trabajo
+RUTA_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class GestorRecursos:
+    """
+    Cache de imágenes y fondos estáticos de las pantallas de menú.
+
+    Las imágenes se leen de disco y se convierten al formato de la pantalla
+    una sola vez; las versiones escaladas y los fondos con patrón se guardan
+    por tamaño de ventana, así redibujar un frame no toca el disco ni vuelve
+    a escalar nada.
+    """
+
+    def __init__(self):
+        self._imagenes = {}
+        self._escaladas = {}
+        self._fondos = {}
+
+    def imagen(self, nombre):
+        """
+        Obtiene una imagen del proyecto, cargándola solo la primera vez.
+
+        Retorna:
+            pygame.Surface o None: La imagen convertida, o None si no se pudo cargar
+        """
+        if nombre not in self._imagenes:
+            self._imagenes[nombre] = self._cargar(nombre)
+        return self._imagenes[nombre]
+
+    def _cargar(self, nombre):
+        """Lee la imagen de disco y la convierte al formato de la pantalla"""
+        try:
+            imagen = pygame.image.load(os.path.join(RUTA_BASE, nombre))
+        except (pygame.error, FileNotFoundError):
+            # Se guarda None para no reintentar la lectura en cada frame
+            return None
+
+        if pygame.display.get_surface() is None:
+            return imagen
+        if imagen.get_alpha() is not None or imagen.get_colorkey() is not None:
+            return imagen.convert_alpha()
+        return imagen.convert()
+
+    def imagen_escalada(self, nombre, ancho_maximo, alto_maximo):
+        """
+        Obtiene una imagen escalada para entrar en el rectángulo indicado.
+
+        La imagen conserva su proporción. Cada tamaño se escala una única vez.
+
+        Retorna:
+            pygame.Surface o None: La imagen escalada, o None si no se pudo cargar
+        """
+        clave = (nombre, ancho_maximo, alto_maximo)
+        if clave in self._escaladas:
+            return self._escaladas[clave]
+
+        original = self.imagen(nombre)
+        escalada = None
+        if original is not None:
+            ancho_original, alto_original = original.get_size()
+            factor_escalado = min(ancho_maximo / ancho_original, alto_maximo / alto_original)
+
+            nuevo_ancho = int(ancho_original * factor_escalado)
+            nuevo_alto = int(alto_original * factor_escalado)
+            escalada = pygame.transform.scale(original, (nuevo_ancho, nuevo_alto))
+
+        self._escaladas[clave] = escalada
+        return escalada
+
+    def fondo_patron(self, ancho, alto, paso, color_fondo, color_patron):
+        """
+        Obtiene el fondo pixelado tipo tablero pre-renderizado para un tamaño de ventana.
+
+        Parámetros:
+            ancho (int): Ancho de la ventana
+            alto (int): Alto de la ventana
+            paso (int): Separación entre cuadros del patrón (cada cuadro mide paso/2)
+            color_fondo (tuple): Color del fondo
+            color_patron (tuple): Color de los cuadros
+        """
+        clave = (ancho, alto, paso, color_fondo, color_patron)
+        fondo = self._fondos.get(clave)
+        if fondo is None:
+            fondo = pygame.Surface((ancho, alto))
+            fondo.fill(color_fondo)
+
+            # Patrón de fondo pixelado
+            for x in range(0, ancho, paso):
+                for y in range(0, alto, paso):
+                    if (x + y) % (paso * 2) == 0:
+                        fondo.fill(color_patron, (x, y, paso // 2, paso // 2))
+
+            if pygame.display.get_surface() is not None:
+                fondo = fondo.convert()
+            self._fondos[clave] = fondo
+        return fondo
+
+    def limpiar_escalados(self):
+        """Descarta las variantes por tamaño de ventana (las imágenes originales se conservan)"""
+        self._escaladas.clear()
+        self._fondos.clear()
+
+# Gestor compartido por los renderizadores
+recursos = GestorRecursos()
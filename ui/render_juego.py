@@ -1,170 +1,246 @@
 import pygame
 from core.constantes import *
+from ui.cache_texto import cache_texto, FuenteDiferida
+
+# Instrucciones de los paneles laterales (los títulos se resaltan)
+INSTRUCCIONES_IZQUIERDA = [
+    "FLECHAS:",
+    "",
+    "Control de aparicion de granos",
+    "ARRIBA - Mas velocidad de aparicion",
+    "ABAJO - Menos velocidad de aparicion", 
+    "IZQ - Encojer area de caida",
+    "DER - Ampliar area de caida",
+    "",
+    "MODOS:",
+    "",
+    "P - Modo Perlita",
+    "R - Modo Roca",
+    "E - Modo Borrador",
+    "A - Aparicion On/Off",
+    "",
+    "MECANICAS:",
+    "",
+    "O - Pausar/Reanudar",
+    "L - Linea de nivel",
+    "M - Motor de fisica",
+    "D - Debug",
+    "",
+    "PINCEL:",
+    "",
+    "+ - Agrandar pincel",
+    "- - Achicar pincel",
+    "C - Cuadrado/Circulo"
+]
+TITULOS_IZQUIERDA = ["FLECHAS:", "MODOS:", "MECANICAS:", "PINCEL:"]
+
+INSTRUCCIONES_DERECHA = [
+    "RESOLUCION:",
+    "",
+    "Teclas 1 a 9",
+    "(celdas de simulacion)",
+    "",
+    "1 - Muy fina (lenta)",
+    "5 - Normal",
+    "9 - Muy gruesa (rapida)",
+    "",
+    "INTENSIDAD:",
+    "",
+    "PgUp     - Mas particulas",
+    "PgDn     - Menos particulas",
+    "",
+    "NIVEL:",
+    "",
+    "INICIO   - Subir linea",
+    "FIN      - Bajar linea",
+    "",
+    "VISTA:",
+    "",
+    "Rueda    - Zoom",
+    "Click der - Mover",
+    "0        - Vista completa",
+    "",
+    "OTROS:",
+    "",
+    "ESC      - Menu",
+    "SPACE    - Limpiar"
+]
+TITULOS_DERECHA = ["RESOLUCION:", "INTENSIDAD:", "NIVEL:", "VISTA:", "OTROS:"]
 
 class RenderizadorJuego:
     """Renderizador para la pantalla de juego"""
     
+    # Fuentes estilo 8-bit (compartidas a través de la cache de texto, creadas al primer uso)
+    font_large = FuenteDiferida(96)
+    font_medium = FuenteDiferida(64)
+    font_small = FuenteDiferida(40)
+    font_tiny = FuenteDiferida(28)
+    font_drenaje = FuenteDiferida(48)
+    font_estado = FuenteDiferida(32)
+    
     def __init__(self):
-        # Fuentes estilo 8-bit
-        self.font_large = pygame.font.Font(None, 96)
-        self.font_medium = pygame.font.Font(None, 64)
-        self.font_small = pygame.font.Font(None, 40)
-        self.font_tiny = pygame.font.Font(None, 28)
+        # Superficies estáticas compuestas una sola vez
+        self._panel_izquierdo = None
+        self._panel_derecho = None
+        self._carteles_drenaje = {}
+        # Superficie del área de juego; se recrea solo si cambia su tamaño
+        self._superficie_juego = None
     
-    def dibujar(self, screen, simulacion, ancho_borde, color_borde):
-        """Dibuja la pantalla de juego completa"""
-        screen.fill(NEGRO)
+    def dibujar(self, screen, simulacion, ancho_borde, color_borde, compositor=None):
+        """
+        Dibuja la pantalla de juego.
+        
+        Sin compositor se redibuja la pantalla completa. Con compositor, el fondo
+        estático (borde y paneles de instrucciones) se dibuja solo cuando cambia
+        el layout; en los demás frames únicamente se redibujan el área de
+        simulación y los mensajes, y se marcan como regiones sucias.
+        """
+        centrado_x, centrado_y, ancho_total, alto_total, area_juego = \
+            self._calcular_layout(screen, simulacion, ancho_borde)
+        
+        firma = ("juego", screen.get_size(), area_juego.size)
+        if compositor is None or compositor.preparar(firma):
+            self._dibujar_estatico(screen, centrado_x, centrado_y, ancho_total, alto_total,
+                                   area_juego, color_borde)
+            if compositor is not None:
+                compositor.capturar_fondo(screen)
+        else:
+            # Borrar lo que dibujaron las capas dinámicas en el frame anterior
+            compositor.limpiar_capas(screen)
+        
+        # Superficie del área de juego (la del frame anterior si el tamaño no cambió)
+        superficie_juego = self._superficie_juego
+        if superficie_juego is None or superficie_juego.get_size() != area_juego.size:
+            superficie_juego = self._superficie_juego = pygame.Surface(area_juego.size)
+        superficie_juego.fill(GRIS)
+        
+        # Dibujar simulación
+        simulacion.dibujar(superficie_juego)
+        
+        # Transferir al screen
+        screen.blit(superficie_juego, area_juego.topleft)
         
-        # Calcular dimensiones y posición
+        # Dibujar mensajes especiales
+        rect_drenaje = self._dibujar_mensaje_drenaje(screen, simulacion, centrado_x, centrado_y, ancho_total)
+        rect_estado = self._dibujar_mensaje_estado(screen, simulacion, centrado_x, centrado_y, ancho_total, alto_total)
+        
+        if compositor is not None:
+            compositor.marcar(area_juego)
+            compositor.registrar_capa("mensaje_drenaje", rect_drenaje)
+            compositor.registrar_capa("mensaje_estado", rect_estado)
+    
+    def _calcular_layout(self, screen, simulacion, ancho_borde):
+        """
+        Calcula la posición centrada del campo y el rectángulo del área de juego.
+        
+        El espacio disponible es la ventana menos los paneles laterales y las
+        franjas de mensajes. La vista de la simulación escala la grilla para
+        ocupar ese espacio, sin importar la resolución de la simulación.
+        """
         ancho_pantalla = screen.get_width()
         alto_pantalla = screen.get_height()
         
-        ancho_juego_real = simulacion.grilla.columnas * simulacion.tamaño_celda
-        alto_juego_real = simulacion.grilla.filas * simulacion.tamaño_celda
+        margen_x = ANCHO_PANEL_LATERAL + ancho_borde
+        margen_y = ALTO_FRANJA_MENSAJES + ancho_borde
+        area_disponible = pygame.Rect(
+            margen_x, margen_y,
+            max(1, ancho_pantalla - 2 * margen_x),
+            max(1, alto_pantalla - 2 * margen_y)
+        )
         
-        ancho_total = ancho_juego_real + 2 * ancho_borde
-        alto_total = alto_juego_real + 2 * ancho_borde
-        centrado_x = (ancho_pantalla - ancho_total) // 2
-        centrado_y = (alto_pantalla - alto_total) // 2
+        area_juego = simulacion.sistema_vista.ajustar(
+            area_disponible, simulacion.grilla.filas, simulacion.grilla.columnas
+        )
+        
+        ancho_total = area_juego.width + 2 * ancho_borde
+        alto_total = area_juego.height + 2 * ancho_borde
+        centrado_x = area_juego.x - ancho_borde
+        centrado_y = area_juego.y - ancho_borde
+        return centrado_x, centrado_y, ancho_total, alto_total, area_juego
+    
+    def _dibujar_estatico(self, screen, centrado_x, centrado_y, ancho_total, alto_total,
+                          area_juego, color_borde):
+        """Dibuja el fondo, el borde del campo y las instrucciones laterales"""
+        screen.fill(NEGRO)
         
         # Dibujar borde verde
         borde_remarcado_exterior = pygame.Rect(centrado_x, centrado_y, ancho_total, alto_total)
         pygame.draw.rect(screen, color_borde, borde_remarcado_exterior)
         
         # Área de juego
-        area_juego_x = centrado_x + ancho_borde
-        area_juego_y = centrado_y + ancho_borde
-        area_juego = pygame.Rect(area_juego_x, area_juego_y, ancho_juego_real, alto_juego_real)
         pygame.draw.rect(screen, GRIS, area_juego)
         
-        # Crear superficie temporal para el juego
-        superficie_juego = pygame.Surface((ancho_juego_real, alto_juego_real))
-        superficie_juego.fill(GRIS)
-        
-        # Dibujar simulación
-        simulacion.dibujar(superficie_juego)
-        
-        # Transferir al screen
-        screen.blit(superficie_juego, (area_juego_x, area_juego_y))
-        
-        # Dibujar mensajes especiales
-        self._dibujar_mensaje_drenaje(screen, simulacion, centrado_x, centrado_y, ancho_total)
-        self._dibujar_mensaje_estado(screen, simulacion, centrado_x, centrado_y, ancho_total, alto_total)
-        
         # Dibujar instrucciones
         self._dibujar_instrucciones(screen, centrado_x, centrado_y, ancho_total)
         
     def _dibujar_mensaje_drenaje(self, screen, simulacion, centrado_x, centrado_y, ancho_total):
-        """Dibuja el mensaje 'ABRIENDO COMPUERTAS'"""
-        if simulacion.sistema_nivel.esta_drenando and simulacion.sistema_nivel.timer_mensaje_drenaje > 0:
-            font = pygame.font.Font(None, 48)
-            text = font.render("ABRIENDO COMPUERTAS", True, (255, 255, 0))
+        """Dibuja el cartel de drenaje ('ABRIENDO COMPUERTAS' o 'COMPUERTAS BLOQUEADAS')"""
+        mensaje = simulacion.sistema_nivel.obtener_mensaje_drenaje()
+        if mensaje:
+            cartel = self._carteles_drenaje.get(mensaje)
+            if cartel is None:
+                cartel = self._carteles_drenaje[mensaje] = self._componer_cartel_drenaje(mensaje)
             
-            text_rect = text.get_rect(center=(
+            cartel_rect = cartel.get_rect(center=(
                 centrado_x + ancho_total // 2,
                 centrado_y - 30
             ))
-            
-            # Fondo semi-transparente
-            overlay = pygame.Surface((text_rect.width + 40, text_rect.height + 20))
-            overlay.set_alpha(200)
-            overlay.fill((255, 0, 0))
-            screen.blit(overlay, (text_rect.x - 20, text_rect.y - 10))
-            
-            # Borde
-            pygame.draw.rect(screen, BLANCO, 
-                           (text_rect.x - 20, text_rect.y - 10, 
-                            text_rect.width + 40, text_rect.height + 20), 3)
-            
-            screen.blit(text, text_rect)
+            return screen.blit(cartel, cartel_rect)
+        return None
+    
+    def _componer_cartel_drenaje(self, mensaje):
+        """Compone el cartel de drenaje (fondo, borde y texto) en una sola superficie"""
+        text = self.font_drenaje.render(mensaje, True, (255, 255, 0))
+        ancho = text.get_width() + 40
+        alto = text.get_height() + 20
+        
+        cartel = pygame.Surface((ancho, alto), pygame.SRCALPHA)
+        
+        # Fondo semi-transparente
+        cartel.fill((255, 0, 0, 200))
+        
+        # Borde
+        pygame.draw.rect(cartel, BLANCO, (0, 0, ancho, alto), 3)
+        
+        cartel.blit(text, (20, 10))
+        return cartel
     
     def _dibujar_mensaje_estado(self, screen, simulacion, centrado_x, centrado_y, ancho_total, alto_total):
         """Dibuja mensajes de estado debajo del campo"""
-        if simulacion.sistema_mensajes.obtener_mensaje():
-            font = pygame.font.Font(None, 32)
-            text = font.render(simulacion.sistema_mensajes.obtener_mensaje(), True, (255, 0, 0))
+        mensaje = simulacion.sistema_mensajes.obtener_mensaje()
+        if mensaje:
+            text = cache_texto.render(self.font_estado, mensaje, (255, 0, 0))
             
             text_rect = text.get_rect(center=(
                 centrado_x + ancho_total // 2,
                 centrado_y + alto_total + 30
             ))
             
-            screen.blit(text, text_rect)
+            return screen.blit(text, text_rect)
+        return None
     
     def _dibujar_instrucciones(self, screen, centrado_x, centrado_y, ancho_total):
         """Dibuja las instrucciones a los lados"""
+        if self._panel_izquierdo is None:
+            self._panel_izquierdo = self._componer_panel(INSTRUCCIONES_IZQUIERDA, TITULOS_IZQUIERDA)
+            self._panel_derecho = self._componer_panel(INSTRUCCIONES_DERECHA, TITULOS_DERECHA)
+        
         # Instrucciones izquierda
-        instrucciones_izquierda = [
-            "FLECHAS:",
-            "",
-            "Control de aparicion de granos",
-            "ARRIBA - Mas velocidad de aparicion",
-            "ABAJO - Menos velocidad de aparicion", 
-            "IZQ - Encojer area de caida",
-            "DER - Ampliar area de caida",
-            "",
-            "MODOS:",
-            "",
-            "P - Modo Perlita",
-            "R - Modo Roca",
-            "E - Modo Borrador",
-            "A - Aparicion On/Off",
-            "",
-            "MECANICAS:",
-            "",
-            "O - Pausar/Reanudar",
-            "L - Linea de nivel",
-            "D - Debug"
-        ]
-        
-        izquierda_x = 50
-        izquierda_start_y = centrado_y + 50
-        
-        for i, instruccion in enumerate(instrucciones_izquierda):
-            if instruccion in ["FLECHAS:", "MODOS:", "MECANICAS:"]:
-                color = COLOR_PERLIA
-                font = self.font_small
-            elif instruccion == "":
-                continue
-            else:
-                color = PERLITA_CLARA
-                font = self.font_tiny
-            
-            text = font.render(instruccion, True, color)
-            screen.blit(text, (izquierda_x, izquierda_start_y + i * 22))
+        screen.blit(self._panel_izquierdo, (50, centrado_y + 50))
         
         # Instrucciones derecha
-        instrucciones_derecha = [
-            "TAMANO VISUAL:",
-            "",
-            "Teclas 1 a 9",
-            "(tamaño de particula)",
-            "",
-            "1 - Muy fino",
-            "5 - Normal",
-            "9 - Muy grueso",
-            "",
-            "INTENSIDAD:",
-            "",
-            "PgUp     - Mas particulas",
-            "PgDn     - Menos particulas",
-            "",
-            "NIVEL:",
-            "",
-            "INICIO   - Subir linea",
-            "FIN      - Bajar linea",
-            "",
-            "OTROS:",
-            "",
-            "ESC      - Menu",
-            "SPACE    - Limpiar"
-        ]
-        
-        derecha_x = centrado_x + ancho_total + 50
-        derecha_start_y = centrado_y + 50
-        
-        for i, instruccion in enumerate(instrucciones_derecha):
-            if instruccion in ["TAMANO VISUAL:", "INTENSIDAD:", "NIVEL:", "OTROS:"]:
+        screen.blit(self._panel_derecho, (centrado_x + ancho_total + 50, centrado_y + 50))
+    
+    def _componer_panel(self, instrucciones, titulos):
+        """
+        Compone un panel de instrucciones en una única superficie transparente.
+        
+        El contenido de los paneles no cambia durante el juego, así que se
+        renderiza una sola vez y luego cada frame cuesta un único blit.
+        """
+        lineas = []
+        for i, instruccion in enumerate(instrucciones):
+            if instruccion in titulos:
                 color = COLOR_PERLIA
                 font = self.font_small
             elif instruccion == "":
@@ -173,5 +249,12 @@ class RenderizadorJuego:
                 color = PERLITA_CLARA
                 font = self.font_tiny
             
-            text = font.render(instruccion, True, color)
-            screen.blit(text, (derecha_x, derecha_start_y + i * 22)) 
\ No newline at end of file
+            lineas.append((font.render(instruccion, True, color), i * 22))
+        
+        ancho = max(text.get_width() for text, _ in lineas)
+        alto = max(y + text.get_height() for text, y in lineas)
+        
+        panel = pygame.Surface((ancho, alto), pygame.SRCALPHA)
+        for text, y in lineas:
+            panel.blit(text, (0, y))
+        return panel
@@ -1,55 +1,42 @@
 import pygame
 import time
 from core.constantes import *
+from ui.cache_texto import cache_texto, FuenteDiferida
+from ui.recursos import recursos
 
 class RenderizadorMenu:
     """Renderizador para las pantallas de splash y menú"""
     
-    def __init__(self):
-        # Fuentes estilo 8-bit
-        self.font_large = pygame.font.Font(None, 96)
-        self.font_medium = pygame.font.Font(None, 64)
-        self.font_small = pygame.font.Font(None, 40)
-        self.font_tiny = pygame.font.Font(None, 28)
+    # Fuentes estilo 8-bit (se crean al primer uso; el splash con logo no usa ninguna)
+    font_large = FuenteDiferida(96)
+    font_medium = FuenteDiferida(64)
+    font_small = FuenteDiferida(40)
+    font_tiny = FuenteDiferida(28)
     
     def dibujar_splash(self, screen):
         """Dibuja la pantalla de splash"""
         ancho_pantalla = screen.get_width()
         alto_pantalla = screen.get_height()
         
-        screen.fill(PERLITA_OSCURA)
+        # Fondo con patrón pixelado pre-renderizado
+        screen.blit(recursos.fondo_patron(ancho_pantalla, alto_pantalla, 40,
+                                          PERLITA_OSCURA, COLOR_PERLIA), (0, 0))
         
-        # Patrón de fondo pixelado
-        for x in range(0, ancho_pantalla, 40):
-            for y in range(0, alto_pantalla, 40):
-                if (x + y) % 80 == 0:
-                    pygame.draw.rect(screen, COLOR_PERLIA, (x, y, 20, 20))
-        
-        # Cargar y mostrar el logo
-        try:
-            logo = pygame.image.load("logo_tucumordor.png")
-            
-            # Escalar el logo
-            ancho_maximo = int(ancho_pantalla * 0.6)
-            alto_maximo = int(alto_pantalla * 0.6)
-            
-            ancho_original, alto_original = logo.get_size()
-            factor_escalado = min(ancho_maximo / ancho_original, alto_maximo / alto_original)
-            
-            nuevo_ancho = int(ancho_original * factor_escalado)
-            nuevo_alto = int(alto_original * factor_escalado)
-            
-            logo = pygame.transform.scale(logo, (nuevo_ancho, nuevo_alto))
+        # Mostrar el logo (cargado y escalado una sola vez por tamaño de ventana)
+        logo = recursos.imagen_escalada(ARCHIVO_LOGO,
+                                        int(ancho_pantalla * 0.6),
+                                        int(alto_pantalla * 0.6))
+        if logo is not None:
             logo_rect = logo.get_rect(center=(ancho_pantalla//2, alto_pantalla//2))
             screen.blit(logo, logo_rect)
-        except:
+        else:
             # Respaldo si no se puede cargar el logo
-            texto_tucumordor = self.font_large.render("TUCUMORDOR", True, NEGRO)
+            texto_tucumordor = cache_texto.render(self.font_large, "TUCUMORDOR", NEGRO)
             tucumordor_rect = texto_tucumordor.get_rect(center=(ancho_pantalla//2, alto_pantalla//2))
             screen.blit(texto_tucumordor, tucumordor_rect)
         
         # Instrucción
-        instrucciones_menu = self.font_small.render("Presiona ENTER o haz click para continuar", True, NEGRO)
+        instrucciones_menu = cache_texto.render(self.font_small, "Presiona ENTER o haz click para continuar", NEGRO)
         instruccion_rect = instrucciones_menu.get_rect(center=(ancho_pantalla//2, alto_pantalla - 80))
         screen.blit(instrucciones_menu, instruccion_rect)
     
@@ -58,20 +45,16 @@ class RenderizadorMenu:
         ancho_pantalla = screen.get_width()
         alto_pantalla = screen.get_height()
         
-        screen.fill(PERLITA_OSCURA)
-        
-        # Patrón de fondo pixelado
-        for x in range(0, ancho_pantalla, 60):
-            for y in range(0, alto_pantalla, 60):
-                if (x + y) % 120 == 0:
-                    pygame.draw.rect(screen, COLOR_PERLIA, (x, y, 30, 30))
+        # Fondo con patrón pixelado pre-renderizado
+        screen.blit(recursos.fondo_patron(ancho_pantalla, alto_pantalla, 60,
+                                          PERLITA_OSCURA, COLOR_PERLIA), (0, 0))
         
         # Título principal
-        texto_titulo = self.font_medium.render("Simulacion de Acumulacion", True, NEGRO)
+        texto_titulo = cache_texto.render(self.font_medium, "Simulacion de Acumulacion", NEGRO)
         titulo_rect = texto_titulo.get_rect(center=(ancho_pantalla//2, alto_pantalla//4))
         screen.blit(texto_titulo, titulo_rect)
         
-        texto_subtitulo = self.font_medium.render("de Particulas de Perlita", True, NEGRO)
+        texto_subtitulo = cache_texto.render(self.font_medium, "de Particulas de Perlita", NEGRO)
         subtitulo_rect = texto_subtitulo.get_rect(center=(ancho_pantalla//2, alto_pantalla//4 + 50))
         screen.blit(texto_subtitulo, subtitulo_rect)
         
@@ -90,7 +73,7 @@ class RenderizadorMenu:
         pygame.draw.rect(screen, PERLITA_CLARA, boton_comenzar_rect, 6)
         
         # Texto del botón
-        texto_comenzar = self.font_large.render("COMENZAR", True, NEGRO)
+        texto_comenzar = cache_texto.render(self.font_large, "COMENZAR", NEGRO)
         texto_comenzar_rect = texto_comenzar.get_rect(center=boton_comenzar_rect.center)
         screen.blit(texto_comenzar, texto_comenzar_rect)
         
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Visor del Simulador de Perlita en un proceso aparte.
+
+Este módulo abre una ventana de pygame que muestra una simulación que corre
+en otro proceso (headless.py --publicar-frames). Los frames se leen de la
+memoria compartida (ver sistema/compartido.py) y se dibujan con los mismos
+RenderizadorJuego y HUD del juego, así que el visor se ve igual que la
+pantalla de juego, pero una ventana lenta o arrastrada nunca frena la física.
+
+El visor se puede abrir antes o después de la simulación y cerrarse en
+cualquier momento: mientras no hay frames publicados espera, y si la
+simulación termina vuelve a esperar la siguiente.
+
+Uso:
+    python headless.py --segundos 600 --publicar-frames
+    python visor.py
+
+Controles:
+    Rueda / click derecho - Zoom y desplazamiento de la vista
+    0 - Vista completa
+    D - Debug
+    ESC - Salir
+"""
+
+import argparse
+import time
+import pygame
+from simulacion import Simulacion
+from sistema.compartido import LectorFrames
+from sistema.metricas import SistemaMetricas
+from ui.render_juego import RenderizadorJuego
+from ui.hud import HUD
+from ui.compositor import Compositor
+from ui.cache_texto import cache_texto, FuenteDiferida
+from core.constantes import *
+
+class MetricasPublicadas:
+    """Últimas métricas recibidas; ocupa el lugar de SistemaMetricas para el HUD"""
+
+    def __init__(self):
+        self.datos = SistemaMetricas().resumen()
+
+    def resumen(self):
+        """Retorna las métricas del último frame publicado"""
+        return self.datos
+
+class SimulacionReflejada(Simulacion):
+    """
+    Simulación que no avanza por sí misma: refleja los frames de otro proceso.
+
+    Tiene la misma grilla y los mismos sistemas que una Simulacion (así la
+    dibujan RenderizadorJuego y el HUD), pero en lugar de aplicar física
+    copia en cada frame los planos y el estado publicados.
+    """
+
+    def __init__(self, lector):
+        super().__init__(lector.columnas * lector.tamaño_celda, lector.filas * lector.tamaño_celda,
+                         lector.tamaño_celda, "compacta")
+        self.lector = lector
+        self.sistema_metricas = MetricasPublicadas()
+        self.configurar_constantes_nivel(TIEMPO_DRENAJE_SEGUNDOS, COLOR_LINEA_NIVEL, ANCHO_LINEA_NIVEL)
+        self._compuertas = None
+
+    def actualizar(self):
+        """
+        Copia el último frame publicado, si hay uno nuevo.
+
+        Retorna:
+            bool: True si se recibió un frame
+        """
+        estado = self.lector.leer(self.grilla.tipos, self.grilla.colores)
+        if estado is None:
+            return False
+        if estado:
+            self._aplicar_estado(estado)
+        return True
+
+    def _aplicar_estado(self, estado):
+        """Vuelca el estado publicado en los sistemas que leen los renderizadores"""
+        self.sistema_mensajes.mensaje_actual = estado["mensaje"]
+        self.manejador_entrada.modo = estado["entrada"]["modo"]
+        self.manejador_entrada.pausado = estado["entrada"]["pausado"]
+
+        aparicion = estado["aparicion"]
+        self.sistema_aparicion.habilitado = aparicion["habilitado"]
+        self.sistema_aparicion.velocidad = aparicion["velocidad"]
+        self.sistema_aparicion.ancho_area = aparicion["ancho_area"]
+        self.sistema_aparicion.tamaño_cluster = aparicion["tamaño_cluster"]
+
+        nivel = estado["nivel"]
+        self.sistema_nivel.modo_activo = nivel["modo_activo"]
+        self.sistema_nivel.posicion_linea = nivel["posicion_linea"]
+        self.sistema_nivel.esta_drenando = nivel["esta_drenando"]
+        self.sistema_nivel.timer_mensaje_drenaje = nivel["timer_mensaje_drenaje"]
+        self.sistema_nivel.compuertas_bloqueadas = nivel["compuertas_bloqueadas"]
+        # Las compuertas solo se recrean si cambió su ubicación
+        compuertas = [(c["posicion"], c["ancho"]) for c in nivel["compuertas"]]
+        if (nivel["politica_drenaje"], compuertas) != self._compuertas:
+            self._compuertas = (nivel["politica_drenaje"], compuertas)
+            self.sistema_nivel.configurar_drenaje(nivel["politica_drenaje"], nivel["compuertas"])
+
+        self.motor_fisicas.motor = estado["fisicas"]["motor"]
+        self.motor_fisicas.bandas_diferidas = estado["fisicas"]["bandas_diferidas"]
+        self.sistema_metricas.datos = estado["metricas"]
+
+    def _dibujar_pincel(self, superficie):
+        """El visor no pinta: no hay pincel que mostrar"""
+
+class VisorPerlita:
+    """Ventana que se conecta a una simulación publicada y la dibuja"""
+
+    # Fuente del cartel de espera
+    font_espera = FuenteDiferida(40)
+
+    def __init__(self, nombre):
+        pygame.display.init()
+        pygame.font.init()
+        self.screen = pygame.display.set_mode((ANCHO_VENTANA_INICIAL, ALTO_VENTANA_INICIAL), pygame.RESIZABLE)
+        pygame.display.set_caption(f"{TITULO_VENTANA} - Visor")
+
+        self.nombre = nombre
+        self.simulacion = None
+        self.renderizador_juego = RenderizadorJuego()
+        self.hud = HUD()
+        self.compositor = Compositor()
+        self.clock = pygame.time.Clock()
+        self._debug = False
+        self._proximo_intento = 0.0
+
+    def run(self):
+        """Bucle principal: conectar, leer y dibujar hasta que se cierre la ventana"""
+        corriendo = True
+        while corriendo:
+            corriendo = self._procesar_eventos()
+            if self.simulacion is None:
+                self._conectar()
+            elif not self.simulacion.lector.activo:
+                self._desconectar()
+
+            if self.simulacion is None:
+                self._dibujar_espera()
+            else:
+                self.simulacion.actualizar()
+                self._dibujar_frame()
+            self.clock.tick(FRAMES_POR_SEGUNDO)
+
+        self._desconectar()
+        pygame.quit()
+
+    def _procesar_eventos(self):
+        """Atiende la ventana, el zoom de la vista y las teclas del visor"""
+        for evento in pygame.event.get():
+            if evento.type == pygame.QUIT:
+                return False
+            if evento.type == pygame.VIDEORESIZE:
+                self.screen = pygame.display.set_mode((evento.w, evento.h), pygame.RESIZABLE)
+                self.compositor.invalidar()
+            elif evento.type == pygame.KEYDOWN:
+                if evento.key == pygame.K_ESCAPE:
+                    return False
+                if evento.key == pygame.K_d:
+                    self._debug = not self._debug
+                elif evento.key == pygame.K_0 and self.simulacion is not None:
+                    self.simulacion.sistema_vista.restablecer()
+            elif self.simulacion is not None:
+                vista = self.simulacion.sistema_vista
+                if evento.type == pygame.MOUSEWHEEL:
+                    vista.zoom(evento.y, pygame.mouse.get_pos())
+                elif evento.type == pygame.MOUSEMOTION and evento.buttons[2]:
+                    vista.desplazar(evento.rel)
+        return True
+
+    def _conectar(self):
+        """Intenta conectarse al bloque publicado (a intervalos, sin frenar la ventana)"""
+        ahora = time.monotonic()
+        if ahora < self._proximo_intento:
+            return
+        self._proximo_intento = ahora + INTERVALO_CONEXION_VISOR
+        try:
+            lector = LectorFrames(self.nombre)
+        except (FileNotFoundError, ValueError):
+            return
+        self.simulacion = SimulacionReflejada(lector)
+        self.simulacion.debug_mode = self._debug
+        self.compositor.invalidar()
+
+    def _desconectar(self):
+        """Suelta el bloque (la simulación terminó o se cierra el visor)"""
+        if self.simulacion is not None:
+            self.simulacion.lector.cerrar()
+            self.simulacion = None
+            self.compositor.invalidar()
+
+    def _dibujar_espera(self):
+        """Dibuja el cartel de espera mientras no hay simulación publicada"""
+        if self.compositor.preparar(("espera", self.screen.get_size())):
+            self.screen.fill(NEGRO)
+            texto = cache_texto.render(self.font_espera, f"Esperando la simulacion ({self.nombre})...",
+                                       PERLITA_CLARA)
+            self.screen.blit(texto, texto.get_rect(center=self.screen.get_rect().center))
+            self.compositor.capturar_fondo(self.screen)
+        self.compositor.presentar()
+
+    def _dibujar_frame(self):
+        """Dibuja la simulación reflejada igual que la pantalla de juego"""
+        self.simulacion.debug_mode = self._debug
+        self.renderizador_juego.dibujar(self.screen, self.simulacion, ANCHO_BORDE, COLOR_BORDE,
+                                        self.compositor)
+        self.compositor.registrar_capa("debug", self.hud.dibujar_info_debug(self.screen, self.simulacion))
+        self.compositor.registrar_capa("metricas", self.hud.dibujar_metricas(self.screen, self.simulacion))
+        self.compositor.presentar()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Visor de una simulación de perlita publicada por headless.py")
+    parser.add_argument("--nombre", default=NOMBRE_MEMORIA_VISOR,
+                        help="Nombre del bloque de memoria compartida (el de --publicar-frames)")
+    argumentos = parser.parse_args()
+    VisorPerlita(argumentos.nombre).run()